@@ -30,6 +30,7 @@ import io
 import json
 import logging
 import sys
+from argparse import Namespace
 from contextlib import redirect_stderr, redirect_stdout
 from pathlib import Path
 
@@ -37,7 +38,8 @@ from pathlib import Path
 REPO_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(REPO_ROOT / "src" / "discovery"))
 
-from main import main as analyze_main  # noqa: E402
+from main import analyze_directory, analyze_file  # noqa: E402
+from schema import AnalysisOptions  # noqa: E402
 
 # Ensure UTF-8 output on Windows regardless of active code page
 import io as _io
@@ -202,29 +204,29 @@ def _run_target(target: dict, out_base: Path) -> dict:
     out_dir = out_base / path.name
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    sys.argv = ["main.py", "--target", str(path), "--out", str(out_dir)]
-
     capture = io.StringIO()
     try:
         with redirect_stdout(capture), redirect_stderr(capture):
-            try:
-                analyze_main()
-            except SystemExit:
-                pass
+            if path.is_dir():
+                analyze_directory(path, out_dir, Namespace())
+                agg_path = out_dir / f"{path.name}_scan_mcp.json"
+                invocables = []
+                if agg_path.exists():
+                    with open(agg_path, encoding="utf-8") as fh:
+                        invocables = json.load(fh).get("invocables", [])
+            else:
+                result = analyze_file(
+                    path, AnalysisOptions(out_dir=out_dir, write_artifacts=True))
+                invocables = [inv.to_dict() for inv in result.invocables]
     except Exception as exc:
         return {"status": "error", "detail": str(exc)}
 
-    json_files = list(out_dir.glob("*_mcp.json"))
-    if not json_files:
+    if not invocables:
         return {
             "status": "failed",
             "detail": capture.getvalue().strip().splitlines()[-5:],
         }
 
-    with open(json_files[0], encoding="utf-8") as fh:
-        data = json.load(fh)
-
-    invocables = data.get("invocables", [])
     label, colour = majority_confidence(invocables)
     return {
         "status":     "ok",
@@ -366,7 +368,7 @@ def print_detail(name: str) -> None:
 
 # ── Entry point ───────────────────────────────────────────────────────────────
 if __name__ == "__main__":
-    # Capture optional detail target before run_demo() writes sys.argv
+    # Optional detail target, e.g. `demo_all_capabilities.py sample.py`
     detail_target = None
     if len(sys.argv) > 1 and not sys.argv[1].startswith("-"):
         detail_target = sys.argv[1]
@@ -0,0 +1,53 @@
+"""
+binary_strings.py - Single-pass printable string extraction from binaries.
+
+Walks the raw bytes of a target (usually the shared PEImage memory map)
+once and yields ASCII and UTF-16LE strings with their file offsets, so
+named-pipe, RPC endpoint and URL detection can share one extraction
+instead of each decoding the whole file.
+"""
+
+import re
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional
+
+from pe_image import PEImage
+
+MIN_LENGTH = 4
+
+# Printable ASCII runs, or the same characters each followed by a NUL (UTF-16LE).
+# Factored on the first character so the engine does not retry both
+# alternatives at every offset.
+_STRING_RE = re.compile(
+    rb'[\x20-\x7e](?:\x00(?:[\x20-\x7e]\x00){%d,}|[\x20-\x7e]{%d,})'
+    % (MIN_LENGTH - 1, MIN_LENGTH - 1)
+)
+
+
+class BinaryString(NamedTuple):
+    """A printable string found in a binary."""
+    offset: int
+    encoding: str  # "ascii" | "utf-16le"
+    text: str
+
+
+def iter_strings(data) -> Iterator[BinaryString]:
+    """Yield printable strings of at least MIN_LENGTH characters from *data*.
+
+    *data* is any bytes-like object (bytes, mmap); only matched runs are
+    copied, never the whole buffer.
+    """
+    for match in _STRING_RE.finditer(data):
+        raw = match.group()
+        if raw[1] == 0:
+            yield BinaryString(match.start(), "utf-16le", raw.decode('utf-16le'))
+        else:
+            yield BinaryString(match.start(), "ascii", raw.decode('ascii'))
+
+
+def extract_strings(path: Path, image: Optional[PEImage] = None) -> List[BinaryString]:
+    """All printable strings of *path* in file order (one pass over the image)."""
+    if image is not None:
+        return list(iter_strings(image.data))
+    with open(path, 'rb') as f:
+        return list(iter_strings(f.read()))
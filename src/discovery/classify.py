@@ -5,10 +5,15 @@ Detects file types (PE DLL/EXE, .NET assembly, script, COM object, etc)
 to route to appropriate analyzers, and extracts digital signature info.
 """
 
+import json
+import struct
 import subprocess
 from enum import Enum
+from functools import cached_property
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Callable, FrozenSet, NamedTuple, Optional, Tuple
+
+from pe_image import DIR_IMPORT, PEImage
 
 # Suppress GUI windows when calling wmic or other tools (Windows only).
 _NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
@@ -45,11 +50,181 @@ class FileType(Enum):
     UNKNOWN = "UNKNOWN"
 
 
-def classify_file(file_path: Path) -> FileType:
+# Classification looks at no more than this many leading bytes of a file
+HEADER_READ_SIZE = 64 * 1024
+
+_COM_CORE_DLLS = frozenset({'ole32.dll', 'oleaut32.dll'})
+
+
+class _Header:
+    """The parts of a file classification may look at.
+
+    The file's first HEADER_READ_SIZE bytes are read with a single read()
+    the first time a rule needs them (extension-only rules never do); the
+    text, JSON and PE header views are decoded from that buffer on demand.
+    """
+
+    def __init__(self, path: Path, image: Optional[PEImage] = None):
+        self.path = path
+        self.ext = path.suffix.lower()
+        self._image = image     # caller's full image, if any
+        self._own_image: Optional[PEImage] = None
+
+    @cached_property
+    def data(self) -> bytes:
+        if self._image is not None:
+            return self._image.data[:HEADER_READ_SIZE]
+        try:
+            with open(self.path, 'rb') as f:
+                return f.read(HEADER_READ_SIZE)
+        except OSError:
+            return b''
+
+    @cached_property
+    def text(self) -> str:
+        return self.data.decode('utf-8', errors='replace')
+
+    @cached_property
+    def json(self) -> dict:
+        """Top-level object of a JSON document (a cut-off object is closed first)."""
+        text = self.text
+        try:
+            data = json.loads(text + ('}' if not text.rstrip().endswith('}') else ''))
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    @cached_property
+    def image(self) -> Optional[PEImage]:
+        """PE headers parsed from the header bytes (or the caller's image)."""
+        if self._image is not None:
+            return self._image
+        return PEImage.from_bytes(self.path, self.data)
+
+    def full_image(self) -> Optional[PEImage]:
+        """The whole file mapped, for the rare structures past the header bytes."""
+        if self._image is not None:
+            return self._image
+        if self._own_image is None:
+            self._own_image = PEImage.open(self.path)
+        return self._own_image
+
+    def close(self) -> None:
+        if self._own_image is not None:
+            self._own_image.close()
+
+
+def _is_pe(header: _Header) -> bool:
+    return header.image is not None
+
+
+def _is_clr(header: _Header) -> bool:
+    return header.image is not None and header.image.has_clr
+
+
+def _is_dll(header: _Header) -> bool:
+    return header.image is not None and header.image.is_dll
+
+
+def _is_com_dll(header: _Header) -> bool:
+    """PE DLL that is, or imports, a core COM runtime DLL."""
+    if not _is_dll(header):
+        return False
+    if header.path.name.lower() in _COM_CORE_DLLS:
+        return True
+    imported = _imported_dlls(header.image)
+    if imported is None:  # import table lies past the header bytes
+        image = header.full_image()
+        return image is not None and _is_com_object(header.path, image=image)
+    return not imported.isdisjoint(_COM_CORE_DLLS)
+
+
+def _is_com_core_name(header: _Header) -> bool:
+    return header.path.name.lower() in _COM_CORE_DLLS
+
+
+class Signature(NamedTuple):
+    """One classification rule; every given condition must hold.
+
+    Rules are tried in SIGNATURES order and the first match wins.
+    """
+    file_type: FileType
+    extensions: FrozenSet[str] = frozenset()   # empty: any extension
+    magic: bytes = b''                          # leading bytes of the file
+    markers: Tuple[str, ...] = ()               # any of these in the header text
+    required: Tuple[str, ...] = ()              # all of these in the header text
+    json_keys: Tuple[str, ...] = ()             # any of these top-level JSON keys
+    test: Optional[Callable[[_Header], bool]] = None  # PE header facts etc.
+
+
+def _ext(*extensions: str) -> FrozenSet[str]:
+    return frozenset(extensions)
+
+
+SIGNATURES: Tuple[Signature, ...] = (
+    # Type libraries are always COM
+    Signature(FileType.COM_OBJECT,        _ext('.tlb', '.olb')),
+    # JIT / scripting / query files
+    Signature(FileType.PYTHON_SCRIPT,     _ext('.py')),
+    Signature(FileType.POWERSHELL_SCRIPT, _ext('.ps1')),
+    Signature(FileType.BATCH_SCRIPT,      _ext('.bat', '.cmd')),
+    Signature(FileType.VBSCRIPT,          _ext('.vbs')),
+    Signature(FileType.SHELL_SCRIPT,      _ext('.sh', '.bash', '.zsh')),
+    Signature(FileType.JAVASCRIPT,        _ext('.js', '.mjs', '.cjs')),
+    Signature(FileType.TYPESCRIPT,        _ext('.ts', '.tsx', '.mts')),
+    Signature(FileType.RUBY_SCRIPT,       _ext('.rb')),
+    Signature(FileType.PHP_SCRIPT,        _ext('.php')),
+    Signature(FileType.SQL_FILE,          _ext('.sql')),
+    # Service / protocol descriptors (all YAML is treated as potential OpenAPI)
+    Signature(FileType.OPENAPI_SPEC,      _ext('.yaml', '.yml')),
+    Signature(FileType.WSDL_FILE,         _ext('.wsdl')),
+    Signature(FileType.CORBA_IDL,         _ext('.idl')),
+    Signature(FileType.JNDI_CONFIG,       _ext('.jndi', '.properties')),
+    Signature(FileType.PDB_FILE,          _ext('.pdb')),
+    # XML: Spring JNDI context or WSDL
+    Signature(FileType.JNDI_CONFIG,       _ext('.xml'),
+              markers=('jndi-lookup', 'JndiObjectFactoryBean', 'java.naming', 'jndiName')),
+    Signature(FileType.WSDL_FILE,         _ext('.xml'),
+              required=('<definitions', 'schemas.xmlsoap.org/wsdl')),
+    # JSON: OpenAPI or JSON-RPC
+    Signature(FileType.OPENAPI_SPEC,      _ext('.json'), json_keys=('openapi', 'swagger')),
+    Signature(FileType.JSONRPC_SPEC,      _ext('.json'), json_keys=('methods', 'jsonrpc', 'method')),
+    # PE images, by optional-header facts
+    Signature(FileType.DOTNET_ASSEMBLY,   magic=b'MZ', test=_is_clr),
+    Signature(FileType.COM_OBJECT,        magic=b'MZ', test=_is_com_dll),
+    Signature(FileType.PE_DLL,            magic=b'MZ', test=_is_dll),
+    Signature(FileType.PE_EXE,            magic=b'MZ', test=_is_pe),
+    Signature(FileType.DOTNET_ASSEMBLY,   magic=b'ILFM'),
+    # Extension fallback for images the header check rejected
+    Signature(FileType.COM_OBJECT,        _ext('.dll'), test=_is_com_core_name),
+    Signature(FileType.PE_DLL,            _ext('.dll')),
+    Signature(FileType.PE_EXE,            _ext('.exe', '.com')),
+)
+
+
+def _matches(signature: Signature, header: _Header) -> bool:
+    if signature.extensions and header.ext not in signature.extensions:
+        return False
+    if signature.magic and not header.data.startswith(signature.magic):
+        return False
+    if signature.markers and not any(m in header.text for m in signature.markers):
+        return False
+    if signature.required and not all(m in header.text for m in signature.required):
+        return False
+    if signature.json_keys and not any(k in header.json for k in signature.json_keys):
+        return False
+    return signature.test is None or signature.test(header)
+
+
+def classify_file(file_path: Path, image: Optional[PEImage] = None) -> FileType:
     """Classify a file based on its signature and extension.
     
+    Matches the file against SIGNATURES using its extension and at most
+    one bounded read of its first HEADER_READ_SIZE bytes.
+    
     Args:
         file_path: Path to file to classify
+        image: Already-opened PEImage of *file_path* (opened here if omitted)
         
     Returns:
         FileType enum indicating detected type
@@ -57,209 +232,62 @@ def classify_file(file_path: Path) -> FileType:
     if not file_path.exists():
         return FileType.UNKNOWN
 
-    ext = file_path.suffix.lower()
-
-    # Explicit override for .tlb files - they are always COM/TypeLibraries
-    if ext in ['.tlb', '.olb']:
-        return FileType.COM_OBJECT
-
-    # --- JIT / scripting / query files (extension-based detection) ---
-    if ext == '.py':
-        return FileType.PYTHON_SCRIPT
-    if ext == '.ps1':
-        return FileType.POWERSHELL_SCRIPT
-    if ext in ('.bat', '.cmd'):
-        return FileType.BATCH_SCRIPT
-    if ext == '.vbs':
-        return FileType.VBSCRIPT
-    if ext in ('.sh', '.bash', '.zsh'):
-        return FileType.SHELL_SCRIPT
-    if ext in ('.js', '.mjs', '.cjs'):
-        return FileType.JAVASCRIPT
-    if ext in ('.ts', '.tsx', '.mts'):
-        return FileType.TYPESCRIPT
-    if ext == '.rb':
-        return FileType.RUBY_SCRIPT
-    if ext == '.php':
-        return FileType.PHP_SCRIPT
-    if ext == '.sql':
-        return FileType.SQL_FILE
-
-    # ── Service / protocol descriptor files ─────────────────────────────────
-    if ext in ('.yaml', '.yml'):
-        # Could be a plain YAML config or an OpenAPI spec; peek inside
-        try:
-            snippet = file_path.read_text(encoding='utf-8', errors='replace')[:2000]
-            if any(k in snippet for k in ('openapi:', 'swagger:')):
-                return FileType.OPENAPI_SPEC
-        except OSError:
-            pass
-        return FileType.OPENAPI_SPEC  # treat all YAML as potential OpenAPI specs
-
-    if ext == '.wsdl':
-        return FileType.WSDL_FILE
-
-    if ext == '.idl':
-        return FileType.CORBA_IDL
-
-    if ext in ('.jndi', '.properties'):
-        return FileType.JNDI_CONFIG
-
-    if ext == '.pdb':
-        return FileType.PDB_FILE
-
-    # XML: could be Spring JNDI context
-    if ext == '.xml':
-        try:
-            snippet = file_path.read_text(encoding='utf-8', errors='replace')[:2000]
-            if any(k in snippet for k in ('jndi-lookup', 'JndiObjectFactoryBean',
-                                          'java.naming', 'jndiName')):
-                return FileType.JNDI_CONFIG
-            if '<definitions' in snippet and 'schemas.xmlsoap.org/wsdl' in snippet:
-                return FileType.WSDL_FILE
-        except OSError:
-            pass
-
-    # JSON: could be OpenAPI or JSON-RPC
-    if ext == '.json':
-        try:
-            import json as _json
-            snippet = file_path.read_text(encoding='utf-8', errors='replace')[:4000]
-            data = _json.loads(snippet + ('}' if not snippet.rstrip().endswith('}') else ''))
-        except Exception:
-            data = {}
-        if isinstance(data, dict):
-            if 'openapi' in data or 'swagger' in data:
-                return FileType.OPENAPI_SPEC
-            if 'methods' in data and 'jsonrpc' not in data:
-                return FileType.JSONRPC_SPEC
-            if 'jsonrpc' in data or 'method' in data:
-                return FileType.JSONRPC_SPEC
+    header = _Header(file_path, image)
     try:
-        with open(file_path, 'rb') as f:
-            magic = f.read(4)
-
-        # PE signature: "MZ" followed by PE signature at offset
-        if magic[:2] == b'MZ':
-            # Read PE header offset
-            with open(file_path, 'rb') as f:
-                f.seek(0x3c)
-                pe_offset_bytes = f.read(4)
-                if len(pe_offset_bytes) == 4:
-                    pe_offset = int.from_bytes(pe_offset_bytes, 'little')
-
-                    # Read PE signature
-                    with open(file_path, 'rb') as f2:
-                        f2.seek(pe_offset)
-                        pe_sig = f2.read(4)
-
-                        if pe_sig == b'PE\x00\x00':
-                            # Read machine type (offset +4 in COFF header)
-                            f2.seek(pe_offset + 4)
-                            machine = f2.read(2)
-
-                            # Check for .NET metadata
-                            if _has_dotnet_metadata(file_path):
-                                return FileType.DOTNET_ASSEMBLY
-
-                            # Distinguish DLL vs EXE by characteristics
-                            f2.seek(pe_offset + 22)  # Characteristics field
-                            chars = f2.read(2)
-                            if len(chars) == 2:
-                                characteristics = int.from_bytes(chars, 'little')
-                                # 0x2000 = DLL characteristic
-                                if characteristics & 0x2000:
-                                    # Check if it's a COM object
-                                    if _is_com_object(file_path):
-                                        return FileType.COM_OBJECT
-                                    return FileType.PE_DLL
-                                else:
-                                    return FileType.PE_EXE
-
-                            return FileType.PE_DLL  # Default for PE
-
-        # .NET signature
-        if magic == b'ILFM':
-            return FileType.DOTNET_ASSEMBLY
-
-    except (OSError, struct.error):
-        pass
-
-    # Extension-based fallback
-    if ext in ['.dll']:
-        # If we failed to detect COM/NET via PE, check name
-        if _is_com_object(file_path):
-             return FileType.COM_OBJECT
-        return FileType.PE_DLL
-    elif ext in ['.exe', '.com']:
-        return FileType.PE_EXE
-    elif ext in ['.tlb', '.olb']:
-        return FileType.COM_OBJECT
-    
-    # Pre-check: TLB files often have "MSFT" magic or others, but extension is reliable enough
-    if ext in ['.tlb', '.olb']:
-        return FileType.COM_OBJECT
+        for signature in SIGNATURES:
+            if _matches(signature, header):
+                return signature.file_type
+        return FileType.UNKNOWN
+    finally:
+        header.close()
 
-    return FileType.UNKNOWN
 
+def _imported_dlls(image: PEImage) -> Optional[FrozenSet[str]]:
+    """Lower-case names of the DLLs *image* imports from.
 
-def _has_dotnet_metadata(file_path: Path) -> bool:
+    None if the import descriptors or names are not inside image.data
+    (a header-only image of a larger file).
+    """
+    dir_rva, _ = image.data_directory(DIR_IMPORT)
+    if not dir_rva:
+        return frozenset()
+    names = set()
+    index = 0
+    try:
+        while True:
+            desc = image.rva_to_offset(dir_rva + 20 * index)
+            if desc is None:
+                return None
+            original_thunk, _, _, name_rva, first_thunk = struct.unpack_from('<IIIII', image.data, desc)
+            if not (original_thunk or name_rva or first_thunk):
+                return frozenset(names)
+            start = image.rva_to_offset(name_rva)
+            end = image.data.find(b'\x00', start) if start is not None else -1
+            if end < 0:
+                return None
+            names.add(bytes(image.data[start:end]).decode('ascii', errors='replace').lower())
+            index += 1
+    except struct.error:  # descriptor cut off by the end of the header bytes
+        return None
+
+
+def _has_dotnet_metadata(file_path: Path, image: Optional[PEImage] = None) -> bool:
     """Check if PE file contains .NET metadata (CLR header).
     
     Reads PE data directory 14 (CLR Runtime Header).
     If RVA > 0 and Size > 0, the binary contains .NET code.
     """
-    try:
-        with open(file_path, 'rb') as f:
-            # Read DOS header -> PE offset
-            f.seek(0x3c)
-            pe_offset_bytes = f.read(4)
-            if len(pe_offset_bytes) != 4:
-                return False
-            pe_offset = int.from_bytes(pe_offset_bytes, 'little')
-            
-            # Validate PE signature
-            f.seek(pe_offset)
-            pe_sig = f.read(4)
-            if pe_sig != b'PE\x00\x00':
-                return False
-            
-            # Read magic (determines bitness)
-            # Magic is 2 bytes after PE signature + COFF header (20 bytes)
-            f.seek(pe_offset + 24)
-            magic_bytes = f.read(2)
-            if len(magic_bytes) != 2:
-                return False
-            magic = int.from_bytes(magic_bytes, 'little')
-            
-            is_64bit = (magic == 0x20B)  # 0x20B = PE32+, 0x10B = PE32
-            
-            # Data directories start AFTER NumberOfRvaAndSizes field:
-            # PE+24 (Optional Header start) + 108 (x64) or + 92 (x86) = NumberOfRvaAndSizes offset
-            # Then +4 to skip NumberOfRvaAndSizes itself = First data directory
-            num_dirs_offset = pe_offset + 24 + (108 if is_64bit else 92)
-            
-            # CLR Runtime Header is directory 14
-            # Each directory = 8 bytes (RVA + Size)
-            clr_dir_offset = num_dirs_offset + 4 + (14 * 8)
-            
-            f.seek(clr_dir_offset)
-            clr_rva_bytes = f.read(4)
-            clr_size_bytes = f.read(4)
-            
-            if len(clr_rva_bytes) != 4 or len(clr_size_bytes) != 4:
-                return False
-            
-            clr_rva = int.from_bytes(clr_rva_bytes, 'little')
-            clr_size = int.from_bytes(clr_size_bytes, 'little')
-            
-            return clr_rva > 0 and clr_size > 0
-    
-    except (OSError, ValueError):
+    if image is not None:
+        return image.has_clr
+    image = PEImage.open(file_path)
+    if image is None:
         return False
+    with image:
+        return image.has_clr
 
 
-def _is_com_object(file_path: Path, dumpbin_exe: str = "dumpbin") -> bool:
+def _is_com_object(file_path: Path, dumpbin_exe: str = "dumpbin",
+                   image: Optional[PEImage] = None) -> bool:
     """Detect if PE DLL is a COM object by checking imports.
     
     COM objects typically import ole32.dll or oleaut32.dll.
@@ -272,7 +300,7 @@ def _is_com_object(file_path: Path, dumpbin_exe: str = "dumpbin") -> bool:
             return True
         
         from pe_parse import get_pe_imports
-        imports, success = get_pe_imports(file_path, dumpbin_exe)
+        imports, success = get_pe_imports(file_path, image=image)
         
         if not success or not imports:
             return False
@@ -284,55 +312,37 @@ def _is_com_object(file_path: Path, dumpbin_exe: str = "dumpbin") -> bool:
         return False
 
 
-def get_architecture(file_path: Path) -> Optional[str]:
+def get_architecture(file_path: Path, image: Optional[PEImage] = None) -> Optional[str]:
     """Detect architecture (x86, x64, ARM64, etc) from PE header.
     
     Returns:
         Architecture string or None if cannot determine
     """
-    try:
-        with open(file_path, 'rb') as f:
-            f.seek(0x3c)
-            pe_offset = int.from_bytes(f.read(4), 'little')
-
-            f.seek(pe_offset + 4)
-            machine = int.from_bytes(f.read(2), 'little')
-
-            # Machine type constants
-            MACHINE_I386 = 0x014C
-            MACHINE_AMD64 = 0x8664
-            MACHINE_ARM = 0x01C0
-            MACHINE_ARM64 = 0xAA64
-
-            if machine == MACHINE_I386:
-                return "x86"
-            elif machine == MACHINE_AMD64:
-                return "x64"
-            elif machine == MACHINE_ARM:
-                return "ARM"
-            elif machine == MACHINE_ARM64:
-                return "ARM64"
-
-    except (OSError, ValueError):
-        pass
-
-    return None
+    if image is not None:
+        return image.architecture
+    image = PEImage.open(file_path)
+    if image is None:
+        return None
+    with image:
+        return image.architecture
 
 
-def extract_signature(pe_path: Path) -> Tuple[bool, Optional[str]]:
+def extract_signature(pe_path: Path,
+                      image: Optional[PEImage] = None) -> Tuple[bool, Optional[str]]:
     """Extract digital signature and publisher info from PE file.
     
-    Parses Security Directory[4] via PowerShell Get-AuthenticodeSignature.
+    Parses the Authenticode signature in Security Directory[4].
     
     Args:
         pe_path: Path to PE file
+        image: Already mapped PEImage of *pe_path* (opened here if omitted)
         
     Returns:
         (is_signed, publisher_name)
     """
     try:
         from signature import get_signature_info
-        return get_signature_info(pe_path)
+        return get_signature_info(pe_path, image)
     except ImportError:
         # Fallback to old method if signature module not available
         try:
@@ -0,0 +1,721 @@
+"""
+clr_metadata.py - ECMA-335 metadata reader for .NET assemblies.
+
+Reads the CLI metadata of a managed PE image straight from the shared
+PEImage memory map, so public methods can be listed on any platform
+without loading the assembly into a CLR (no PowerShell, no static
+initializers run).
+
+Implements:
+- CLR header -> metadata root -> stream headers (#~ / #-, #Strings, #Blob)
+- Table row counts, heap index widths and coded index sizes (ECMA-335 II.24.2.6)
+- TypeDef / MethodDef / Param / TypeRef / TypeSpec / GenericParam / Assembly rows
+- Method signature blobs rendered as reflection short type names (Type.Name)
+  and as XML documentation member IDs (``M:Ns.Type.Method(System.Int32)``)
+"""
+
+import hashlib
+import re
+import struct
+from contextlib import contextmanager
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from pe_image import DIR_CLR, PEImage
+
+METADATA_SIGNATURE = 0x424A5342  # "BSJB"
+
+# Table numbers used below (ECMA-335 II.22)
+T_MODULE = 0x00
+T_TYPEREF = 0x01
+T_TYPEDEF = 0x02
+T_FIELDPTR = 0x03
+T_FIELD = 0x04
+T_METHODPTR = 0x05
+T_METHODDEF = 0x06
+T_PARAMPTR = 0x07
+T_PARAM = 0x08
+T_INTERFACEIMPL = 0x09
+T_MEMBERREF = 0x0A
+T_DECLSECURITY = 0x0E
+T_STANDALONESIG = 0x11
+T_EVENTPTR = 0x13
+T_EVENT = 0x14
+T_PROPERTYPTR = 0x16
+T_PROPERTY = 0x17
+T_MODULEREF = 0x1A
+T_TYPESPEC = 0x1B
+T_ASSEMBLY = 0x20
+T_ASSEMBLYREF = 0x23
+T_FILE = 0x26
+T_EXPORTEDTYPE = 0x27
+T_MANIFESTRESOURCE = 0x28
+T_NESTEDCLASS = 0x29
+T_GENERICPARAM = 0x2A
+T_METHODSPEC = 0x2B
+T_GENERICPARAMCONSTRAINT = 0x2C
+
+# Coded index kinds: (tag bits, tables by tag; None = unused tag)
+_CODED = {
+    "TypeDefOrRef": (2, (T_TYPEDEF, T_TYPEREF, T_TYPESPEC)),
+    "HasConstant": (2, (T_FIELD, T_PARAM, T_PROPERTY)),
+    "HasCustomAttribute": (5, (T_METHODDEF, T_FIELD, T_TYPEREF, T_TYPEDEF, T_PARAM,
+                               T_INTERFACEIMPL, T_MEMBERREF, T_MODULE, T_DECLSECURITY,
+                               T_PROPERTY, T_EVENT, T_STANDALONESIG, T_MODULEREF,
+                               T_TYPESPEC, T_ASSEMBLY, T_ASSEMBLYREF, T_FILE,
+                               T_EXPORTEDTYPE, T_MANIFESTRESOURCE, T_GENERICPARAM,
+                               T_GENERICPARAMCONSTRAINT, T_METHODSPEC)),
+    "HasFieldMarshal": (1, (T_FIELD, T_PARAM)),
+    "HasDeclSecurity": (2, (T_TYPEDEF, T_METHODDEF, T_ASSEMBLY)),
+    "MemberRefParent": (3, (T_TYPEDEF, T_TYPEREF, T_MODULEREF, T_METHODDEF, T_TYPESPEC)),
+    "HasSemantics": (1, (T_EVENT, T_PROPERTY)),
+    "MethodDefOrRef": (1, (T_METHODDEF, T_MEMBERREF)),
+    "MemberForwarded": (1, (T_FIELD, T_METHODDEF)),
+    "Implementation": (2, (T_FILE, T_ASSEMBLYREF, T_EXPORTEDTYPE)),
+    "CustomAttributeType": (3, (None, None, T_METHODDEF, T_MEMBERREF, None)),
+    "ResolutionScope": (2, (T_MODULE, T_MODULEREF, T_ASSEMBLYREF, T_TYPEREF)),
+    "TypeOrMethodDef": (1, (T_TYPEDEF, T_METHODDEF)),
+}
+
+# Column layout of every table that can precede the ones we read.
+# "2"/"4": constants, "S"/"G"/"B": #Strings/#GUID/#Blob heap index,
+# an int: simple index into that table, any other str: coded index kind.
+_SCHEMA: Dict[int, Tuple] = {
+    0x00: ("2", "S", "G", "G", "G"),                       # Module
+    0x01: ("ResolutionScope", "S", "S"),                   # TypeRef
+    0x02: ("4", "S", "S", "TypeDefOrRef", T_FIELD, T_METHODDEF),  # TypeDef
+    0x03: (T_FIELD,),                                      # FieldPtr
+    0x04: ("2", "S", "B"),                                 # Field
+    0x05: (T_METHODDEF,),                                  # MethodPtr
+    0x06: ("4", "2", "2", "S", "B", T_PARAM),              # MethodDef
+    0x07: (T_PARAM,),                                      # ParamPtr
+    0x08: ("2", "2", "S"),                                 # Param
+    0x09: (T_TYPEDEF, "TypeDefOrRef"),                     # InterfaceImpl
+    0x0A: ("MemberRefParent", "S", "B"),                   # MemberRef
+    0x0B: ("2", "HasConstant", "B"),                       # Constant
+    0x0C: ("HasCustomAttribute", "CustomAttributeType", "B"),  # CustomAttribute
+    0x0D: ("HasFieldMarshal", "B"),                        # FieldMarshal
+    0x0E: ("2", "HasDeclSecurity", "B"),                   # DeclSecurity
+    0x0F: ("2", "4", T_TYPEDEF),                           # ClassLayout
+    0x10: ("4", T_FIELD),                                  # FieldLayout
+    0x11: ("B",),                                          # StandAloneSig
+    0x12: (T_TYPEDEF, T_EVENT),                            # EventMap
+    0x13: (T_EVENT,),                                      # EventPtr
+    0x14: ("2", "S", "TypeDefOrRef"),                      # Event
+    0x15: (T_TYPEDEF, T_PROPERTY),                         # PropertyMap
+    0x16: (T_PROPERTY,),                                   # PropertyPtr
+    0x17: ("2", "S", "B"),                                 # Property
+    0x18: ("2", T_METHODDEF, "HasSemantics"),              # MethodSemantics
+    0x19: (T_TYPEDEF, "MethodDefOrRef", "MethodDefOrRef"),  # MethodImpl
+    0x1A: ("S",),                                          # ModuleRef
+    0x1B: ("B",),                                          # TypeSpec
+    0x1C: ("2", "MemberForwarded", "S", T_MODULEREF),      # ImplMap
+    0x1D: ("4", T_FIELD),                                  # FieldRVA
+    0x1E: ("4", "4"),                                      # EncLog
+    0x1F: ("4",),                                          # EncMap
+    0x20: ("4", "2", "2", "2", "2", "4", "B", "S", "S"),   # Assembly
+    0x21: ("4",),                                          # AssemblyProcessor
+    0x22: ("4", "4", "4"),                                 # AssemblyOS
+    0x23: ("2", "2", "2", "2", "4", "B", "S", "S", "B"),   # AssemblyRef
+    0x24: ("4", T_ASSEMBLYREF),                            # AssemblyRefProcessor
+    0x25: ("4", "4", "4", T_ASSEMBLYREF),                  # AssemblyRefOS
+    0x26: ("4", "S", "B"),                                 # File
+    0x27: ("4", "4", "S", "S", "Implementation"),          # ExportedType
+    0x28: ("4", "4", "S", "Implementation"),               # ManifestResource
+    0x29: (T_TYPEDEF, T_TYPEDEF),                          # NestedClass
+    0x2A: ("2", "2", "TypeOrMethodDef", "S"),              # GenericParam
+    0x2B: ("MethodDefOrRef", "B"),                         # MethodSpec
+    0x2C: (T_GENERICPARAM, "TypeDefOrRef"),                # GenericParamConstraint
+}
+
+# TypeAttributes / MethodAttributes
+TYPE_VISIBILITY_MASK = 0x07
+TYPE_PUBLIC = 0x01
+METHOD_ACCESS_MASK = 0x07
+METHOD_PUBLIC = 0x06
+METHOD_STATIC = 0x10
+METHOD_VIRTUAL = 0x40
+METHOD_NEW_SLOT = 0x100
+METHOD_ABSTRACT = 0x400
+METHOD_SPECIAL_NAME = 0x800
+
+# Signature element types with a fixed reflection name (ECMA-335 II.23.1.16)
+_PRIMITIVES = {
+    0x01: "Void", 0x02: "Boolean", 0x03: "Char", 0x04: "SByte", 0x05: "Byte",
+    0x06: "Int16", 0x07: "UInt16", 0x08: "Int32", 0x09: "UInt32", 0x0A: "Int64",
+    0x0B: "UInt64", 0x0C: "Single", 0x0D: "Double", 0x0E: "String",
+    0x16: "TypedReference", 0x18: "IntPtr", 0x19: "UIntPtr", 0x1C: "Object",
+}
+ELEMENT_PTR = 0x0F
+ELEMENT_BYREF = 0x10
+ELEMENT_VALUETYPE = 0x11
+ELEMENT_CLASS = 0x12
+ELEMENT_VAR = 0x13
+ELEMENT_ARRAY = 0x14
+ELEMENT_GENERICINST = 0x15
+ELEMENT_FNPTR = 0x1B
+ELEMENT_SZARRAY = 0x1D
+ELEMENT_MVAR = 0x1E
+ELEMENT_CMOD_REQD = 0x1F
+ELEMENT_CMOD_OPT = 0x20
+ELEMENT_SENTINEL = 0x41
+ELEMENT_PINNED = 0x45
+
+SIG_GENERIC = 0x10
+
+# Generic arity suffix of a type name ("List`1"), dropped in doc ID instantiations
+_ARITY_RE = re.compile(r"`(\d+)$")
+
+# Generic arguments of a constructed base type: (reflection names, doc ID names)
+_TypeArgs = Tuple[Tuple[str, ...], Tuple[str, ...]]
+
+
+class MetadataError(ValueError):
+    """Raised for truncated or malformed CLI metadata."""
+
+
+@contextmanager
+def _malformed():
+    """Report reads past the end of a table, heap or blob as MetadataError."""
+    try:
+        yield
+    except (struct.error, IndexError) as e:
+        raise MetadataError(f"truncated metadata: {e}") from e
+
+
+class DotnetMethod(NamedTuple):
+    """One public method of a public type, as reflection would report it."""
+    type_name: str                      # Type.FullName
+    namespace: Optional[str]
+    name: str
+    return_type: str                    # Type.Name of the return type
+    parameters: List[Tuple[str, str]]   # (Type.Name, parameter name)
+    is_static: bool
+    is_abstract: bool
+    doc_id: str                         # XML doc member ID of the declaration
+
+
+class _DeclaredMethods(NamedTuple):
+    # (signature key, method, is virtual) of each public method
+    methods: List[Tuple[tuple, DotnetMethod, bool]]
+    # signature keys of virtual methods that override a base slot
+    overrides: FrozenSet[tuple]
+
+
+class ClrMetadata:
+    """Parsed metadata tables of one managed PE image.
+
+    Use ``ClrMetadata.open(image)``; it returns None for native images and
+    raises MetadataError if the metadata is malformed.  The object reads
+    from ``image.data`` and must not outlive the image.
+    """
+
+    def __init__(self, image: PEImage):
+        self._data = image.data
+        self._streams: Dict[str, Tuple[int, int]] = {}
+        self._read_root(image)
+
+        tables = self._streams.get("#~") or self._streams.get("#-")
+        if tables is None:
+            raise MetadataError("no #~ tables stream")
+        self._strings = self._streams.get("#Strings", (0, 0))
+        self._blob = self._streams.get("#Blob", (0, 0))
+        self._read_tables(*tables)
+        self._generic_names: Optional[Dict[Tuple[int, int], List[str]]] = None
+        self._enclosing: Optional[Dict[int, int]] = None
+
+    @classmethod
+    def open(cls, image: PEImage) -> Optional["ClrMetadata"]:
+        """Metadata of *image*, or None if it has no CLR header."""
+        if not image.has_clr:
+            return None
+        with _malformed():
+            return cls(image)
+
+    # ── Layout ───────────────────────────────────────────────────────────────
+
+    def _offset(self, image: PEImage, rva: int, what: str) -> int:
+        offset = image.rva_to_offset(rva)
+        if offset is None:
+            raise MetadataError(f"{what} is not mapped")
+        return offset
+
+    def _read_root(self, image: PEImage) -> None:
+        cor20 = self._offset(image, image.data_directory(DIR_CLR)[0], "CLR header")
+        md_rva, md_size = struct.unpack_from('<II', self._data, cor20 + 8)
+        root = self._offset(image, md_rva, "metadata root")
+
+        if struct.unpack_from('<I', self._data, root)[0] != METADATA_SIGNATURE:
+            raise MetadataError("bad metadata signature")
+        version_length = struct.unpack_from('<I', self._data, root + 12)[0]
+        pos = root + 16 + version_length
+        stream_count = struct.unpack_from('<H', self._data, pos + 2)[0]
+        pos += 4
+
+        for _ in range(stream_count):
+            offset, size = struct.unpack_from('<II', self._data, pos)
+            end = self._data.find(b'\x00', pos + 8, pos + 8 + 32)
+            if end < 0:
+                raise MetadataError("unterminated stream name")
+            name = self._data[pos + 8:end].decode('ascii', errors='replace')
+            pos = (end + 4) & ~3  # name is NUL-padded to a 4-byte boundary
+            if offset + size > md_size:
+                raise MetadataError(f"stream {name} exceeds metadata")
+            self._streams.setdefault(name, (root + offset, size))
+
+    def _read_tables(self, start: int, size: int) -> None:
+        data = self._data
+        heap_sizes = data[start + 6]
+        valid = struct.unpack_from('<Q', data, start + 8)[0]
+        self._str_size = 4 if heap_sizes & 0x01 else 2
+        guid_size = 4 if heap_sizes & 0x02 else 2
+        self._blob_size = 4 if heap_sizes & 0x04 else 2
+
+        self.rows = [0] * 64
+        pos = start + 24
+        for table in range(64):
+            if valid >> table & 1:
+                self.rows[table] = struct.unpack_from('<I', data, pos)[0]
+                pos += 4
+        if heap_sizes & 0x40:
+            pos += 4  # extra data after the row counts (#- streams)
+
+        present = [t for t in range(64) if self.rows[t]]
+        unknown = [t for t in present if t not in _SCHEMA]
+        if unknown:
+            raise MetadataError(f"unknown metadata table 0x{unknown[0]:02X}")
+
+        # Column widths -> a row struct per table
+        def coded_width(kind: str) -> int:
+            bits, tables = _CODED[kind]
+            largest = max(self.rows[t] for t in tables if t is not None)
+            return 2 if largest < 1 << (16 - bits) else 4
+
+        self._row_struct: Dict[int, struct.Struct] = {}
+        self._table_start: Dict[int, int] = {}
+        for table in present:
+            fmt = '<'
+            for column in _SCHEMA[table]:
+                if column in ("2", "4"):
+                    width = int(column)
+                elif column == "S":
+                    width = self._str_size
+                elif column == "G":
+                    width = guid_size
+                elif column == "B":
+                    width = self._blob_size
+                elif isinstance(column, int):
+                    width = 2 if self.rows[column] < 1 << 16 else 4
+                else:
+                    width = coded_width(column)
+                fmt += 'H' if width == 2 else 'I'
+            self._row_struct[table] = struct.Struct(fmt)
+            self._table_start[table] = pos
+            pos += self._row_struct[table].size * self.rows[table]
+
+        if pos > start + size:
+            raise MetadataError("tables exceed the #~ stream")
+
+    # ── Row / heap access ────────────────────────────────────────────────────
+
+    def row(self, table: int, rid: int) -> Tuple[int, ...]:
+        """Column values of row *rid* (1-based) of *table*."""
+        if not 1 <= rid <= self.rows[table]:
+            raise MetadataError(f"row {rid} out of range for table 0x{table:02X}")
+        row_struct = self._row_struct[table]
+        return row_struct.unpack_from(self._data, self._table_start[table]
+                                      + (rid - 1) * row_struct.size)
+
+    def string(self, index: int) -> str:
+        """Entry *index* of the #Strings heap."""
+        start, size = self._strings
+        if index >= size:
+            raise MetadataError(f"string index {index} out of range")
+        end = self._data.find(b'\x00', start + index, start + size)
+        if end < 0:
+            end = start + size
+        return self._data[start + index:end].decode('utf-8', errors='replace')
+
+    def blob(self, index: int) -> bytes:
+        """Entry *index* of the #Blob heap."""
+        start, size = self._blob
+        if index >= size:
+            raise MetadataError(f"blob index {index} out of range")
+        length, pos = _read_compressed(self._data, start + index)
+        if pos + length > start + size:
+            raise MetadataError(f"blob {index} exceeds the #Blob heap")
+        return bytes(self._data[pos:pos + length])
+
+    def _list_range(self, table: int, column: int, rid: int, target: int,
+                    pointer: int) -> List[int]:
+        """Rows of *target* owned by row *rid* of *table* (MethodList, ParamList).
+
+        Runs from this row's list start to the next row's; a *pointer* table
+        (MethodPtr / ParamPtr in unoptimized #- metadata) adds one indirection.
+        """
+        first = self.row(table, rid)[column]
+        if rid < self.rows[table]:
+            last = self.row(table, rid + 1)[column]
+        else:
+            last = (self.rows[pointer] or self.rows[target]) + 1
+        rids = range(first, max(first, last))
+        if self.rows[pointer]:
+            return [self.row(pointer, r)[0] for r in rids]
+        return [r for r in rids if r <= self.rows[target]]
+
+    def type_full_name(self, type_rid: int) -> str:
+        """Type.FullName of a top-level TypeDef row."""
+        _, name, namespace = self.row(T_TYPEDEF, type_rid)[:3]
+        namespace_text = self.string(namespace)
+        return f"{namespace_text}.{self.string(name)}" if namespace_text else self.string(name)
+
+    def type_namespace(self, type_rid: int) -> Optional[str]:
+        """Type.Namespace of a TypeDef row (None for the global namespace)."""
+        return self.string(self.row(T_TYPEDEF, type_rid)[2]) or None
+
+    def type_def_doc_name(self, type_rid: int) -> str:
+        """Documentation ID name of a TypeDef row (``Ns.Outer`1.Inner``)."""
+        return ".".join(self._doc_segments(type_rid << 2))
+
+    def _doc_segments(self, coded: int, depth: int = 0) -> List[str]:
+        """Doc ID name of a TypeDef / TypeRef (TypeDefOrRef-coded) split at nesting.
+
+        ``["Ns.Outer`1", "Inner"]``: generic arguments of a constructed
+        nested type are spread over the segments by their arity.
+        """
+        tag, rid = coded & 3, coded >> 2
+        if tag == 0:
+            if self._enclosing is None:
+                self._enclosing = {}
+                for nested_rid in range(1, self.rows[T_NESTEDCLASS] + 1):
+                    nested, enclosing = self.row(T_NESTEDCLASS, nested_rid)
+                    self._enclosing[nested] = enclosing
+            _, name, namespace = self.row(T_TYPEDEF, rid)[:3]
+            enclosing = self._enclosing.get(rid)
+            outer = enclosing << 2 if enclosing is not None else None
+        elif tag == 1:
+            scope, name, namespace = self.row(T_TYPEREF, rid)
+            outer = (scope >> 2) << 2 | 1 if scope & 3 == 3 else None  # nested TypeRef
+        else:
+            raise MetadataError(f"bad TypeDefOrRef tag {tag}")
+
+        if outer is not None and depth < 16:
+            return self._doc_segments(outer, depth + 1) + [self.string(name)]
+        namespace_text = self.string(namespace)
+        return [f"{namespace_text}.{self.string(name)}" if namespace_text else self.string(name)]
+
+    # ── Signatures ───────────────────────────────────────────────────────────
+
+    def _generic_param_names(self) -> Dict[Tuple[int, int], List[str]]:
+        """(owner table, owner rid) -> generic parameter names by position."""
+        if self._generic_names is None:
+            names: Dict[Tuple[int, int], Dict[int, str]] = {}
+            for rid in range(1, self.rows[T_GENERICPARAM] + 1):
+                number, _, owner, name = self.row(T_GENERICPARAM, rid)
+                key = (T_METHODDEF if owner & 1 else T_TYPEDEF, owner >> 1)
+                names.setdefault(key, {})[number] = self.string(name)
+            self._generic_names = {
+                key: [by_number.get(i, f"T{i}") for i in range(max(by_number) + 1)]
+                for key, by_number in names.items()
+            }
+        return self._generic_names
+
+    def type_def_or_ref_name(self, coded: int, context: Tuple[int, int] = (0, 0),
+                             type_args: Optional[Tuple[str, ...]] = None,
+                             doc_id: bool = False) -> str:
+        """Reflection Name (or doc ID name) of a TypeDefOrRef-encoded type."""
+        tag, rid = coded & 3, coded >> 2
+        if doc_id and tag in (0, 1):
+            return ".".join(self._doc_segments(coded))
+        if tag == 0:
+            return self.string(self.row(T_TYPEDEF, rid)[1])
+        if tag == 1:
+            return self.string(self.row(T_TYPEREF, rid)[1])
+        if tag == 2:
+            spec = self.blob(self.row(T_TYPESPEC, rid)[0])
+            return _SigReader(self, spec, context, type_args, doc_id).type_name()
+        raise MetadataError(f"bad TypeDefOrRef tag {tag}")
+
+    def method_signature(self, blob_index: int, type_rid: int, method_rid: int,
+                         type_args: Optional[Tuple[str, ...]] = None,
+                         doc_id: bool = False) -> Tuple[str, List[str]]:
+        """(return type, parameter types) of a MethodDefSig.
+
+        *type_args* substitutes the declaring type's generic parameters, as
+        reflection does for methods inherited from a constructed base type.
+        With *doc_id* the types are rendered as in XML documentation IDs.
+        """
+        reader = _SigReader(self, self.blob(blob_index), (type_rid, method_rid),
+                            type_args, doc_id)
+        flags = reader.byte()
+        if flags & SIG_GENERIC:
+            reader.compressed()  # generic parameter count
+        count = reader.compressed()
+        return_type = reader.type_name()
+        params = []
+        for _ in range(count):
+            if reader.peek() == ELEMENT_SENTINEL:
+                break  # vararg: the fixed parameters end here
+            params.append(reader.type_name())
+        return return_type, params
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def public_methods(self) -> List[DotnetMethod]:
+        """Public, non-special-name methods of every public top-level type.
+
+        Matches ``Type.GetMethods(Public | Instance | Static)`` with
+        IsSpecialName skipped, except that inherited methods are only
+        followed through base types defined in this assembly (System.Object
+        and other external bases are not loaded).
+        """
+        with _malformed():
+            return self._public_methods()
+
+    def _public_methods(self) -> List[DotnetMethod]:
+        methods: List[DotnetMethod] = []
+        declared: Dict[Tuple[int, Optional[_TypeArgs]], _DeclaredMethods] = {}
+
+        def declared_methods(type_rid: int,
+                             type_args: Optional[_TypeArgs] = None) -> _DeclaredMethods:
+            key = (type_rid, type_args)
+            if key not in declared:
+                declared[key] = self._declared_methods(type_rid, type_args)
+            return declared[key]
+
+        for type_rid in range(1, self.rows[T_TYPEDEF] + 1):
+            flags = self.row(T_TYPEDEF, type_rid)[0]
+            if flags & TYPE_VISIBILITY_MASK != TYPE_PUBLIC:
+                continue
+
+            own = declared_methods(type_rid)
+            methods.extend(m for _, m, _ in own.methods)
+            overridden = set(own.overrides)
+
+            # Inherited public instance methods (statics need FlattenHierarchy);
+            # a virtual one is dropped once a more derived type overrides it
+            visited = {type_rid}
+            base_rid, base_args = self._base_type_def(type_rid)
+            while base_rid and base_rid not in visited:
+                visited.add(base_rid)
+                base = declared_methods(base_rid, base_args)
+                for key, m, is_virtual in base.methods:
+                    if m.is_static or (is_virtual and key in overridden):
+                        continue
+                    methods.append(m._replace(type_name=self.type_full_name(type_rid),
+                                              namespace=self.type_namespace(type_rid)))
+                overridden |= base.overrides
+                base_rid, base_args = self._base_type_def(base_rid, base_args)
+
+        return methods
+
+    def _base_type_def(self, type_rid: int, type_args: Optional[_TypeArgs] = None
+                       ) -> Tuple[Optional[int], Optional[_TypeArgs]]:
+        """(TypeDef row, type arguments) of the base type if it is defined here.
+
+        A constructed base (``class Items : Base<Item>``) yields the generic
+        definition's row and its argument names (``("Item",)``), rendered
+        both as reflection names and as doc ID names.
+        """
+        extends = self.row(T_TYPEDEF, type_rid)[3]
+        base_args = None
+        if extends & 3 == 2:  # TypeSpec: a generic instantiation of the base
+            spec = self.blob(self.row(T_TYPESPEC, extends >> 2)[0])
+            rendered = []
+            for doc_id in (False, True):
+                reader = _SigReader(self, spec, (type_rid, 0),
+                                    type_args and type_args[doc_id], doc_id)
+                if reader.byte() != ELEMENT_GENERICINST:
+                    return None, None
+                reader.byte()  # CLASS / VALUETYPE
+                extends = reader.compressed()
+                rendered.append(tuple(reader.type_name() for _ in range(reader.compressed())))
+            base_args = (rendered[0], rendered[1])
+        if extends & 3 == 0 and extends >> 2:
+            return extends >> 2, base_args
+        return None, None
+
+    def _declared_methods(self, type_rid: int,
+                          type_args: Optional[_TypeArgs] = None) -> _DeclaredMethods:
+        """Public methods declared by *type_rid* and the base methods it overrides."""
+        type_name = self.type_full_name(type_rid)
+        type_doc_name = self.type_def_doc_name(type_rid)
+        namespace = self.type_namespace(type_rid)
+        methods = []
+        overrides = set()
+        for method_rid in self._list_range(T_TYPEDEF, 5, type_rid, T_METHODDEF, T_METHODPTR):
+            _, _, flags, name, signature, _ = self.row(T_METHODDEF, method_rid)
+            is_public = (flags & METHOD_ACCESS_MASK == METHOD_PUBLIC
+                         and not flags & METHOD_SPECIAL_NAME)
+            is_override = flags & (METHOD_VIRTUAL | METHOD_NEW_SLOT) == METHOD_VIRTUAL
+            if not (is_public or is_override):
+                continue
+
+            # Methods are matched by doc ID signature: overloads can differ only
+            # in generic arguments (Span<char> / Span<byte>), which Type.Name drops
+            method_name = self.string(name)
+            doc_return, doc_params = self.method_signature(
+                signature, type_rid, method_rid, type_args and type_args[1], doc_id=True)
+            key = (method_name, doc_return, tuple(doc_params))
+            if is_override:
+                overrides.add(key)
+            if not is_public:
+                continue
+
+            if type_args is not None:  # the ID names the generic declaration
+                doc_params = self.method_signature(signature, type_rid, method_rid,
+                                                   doc_id=True)[1]
+            arity = len(self._generic_param_names().get((T_METHODDEF, method_rid), ()))
+            doc_id = (f"M:{type_doc_name}.{method_name.replace('.', '#')}"
+                      + (f"``{arity}" if arity else "")
+                      + (f"({','.join(doc_params)})" if doc_params else ""))
+
+            return_type, param_types = self.method_signature(
+                signature, type_rid, method_rid, type_args and type_args[0])
+            param_names: Dict[int, str] = {}
+            for param_rid in self._list_range(T_METHODDEF, 5, method_rid, T_PARAM, T_PARAMPTR):
+                _, sequence, param_name = self.row(T_PARAM, param_rid)
+                param_names[sequence] = self.string(param_name)
+
+            methods.append((key, DotnetMethod(
+                type_name=type_name,
+                namespace=namespace,
+                name=method_name,
+                return_type=return_type,
+                parameters=[(t, param_names.get(i, "")) for i, t in enumerate(param_types, 1)],
+                is_static=bool(flags & METHOD_STATIC),
+                is_abstract=bool(flags & METHOD_ABSTRACT),
+                doc_id=doc_id,
+            ), bool(flags & METHOD_VIRTUAL)))
+        return _DeclaredMethods(methods, frozenset(overrides))
+
+    def assembly_identity(self) -> Dict[str, str]:
+        """AssemblyName, Version, Culture and PublicKeyToken of the Assembly row."""
+        if not self.rows[T_ASSEMBLY]:
+            return {}
+        with _malformed():
+            return self._assembly_identity()
+
+    def _assembly_identity(self) -> Dict[str, str]:
+        _, major, minor, build, revision, _, public_key, name, culture = self.row(T_ASSEMBLY, 1)
+        key = self.blob(public_key)
+        return {
+            "AssemblyName": self.string(name),
+            "Version": f"{major}.{minor}.{build}.{revision}",
+            "Culture": self.string(culture) or "neutral",
+            # Token = last 8 bytes of SHA-1(public key), reversed
+            "PublicKeyToken": hashlib.sha1(key).digest()[-8:][::-1].hex() if key else "null",
+        }
+
+
+def _read_compressed(data, pos: int) -> Tuple[int, int]:
+    """ECMA-335 II.23.2 compressed unsigned integer at *pos* -> (value, next pos)."""
+    first = data[pos]
+    if first & 0x80 == 0:
+        return first, pos + 1
+    if first & 0xC0 == 0x80:
+        return (first & 0x3F) << 8 | data[pos + 1], pos + 2
+    if first & 0xE0 == 0xC0:
+        return ((first & 0x1F) << 24 | data[pos + 1] << 16
+                | data[pos + 2] << 8 | data[pos + 3]), pos + 4
+    raise MetadataError(f"bad compressed integer 0x{first:02X}")
+
+
+class _SigReader:
+    """Cursor over one signature blob, rendering types as reflection names.
+
+    With *doc_id* types are rendered as in XML documentation member IDs
+    instead: namespace-qualified, ``List{System.Int32}``, `` `0 `` / ``` ``0 ```
+    for type / method generic parameters and ``@`` for by-ref.
+    """
+
+    def __init__(self, md: ClrMetadata, blob: bytes, context: Tuple[int, int],
+                 type_args: Optional[Tuple[str, ...]] = None, doc_id: bool = False):
+        self.md = md
+        self.blob = blob
+        self.pos = 0
+        self.context = context  # (TypeDef rid, MethodDef rid) owning VAR / MVAR
+        self.type_args = type_args  # names substituted for VAR, if constructed
+        self.doc_id = doc_id
+
+    def peek(self) -> int:
+        return self.blob[self.pos]
+
+    def byte(self) -> int:
+        value = self.blob[self.pos]
+        self.pos += 1
+        return value
+
+    def compressed(self) -> int:
+        value, self.pos = _read_compressed(self.blob, self.pos)
+        return value
+
+    def _generic_name(self, table: int, number: int) -> str:
+        rid = self.context[0] if table == T_TYPEDEF else self.context[1]
+        names = self.md._generic_param_names().get((table, rid), [])
+        return names[number] if number < len(names) else f"T{number}"
+
+    def type_name(self) -> str:
+        element = self.byte()
+        while element in (ELEMENT_CMOD_REQD, ELEMENT_CMOD_OPT, ELEMENT_PINNED):
+            if element != ELEMENT_PINNED:
+                self.compressed()  # modifier type (e.g. IsConst, IsVolatile)
+            element = self.byte()
+
+        if element in _PRIMITIVES:
+            return f"System.{_PRIMITIVES[element]}" if self.doc_id else _PRIMITIVES[element]
+        if element in (ELEMENT_CLASS, ELEMENT_VALUETYPE):
+            return self.md.type_def_or_ref_name(self.compressed(), self.context,
+                                                self.type_args, self.doc_id)
+        if element == ELEMENT_SZARRAY:
+            return self.type_name() + "[]"
+        if element == ELEMENT_PTR:
+            return self.type_name() + "*"
+        if element == ELEMENT_BYREF:
+            return self.type_name() + ("@" if self.doc_id else "&")
+        if element == ELEMENT_VAR:
+            number = self.compressed()
+            if self.type_args is not None and number < len(self.type_args):
+                return self.type_args[number]
+            return f"`{number}" if self.doc_id else self._generic_name(T_TYPEDEF, number)
+        if element == ELEMENT_MVAR:
+            number = self.compressed()
+            return f"``{number}" if self.doc_id else self._generic_name(T_METHODDEF, number)
+        if element == ELEMENT_GENERICINST:
+            self.byte()  # CLASS / VALUETYPE
+            coded = self.compressed()
+            args = [self.type_name() for _ in range(self.compressed())]
+            if not self.doc_id:
+                # Type.Name of a constructed type omits its arguments
+                return self.md.type_def_or_ref_name(coded, self.context, self.type_args)
+            # Outer`2.Inner`1<A, B, C> -> Outer{A,B}.Inner{C}
+            segments = []
+            for segment in self.md._doc_segments(coded):
+                arity = _ARITY_RE.search(segment)
+                if arity:
+                    count = int(arity.group(1))
+                    segment = f"{segment[:arity.start()]}{{{','.join(args[:count])}}}"
+                    args = args[count:]
+                segments.append(segment)
+            return ".".join(segments)
+        if element == ELEMENT_ARRAY:
+            name = self.type_name()
+            rank = self.compressed()
+            for _ in range(self.compressed()):  # sizes
+                self.compressed()
+            for _ in range(self.compressed()):  # lower bounds (signed, same encoding)
+                self.compressed()
+            if self.doc_id:
+                return name + "[" + ",".join(["0:"] * rank) + "]"
+            return name + ("[*]" if rank == 1 else "[" + "," * (rank - 1) + "]")
+        if element == ELEMENT_FNPTR:
+            flags = self.byte()
+            if flags & SIG_GENERIC:
+                self.compressed()
+            count = self.compressed()
+            for _ in range(count + 1):  # return type + parameters
+                if self.peek() == ELEMENT_SENTINEL:
+                    self.byte()
+                self.type_name()
+            # reflection surfaces function pointers as IntPtr
+            return "System.IntPtr" if self.doc_id else "IntPtr"
+        raise MetadataError(f"unsupported signature element 0x{element:02X}")
@@ -0,0 +1,247 @@
+"""
+com_registry.py - COM server registration index.
+
+Maps a server file name (``shell32.dll``) to the CLSIDs registered for it,
+with ProgID, server type (InprocServer32 / LocalServer32) and friendly
+name.  The index is built by one walk of ``HKCR\\CLSID`` (or one read of an
+exported ``.reg`` file) and kept for the life of the process, so every
+per-file COM lookup of a scan is a dict lookup instead of a registry walk.
+Directory scans build it before starting their worker processes and seed
+each worker with it (seed_registry_index).
+
+Sources:
+- the live registry (Windows, via winreg)
+- a regedit export (``REGEDIT4`` or ``Windows Registry Editor Version
+  5.00``) of HKCR\\CLSID, HKLM\\SOFTWARE\\Classes\\CLSID or
+  HKCU\\Software\\Classes\\CLSID, so registrations can be analyzed on any
+  platform
+"""
+
+import logging
+import re
+from pathlib import Path, PureWindowsPath
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SERVER_KEYS = ("InprocServer32", "LocalServer32")
+
+# CLSID subkeys of the hives regedit exports for HKCR
+_CLSID_KEY_RE = re.compile(
+    r"^(?:HKEY_CLASSES_ROOT|HKCR|HKEY_LOCAL_MACHINE\\SOFTWARE\\Classes|HKLM\\SOFTWARE\\Classes"
+    r"|HKEY_CURRENT_USER\\Software\\Classes|HKCU\\Software\\Classes)"
+    r"(?:\\WOW6432Node)?\\CLSID\\(\{[^\\}]+\})(?:\\(InprocServer32|LocalServer32|ProgID))?$",
+    re.IGNORECASE)
+
+_VALUE_RE = re.compile(r'^(@|"(?:[^"\\]|\\.)*")\s*=\s*(.*)$', re.DOTALL)
+
+
+class ComRegistration(NamedTuple):
+    """One registered COM class."""
+    clsid: str
+    name: Optional[str]         # default value of the CLSID key
+    progid: Optional[str]
+    server_path: str
+    server_type: str            # InprocServer32 or LocalServer32
+
+    def to_dict(self) -> Dict:
+        """The record shape scan_com_registry() has always returned."""
+        return {
+            'clsid': self.clsid,
+            'name': self.name or self.clsid,
+            'progid': self.progid,
+            'server_path': self.server_path,
+            'inproc': self.server_type == "InprocServer32",
+            'server_type': self.server_type,
+        }
+
+
+def server_filename(server_path: str) -> str:
+    """Lower-case file name of a registered server command line.
+
+    ``"C:\\Program Files\\App\\app.exe" /automation`` -> ``app.exe``
+    """
+    clean = server_path.replace('"', '').split(' -')[0].split(' /')[0].strip()
+    return PureWindowsPath(clean).name.lower()
+
+
+class ComRegistryIndex:
+    """Server file name -> COM registrations.
+
+    Build it with ``from_registry()`` / ``from_reg_file()``, or get the
+    process-wide instance for a source with ``registry_index()``.
+    """
+
+    def __init__(self, registrations: List[ComRegistration]):
+        self.by_server: Dict[str, List[ComRegistration]] = {}
+        for registration in registrations:
+            self.by_server.setdefault(server_filename(registration.server_path),
+                                      []).append(registration)
+        self.count = len(registrations)
+
+    def lookup(self, target_name: str) -> List[ComRegistration]:
+        """Registrations whose server is the file *target_name* (any case)."""
+        return self.by_server.get(target_name.lower(), [])
+
+    @classmethod
+    def from_registry(cls) -> "ComRegistryIndex":
+        """Walk HKEY_CLASSES_ROOT\\CLSID once (empty index off Windows)."""
+        try:
+            import winreg
+        except ImportError:
+            logger.warning("winreg not available (Windows only)")
+            return cls([])
+        return cls(list(_walk_registry(winreg)))
+
+    @classmethod
+    def from_reg_file(cls, reg_path: Path) -> "ComRegistryIndex":
+        """Index the CLSID keys of a regedit export."""
+        keys: Dict[str, Dict[str, str]] = {}  # CLSID -> subkey ("" = itself) -> default value
+        for key, values in _read_reg_file(reg_path):
+            match = _CLSID_KEY_RE.match(key)
+            if match and "@" in values:
+                clsid, subkey = match.group(1).upper(), match.group(2) or ""
+                # Canonical subkey spelling, whatever case the export used
+                subkey = next((k for k in SERVER_KEYS + ("ProgID",) if k.lower() == subkey.lower()), "")
+                keys.setdefault(clsid, {})[subkey] = values["@"]
+
+        registrations = []
+        for clsid, subkeys in keys.items():
+            server_type = next((k for k in SERVER_KEYS if subkeys.get(k)), None)
+            if server_type:
+                registrations.append(ComRegistration(
+                    clsid=clsid,
+                    name=subkeys.get("") or None,
+                    progid=subkeys.get("ProgID") or None,
+                    server_path=subkeys[server_type],
+                    server_type=server_type,
+                ))
+        return cls(registrations)
+
+
+_INDEXES: Dict[Tuple, ComRegistryIndex] = {}
+
+
+def registry_index(reg_file: Optional[Path] = None) -> ComRegistryIndex:
+    """Process-wide index of the live registry, or of *reg_file* if given.
+
+    Built on first use; a .reg file is re-read only if it changes.
+    """
+    key = _index_key(reg_file)
+    index = _INDEXES.get(key)
+    if index is None:
+        index = (ComRegistryIndex.from_reg_file(reg_file) if reg_file is not None
+                 else ComRegistryIndex.from_registry())
+        logger.info(f"COM registration index: {index.count} servers registered")
+        _INDEXES[key] = index
+    return index
+
+
+def seed_registry_index(index: ComRegistryIndex, reg_file: Optional[Path] = None) -> None:
+    """Use *index*, built in another process, as the index of *reg_file*
+    (or of the live registry), so this process does not build its own."""
+    _INDEXES[_index_key(reg_file)] = index
+
+
+def _index_key(reg_file: Optional[Path]) -> Tuple:
+    if reg_file is None:
+        return ("live",)
+    st = reg_file.stat()
+    return (str(reg_file.resolve()), st.st_size, st.st_mtime_ns)
+
+
+# ── Live registry ────────────────────────────────────────────────────────────
+
+def _walk_registry(winreg) -> Iterator[ComRegistration]:
+    def default_value(key, subkey: str) -> Optional[str]:
+        try:
+            with winreg.OpenKey(key, subkey) as handle:
+                return winreg.QueryValueEx(handle, "")[0]
+        except OSError:
+            return None
+
+    with winreg.OpenKey(winreg.HKEY_CLASSES_ROOT, "CLSID") as clsid_key:
+        i = 0
+        while True:
+            try:
+                clsid = winreg.EnumKey(clsid_key, i)
+            except OSError:
+                break
+            i += 1
+            for server_type in SERVER_KEYS:
+                server_path = default_value(clsid_key, f"{clsid}\\{server_type}")
+                if server_path:
+                    yield ComRegistration(
+                        clsid=clsid,
+                        name=default_value(clsid_key, clsid),
+                        progid=default_value(clsid_key, f"{clsid}\\ProgID"),
+                        server_path=server_path,
+                        server_type=server_type,
+                    )
+                    break
+
+
+# ── .reg export parsing ──────────────────────────────────────────────────────
+
+def _read_reg_file(reg_path: Path) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """(key path, {value name ("@" = default): string data}) per key section."""
+    raw = reg_path.read_bytes()
+    if raw[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        text = raw.decode("utf-16")
+    else:
+        try:
+            text = raw.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            text = raw.decode("cp1252", errors="replace")
+
+    key, values = None, {}
+    for line in _logical_lines(text):
+        if line.startswith("["):
+            if key is not None:
+                yield key, values
+            key, values = line[1:line.rfind("]")], {}
+            if key.startswith("-"):  # deletion entry
+                key = None
+        elif key is not None:
+            match = _VALUE_RE.match(line)
+            if match:
+                name = "@" if match.group(1) == "@" else _unescape(match.group(1)[1:-1])
+                data = _string_data(match.group(2).strip())
+                if data is not None:
+                    values[name] = data
+    if key is not None:
+        yield key, values
+
+
+def _logical_lines(text: str) -> Iterator[str]:
+    """Lines with ``\\``-continued hex data joined and comments dropped."""
+    pending = ""
+    for line in text.splitlines():
+        line = line.strip()
+        if pending:
+            line = pending + line
+            pending = ""
+        if line.endswith("\\") and not line.startswith(("[", ";")) and "=hex" in line:
+            pending = line[:-1]
+            continue
+        if line and not line.startswith(";"):
+            yield line
+    if pending:
+        yield pending
+
+
+def _string_data(data: str) -> Optional[str]:
+    """REG_SZ (``"..."``) or REG_EXPAND_SZ (``hex(2):...``) data as text."""
+    if data.startswith('"') and data.endswith('"') and len(data) >= 2:
+        return _unescape(data[1:-1])
+    if data.lower().startswith("hex(2):"):
+        try:
+            raw = bytes(int(b, 16) for b in data[7:].replace(" ", "").split(",") if b)
+        except ValueError:
+            return None
+        return raw.decode("utf-16-le", errors="replace").split("\x00", 1)[0]
+    return None
+
+
+def _unescape(value: str) -> str:
+    return re.sub(r'\\(.)', r'\1', value)
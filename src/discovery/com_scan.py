@@ -2,7 +2,7 @@
 com_scan.py - COM object discovery and type library analysis.
 
 Implements:
-- Registry scanning (CLSID, AppID, ProgID)
+- Registry scanning (CLSID, ProgID) through a once-per-process index
 - Type library (TLB) parsing (via tlb_analyzer)
 """
 
@@ -10,104 +10,45 @@ import logging
 from pathlib import Path
 from typing import List, Dict, Optional
 
+from com_registry import registry_index
+from pe_image import PEImage
 from schema import Invocable
 from tlb_analyzer import scan_type_library, format_tlb_signature
 
 logger = logging.getLogger(__name__)
 
 
-def scan_com_registry(target_name: str) -> List[Dict]:
-    """Scan registry for COM objects registered by this DLL.
+def scan_com_registry(target_name: str, reg_file: Optional[Path] = None) -> List[Dict]:
+    """Look up the COM objects registered by this DLL.
+    
+    The registration index (com_registry) is built once per process, so
+    every file of a directory scan is an O(1) lookup instead of a walk of
+    HKCR\\CLSID.
     
     Args:
         target_name: Name of target DLL/executable (e.g., "ole32.dll")
+        reg_file: Exported .reg file to use instead of the live registry
         
     Returns:
         List of COM objects found with CLSID, ProgID, and path info
     """
     try:
-        import winreg
-    except ImportError:
-        logger.warning("winreg not available (Windows only)")
+        index = registry_index(reg_file)
+    except OSError as e:
+        logger.error(f"Error reading COM registrations from {reg_file}: {e}")
         return []
     
-    results = []
-    target_lower = target_name.lower()
-    
-    try:
-        # Search HKEY_CLASSES_ROOT\CLSID
-        with winreg.OpenKey(winreg.HKEY_CLASSES_ROOT, "CLSID") as clsid_key:
-            num_subkeys = winreg.QueryInfoKey(clsid_key)[0]
-            
-            for i in range(min(num_subkeys, 10000)):  # Increased limit for better coverage
-                try:
-                    clsid = winreg.EnumKey(clsid_key, i)
-                    
-                    found_match = False
-                    server_path = None
-                    server_type = None
+    results = [registration.to_dict() for registration in index.lookup(target_name)]
+    logger.info(f"Found {len(results)} COM objects for {target_name}")
+    return results
 
-                    # Check InprocServer32 (DLLs)
-                    try:
-                        with winreg.OpenKey(clsid_key, f"{clsid}\\InprocServer32") as server_key:
-                            server_path = winreg.QueryValueEx(server_key, "")[0]
-                            server_type = "InprocServer32"
-                    except WindowsError:
-                        pass
 
-                    # Check LocalServer32 (EXEs)
-                    if not server_path:
-                        try:
-                            with winreg.OpenKey(clsid_key, f"{clsid}\\LocalServer32") as server_key:
-                                server_path = winreg.QueryValueEx(server_key, "")[0]
-                                server_type = "LocalServer32"
-                        except WindowsError:
-                            pass
+def com_objects_to_invocables(com_objects: List[Dict], dll_path: Optional[Path] = None,
+                              image: Optional[PEImage] = None) -> List[Invocable]:
+    """Convert COM object registry entries AND TLB entries to Invocable records.
 
-                    if server_path:
-                        # Clean up path (remove quotes, args)
-                        clean_path = Path(server_path.replace('"', '').split(' -')[0].split(' /')[0])
-                        server_filename = clean_path.name.lower()
-                        
-                        if target_lower == server_filename:
-                            # Found a match - try to get friendly name
-                            friendly_name = None
-                            try:
-                                with winreg.OpenKey(clsid_key, clsid) as name_key:
-                                    friendly_name = winreg.QueryValueEx(name_key, "")[0]
-                            except WindowsError:
-                                pass
-                            
-                            # Try to get ProgID
-                            progid = None
-                            try:
-                                with winreg.OpenKey(clsid_key, f"{clsid}\\ProgID") as progid_key:
-                                    progid = winreg.QueryValueEx(progid_key, "")[0]
-                            except WindowsError:
-                                pass
-                            
-                            results.append({
-                                'clsid': clsid,
-                                'name': friendly_name or clsid,
-                                'progid': progid,
-                                'server_path': server_path,
-                                'inproc': (server_type == "InprocServer32"),
-                                'server_type': server_type
-                            })
-
-                except WindowsError:
-                    continue
-        
-        logger.info(f"Found {len(results)} COM objects for {target_name}")
-        return results
-    
-    except Exception as e:
-        logger.error(f"Error scanning COM registry: {e}")
-        return []
-
-
-def com_objects_to_invocables(com_objects: List[Dict], dll_path: Optional[Path] = None) -> List[Invocable]:
-    """Convert COM object registry entries AND TLB entries to Invocable records."""
+    *image* is the already mapped PE for *dll_path*, if any.
+    """
     invocables = []
     
     # 1. Process Registry-discovered Objects (CoClasses)
@@ -127,7 +68,7 @@ def com_objects_to_invocables(com_objects: List[Dict], dll_path: Optional[Path]
 
     # 2. Process Type Library (TLB) embedded in the DLL (if provided)
     if dll_path and dll_path.exists():
-        tlb_results = scan_type_library(dll_path)
+        tlb_results = scan_type_library(dll_path, image=image)
         
         for item in tlb_results:
             # We are interested in Interfaces (methods) and CoClasses
@@ -136,13 +77,13 @@ def com_objects_to_invocables(com_objects: List[Dict], dll_path: Optional[Path]
             # For interfaces, create invocables for each method
             if item['kind'] in ('interface', 'dispatch'):
                 for method in item.get('methods', []):
-                    # Signature formatting
-                    sig_str = format_tlb_signature(method['name'], method['parameters'])
-                    
-                    # Create param string for schema
-                    # TLB params match [name, name, ...] but we lack types in this basic extractor
-                    # We can assume variants or pointers.
-                    param_str = ", ".join([f"VARIANT {p}" for p in method['parameters']])
+                    # The built-in reader supplies IDL types; pythoncom only names,
+                    # so those parameters are assumed to be VARIANTs.
+                    param_types = method.get('parameter_types') or ["VARIANT"] * len(method['parameters'])
+                    typed_params = [f"{t} {p}" for t, p in zip(param_types, method['parameters'])]
+                    return_type = method.get('return_type', "HRESULT")
+                    sig_str = format_tlb_signature(method['name'], typed_params, return_type)
+                    param_str = ", ".join(typed_params)
                     
                     inv = Invocable(
                         name=f"{item_name}::{method['name']}", # Namespaced name
@@ -151,8 +92,9 @@ def com_objects_to_invocables(com_objects: List[Dict], dll_path: Optional[Path]
                         confidence='guaranteed', # Extracted from TLB
                         signature=sig_str,
                         parameters=param_str,
-                        return_type="HRESULT",
-                        doc_comment=item.get('description', f"Method of interface {item_name}"),
+                        return_type=return_type,
+                        doc_comment=(method.get('description') or item.get('description')
+                                     or f"Method of interface {item_name}"),
                         dll_path=str(dll_path)
                     )
                     invocables.append(inv)
@@ -161,10 +103,10 @@ def com_objects_to_invocables(com_objects: List[Dict], dll_path: Optional[Path]
 
 
 def parse_type_library(tlb_path: Path) -> List[dict]:
-    """Parse type library using PowerShell and Get-TypeLib (if available).
+    """Parse a type library with the built-in MSFT reader (no COM required).
     
     Args:
-        tlb_path: Path to .tlb file or DLL with embedded TLB
+        tlb_path: Path to .tlb/.olb file or DLL/EXE with embedded TYPELIB resources
         
     Returns:
         List of interface/method definitions
@@ -173,47 +115,10 @@ def parse_type_library(tlb_path: Path) -> List[dict]:
         logger.warning(f"Type library not found: {tlb_path}")
         return []
     
-    try:
-        # Use PowerShell to load and inspect type library via COM
-        ps_script = f"""
-        try {{
-            # Try to load type library
-            $typeLib = [System.Runtime.InteropServices.Marshal]::BindToMoniker("{tlb_path}")
-            if ($typeLib) {{
-                Write-Output "SUCCESS: Type library loaded"
-            }} else {{
-                Write-Output "FAILED: Could not load type library"
-            }}
-        }} catch {{
-            Write-Output "ERROR: $($_.Exception.Message)"
-        }}
-        """
-        
-        import subprocess
-        result = subprocess.run(
-            ["powershell", "-NoProfile", "-NonInteractive", "-Command", ps_script],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        
-        if "SUCCESS" in result.stdout:
-            logger.info(f"Type library loaded successfully: {tlb_path.name}")
-            # Note: Full parsing would require extensive COM interop
-            # For now, just confirm it's loadable
-            return [{
-                'path': str(tlb_path),
-                'size': tlb_path.stat().st_size,
-                'loadable': True,
-                'note': 'Full TLB method enumeration requires COM interop - returning basic info'
-            }]
-        else:
-            logger.warning(f"Could not load type library: {result.stdout}")
-            return []
-            
-    except Exception as e:
-        logger.warning(f"Error parsing type library: {e}")
-        return []
+    definitions = scan_type_library(tlb_path)
+    if not definitions:
+        logger.warning(f"Could not read a type library from {tlb_path.name}")
+    return definitions
 
 
 def enumerate_idispatch_safe(clsid: str) -> List[dict]:
@@ -0,0 +1,130 @@
+"""
+dir_walk.py - Directory tree enumeration and batched classification.
+
+Walks an installed-instance tree with os.scandir, streaming DirEntry objects
+instead of materializing the whole tree: entries are filtered on extension
+from the name alone and on size from the entry's cached stat, and excluded
+directories (VCS metadata, node_modules, WinSxS backups, ...) are pruned
+without being entered.  Matching paths are classified in batches on a
+thread pool while the walk continues, since classification is one bounded
+read per file and therefore I/O-bound.
+
+Paths come out in the order of ``sorted(root.rglob('*'))``.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Collection, FrozenSet, Iterator, List, Optional, Tuple
+
+from classify import FileType, classify_file
+
+logger = logging.getLogger(__name__)
+
+# Directory names never entered (compared case-insensitively)
+EXCLUDED_DIRS: FrozenSet[str] = frozenset({
+    ".git", ".hg", ".svn", "node_modules", "__pycache__",
+    "$recycle.bin", "system volume information",
+})
+
+# Directories pruned only below a given parent: (parent, name), case-insensitive
+EXCLUDED_SUBDIRS: FrozenSet[Tuple[str, str]] = frozenset({
+    ("winsxs", "backup"), ("winsxs", "manifestcache"), ("winsxs", "temp"),
+})
+
+CLASSIFY_BATCH_SIZE = 256
+
+
+def walk_files(root: Path, extensions: Collection[str],
+               max_size: Optional[int] = None,
+               excluded: Collection[str] = EXCLUDED_DIRS) -> Iterator[Path]:
+    """Files under *root* whose suffix (lower-case) is in *extensions*.
+
+    Args:
+        root: Directory to walk
+        extensions: Lower-case suffixes to keep (``.dll``, ``.py``, ...)
+        max_size: Skip files larger than this many bytes
+        excluded: Directory names to prune (case-insensitive)
+
+    Yields:
+        Paths in sorted (``sorted(root.rglob('*'))``) order.
+    """
+    excluded = frozenset(name.lower() for name in excluded)
+    # Depth-first over per-directory sorted entries == sorted full paths
+    stack: List[Iterator[os.DirEntry]] = [_sorted_entries(root)]
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+            continue
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                name = entry.name.lower()
+                parent = os.path.basename(os.path.dirname(entry.path)).lower()
+                if name not in excluded and (parent, name) not in EXCLUDED_SUBDIRS:
+                    stack.append(_sorted_entries(Path(entry.path)))
+                continue
+            if os.path.splitext(entry.name)[1].lower() not in extensions:
+                continue
+            if not entry.is_file():
+                continue
+            if max_size is not None and entry.stat().st_size > max_size:
+                logger.debug("Skipping %s: larger than %d bytes", entry.path, max_size)
+                continue
+        except OSError as e:
+            logger.debug("Skipping %s: %s", entry.path, e)
+            continue
+        yield Path(entry.path)
+
+
+def _sorted_entries(directory: Path) -> Iterator[os.DirEntry]:
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError as e:
+        logger.warning("Cannot list %s: %s", directory, e)
+        return iter(())
+    return iter(sorted(entries, key=lambda e: os.path.normcase(e.name)))
+
+
+def _classify_batch(paths: List[Path]) -> List[FileType]:
+    return [classify_file(path) for path in paths]
+
+
+def classify_tree(root: Path, extensions: Collection[str], workers: int = 1,
+                  max_size: Optional[int] = None,
+                  excluded: Collection[str] = EXCLUDED_DIRS) -> List[Tuple[Path, FileType]]:
+    """(path, file type) of every recognized file under *root*, in sorted order.
+
+    Walks with walk_files() and classifies in batches of
+    CLASSIFY_BATCH_SIZE on *workers* threads while the walk goes on;
+    UNKNOWN files are dropped.
+    """
+    files = walk_files(root, extensions, max_size, excluded)
+    results: List[Tuple[Path, FileType]] = []
+
+    def collect(batch: List[Path], types: List[FileType]) -> None:
+        results.extend((p, t) for p, t in zip(batch, types) if t != FileType.UNKNOWN)
+
+    if workers <= 1:
+        for batch in _batches(files):
+            collect(batch, _classify_batch(batch))
+        return results
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = [(batch, pool.submit(_classify_batch, batch)) for batch in _batches(files)]
+        for batch, future in pending:
+            collect(batch, future.result())
+    return results
+
+
+def _batches(paths: Iterator[Path]) -> Iterator[List[Path]]:
+    batch: List[Path] = []
+    for path in paths:
+        batch.append(path)
+        if len(batch) == CLASSIFY_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
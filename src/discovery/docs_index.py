@@ -0,0 +1,198 @@
+"""
+docs_index.py - Inverted identifier index over a documentation tree.
+
+Links exports to the documentation files that mention them.  Every doc
+file under the root is read and tokenized once into identifier ->
+(document, occurrence count) postings; linking an export is then one
+index lookup instead of a read of every file.
+
+The index is stored as ``.mcp_docs_index_<root hash>.sqlite`` in the
+index directory (the output directory for CLI runs) and reused while the
+docs tree is unchanged.  The fingerprint covers the mtime of every
+directory (files added, removed or renamed) and the size/mtime of every
+doc file (edited in place).
+
+Ranking per identifier:
+1. documents named after it (``CreateFileW.md``, ``createfilew.html``)
+2. more occurrences first
+3. relative path, for stable output
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+from collections import Counter
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DOC_EXTENSIONS = {".md", ".txt", ".rst", ".adoc", ".htm", ".html"}
+
+# Bump when tokenization or the table layout changes
+INDEX_VERSION = 1
+
+_TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+_SCHEMA = """
+CREATE TABLE docs (
+    id   INTEGER PRIMARY KEY,
+    path TEXT NOT NULL
+);
+CREATE TABLE postings (
+    token  TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    count  INTEGER NOT NULL,
+    PRIMARY KEY (token, doc_id)
+) WITHOUT ROWID;
+CREATE TABLE meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_LOOKUP_CHUNK = 500
+
+
+def walk_docs(docs_root: Path) -> Tuple[List[Path], str]:
+    """Doc files under *docs_root* (sorted) and a fingerprint of the tree."""
+    digest = hashlib.sha256(str(INDEX_VERSION).encode())
+    files: List[Path] = []
+
+    for dirpath, dirnames, filenames in os.walk(docs_root):
+        dirnames.sort()
+        rel_dir = os.path.relpath(dirpath, docs_root)
+        digest.update(f"D {rel_dir} {os.stat(dirpath).st_mtime_ns}\n".encode())
+        for name in sorted(filenames):
+            if os.path.splitext(name)[1].lower() not in DOC_EXTENSIONS:
+                continue
+            path = Path(dirpath) / name
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            digest.update(f"F {rel_dir} {name} {st.st_size} {st.st_mtime_ns}\n".encode())
+            files.append(path)
+
+    return files, digest.hexdigest()
+
+
+def index_path(index_dir: Path, docs_root: Path) -> Path:
+    """Location of the cached index for *docs_root* inside *index_dir*."""
+    root_hash = hashlib.sha256(str(docs_root.resolve()).encode()).hexdigest()[:12]
+    return index_dir / f".mcp_docs_index_{root_hash}.sqlite"
+
+
+class DocsIndex:
+    """Identifier -> ranked documentation files for one docs root."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    @classmethod
+    def open(cls, docs_root: Path, index_dir: Optional[Path] = None) -> "DocsIndex":
+        """Load the cached index for *docs_root*, (re)building it if stale.
+
+        Without *index_dir* the index is built in memory and not kept.
+        """
+        files, fingerprint = walk_docs(docs_root)
+
+        if index_dir is None:
+            conn = sqlite3.connect(":memory:")
+            _build(conn, docs_root, files, fingerprint)
+            return cls(conn)
+
+        db_path = index_path(index_dir, docs_root)
+        if db_path.exists():
+            try:
+                conn = sqlite3.connect(str(db_path))
+                row = conn.execute(
+                    "SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+                if row and row[0] == fingerprint:
+                    return cls(conn)
+                conn.close()
+            except sqlite3.Error:
+                pass  # unreadable or foreign file: rebuild it
+
+        logger.info(f"Indexing {len(files)} documentation file(s) under {docs_root}")
+        index_dir.mkdir(parents=True, exist_ok=True)
+        # Build beside the final file and swap it in, so concurrent scans
+        # (process-pool workers) never read a half-written index
+        tmp_path = db_path.with_name(f"{db_path.name}.{os.getpid()}.tmp")
+        conn = sqlite3.connect(str(tmp_path))
+        try:
+            _build(conn, docs_root, files, fingerprint)
+            conn.close()
+            tmp_path.replace(db_path)
+            return cls(sqlite3.connect(str(db_path)))
+        except OSError:
+            # Windows: another scan still has the stale index open; use this
+            # build from memory and leave the swap to a later run
+            memory = sqlite3.connect(":memory:")
+            with closing(sqlite3.connect(str(tmp_path))) as built:
+                built.backup(memory)
+            return cls(memory)
+        finally:
+            conn.close()
+            tmp_path.unlink(missing_ok=True)
+
+    def lookup_many(self, names: Iterable[str], max_hits: int) -> Dict[str, List[str]]:
+        """Up to *max_hits* ranked doc paths (relative to the root) per name.
+
+        Names without any hit are omitted.
+        """
+        names = list(dict.fromkeys(names))
+        postings: Dict[str, List[Tuple[str, int]]] = {}
+        for i in range(0, len(names), _LOOKUP_CHUNK):
+            chunk = names[i:i + _LOOKUP_CHUNK]
+            rows = self._conn.execute(
+                "SELECT p.token, d.path, p.count FROM postings p "
+                "JOIN docs d ON d.id = p.doc_id "
+                f"WHERE p.token IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for token, path, count in rows:
+                postings.setdefault(token, []).append((path, count))
+
+        results: Dict[str, List[str]] = {}
+        for name in names:
+            if name not in postings:
+                continue
+            lowered = name.lower()
+            ranked = sorted(
+                postings[name],
+                key=lambda hit: (Path(hit[0]).stem.lower() != lowered, -hit[1], hit[0]),
+            )
+            results[name] = [path for path, _ in ranked[:max_hits]]
+        return results
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "DocsIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _build(conn: sqlite3.Connection, docs_root: Path, files: List[Path],
+           fingerprint: str) -> None:
+    conn.executescript(_SCHEMA)
+    for doc_id, path in enumerate(files):
+        try:
+            content = path.read_text(encoding="utf-8", errors="ignore")
+        except Exception:
+            continue
+        conn.execute("INSERT INTO docs VALUES (?, ?)",
+                     (doc_id, str(path.relative_to(docs_root))))
+        conn.executemany(
+            "INSERT INTO postings VALUES (?, ?, ?)",
+            ((token, doc_id, count)
+             for token, count in Counter(_TOKEN_RE.findall(content)).items()),
+        )
+    conn.execute("INSERT INTO meta VALUES ('fingerprint', ?)", (fingerprint,))
+    conn.commit()
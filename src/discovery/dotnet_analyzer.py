@@ -1,31 +1,107 @@
 """
 dotnet_analyzer.py - .NET assembly metadata extraction.
 
-Extracts type and method information from .NET assemblies using
-System.Reflection via PowerShell.
+Extracts type and method information from .NET assemblies by reading
+their ECMA-335 metadata in-process (clr_metadata), on any platform, and
+attaches summaries from a sibling ``<Assembly>.xml`` documentation file
+(dotnet_xmldoc).  System.Reflection via PowerShell remains as a fallback
+for assemblies the metadata reader rejects.
 """
 
 import json
 import logging
+import shutil
 import subprocess
 from pathlib import Path
 from typing import List, Dict, Optional
 
+from clr_metadata import ClrMetadata, MetadataError
+from dotnet_xmldoc import MemberDoc, load_xml_docs, xml_doc_path
+from pe_image import PEImage
 from schema import Invocable
 
 logger = logging.getLogger(__name__)
 
 
-def get_dotnet_methods(dll_path: Path, timeout: int = 60) -> List[Invocable]:
-    """Extract .NET types and methods using PowerShell reflection.
+def get_dotnet_methods(dll_path: Path, timeout: int = 60,
+                       image: Optional[PEImage] = None) -> List[Invocable]:
+    """Extract public .NET types and methods from assembly metadata.
     
     Args:
         dll_path: Path to .NET assembly DLL
-        timeout: Timeout in seconds for PowerShell execution
+        timeout: Timeout in seconds for the PowerShell fallback
+        image: Already-opened PEImage of *dll_path* (opened here if omitted)
         
     Returns:
         List of Invocable records representing .NET methods
     """
+    try:
+        methods = _read_metadata(dll_path, image, lambda md: md.public_methods())
+    except MetadataError as e:
+        logger.warning(f"Could not read .NET metadata of {dll_path.name}: {e}")
+        if not shutil.which("powershell"):
+            return []
+        return _get_dotnet_methods_reflection(dll_path, timeout)
+
+    if methods is None:
+        logger.info(f"No CLR header in {dll_path.name}")
+        return []
+
+    # Only read the XML docs once there is something to attach them to
+    docs: Dict[str, MemberDoc] = {}
+    xml_path = xml_doc_path(dll_path)
+    if xml_path is not None and methods:
+        docs = load_xml_docs(xml_path, {m.doc_id for m in methods})
+        logger.info(f"Loaded XML documentation for {len(docs)} method(s) from {xml_path.name}")
+
+    invocables = [
+        _make_invocable(m.type_name, m.namespace, m.name, m.return_type,
+                        ", ".join(f"{t} {n}" for t, n in m.parameters), m.is_static,
+                        docs.get(m.doc_id))
+        for m in methods
+    ]
+    logger.info(f"Extracted {len(invocables)} .NET methods from {dll_path.name}")
+    return invocables
+
+
+def _read_metadata(dll_path: Path, image: Optional[PEImage], query):
+    """Run *query* on the metadata of *dll_path*; None if it is not managed."""
+    own_image = image is None
+    if own_image:
+        image = PEImage.open(dll_path)
+        if image is None:
+            return None
+    try:
+        metadata = ClrMetadata.open(image)
+        return query(metadata) if metadata is not None else None
+    finally:
+        if own_image:
+            image.close()
+
+
+def _make_invocable(type_name: str, namespace: Optional[str], method: str,
+                    return_type: str, parameters: str, is_static: bool,
+                    doc: Optional[MemberDoc] = None) -> Invocable:
+    reasons = ["full reflection metadata", "return type known", "parameters known", "invocation method known"]
+    description = doc.describe() if doc else None
+    if description:
+        reasons.append("XML documentation")
+    else:
+        description = f"{'Static' if is_static else 'Instance'} method from {namespace}" if namespace else None
+    return Invocable(
+        name=f"{type_name}.{method}",
+        source_type="dotnet",
+        return_type=return_type,
+        parameters=parameters,
+        signature=f"{return_type} {method}({parameters})",
+        doc_comment=description,
+        confidence="guaranteed",  # .NET metadata provides complete invocable signature
+        confidence_reasons=reasons
+    )
+
+
+def _get_dotnet_methods_reflection(dll_path: Path, timeout: int) -> List[Invocable]:
+    """Extract .NET types and methods using PowerShell reflection (Windows)."""
     
     # PowerShell script to enumerate all public types/methods
     ps_script = f"""
@@ -105,21 +181,11 @@ def get_dotnet_methods(dll_path: Path, timeout: int = 60) -> List[Invocable]:
             data = [data]
         
         # Convert to Invocable records
-        invocables = []
-        for m in data:
-            signature = f"{m['ReturnType']} {m['Method']}({m['Parameters']})"
-            
-            invocable = Invocable(
-                name=f"{m['Type']}.{m['Method']}",
-                source_type="dotnet",
-                return_type=m['ReturnType'],
-                parameters=m['Parameters'],
-                signature=signature,
-                doc_comment=f"{'Static' if m['IsStatic'] else 'Instance'} method from {m['Namespace']}" if m.get('Namespace') else None,
-                confidence="guaranteed",  # .NET reflection provides complete invocable signature
-                confidence_reasons=["full reflection metadata", "return type known", "parameters known", "invocation method known"]
-            )
-            invocables.append(invocable)
+        invocables = [
+            _make_invocable(m['Type'], m.get('Namespace'), m['Method'], m['ReturnType'],
+                            m['Parameters'], m['IsStatic'])
+            for m in data
+        ]
         
         logger.info(f"Extracted {len(invocables)} .NET methods from {dll_path.name}")
         return invocables
@@ -135,15 +201,22 @@ def get_dotnet_methods(dll_path: Path, timeout: int = 60) -> List[Invocable]:
         return []
 
 
-def get_dotnet_metadata(dll_path: Path) -> Dict[str, str]:
+def get_dotnet_metadata(dll_path: Path, image: Optional[PEImage] = None) -> Dict[str, str]:
     """Extract basic .NET assembly metadata (version, culture, key).
     
     Args:
         dll_path: Path to .NET assembly
+        image: Already-opened PEImage of *dll_path* (opened here if omitted)
         
     Returns:
         Dictionary with metadata fields
     """
+    try:
+        return _read_metadata(dll_path, image, lambda md: md.assembly_identity()) or {}
+    except MetadataError:
+        if not shutil.which("powershell"):
+            return {}
+
     ps_script = f"""
     try {{
         $asm = [System.Reflection.Assembly]::LoadFile('{dll_path}')
@@ -0,0 +1,128 @@
+"""
+dotnet_xmldoc.py - .NET XML documentation file loader.
+
+Compilers emit ``<Assembly>.xml`` next to an assembly built with
+``/doc``; framework and NuGet reference assemblies ship them the same
+way.  Members are keyed by documentation ID (``M:Ns.Type.Method(System.Int32)``,
+produced for each method by clr_metadata).
+
+The file is streamed with ``iterparse`` and every ``<member>`` element is
+discarded as soon as it has been read, so 50+ MB framework doc files are
+loaded without building a DOM; only the members the assembly actually
+exposes are kept.
+"""
+
+import logging
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Collection, Dict, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class MemberDoc(NamedTuple):
+    """Documentation of one member."""
+    summary: Optional[str]
+    params: Tuple[Tuple[str, str], ...]  # (parameter name, description)
+    returns: Optional[str]
+
+    def describe(self) -> Optional[str]:
+        """One-line description: summary, then parameter and return docs."""
+        parts = [self.summary] if self.summary else []
+        if self.params:
+            parts.append("Parameters: "
+                         + "; ".join(f"{n}: {d.rstrip('.')}" for n, d in self.params) + ".")
+        if self.returns:
+            parts.append(f"Returns: {self.returns}")
+        return " ".join(parts) or None
+
+
+def xml_doc_path(assembly: Path) -> Optional[Path]:
+    """The ``<Assembly>.xml`` documentation file beside *assembly*, if any."""
+    if assembly.suffix.lower() not in (".dll", ".exe"):
+        return None
+    for suffix in (".xml", ".XML"):
+        candidate = assembly.with_suffix(suffix)
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def load_xml_docs(xml_path: Path,
+                  member_ids: Optional[Collection[str]] = None) -> Dict[str, MemberDoc]:
+    """Documentation ID -> MemberDoc for the members of *xml_path*.
+
+    With *member_ids* only those members are kept.  Unreadable or
+    malformed files yield whatever was parsed before the error.
+    """
+    wanted = set(member_ids) if member_ids is not None else None
+    docs: Dict[str, MemberDoc] = {}
+    members = None
+    try:
+        for event, elem in ET.iterparse(str(xml_path), events=("start", "end")):
+            if event == "start":
+                if elem.tag == "members":
+                    members = elem
+                continue
+            if elem.tag != "member":
+                continue
+            name = elem.get("name")
+            if name and (wanted is None or name in wanted):
+                doc = _member_doc(elem)
+                if doc.summary or doc.params or doc.returns:
+                    docs[name] = doc
+            # Drop every finished member so memory stays flat
+            if members is not None:
+                members.clear()
+            else:
+                elem.clear()
+    except (ET.ParseError, OSError) as e:
+        logger.warning(f"Could not read XML documentation {xml_path.name}: {e}")
+    return docs
+
+
+def _member_doc(member: ET.Element) -> MemberDoc:
+    summary = returns = None
+    params = []
+    for child in member:
+        if child.tag == "summary":
+            summary = _text(child)
+        elif child.tag == "returns":
+            returns = _text(child)
+        elif child.tag == "param" and child.get("name"):
+            text = _text(child)
+            if text:
+                params.append((child.get("name"), text))
+    return MemberDoc(summary or None, tuple(params), returns or None)
+
+
+def _text(elem: ET.Element) -> str:
+    """Flatten a doc element: ``<see cref="T:System.String"/>`` -> ``String``."""
+    return _WHITESPACE_RE.sub(" ", _inline(elem)).strip()
+
+
+def _inline(elem: ET.Element) -> str:
+    parts = [elem.text or ""]
+    for child in elem:
+        if child.tag in ("see", "seealso") and not (child.text or len(child)):
+            parts.append(_reference(child))
+        elif child.tag in ("paramref", "typeparamref"):
+            parts.append(child.get("name", ""))
+        elif child.tag == "para":
+            parts.append(f" {_inline(child)} ")
+        else:
+            parts.append(_inline(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+def _reference(see: ET.Element) -> str:
+    """Short name of a ``<see cref/langword/href>`` reference."""
+    cref = see.get("cref")
+    if cref:
+        # "M:Ns.Type.Method(System.Int32)" -> "Method", "T:Ns.List`1" -> "List`1"
+        return cref.split(":", 1)[-1].split("(", 1)[0].rsplit(".", 1)[-1]
+    return see.get("langword") or see.get("href") or ""
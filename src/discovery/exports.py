@@ -4,16 +4,48 @@ exports.py - Export normalization, demangling, and forwarder resolution.
 Enhances raw export list with demangling, forwarding resolution, and deduplication.
 """
 
+import shutil
 import subprocess
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 # Suppress GUI windows when calling undname or other tools (Windows only).
 _NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
 
+from msvc_demangle import demangle
 from schema import ExportedFunc
 
 
+def demangle_exports(
+    exports: List[ExportedFunc],
+    undname_path: Optional[str] = None
+) -> bool:
+    """Demangle C++ export names in-process with the built-in MSVC demangler.
+    
+    Names the built-in demangler rejects are handed to undname.exe, but
+    only when *undname_path* resolves to an executable.
+    
+    Args:
+        exports: List of exports to demangle (modified in-place)
+        undname_path: Optional undname.exe fallback
+        
+    Returns:
+        True if demangling succeeded for at least some exports
+    """
+    unresolved = []
+    for exp in exports:
+        if not exp.name.startswith('?'):
+            continue
+        exp.demangled = demangle(exp.name)
+        if exp.demangled is None:
+            unresolved.append(exp)
+
+    if unresolved and undname_path and shutil.which(undname_path):
+        demangle_with_undname(unresolved, undname_path)
+
+    return any(exp.demangled for exp in exports)
+
+
 def demangle_with_undname(
     exports: List[ExportedFunc],
     undname_path: str
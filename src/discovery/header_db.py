@@ -0,0 +1,131 @@
+"""
+header_db.py - Prebuilt header prototype database.
+
+Compiles a header root (Windows SDK, vcpkg ``include`` tree, ...) into a
+SQLite file once, so later runs pass the database to ``--headers`` and
+get prototype matches by lookup instead of re-parsing the headers.
+
+Each row holds one function: name, return type, parameters, doc comment,
+header file/line and the normalized prototype.  A name is resolved the
+same way a directory scan resolves it (first parseable prototype in
+header file order), so both forms of ``--headers`` give identical matches.
+
+Build with:
+    python src/discovery/main.py --build-header-db sdk.sqlite --headers <include root>
+"""
+
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable
+
+from headers_scan import HeaderIndex
+from schema import MatchInfo
+
+logger = logging.getLogger(__name__)
+
+# Bump when the table layout changes; older databases are then rejected
+SCHEMA_VERSION = 1
+
+_SQLITE_MAGIC = b"SQLite format 3\x00"
+
+_SCHEMA = """
+CREATE TABLE prototypes (
+    name        TEXT PRIMARY KEY,
+    return_type TEXT NOT NULL,
+    parameters  TEXT NOT NULL,
+    doc_comment TEXT NOT NULL,
+    header_file TEXT NOT NULL,
+    line        INTEGER NOT NULL,
+    prototype   TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Stay under SQLITE_MAX_VARIABLE_NUMBER (999 on older builds)
+_LOOKUP_CHUNK = 500
+
+
+def is_header_db(path: Path) -> bool:
+    """True if *path* is a SQLite file (a prebuilt prototype database)."""
+    try:
+        with open(path, "rb") as fh:
+            return fh.read(len(_SQLITE_MAGIC)) == _SQLITE_MAGIC
+    except OSError:  # directories, missing files
+        return False
+
+
+def build_header_db(headers_root: Path, db_path: Path) -> int:
+    """Index every prototype under *headers_root* into *db_path*.
+
+    Replaces an existing database. Returns the number of functions stored.
+    """
+    index = HeaderIndex.build(headers_root)
+
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = db_path.with_name(db_path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    conn = sqlite3.connect(str(tmp_path))
+    try:
+        conn.executescript(_SCHEMA)
+        conn.executemany(
+            "INSERT INTO prototypes VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((mi.function, mi.return_type, mi.parameters, mi.doc_comment,
+              mi.header_file, mi.line, mi.prototype)
+             for mi in index.matches.values()),
+        )
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("headers_root", str(headers_root.resolve())),
+        ])
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    finally:
+        conn.close()
+
+    # Swap in the finished file so readers never see a half-built database
+    tmp_path.replace(db_path)
+    logger.info(f"Indexed {len(index.matches)} prototypes from {headers_root} into {db_path}")
+    return len(index.matches)
+
+
+class HeaderDB:
+    """Read-only view of a prototype database built by build_header_db()."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self._conn.close()
+            raise ValueError(
+                f"{db_path} is not a header database of version {SCHEMA_VERSION} "
+                f"(found {version}); rebuild it with --build-header-db"
+            )
+
+    def lookup_many(self, names: Iterable[str]) -> Dict[str, MatchInfo]:
+        """MatchInfo for each of *names* present in the database, in input order."""
+        names = list(dict.fromkeys(names))
+        found: Dict[str, MatchInfo] = {}
+        for i in range(0, len(names), _LOOKUP_CHUNK):
+            chunk = names[i:i + _LOOKUP_CHUNK]
+            rows = self._conn.execute(
+                "SELECT name, return_type, parameters, doc_comment, header_file, line, "
+                f"prototype FROM prototypes WHERE name IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for row in rows:
+                found[row[0]] = MatchInfo(*row)
+        return {name: found[name] for name in names if name in found}
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "HeaderDB":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -6,10 +6,12 @@ extracting signatures and documentation comments.
 """
 
 import re
-from bisect import bisect_right
+from bisect import bisect_left
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Set
 
+from comment_index import CommentIndex
+from docs_index import DocsIndex
 from schema import ExportedFunc, MatchInfo
 
 
@@ -29,130 +31,32 @@ def make_proto_regex(func_name: str) -> re.Pattern:
     return re.compile(rf"(^|[^A-Za-z0-9_]){escaped}\s*\(", re.MULTILINE)
 
 
-def build_comment_spans(text: str) -> Tuple[List[Tuple[int, int]], List[int]]:
-    """Build a list of (start, end) character indices for all comments in the text."""
-    spans: List[Tuple[int, int]] = []
-    i = 0
-    n = len(text)
-
-    while i < n:
-        # Single-line comment
-        if text.startswith("//", i):
-            start = i
-            i = text.find("\n", i)
-            if i == -1:
-                spans.append((start, n))
-                break
-            spans.append((start, i))
-            continue
-
-        # Multi-line comment
-        if text.startswith("/*", i):
-            start = i
-            end = text.find("*/", i + 2)
-            if end == -1:
-                spans.append((start, n))
-                break
-            spans.append((start, end + 2))
-            i = end + 2
-            continue
-
-        i += 1
-
-    starts = [s for s, _ in spans]
-    return spans, starts
+def extract_doc_comment_above(text: str, start_index: int) -> str:
+    """Extract documentation comment appearing immediately before the given index.
 
+    Builds a comment index for *text*; callers looking up several
+    declarations in one text should build it once and use doc_comment_above().
+    """
+    return doc_comment_above(CommentIndex(text), start_index)
 
-def in_comment_spans(idx: int, spans: List[Tuple[int, int]], starts: List[int]) -> bool:
-    """Check if the given index is inside a comment span."""
-    if not spans:
-        return False
-    pos = bisect_right(starts, idx) - 1
-    if pos < 0:
-        return False
-    s, e = spans[pos]
-    return s <= idx < e
 
+def doc_comment_above(comments: CommentIndex, start_index: int) -> str:
+    """Doxygen comment (///, //! run or /** */, /*! */ block) directly above *start_index*.
 
-def extract_doc_comment_above(text: str, start_index: int) -> str:
-    """Extract documentation comment appearing immediately before the given index.
-    
-    Robustly handles blank lines between comment definition and function.
+    Allows up to 5 blank lines between the comment and the declaration.
     """
-    # Look at text before the function
-    before = text[:start_index]
-    lines = before.splitlines()
-    if not lines:
+    run = comments.run_before(start_index, max_blank_lines=5)
+    if not run:
         return ""
-    
-    # 1. Look backwards for the first non-empty line
-    i = len(lines) - 1
-    blank_limit = 5 # Allow up to N blank lines
-    blanks_seen = 0
-    
-    while i >= 0:
-        if lines[i].strip():
-            break # Found content
-        blanks_seen += 1
-        i -= 1
-        
-    if i < 0 or blanks_seen > blank_limit:
-        return "" # No comment found within range
-
-    line = lines[i].lstrip()
-
-    # 2. Check for Single-line Doxygen (/// or //!)
-    if line.startswith("///") or line.startswith("//!"):
-        block = []
-        while i >= 0:
-            l = lines[i].lstrip()
-            if l.startswith("///") or l.startswith("//!"):
-                block.append(l[3:].lstrip())
-                i -= 1
-            else:
-                break
-        block.reverse()
-        return "\n".join(block).strip()
-
-    # 3. Check for Multi-line Doxygen (ends with */)
-    if lines[i].strip().endswith("*/"):
-        block_lines = []
-        
-        # Scan backwards to find /* or /**
-        while i >= 0:
-            block_lines.append(lines[i])
-            if "/*" in lines[i]:
-                break
-            i -= 1
-            
-        if i < 0: return "" # Never found start
-        
-        block_lines.reverse()
-        
-        # Check if it starts with Doxygen marker
-        opening = block_lines[0].lstrip()
-        if not (opening.startswith("/**") or opening.startswith("/*!")):
-            # Standard C comment, but maybe we treat it as doc?
-            # For now, stick to Doxygen
-            return ""
-            
-        block_text = "\n".join(block_lines)
-        
-        # Clean up the Doxygen block
-        # Remove opening /**
-        block_text = re.sub(r"^\s*/\*\*?\s?", "", block_text.lstrip())
-        # Remove closing */
-        block_text = re.sub(r"\s?\*/\s*$", "", block_text.rstrip())
-        
-        # Remove leading * on each line
-        cleaned = []
-        for l in block_text.splitlines():
-            l = re.sub(r"^\s*\*\s?", "", l)
-            cleaned.append(l.rstrip())
-            
-        return "\n".join(cleaned).strip()
-
-    return ""
+    if run[-1].block:
+        return run[-1].text if run[-1].marker in ("/**", "/*!") else ""
+    block: List[str] = []
+    for comment in reversed(run):
+        if comment.marker not in ("///", "//!"):
+            break
+        block.append(comment.text)
+    block.reverse()
+    return "\n".join(block).strip()
 
 
 def extract_inline_comment(line_text: str) -> str:
@@ -190,6 +94,141 @@ def clean_return_type(text: str) -> str:
     return text
 
 
+# An identifier directly followed by "(" - every place a prototype can start.
+_CALL_SITE_RE = re.compile(r"(?<![A-Za-z0-9_])([A-Za-z_][A-Za-z0-9_]*)\s*\(")
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_DECL_PUNCT_RE = re.compile(r"[();{]")
+_DECL_END_RE = re.compile(r"[;{]")
+
+
+class _HeaderText:
+    """One header's text with its comment index, shared by every lookup in it."""
+
+    def __init__(self, path: Path, text: str):
+        self.path = path
+        self.text = text
+        self.comments = CommentIndex(text)
+        # Declaration end per line start; every call site on a line shares it
+        self._decl_ends: Dict[int, Optional[int]] = {}
+        self._last_terminator: Optional[int] = None
+        self._newlines: Optional[List[int]] = None
+
+    def in_comment(self, idx: int) -> bool:
+        return self.comments.contains(idx)
+
+    def line_number(self, idx: int) -> int:
+        """1-based line number of character *idx*."""
+        if self._newlines is None:
+            self._newlines = [m.start() for m in re.finditer("\n", self.text)]
+        return bisect_left(self._newlines, idx) + 1
+
+    def last_terminator(self) -> int:
+        """Index of the last ";" or "{" outside comments (-1 if none)."""
+        if self._last_terminator is None:
+            self._last_terminator = -1
+            for m in reversed(list(_DECL_END_RE.finditer(self.text))):
+                if not self.in_comment(m.start()):
+                    self._last_terminator = m.start()
+                    break
+        return self._last_terminator
+
+    def declaration_end(self, line_start: int) -> Optional[int]:
+        """First ";" or "{" at paren depth 0 from *line_start*, skipping comments."""
+        if line_start in self._decl_ends:
+            return self._decl_ends[line_start]
+
+        end_idx = None
+        # Tables of macro invocations often never terminate; don't walk them
+        if line_start <= self.last_terminator():
+            depth = 0
+            for m in _DECL_PUNCT_RE.finditer(self.text, line_start):
+                i = m.start()
+                if self.in_comment(i):
+                    continue
+                ch = m.group()
+                if ch == "(":
+                    depth += 1
+                elif ch == ")":
+                    depth = max(0, depth - 1)
+                elif depth == 0:
+                    end_idx = i
+                    break
+
+        self._decl_ends[line_start] = end_idx
+        return end_idx
+
+
+def _parse_prototype(header: _HeaderText, name_index: int,
+                     export_name: str) -> Optional[MatchInfo]:
+    """Parse the declaration of *export_name* found at *name_index* in *header*.
+
+    *name_index* is where the prototype regex matched, i.e. the character
+    just before the name (or the name itself at the start of the text).
+    """
+    text = header.text
+    if header.in_comment(name_index):
+        return None
+
+    line_start = text.rfind("\n", 0, name_index) + 1
+
+    # Skip preprocessor directives
+    line_prefix = text[line_start:name_index].lstrip()
+    if line_prefix.startswith("#"):
+        return None
+
+    end_idx = header.declaration_end(line_start)
+    if end_idx is None:
+        return None
+
+    proto = text[line_start:end_idx].strip()
+    if f"{export_name}(" not in proto and f"{export_name} (" not in proto:
+        return None
+
+    # Extract inline comment
+    line_end = text.find("\n", end_idx)
+    if line_end == -1:
+        line_end = len(text)
+    inline_comment = extract_inline_comment(text[end_idx:line_end])
+    doc = inline_comment or doc_comment_above(header.comments, line_start)
+
+    # Parse prototype
+    proto_one = normalize_whitespace(proto)
+    idx = proto_one.find(export_name)
+    if idx <= 0:
+        return None
+    before_name = proto_one[:idx].strip()
+    after_name = proto_one[idx + len(export_name) :].lstrip()
+
+    # Extract parameters
+    if not after_name.startswith("("):
+        params = ""
+    else:
+        depth = 0
+        params_chars = []
+        for ch in after_name:
+            if ch == "(":
+                depth += 1
+                if depth == 1:
+                    continue
+            elif ch == ")":
+                depth -= 1
+                if depth == 0:
+                    break
+            if depth >= 1:
+                params_chars.append(ch)
+        params = normalize_whitespace("".join(params_chars))
+
+    return MatchInfo(
+        function=export_name,
+        return_type=clean_return_type(before_name),
+        parameters=params,
+        doc_comment=doc.strip(),
+        header_file=str(header.path),
+        line=header.line_number(line_start),
+        prototype=proto_one,
+    )
+
+
 def find_prototype_in_header(file_path: Path, export_name: str) -> Optional[MatchInfo]:
     """Find function prototype in a header file."""
     try:
@@ -198,94 +237,79 @@ def find_prototype_in_header(file_path: Path, export_name: str) -> Optional[Matc
         return None
 
     rx = make_proto_regex(export_name)
-    comment_spans, comment_starts = build_comment_spans(text)
+    header = _HeaderText(file_path, text)
 
     for m in rx.finditer(text):
-        name_index = m.start(0)
-        if in_comment_spans(name_index, comment_spans, comment_starts):
-            continue
+        mi = _parse_prototype(header, m.start(0), export_name)
+        if mi:
+            return mi
 
-        line_start = text.rfind("\n", 0, name_index) + 1
-        line_no = text.count("\n", 0, line_start) + 1
+    return None
 
-        # Skip preprocessor directives
-        line_prefix = text[line_start:name_index].lstrip()
-        if line_prefix.startswith("#"):
-            continue
 
-        # Find end of declaration (semicolon or opening brace)
-        end_idx = None
-        depth = 0
-        i = line_start
-        n = len(text)
-        while i < n:
-            if in_comment_spans(i, comment_spans, comment_starts):
-                i += 1
-                continue
-            ch = text[i]
-            if ch == "(":
-                depth += 1
-            elif ch == ")":
-                depth = max(0, depth - 1)
-            elif ch in (";", "{") and depth == 0:
-                end_idx = i
+class HeaderIndex:
+    """Prototypes for a set of function names, found in one pass over a header tree.
+
+    Every header is read once and its comment index built once.  A single
+    scan for "identifier (" yields every candidate prototype site; sites
+    whose identifier is one of the wanted names (a set lookup) are parsed.
+    Headers are visited in the same order as the per-export search, and
+    the first parseable prototype for a name wins, so results are identical.
+    Without a name set every prototype is indexed (see header_db).
+    """
+
+    def __init__(self, matches: Optional[Dict[str, MatchInfo]] = None):
+        self.matches: Dict[str, MatchInfo] = matches or {}
+
+    @classmethod
+    def build(cls, headers_root: Path,
+              names: Optional[Iterable[str]] = None) -> "HeaderIndex":
+        """Index *headers_root*; with *names* None, every prototype found."""
+        wanted = set(names) if names is not None else None
+        # Decorated/mangled names are not C identifiers; match those per file
+        odd_names = [n for n in wanted or () if not _IDENTIFIER_RE.fullmatch(n)]
+        index = cls()
+
+        for hdr in iter_header_files(headers_root):
+            if wanted is not None and len(index.matches) == len(wanted):
                 break
-            i += 1
-
-        if end_idx is None:
-            continue
-
-        proto = text[line_start:end_idx].strip()
-        if f"{export_name}(" not in proto and f"{export_name} (" not in proto:
-            continue
-
-        # Extract inline comment
-        line_end = text.find("\n", end_idx)
-        if line_end == -1:
-            line_end = len(text)
-        inline_comment = extract_inline_comment(text[end_idx:line_end])
-        doc = inline_comment or extract_doc_comment_above(text, line_start)
-
-        # Parse prototype
-        proto_one = normalize_whitespace(proto)
-        idx = proto_one.find(export_name)
-        if idx <= 0:
-            continue
-        before_name = proto_one[:idx].strip()
-        after_name = proto_one[idx + len(export_name) :].lstrip()
-
-        # Extract parameters
-        if not after_name.startswith("("):
-            params = ""
-        else:
-            depth = 0
-            params_chars = []
-            for ch in after_name:
-                if ch == "(":
-                    depth += 1
-                    if depth == 1:
-                        continue
-                elif ch == ")":
-                    depth -= 1
-                    if depth == 0:
-                        break
-                if depth >= 1:
-                    params_chars.append(ch)
-            params = normalize_whitespace("".join(params_chars))
-
-        return_type = clean_return_type(before_name)
-
-        return MatchInfo(
-            function=export_name,
-            return_type=return_type,
-            parameters=params,
-            doc_comment=doc.strip(),
-            header_file=str(file_path),
-            line=line_no,
-            prototype=proto_one,
-        )
+            try:
+                text = hdr.read_text(encoding="utf-8", errors="replace")
+            except Exception:
+                continue
+            index._index_text(text, hdr, wanted, odd_names)
 
-    return None
+        return index
+
+    def _index_text(self, text: str, file_path: Path, wanted: Optional[Set[str]],
+                    odd_names: List[str]) -> None:
+        header: Optional[_HeaderText] = None
+
+        def parse(name_index: int, name: str) -> None:
+            nonlocal header
+            if header is None:  # only headers with a candidate pay for this
+                header = _HeaderText(file_path, text)
+            mi = _parse_prototype(header, name_index, name)
+            if mi:
+                self.matches[name] = mi
+
+        for m in _CALL_SITE_RE.finditer(text):
+            name = m.group(1)
+            if (wanted is None or name in wanted) and name not in self.matches:
+                # Report the same index make_proto_regex() would match at
+                start = m.start(1)
+                parse(start - 1 if start else 0, name)
+
+        for name in odd_names:
+            if name in self.matches:
+                continue
+            for m in make_proto_regex(name).finditer(text):
+                parse(m.start(0), name)
+                if name in self.matches:
+                    break
+
+    def lookup(self, name: str) -> Optional[MatchInfo]:
+        return self.matches.get(name)
 
 
 def scan_headers(
@@ -294,68 +318,48 @@ def scan_headers(
     """Scan header files for function prototypes matching exports.
     
     Args:
-        headers_root: Root directory to search for headers
+        headers_root: Root directory to search for headers, or a prototype
+            database built from one (see header_db.build_header_db)
         exports: List of exported functions to find prototypes for
         
     Returns:
         Dict mapping export name to MatchInfo (or empty if no match found)
     """
-    matches: Dict[str, MatchInfo] = {}
-    header_files = iter_header_files(headers_root)
+    from header_db import HeaderDB, is_header_db
 
-    for exp in exports:
-        if exp.name in matches:
-            continue
+    if is_header_db(headers_root):
+        with HeaderDB(headers_root) as db:
+            return db.lookup_many(exp.name for exp in exports)
 
-        for hdr in header_files:
-            mi = find_prototype_in_header(hdr, exp.name)
-            if mi:
-                matches[exp.name] = mi
-                break
+    index = HeaderIndex.build(headers_root, (exp.name for exp in exports))
+
+    matches: Dict[str, MatchInfo] = {}
+    for exp in exports:
+        mi = index.lookup(exp.name)
+        if mi:
+            matches[exp.name] = mi
 
     return matches
 
 
 def scan_docs_for_exports(
-    docs_root: Path, exports: List[ExportedFunc], max_hits: int = 2
+    docs_root: Path, exports: List[ExportedFunc], max_hits: int = 2,
+    index_dir: Optional[Path] = None,
 ) -> Dict[str, List[str]]:
     """Scan documentation directory for mentions of exported functions.
     
-    Searches documentation files for mentions of exported functions
-    and links them back to the exports.
+    Looks each export up in an identifier index of the documentation
+    files (built once per docs tree, see docs_index) and links the best
+    ranked files back to the export.
     
     Args:
         docs_root: Root directory to search for documentation
         exports: List of exported functions to search for
         max_hits: Maximum number of documentation files to link per export
+        index_dir: Where to keep the index between runs (in memory if None)
         
     Returns:
         Dict mapping export name to list of documentation file paths
     """
-    results: Dict[str, List[str]] = {}
-
-    doc_extensions = {".md", ".txt", ".rst", ".adoc", ".htm", ".html"}
-    doc_files = [
-        p
-        for p in docs_root.rglob("*")
-        if p.is_file() and p.suffix.lower() in doc_extensions
-    ]
-
-    for exp in exports:
-        hits = []
-
-        for doc_file in doc_files:
-            if len(hits) >= max_hits:
-                break
-
-            try:
-                content = doc_file.read_text(encoding="utf-8", errors="ignore")
-                if exp.name in content:
-                    hits.append(str(doc_file.relative_to(docs_root)))
-            except Exception:
-                continue
-
-        if hits:
-            results[exp.name] = hits
-
-    return results
+    with DocsIndex.open(docs_root, index_dir) as index:
+        return index.lookup_many((exp.name for exp in exports), max_hits)
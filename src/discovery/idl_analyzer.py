@@ -16,6 +16,7 @@ import re
 from pathlib import Path
 from typing import List, Optional
 
+from comment_index import CommentIndex
 from schema import Invocable
 
 logger = logging.getLogger(__name__)
@@ -25,10 +26,6 @@ logger = logging.getLogger(__name__)
 # Regex patterns
 # ---------------------------------------------------------------------------
 
-# Strip // line comments and /* ... */ block comments
-_LINE_COMMENT_RE  = re.compile(r'//[^\n]*')
-_BLOCK_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
-
 # module Foo { ... }
 _MODULE_RE = re.compile(r'\bmodule\s+(?P<name>\w+)\s*\{', re.MULTILINE)
 
@@ -98,13 +95,6 @@ def _idl_type_to_json(idl_type: str) -> str:
 # Parser
 # ---------------------------------------------------------------------------
 
-def _strip_comments(source: str) -> str:
-    """Remove comments but insert newline placeholders to preserve line offsets."""
-    source = _BLOCK_COMMENT_RE.sub(lambda m: '\n' * m.group(0).count('\n'), source)
-    source = _LINE_COMMENT_RE.sub('', source)
-    return source
-
-
 def _extract_block(source: str, open_pos: int) -> Optional[str]:
     """Return the content between matching braces starting at open_pos (which
     must point to the '{') or None if unmatched."""
@@ -141,29 +131,18 @@ def _parse_params(raw: str) -> str:
     return ", ".join(parts)
 
 
-def _find_doc_before(original_source: str, clean_source: str, method_pos: int) -> Optional[str]:
-    """Find a // doc comment immediately preceding the method declaration.
+def _find_doc_before(comments: CommentIndex, method_pos: int) -> Optional[str]:
+    """Find the // doc comment lines immediately preceding the method declaration.
 
-    Uses the *original* (un-stripped) source positionally aligned with the
-    *clean* (comment-stripped) source.  Because _strip_comments preserves
-    newline counts, the character offset in clean maps onto the same line
-    number in original.
+    *method_pos* is an offset into the comment-blanked source, which is
+    also its offset in the original source.
     """
-    # Count the line number of method_pos in clean source
-    line_no = clean_source[:method_pos].count('\n')
-    orig_lines = original_source.splitlines()
-
+    line_start = comments.text.rfind('\n', 0, method_pos) + 1
     doc_lines: List[str] = []
-    for i in range(line_no - 1, max(-1, line_no - 10), -1):
-        if i >= len(orig_lines):
-            continue
-        stripped = orig_lines[i].strip()
-        if stripped.startswith('//'):
-            doc_lines.insert(0, stripped.lstrip('/').strip())
-        elif stripped == '' and not doc_lines:
-            continue
-        else:
+    for comment in reversed(comments.run_before(line_start, max_blank_lines=8)):
+        if comment.block:
             break
+        doc_lines.insert(0, comment.text)
     return ' '.join(doc_lines) if doc_lines else None
 
 
@@ -186,7 +165,9 @@ def analyze_idl(path: Path) -> List[Invocable]:
         logger.error("Cannot read %s: %s", path, exc)
         return []
 
-    clean = _strip_comments(source)
+    # Comments blanked out in place, so offsets in clean are offsets in source
+    comments = CommentIndex(source)
+    clean = comments.blank()
     invocables: List[Invocable] = []
 
     # Scan for interface blocks
@@ -220,9 +201,9 @@ def analyze_idl(path: Path) -> List[Invocable]:
             raw_params = method_m.group("params") or ""
             is_oneway = bool(method_m.group("oneway"))
 
-            # Doc comment — search in original source at the same line offset
+            # Doc comment — looked up in the comment index at the same offset
             abs_pos = body_offset + method_m.start()
-            doc = _find_doc_before(source, clean, abs_pos)
+            doc = _find_doc_before(comments, abs_pos)
 
             ret_type = _idl_type_to_json(rettype_raw)
             params_str = _parse_params(raw_params)
@@ -10,10 +10,14 @@ Analyzes what DLLs and functions a binary imports to determine capabilities:
 """
 
 import logging
+import re
 import subprocess
 from pathlib import Path
 from typing import Dict, List, Set, Optional
-import pefile
+
+from binary_strings import BinaryString
+from pe_image import PEImage
+from pe_parse import read_pe_imports
 
 logger = logging.getLogger(__name__)
 
@@ -94,42 +98,17 @@ COM_FUNCTIONS = {
 }
 
 
-def get_imports_pe(dll_path: Path) -> Dict[str, List[str]]:
-    """Parse imports using pefile.
+def get_imports_pe(dll_path: Path, image: Optional[PEImage] = None) -> Dict[str, List[str]]:
+    """Parse imports straight from the PE import table.
     
     Args:
         dll_path: Path to PE file
+        image: Already-opened PEImage of *dll_path* (opened here if omitted)
         
     Returns:
         Dict mapping DLL names to list of imported functions
     """
-    imports = {}
-    try:
-        pe = pefile.PE(str(dll_path))
-        
-        if hasattr(pe, 'DIRECTORY_ENTRY_IMPORT'):
-            for entry in pe.DIRECTORY_ENTRY_IMPORT:
-                if entry.dll:
-                    try:
-                        dll_name = entry.dll.decode('utf-8').lower()
-                    except UnicodeDecodeError:
-                        dll_name = str(entry.dll)
-                        
-                    func_list = []
-                    for imp in entry.imports:
-                        if imp.name:
-                            try:
-                                func_list.append(imp.name.decode('utf-8'))
-                            except UnicodeDecodeError:
-                                func_list.append(str(imp.name))
-                        else:
-                            # Ordinal import
-                            func_list.append(f"#{imp.ordinal}")
-                    imports[dll_name] = func_list
-                    
-    except Exception as e:
-        logger.error(f"Error parsing imports with pefile: {e}")
-        
+    imports, _ = read_pe_imports(dll_path, image)
     return imports
 
 
@@ -199,18 +178,45 @@ def _detect_network_protocols(network_funcs: Set[str]) -> List[str]:
     return protocols
 
 
-def analyze_imports(dll_path: Path, dumpbin_path: str = "dumpbin") -> Dict:
+_URL_RE = re.compile(r'\b(?:https?|wss?|ftp)://[^\s"\'<>]+')
+
+
+def find_urls(strings: List[BinaryString], limit: int = 50) -> List[str]:
+    """Collect unique URLs (http, https, ws, wss, ftp) from binary strings.
+    
+    Args:
+        strings: Strings from binary_strings.extract_strings()
+        limit: Maximum number of URLs returned
+        
+    Returns:
+        URLs in file order
+    """
+    urls: List[str] = []
+    for s in strings:
+        if '://' not in s.text:
+            continue
+        for url in _URL_RE.findall(s.text):
+            if url not in urls:
+                urls.append(url)
+                if len(urls) >= limit:
+                    return urls
+    return urls
+
+
+def analyze_imports(dll_path: Path, dumpbin_path: str = "dumpbin",
+                    image: Optional[PEImage] = None) -> Dict:
     """Full import analysis with capability detection.
     
     Args:
         dll_path: Path to PE file
         dumpbin_path: Deprecated, ignored.
+        image: Already-opened PEImage of *dll_path* (opened here if omitted)
         
     Returns:
         Dict with import summary and capabilities
     """
-    # Use pure python pefile implementation
-    imports = get_imports_pe(dll_path)
+    # Pure Python import table reader (pefile only as malformed-image fallback)
+    imports = get_imports_pe(dll_path, image)
     
     capabilities = detect_capabilities(imports)
     
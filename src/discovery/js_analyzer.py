@@ -1,7 +1,9 @@
 """
 js_analyzer.py - Invocable extractor for JavaScript and TypeScript files.
 
-Detects and extracts the following patterns without a full AST parser:
+Detects and extracts the following patterns without a full AST parser, in
+one pass over the source (js_lexer.scan_js), so comments, strings and
+template literals never produce matches:
 
   JavaScript
   ----------
@@ -38,6 +40,7 @@ import re
 from pathlib import Path
 from typing import List, Optional
 
+from js_lexer import scan_js
 from schema import Invocable
 
 logger = logging.getLogger(__name__)
@@ -46,8 +49,6 @@ logger = logging.getLogger(__name__)
 # Regex patterns
 # ---------------------------------------------------------------------------
 
-# JSDoc block  /** … */  immediately before a declaration
-_JSDOC_RE = re.compile(r'/\*\*(?P<content>.*?)\*/', re.DOTALL)
 # First @description or plain text from JSDoc
 _JSDOC_DESC_RE = re.compile(r'^\s*\*?\s*(?!@)(.+)', re.MULTILINE)
 # @param {type} name - description
@@ -63,43 +64,12 @@ _JSDOC_RETURNS_RE = re.compile(
     r'@returns?\s+(?:\{(?P<type>[^}]*)\})?(?:\s*-?\s*(?P<desc>.+))?',
 )
 
-# export keyword prefix (TS/ESM)
-_EXPORT_PREFIX = r'export\s+(?:default\s+)?(?:async\s+)?'
-
-# Named function declaration (JS + TS)
-#   [export] [async] function name<T>(params): RetType
-_FUNC_DECL_RE = re.compile(
-    r'(?:' + _EXPORT_PREFIX + r')?(?:async\s+)?function\s*\*?\s*'
-    r'(?P<name>\w+)\s*(?:<[^>]*>)?\s*\((?P<params>[^)]*)\)'
-    r'(?:\s*:\s*(?P<rettype>[^\{;\n]+))?',
-    re.MULTILINE,
-)
-
-# Arrow / function-expression assigned to const/let/var
-#   [export] const name = [async] (params) => …
-#   [export] const name = [async] function(params)
-_ARROW_RE = re.compile(
-    r'(?:export\s+)?(?:const|let|var)\s+(?P<name>\w+)\s*=\s*'
-    r'(?:async\s+)?(?:'
-    r'\((?P<params>[^)]*)\)\s*(?::\s*(?P<rettype>[^\{=>\n]+))?\s*=>'
-    r'|function\s*\((?P<fparams>[^)]*)\)'
-    r')',
-    re.MULTILINE,
-)
-
-# TypeScript class method:  [modifier] name(params): RetType {
-_TS_METHOD_RE = re.compile(
-    r'^\s*(?:public|private|protected|static|async|override|\s)+'
-    r'(?P<name>\w+)\s*(?:<[^>]*>)?\s*\((?P<params>[^)]*)\)'
-    r'(?:\s*:\s*(?P<rettype>[^\{;\n]+))?\s*\{',
-    re.MULTILINE,
-)
-
-# CommonJS  module.exports.foo = …  or  exports.foo = …
-_CJS_EXPORT_RE = re.compile(
-    r'(?:module\.exports|exports)\.(?P<name>\w+)\s*=',
-    re.MULTILINE,
-)
+# scan_js() event kind -> Invocable source_type
+_SOURCE_TYPES = {
+    'function': 'js_function',
+    'arrow':    'js_arrow',
+    'method':   'ts_method',
+}
 
 # CLI detection patterns
 _CLI_INDICATORS = [
@@ -136,78 +106,31 @@ def analyze_js(path: Path) -> List[Invocable]:
 
     invocables: List[Invocable] = []
     seen: set = set()
-
-    # Build a list of (match_pos, invocable) from all patterns, then deduplicate
-    candidates: List[tuple] = []
-
-    # 1. Named function declarations
-    for m in _FUNC_DECL_RE.finditer(source):
-        name = m.group('name')
-        raw_params = m.group('params') or ''
-        rettype = (m.group('rettype') or '').strip()
-        jsdoc = _find_jsdoc_before(source, m.start())
-        inv = _make_invocable(
-            name=name,
-            raw_params=raw_params,
-            rettype=rettype,
-            jsdoc=jsdoc,
-            source_type='js_function',
-            path=path,
-            is_exported='export' in source[max(0, m.start()-10):m.end()],
-        )
-        candidates.append((m.start(), inv))
-
-    # 2. Arrow / function-expression const/let
-    for m in _ARROW_RE.finditer(source):
-        name = m.group('name')
-        raw_params = m.group('params') or m.group('fparams') or ''
-        rettype = (m.group('rettype') or '').strip()
-        jsdoc = _find_jsdoc_before(source, m.start())
-        inv = _make_invocable(
-            name=name,
-            raw_params=raw_params,
-            rettype=rettype,
-            jsdoc=jsdoc,
-            source_type='js_arrow',
-            path=path,
-            is_exported='export' in source[max(0, m.start()-10):m.end()],
-        )
-        candidates.append((m.start(), inv))
-
-    # 3. TypeScript class methods
-    if is_ts:
-        for m in _TS_METHOD_RE.finditer(source):
-            name = m.group('name')
-            if name in ('if', 'for', 'while', 'switch', 'catch'):
-                continue
-            raw_params = m.group('params') or ''
-            rettype = (m.group('rettype') or '').strip()
-            jsdoc = _find_jsdoc_before(source, m.start())
-            inv = _make_invocable(
-                name=name,
-                raw_params=raw_params,
-                rettype=rettype,
-                jsdoc=jsdoc,
-                source_type='ts_method',
+    candidates: List[Invocable] = []
+
+    # One sweep over the source yields every declaration with its JSDoc
+    for event in scan_js(source):
+        if event.kind == 'export':
+            candidates.append(Invocable(
+                name=event.name,
+                source_type='cjs_export',
+                signature=f'{event.name}(…)',
+                confidence='low',
+                dll_path=str(path),
+            ))
+        elif event.kind != 'method' or is_ts:
+            candidates.append(_make_invocable(
+                name=event.name,
+                raw_params=event.params,
+                rettype=event.return_type,
+                jsdoc=event.jsdoc,
+                source_type=_SOURCE_TYPES[event.kind],
                 path=path,
-                is_exported=False,
-            )
-            candidates.append((m.start(), inv))
-
-    # 4. CommonJS module.exports
-    for m in _CJS_EXPORT_RE.finditer(source):
-        name = m.group('name')
-        inv = Invocable(
-            name=name,
-            source_type='cjs_export',
-            signature=f'{name}(…)',
-            confidence='low',
-            dll_path=str(path),
-        )
-        candidates.append((m.start(), inv))
+                is_exported=event.exported,
+            ))
 
     # Deduplicate by name (keep first appearance per name)
-    for _, inv in sorted(candidates, key=lambda x: x[0]):
+    for inv in candidates:
         if inv.name in seen:
             continue
         # Skip private / internal names
@@ -257,21 +180,6 @@ def _is_cli_script(source: str) -> bool:
     return any(pat.search(source) for pat in _CLI_INDICATORS)
 
 
-def _find_jsdoc_before(source: str, pos: int) -> Optional[str]:
-    """Return the body of the JSDoc block (/** … */) immediately before pos."""
-    window = source[max(0, pos - 600):pos]
-    # Find the last /** … */ block in the window
-    matches = list(_JSDOC_RE.finditer(window))
-    if not matches:
-        return None
-    last = matches[-1]
-    # Must end close to the declaration (within ~5 lines)
-    tail = window[last.end():]
-    if '\n' in tail and tail.count('\n') > 3:
-        return None  # Too far away
-    return last.group('content')
-
-
 def _parse_jsdoc(jsdoc_body: Optional[str]) -> tuple:
     """Return (description: str, params: dict[name, desc], returns: str)."""
     if not jsdoc_body:
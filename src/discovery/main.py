@@ -7,6 +7,7 @@ Parses arguments, runs the analysis pipeline, and writes outputs.
 
 import argparse
 import logging
+import sqlite3
 import sys
 from pathlib import Path
 from typing import List, Optional
@@ -15,13 +16,18 @@ logger = logging.getLogger(__name__)
 
 from classify import classify_file, FileType, extract_signature, get_architecture
 from headers_scan import scan_headers, scan_docs_for_exports
-from exports import demangle_with_undname, deduplicate_exports, resolve_forwarders
+from header_db import HeaderDB, build_header_db, is_header_db
+from dir_walk import EXCLUDED_DIRS, classify_tree
+from docs_index import DocsIndex
+from exports import demangle_exports, deduplicate_exports, resolve_forwarders
+from pe_image import PEImage
 from pe_parse import read_pe_exports, get_exports_from_dumpbin, find_dumpbin
-from schema import ExportedFunc, Invocable, MatchInfo, write_csv, write_json, write_markdown, write_tier_summary, write_invocables_json, exports_to_invocables
+from schema import AnalysisOptions, AnalysisResult, ExportedFunc, Invocable, MatchInfo, write_csv, write_json, write_markdown, write_tier_summary, write_invocables_json, exports_to_invocables
 from utils import Spinner, format_verbose_header, format_verbose_result
 from dotnet_analyzer import get_dotnet_methods, get_dotnet_metadata
 from com_scan import scan_com_registry, com_objects_to_invocables
-from import_analyzer import analyze_imports, format_capabilities_summary
+from binary_strings import extract_strings
+from import_analyzer import analyze_imports, find_urls, format_capabilities_summary
 from rpc_analyzer import analyze_rpc, rpc_to_invocables, format_rpc_summary
 from cli_analyzer import analyze_cli
 from script_analyzer import analyze_script
@@ -32,6 +38,12 @@ from wsdl_analyzer import analyze_wsdl
 from idl_analyzer import analyze_idl
 from jndi_analyzer import analyze_jndi
 from pdb_analyzer import analyze_pdb
+from scan_cache import CACHE_FILENAME, ScanCache, file_hash
+from dotnet_xmldoc import xml_doc_path
+from signature import prefetch_catalog_signers, seed_catalog_signers
+from com_registry import registry_index, seed_registry_index
+from python_batch import analyze_python_files
+from python_package import analyze_python_package
 
 # Plugin-based analyzer registry
 ANALYZER_REGISTRY = {
@@ -281,17 +293,18 @@ def get_default_output_dir() -> Path:
     return Path.cwd() / "mcp_dumpbin_out"
 
 
-def analyze_dotnet_assembly(dll_path: Path, out_dir: Path, base_name: str, args) -> int:
+def analyze_dotnet_assembly(dll_path: Path, base_name: str, options: AnalysisOptions,
+                            result: AnalysisResult, image: Optional[PEImage] = None) -> int:
     """.NET assembly analysis pipeline."""
     logger.info(f"Analyzing .NET assembly: {dll_path}")
     
     # Extract .NET methods
-    invocables = get_dotnet_methods(dll_path)
+    invocables = get_dotnet_methods(dll_path, image=image)
     
     if not invocables:
         logger.warning("No public .NET methods found")
         # Try to get metadata at least
-        metadata = get_dotnet_metadata(dll_path)
+        metadata = get_dotnet_metadata(dll_path, image=image)
         if metadata:
             logger.info(f"Assembly: {metadata.get('AssemblyName')}, Version: {metadata.get('Version')}")
     else:
@@ -303,11 +316,16 @@ def analyze_dotnet_assembly(dll_path: Path, out_dir: Path, base_name: str, args)
         if not inv.confidence:
             inv.confidence = "high"  # .NET reflection provides high confidence
     
+    result.groups["dotnet_methods"] = invocables
+    if not options.write_artifacts:
+        return 0
+
     # Write outputs
+    out_dir = options.out_dir
     tier4_md = out_dir / f"{base_name}_dotnet_methods.md"
     with open(tier4_md, 'w', encoding='utf-8') as f:
-        f.write(f"# .NET Assembly Analysis: {dll_path.name}\\n\\n")
-        f.write(f"Total methods: {len(invocables)}\\n\\n")
+        f.write(f"# .NET Assembly Analysis: {dll_path.name}\n\n")
+        f.write(f"Total methods: {len(invocables)}\n\n")
         
         # Group by namespace
         from collections import defaultdict
@@ -317,12 +335,12 @@ def analyze_dotnet_assembly(dll_path: Path, out_dir: Path, base_name: str, args)
             by_namespace[namespace].append(inv)
         
         for namespace in sorted(by_namespace.keys()):
-            f.write(f"## {namespace}\\n\\n")
+            f.write(f"## {namespace}\n\n")
             for inv in sorted(by_namespace[namespace], key=lambda x: x.name):
-                f.write(f"- `{inv.signature}`\\n")
+                f.write(f"- `{inv.signature}`\n")
                 if inv.doc_comment:
-                    f.write(f"  - {inv.doc_comment}\\n")
-            f.write("\\n")
+                    f.write(f"  - {inv.doc_comment}\n")
+            f.write("\n")
     
     # Write MCP-compatible JSON output
     tier4_json_mcp = out_dir / f"{base_name}_dotnet_methods_mcp.json"
@@ -333,9 +351,10 @@ def analyze_dotnet_assembly(dll_path: Path, out_dir: Path, base_name: str, args)
         tier=4,
         schema_version="2.0.0"
     )
+    result.artifacts.extend([tier4_md, tier4_json_mcp])
     
     logger.info(f"Results written to {out_dir}")
-    print(f"\\n.NET Analysis Complete")
+    print(f"\n.NET Analysis Complete")
     print(f"Methods found: {len(invocables)}")
     print(f"Markdown: {tier4_md}")
     print(f"MCP JSON: {tier4_json_mcp}")
@@ -343,12 +362,13 @@ def analyze_dotnet_assembly(dll_path: Path, out_dir: Path, base_name: str, args)
     return 0
 
 
-def analyze_com_object(dll_path: Path, out_dir: Path, base_name: str, args) -> int:
+def analyze_com_object(dll_path: Path, base_name: str, options: AnalysisOptions,
+                       result: AnalysisResult, image: Optional[PEImage] = None) -> int:
     """COM object analysis pipeline."""
     logger.info(f"Analyzing COM object: {dll_path}")
     
-    # Scan registry for related COM objects
-    com_objects = scan_com_registry(dll_path.name)
+    # Look up registered COM objects (index built once per process)
+    com_objects = scan_com_registry(dll_path.name, options.com_registry)
     
     # Even if no registry objects found, the DLL might contain a Type Library
     if not com_objects:
@@ -357,11 +377,12 @@ def analyze_com_object(dll_path: Path, out_dir: Path, base_name: str, args) -> i
         logger.info(f"Found {len(com_objects)} COM objects in registry")
     
     # Convert COM objects / TLB to Invocables
-    invocables = com_objects_to_invocables(com_objects, dll_path)
+    invocables = com_objects_to_invocables(com_objects, dll_path, image=image)
     
     if not invocables:
         logger.warning(f"No COM objects or Type Library found for {dll_path.name}")
-        print(f"\nNo COM objects registered or embedded for {dll_path.name}")
+        if options.write_artifacts:
+            print(f"\nNo COM objects registered or embedded for {dll_path.name}")
         
         # Suppress empty report generation to reduce noise
         return 0
@@ -372,7 +393,12 @@ def analyze_com_object(dll_path: Path, out_dir: Path, base_name: str, args) -> i
         if not inv.confidence:
             inv.confidence = "medium"  # Default fallback
     
+    result.groups["com_objects"] = invocables
+    if not options.write_artifacts:
+        return 0
+
     # Write Markdown output
+    out_dir = options.out_dir
     tier4_md = out_dir / f"{base_name}_com_objects.md"
     with open(tier4_md, 'w', encoding='utf-8') as f:
         f.write(f"# COM Object Analysis: {dll_path.name}\n\n")
@@ -395,6 +421,7 @@ def analyze_com_object(dll_path: Path, out_dir: Path, base_name: str, args) -> i
         tier=4,
         schema_version="2.0.0"
     )
+    result.artifacts.extend([tier4_md, tier4_json])
     
     logger.info(f"Results written to {out_dir}")
     print(f"\nCOM Analysis Complete")
@@ -403,47 +430,6 @@ def analyze_com_object(dll_path: Path, out_dir: Path, base_name: str, args) -> i
     print(f"MCP JSON: {tier4_json}")
     
     return 0
-    
-    if not com_objects:
-        logger.warning(f"No COM objects found registered for {dll_path.name}")
-        logger.info("File imports ole32/oleaut32 but has no registry entries")
-    else:
-        logger.info(f"Found {len(com_objects)} COM objects")
-    
-    # Convert to invocables
-    invocables = com_objects_to_invocables(com_objects)
-    
-    # Write outputs
-    tier4_md = out_dir / f"{base_name}_com_objects.md"
-    with open(tier4_md, 'w', encoding='utf-8') as f:
-        f.write(f"# COM Object Analysis: {dll_path.name}\\n\\n")
-        f.write(f"Total COM objects: {len(com_objects)}\\n\\n")
-        
-        if com_objects:
-            f.write("## Registered COM Objects\\n\\n")
-            for obj in com_objects:
-                f.write(f"### {obj.get('name', 'Unknown')}\\n\\n")
-                f.write(f"- **CLSID:** `{obj['clsid']}`\\n")
-                if obj.get('progid'):
-                    f.write(f"- **ProgID:** `{obj['progid']}`\\n")
-                f.write(f"- **Server:** `{obj['server_path']}`\\n")
-                f.write(f"- **Type:** {'In-process' if obj['inproc'] else 'Out-of-process'}\\n\\n")
-        else:
-            f.write("_No COM objects registered for this DLL._\\n\\n")
-            f.write("Note: This file was detected as COM due to ole32/oleaut32 imports.\\n")
-    
-    # Write JSON output
-    tier4_json = out_dir / f"{base_name}_com_objects.json"
-    import json
-    with open(tier4_json, 'w', encoding='utf-8') as f:
-        json.dump(com_objects, f, indent=2)
-    
-    logger.info(f"Results written to {out_dir}")
-    print(f"\\nCOM Analysis Complete")
-    print(f"COM objects found: {len(com_objects)}")
-    print(f"Output: {tier4_md}")
-    
-    return 0
 
 
 # -------------------------------------------------------------------------
@@ -489,19 +475,85 @@ RECOGNIZED_EXTENSIONS: frozenset = frozenset({
 })
 
 
+def _options_from_args(args, out_dir: Optional[Path], write_artifacts: bool) -> AnalysisOptions:
+    """Build AnalysisOptions from parsed CLI args (missing flags use defaults)."""
+    return AnalysisOptions(
+        headers=getattr(args, 'headers', None),
+        docs=getattr(args, 'docs', None),
+        dumpbin=getattr(args, 'dumpbin', 'dumpbin'),
+        undname=getattr(args, 'undname', 'undname'),
+        no_demangle=getattr(args, 'no_demangle', False),
+        max_doc_hits=getattr(args, 'max_doc_hits', 2),
+        tag=getattr(args, 'tag', ''),
+        out_dir=out_dir,
+        write_artifacts=write_artifacts,
+        index_dir=out_dir,
+        com_registry=getattr(args, 'com_registry', None),
+    )
+
+
+def _scan_directory_entry(file_path: Path, options: AnalysisOptions,
+                          quiet: bool = False) -> AnalysisResult:
+    """Analyze one file of a directory scan in-process.
+
+    Kept at module level so it can be shipped to ``ProcessPoolExecutor``
+    workers.  When *quiet* is set, per-file reports and INFO logging are
+    suppressed so parallel workers do not interleave their output.
+    """
+    import contextlib
+    import io
+
+    if not quiet:
+        return analyze_file(file_path, options)
+
+    # Keep warnings visible but drop per-file INFO chatter
+    logging.disable(logging.INFO)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return analyze_file(file_path, options)
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def _init_scan_worker(catalog: dict, com_registry: Optional[Path], com_index) -> None:
+    """Pool initializer: hand a worker the lookups made once per scan."""
+    seed_catalog_signers(catalog)
+    if com_index is not None:
+        seed_registry_index(com_index, com_registry)
+
+
 def analyze_directory(dir_path: Path, out_dir: Path, args) -> int:
     """Walk *dir_path*, analyze every recognized file, and write an aggregate
     ``<dir>_scan_mcp.json`` that merges all discovered invocables.
 
-    Each file is analyzed in its own sub-directory under *out_dir* so
-    individual artifacts are preserved.  The combined output lets
+    Each file is analyzed in-process via ``analyze_file()``.  Unless
+    ``--aggregate-only`` is given, its artifacts go to a sub-directory under
+    *out_dir* so individual reports are preserved.  The combined output lets
     ``select_invocables.py`` work on the entire directory at once.
 
+    With ``--jobs N`` (N > 1) files are spread across a process pool and
+    results are collected as workers finish; the aggregate is still written
+    in sorted path order so repeated scans produce identical output.
+
+    Without per-file reports (``--aggregate-only``), Python modules are
+    analyzed together by ``python_batch.analyze_python_files()``.  With
+    ``--python-packages`` only the public API and entry points of the
+    tree's Python packages are reported (``python_package.py``); those
+    modules get no per-file reports.
+
+    Copies of the same file (same content, type and name, e.g. side-by-side
+    or per-language copies of a DLL) are analyzed once; every copy is listed
+    in ``source_files`` with ``duplicate_of`` pointing at the analyzed one.
+    Copies repeat its invocables unless ``--unique-blobs`` is given.
+
     §2.a compliance — "Users must be able to provide the system a copy of
     the target file **or an installed instance**."  This function handles
     the installed-instance (directory) case.
     """
+    import dataclasses
     import json as _json
+    import os
+    from collections import Counter
     from datetime import datetime as _dt
 
     logger.info("Directory scan: %s", dir_path)
@@ -509,17 +561,16 @@ def analyze_directory(dir_path: Path, out_dir: Path, args) -> int:
     print(f"  Directory Scan: {dir_path}")
     print(f"{'='*60}\n")
 
+    jobs = getattr(args, 'jobs', 1) or 1
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+
     # ── Collect recognized files ──────────────────────────────────────────────
-    candidates: list = []
-    for f in sorted(dir_path.rglob('*')):
-        if not f.is_file():
-            continue
-        if f.suffix.lower() not in RECOGNIZED_EXTENSIONS:
-            continue
-        ft = classify_file(f)
-        if ft == FileType.UNKNOWN:
-            continue
-        candidates.append((f, ft))
+    max_size_mb = getattr(args, 'max_file_size', None)
+    candidates: list = classify_tree(
+        dir_path, RECOGNIZED_EXTENSIONS, workers=jobs,
+        max_size=int(max_size_mb * 1024 * 1024) if max_size_mb else None,
+        excluded=EXCLUDED_DIRS | {d.lower() for d in getattr(args, 'exclude_dir', None) or ()})
 
     if not candidates:
         print(f"  No recognized files found in {dir_path}")
@@ -531,55 +582,195 @@ def analyze_directory(dir_path: Path, out_dir: Path, args) -> int:
     print()
 
     dir_base = dir_path.name   # e.g. "scripts" or "AppD"
-    all_invocables: list = []
-    source_files: list = []
-
-    # ── Per-file sub-analysis ─────────────────────────────────────────────────
-    for file_path, file_type in candidates:
-        # Unique sub-dir per file; use stem to keep names readable
-        sub_out = out_dir / file_path.stem
-        sub_out.mkdir(parents=True, exist_ok=True)
 
+    def _rel(file_path: Path) -> Path:
         try:
-            rel = file_path.relative_to(dir_path)
+            return file_path.relative_to(dir_path)
         except ValueError:
-            rel = Path(file_path.name)
-        print(f"  \u27a4 {rel}  ({file_type.value})")
+            return Path(file_path.name)
 
-        # Re-invoke main() with sys.argv targeting this individual file
-        saved_argv = sys.argv[:]
+    # ── Per-file sub-analysis ─────────────────────────────────────────────────
+    # Unique sub-dir per file, mirroring its relative path (``bin/foo.dll/``)
+    # so files sharing a stem never overwrite each other's artifacts.
+    base_options = _options_from_args(
+        args, out_dir, write_artifacts=not getattr(args, 'aggregate_only', False))
+
+    def _file_options(file_path: Path) -> AnalysisOptions:
+        return dataclasses.replace(base_options, out_dir=out_dir / _rel(file_path))
+
+    # Build (or refresh) the --docs index once here rather than racing to
+    # build it in every worker
+    if base_options.docs:
+        DocsIndex.open(base_options.docs, base_options.index_dir).close()
+
+    cache = None if getattr(args, 'no_cache', False) else ScanCache.for_output_dir(out_dir)
+
+    # ── Content hashes: the cache needs all of them, dedup only those whose
+    # size is shared with another candidate (a unique size cannot be a copy)
+    sizes = [file_path.stat().st_size for file_path, _ in candidates]
+    size_counts = Counter(sizes)
+    to_hash = [idx for idx, size in enumerate(sizes) if cache is not None or size_counts[size] > 1]
+    hashes: dict = {}
+    if cache is not None:
+        # Files unchanged since the last scan (same size and mtime) are not read
+        for idx in to_hash:
+            known = cache.known_hash(candidates[idx][0])
+            if known is not None:
+                hashes[idx] = known
+        to_hash = [idx for idx in to_hash if idx not in hashes]
+    if jobs > 1 and len(to_hash) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=jobs) as hash_pool:
+            digests = list(hash_pool.map(file_hash, (candidates[idx][0] for idx in to_hash)))
+    else:
+        digests = [file_hash(candidates[idx][0]) for idx in to_hash]
+    hashes.update(zip(to_hash, digests))
+    if cache is not None:
+        for idx, digest in zip(to_hash, digests):
+            cache.remember_hash(candidates[idx][0], digest)
+
+    # ── --python-packages: a module's public API depends on the rest of the
+    # tree, so Python modules are resolved together, not deduplicated or cached
+    package_modules: set = set()
+    if getattr(args, 'python_packages', False):
+        package_modules = {idx for idx, (_, file_type) in enumerate(candidates)
+                           if file_type == FileType.PYTHON_SCRIPT}
+
+    # ── Dedup: analyze each distinct blob once.  The name is part of the key
+    # because analysis can depend on it (COM registrations, system DLL names)
+    duplicate_of: dict = {}
+    first_copy: dict = {}
+    for idx in sorted(hashes):
+        if idx in package_modules:
+            continue
+        file_path, file_type = candidates[idx]
+        first = first_copy.setdefault((hashes[idx], file_type, file_path.name.lower()), idx)
+        if first != idx:
+            duplicate_of[idx] = first
+
+    # ── Incremental cache: skip files whose content and options are unchanged
+    per_file: list = [[] for _ in candidates]
+    pending: list = []
+    for idx, (file_path, file_type) in enumerate(candidates):
+        if idx in package_modules:
+            continue
+        if idx in duplicate_of:
+            print(f"  \u27a4 {_rel(file_path)}  ({file_type.value})"
+                  f"  [copy of {_rel(candidates[duplicate_of[idx]][0])}]")
+            continue
+        if cache is not None:
+            cached = cache.lookup(file_path, hashes[idx], _file_options(file_path))
+            if cached is not None:
+                per_file[idx] = cached.invocables
+                print(f"  \u27a4 {_rel(file_path)}  ({file_type.value})  [cached]")
+                continue
+        pending.append(idx)
+
+    def _record(idx: int, result: AnalysisResult) -> None:
+        per_file[idx] = result.invocables
+        if cache is not None:
+            cache.store(hashes[idx], _file_options(candidates[idx][0]), result)
+
+    if package_modules:
+        ordered = sorted(package_modules)
+        api = analyze_python_package([candidates[idx][0] for idx in ordered], workers=jobs)
+        for idx in ordered:
+            file_path, file_type = candidates[idx]
+            per_file[idx] = api[file_path]
+            print(f"  \u27a4 {_rel(file_path)}  ({file_type.value})"
+                  f"  -> {len(per_file[idx])} public invocable(s)")
+
+    # Python modules without per-file reports go through the batch analyzer:
+    # chunked over the pool instead of one analyze_file() task per module
+    if not base_options.write_artifacts:
+        modules = [idx for idx in pending if candidates[idx][1] == FileType.PYTHON_SCRIPT]
+        if modules:
+            batch = analyze_python_files([candidates[idx][0] for idx in modules], workers=jobs)
+            for idx in modules:
+                file_path, file_type = candidates[idx]
+                _record(idx, batch[file_path])
+                print(f"  \u27a4 {_rel(file_path)}  ({file_type.value})"
+                      f"  -> {len(per_file[idx])} invocable(s)")
+            pending = [idx for idx in pending if candidates[idx][1] != FileType.PYTHON_SCRIPT]
+
+    # Catalog signers of the binaries without an embedded signature, in one
+    # PowerShell call (Windows only).  The scan's content hash is the plain
+    # SHA-256 unless it also covers a .NET XML doc file
+    pe_types = (FileType.PE_DLL, FileType.PE_EXE, FileType.COM_OBJECT)
+    catalog = prefetch_catalog_signers({
+        candidates[idx][0]: hashes.get(idx) if xml_doc_path(candidates[idx][0]) is None else None
+        for idx in pending if candidates[idx][1] in pe_types
+    })
+
+    # The COM registration index is built here, once, and handed to workers
+    # rather than walked again (HKCR\CLSID) in every worker process
+    com_index = None
+    if any(candidates[idx][1] in pe_types for idx in pending):
         try:
-            sys.argv = [
-                "main.py",
-                "--target", str(file_path),
-                "--out",    str(sub_out),
-            ]
-            main()
-        except SystemExit:
-            pass
-        except Exception as exc:
-            logger.warning("Analysis failed for %s: %s", file_path.name, exc)
-            print(f"    [WARN] {exc}")
-        finally:
-            sys.argv = saved_argv
-
-        # Harvest all *_mcp.json written in sub_out
-        file_invocables: list = []
-        for mcp_json in sorted(sub_out.glob('*_mcp.json')):
+            com_index = registry_index(base_options.com_registry)
+        except OSError as exc:
+            logger.warning("COM registrations unavailable: %s", exc)
+
+    jobs = min(jobs, len(pending))
+
+    if jobs <= 1:
+        for idx in pending:
+            file_path, file_type = candidates[idx]
+            print(f"  \u27a4 {_rel(file_path)}  ({file_type.value})")
             try:
-                with open(mcp_json, encoding='utf-8') as fh:
-                    data = _json.load(fh)
-                file_invocables.extend(data.get('invocables', []))
-            except Exception:
-                pass
-
-        all_invocables.extend(file_invocables)
-        source_files.append({
+                _record(idx, _scan_directory_entry(file_path, _file_options(file_path)))
+            except Exception as exc:
+                logger.warning("Analysis failed for %s: %s", file_path.name, exc)
+                print(f"    [WARN] {exc}")
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        print(f"  Analysing with {jobs} worker processes...\n")
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_scan_worker,
+                                 initargs=(catalog, base_options.com_registry, com_index)) as pool:
+            futures = {
+                pool.submit(_scan_directory_entry, candidates[idx][0],
+                            _file_options(candidates[idx][0]), True): idx
+                for idx in pending
+            }
+            for fut in as_completed(futures):
+                idx = futures[fut]
+                file_path, file_type = candidates[idx]
+                try:
+                    _record(idx, fut.result())
+                except Exception as exc:
+                    logger.warning("Analysis failed for %s: %s", file_path.name, exc)
+                    print(f"    [WARN] {exc}")
+                print(f"  \u27a4 {_rel(file_path)}  ({file_type.value})"
+                      f"  -> {len(per_file[idx])} invocable(s)")
+
+    if cache is not None:
+        cache.close()
+
+    # Copies contribute the analyzed copy's invocables, bound to their own path
+    if not getattr(args, 'unique_blobs', False):
+        for idx, first in duplicate_of.items():
+            first_path, copy_path = str(candidates[first][0]), str(candidates[idx][0])
+            per_file[idx] = [
+                dataclasses.replace(inv, dll_path=copy_path) if inv.dll_path == first_path else inv
+                for inv in per_file[first]
+            ]
+
+    all_invocables: list = []
+    source_files: list = []
+    for idx, ((file_path, file_type), file_invocables) in enumerate(zip(candidates, per_file)):
+        all_invocables.extend(inv.to_dict() for inv in file_invocables)
+        entry = {
             'file':          str(file_path.name),
-            'relative_path': str(rel),
+            'relative_path': str(_rel(file_path)),
             'type':          file_type.value,
             'count':         len(file_invocables),
-        })
+        }
+        if idx in hashes:
+            entry['sha256'] = hashes[idx]
+        if idx in duplicate_of:
+            entry['duplicate_of'] = str(_rel(candidates[duplicate_of[idx]][0]))
+        source_files.append(entry)
 
     # ── Write aggregate MCP JSON ──────────────────────────────────────────────
     agg_path = out_dir / f"{dir_base}_scan_mcp.json"
@@ -590,6 +781,7 @@ def analyze_directory(dir_path: Path, out_dir: Path, args) -> int:
             "analysis_type": "directory_scan",
             "generated_at":  _dt.utcnow().isoformat() + "Z",
             "file_count":    len(candidates),
+            "unique_file_count": len(candidates) - len(duplicate_of),
             "source_files":  source_files,
         },
         "invocables": all_invocables,
@@ -610,18 +802,22 @@ def analyze_directory(dir_path: Path, out_dir: Path, args) -> int:
         _json.dump(agg_payload, fh, indent=2, ensure_ascii=False)
 
     print(f"\n  Directory Scan Complete")
-    print(f"  Files analysed:      {len(candidates)}")
+    print(f"  Files analysed:      {len(candidates) - len(duplicate_of)}"
+          + (f" (+{len(duplicate_of)} duplicate copies)" if duplicate_of else ""))
     print(f"  Total invocables:    {len(all_invocables)}")
+    if cache is not None:
+        print(f"  Cache hits:          {cache.hits}/{len(candidates) - len(duplicate_of)}")
     print(f"  Aggregate MCP JSON:  {agg_path}")
     return 0
 
 
-def analyze_scripting_language(target: Path, out_dir: Path, base_name: str,
-                               file_type: FileType) -> int:
+def analyze_scripting_language(target: Path, base_name: str, file_type: FileType,
+                               options: AnalysisOptions, result: AnalysisResult) -> int:
     """Shared pipeline for all JIT / scripting / query file types.
 
-    Calls the appropriate sub-analyzer, writes Markdown + MCP JSON output,
-    and prints a summary.  Returns 0 on success, 1 on failure.
+    Calls the appropriate sub-analyzer, writes Markdown + MCP JSON output
+    when artifacts are requested, and prints a summary.  Returns 0 on
+    success, 1 on failure.
     """
     label, analyzer_fn, _ = _SCRIPT_DISPATCH[file_type]
     logger.info("Analyzing %s: %s", label, target.name)
@@ -631,11 +827,18 @@ def analyze_scripting_language(target: Path, out_dir: Path, base_name: str,
 
     if not invocables:
         logger.warning("No invocables detected in %s", target.name)
-        print(f"\nNo invocables found in {target.name}")
+        if options.write_artifacts:
+            print(f"\nNo invocables found in {target.name}")
+        return 0
+
+    kind = file_type.value.lower()
+    result.groups[kind] = invocables
+    if not options.write_artifacts:
         return 0
 
     # --- Markdown report ---
-    md_path = out_dir / f"{base_name}_{file_type.value.lower()}.md"
+    out_dir = options.out_dir
+    md_path = out_dir / f"{base_name}_{kind}.md"
     with open(md_path, 'w', encoding='utf-8') as f:
         f.write(f"# {label} Analysis: {target.name}\n\n")
         f.write(f"Total invocables detected: {len(invocables)}\n\n")
@@ -665,7 +868,7 @@ def analyze_scripting_language(target: Path, out_dir: Path, base_name: str,
             f.write(f"**Confidence:** {inv.confidence}\n\n")
 
     # --- MCP JSON ---
-    mcp_path = out_dir / f"{base_name}_{file_type.value.lower()}_mcp.json"
+    mcp_path = out_dir / f"{base_name}_{kind}_mcp.json"
     write_invocables_json(
         mcp_path,
         invocables,
@@ -673,6 +876,7 @@ def analyze_scripting_language(target: Path, out_dir: Path, base_name: str,
         tier=4,
         schema_version="2.0.0",
     )
+    result.artifacts.extend([md_path, mcp_path])
 
     logger.info("Results written to %s", out_dir)
     print(f"\n{label} Analysis Complete")
@@ -682,7 +886,8 @@ def analyze_scripting_language(target: Path, out_dir: Path, base_name: str,
     return 0
 
 
-def analyze_cli_tool(exe_path: Path, out_dir: Path, base_name: str, args) -> int:
+def analyze_cli_tool(exe_path: Path, base_name: str, options: AnalysisOptions,
+                     result: AnalysisResult) -> int:
     """CLI tool analysis pipeline."""
     with Spinner("Analyzing CLI capabilities"):
         logger.info(f"Analyzing CLI tool: {exe_path}")
@@ -691,11 +896,17 @@ def analyze_cli_tool(exe_path: Path, out_dir: Path, base_name: str, args) -> int
     
     if not invocables:
         logger.warning(f"No CLI capabilities detected for {exe_path.name}")
-        print(f"\nNo CLI help output detected (might be GUI application)")
+        if options.write_artifacts:
+            print(f"\nNo CLI help output detected (might be GUI application)")
     else:
         logger.info(f"Found {len(invocables)} CLI interactions")
 
+    result.groups["cli"] = invocables
+    if not options.write_artifacts:
+        return 0
+
     # Write Markdown output
+    out_dir = options.out_dir
     tier4_md = out_dir / f"{base_name}_cli_help.md"
     with open(tier4_md, 'w', encoding='utf-8') as f:
         f.write(f"# CLI Analysis: {exe_path.name}\n\n")
@@ -718,6 +929,7 @@ def analyze_cli_tool(exe_path: Path, out_dir: Path, base_name: str, args) -> int
         tier=4,
         schema_version="2.0.0"
     )
+    result.artifacts.extend([tier4_md, tier4_json])
     
     logger.info(f"Results written to {out_dir}")
     print(f"\nCLI Analysis Complete")
@@ -728,141 +940,17 @@ def analyze_cli_tool(exe_path: Path, out_dir: Path, base_name: str, args) -> int
     return 0
 
 
-def main():
-    """Main entry point."""
-    logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
-    parser = argparse.ArgumentParser(
-        description=(
-            "MCP Factory — Binary/Executable/Script Analyzer. "
-            "Accepts DLLs, EXEs, .NET assemblies, COM objects, SQL files, "
-            "Python, PowerShell, JavaScript, TypeScript, Batch, VBScript, "
-            "Shell scripts, and more."
-        )
-    )
+def analyze_native_exports(dll_path: Optional[Path], file_type: Optional[FileType],
+                           base_name: str, options: AnalysisOptions,
+                           result: AnalysisResult,
+                           exports_raw: Optional[Path] = None,
+                           image: Optional[PEImage] = None) -> int:
+    """Native PE pipeline: exports, demangling, headers/docs, imports and RPC.
 
-    # Required arguments (one of)
-    input_group = parser.add_mutually_exclusive_group(required=True)
-    input_group.add_argument(
-        "--dll", "--target",
-        dest="dll",
-        type=Path,
-        metavar="TARGET",
-        help="Path to any target file to analyze (DLL, EXE, .py, .ps1, .sql, .js, .ts, etc.)",
-    )
-    input_group.add_argument(
-        "--exports-raw",
-        type=Path,
-        help="Path to existing dumpbin /exports output (skip dumpbin run)",
-    )
-
-    # Optional arguments
-    parser.add_argument(
-        "--headers",
-        type=Path,
-        help="Root directory to search for header files (.h, .hpp, etc.)",
-    )
-    parser.add_argument(
-        "--docs", type=Path, help="Root directory to search for documentation files"
-    )
-    parser.add_argument(
-        "--out",
-        type=Path,
-        default=None,
-        help=f"Output directory (default: {get_default_output_dir()})",
-    )
-    parser.add_argument(
-        "--tag", type=str, default="", help="Tag to append to output filenames"
-    )
-    parser.add_argument(
-        "--dumpbin",
-        type=str,
-        default="dumpbin",
-        help="Path to dumpbin.exe or name on PATH",
-    )
-    parser.add_argument(
-        "--undname",
-        type=str,
-        default="undname",
-        help="Path to undname.exe or name on PATH",
-    )
-    parser.add_argument(
-        "--no-demangle",
-        action="store_true",
-        help="Skip C++ name demangling step",
-    )
-    parser.add_argument(
-        "--max-doc-hits",
-        type=int,
-        default=2,
-        help="Maximum documentation file hits per export",
-    )
-    parser.add_argument(
-        "--verbose", "-v",
-        action="store_true",
-        help="Show detailed pipeline steps with spinner animation",
-    )
-
-    args = parser.parse_args()
-
-    # Configure verbose mode for Spinner
-    Spinner.enabled = args.verbose
-    
-    if args.verbose:
-        print("\n" + "=" * 60)
-        print("MCP FACTORY - ADVANCED BINARY ANALYZER")
-        print("=" * 60 + "\n")
-
-    # Resolve output directory
-    out_dir = args.out or get_default_output_dir()
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    # Build base filename from DLL or use generic name
-    if args.dll:
-        base_name = args.dll.stem
-        dll_path = args.dll
-    else:
-        base_name = "analysis"
-        dll_path = None
-
-    if args.tag:
-        base_name = f"{base_name}_{args.tag}"
-
-    # ── §2.a: Accept installed directory (c:\Program Files\AppD\) ────────────
-    if dll_path and dll_path.is_dir():
-        return analyze_directory(dll_path, out_dir, args)
-    # ─────────────────────────────────────────────────────────────────────────
-
-    # Detect file type and route to appropriate analyzer
-    file_type = None
-    if dll_path and dll_path.exists():
-        file_type = classify_file(dll_path)
-        logger.info(f"Detected file type: {file_type.value}")
-        
-        # Route based on file type
-        if file_type == FileType.DOTNET_ASSEMBLY:
-            logger.info("Analyzing .NET assembly...")
-            return analyze_dotnet_assembly(dll_path, out_dir, base_name, args)
-        elif file_type == FileType.COM_OBJECT:
-            logger.info("Analyzing COM object...")
-            # Run COM analysis but don't return - fall through to native analysis
-            # because many COM DLLs (shell32, oleaut32) also have standard exports
-            analyze_com_object(dll_path, out_dir, base_name, args)
-        elif file_type == FileType.PE_EXE:
-            logger.info("Analyzing PE executable (try CLI)...")
-            analyze_cli_tool(dll_path, out_dir, base_name, args)
-        elif file_type in _SCRIPT_DISPATCH:
-            # JIT / scripting / query file — route to language-specific analyzer
-            logger.info("Routing to scripting language analyzer: %s", file_type.value)
-            return analyze_scripting_language(dll_path, out_dir, base_name, file_type)
-
-        # For PE files (DLL or EXE) that weren't classified as COM_OBJECT,
-        # still check if they are registered as COM servers (InProc or LocalServer).
-        if file_type in [FileType.PE_DLL, FileType.PE_EXE]:
-             # analyze_com_object is safe to call, it checks registry
-             logger.info("Checking for associated COM objects (Registry)...")
-             analyze_com_object(dll_path, out_dir, base_name, args)
-
-        # Otherwise fall through to native DLL analysis
+    Writes the tiered CSV/Markdown reports, capabilities summary and
+    confidence summary only when artifacts are requested.
+    """
+    target = dll_path or Path(base_name)
 
     # Phase 1: Get raw exports
     exports: List[ExportedFunc] = []
@@ -871,32 +959,30 @@ def main():
     # We should be graceful.
     allow_no_exports = (file_type == FileType.PE_EXE) or (file_type == FileType.PE_DLL)
 
-    if args.exports_raw:
+    if exports_raw:
         # Read from existing raw file
         try:
-            raw_text = args.exports_raw.read_text(encoding="utf-8")
+            raw_text = exports_raw.read_text(encoding="utf-8")
             from pe_parse import parse_dumpbin_exports
             exports = parse_dumpbin_exports(raw_text)
         except Exception as e:
             logger.error(f"Error reading exports-raw file: {e}")
             return 1
-    elif args.dll:
+    elif dll_path:
         # Use pefile to extract exports (Primary Method)
-        logger.info(f"Extracting exports from {args.dll} (using pefile)...")
-        exports, success = read_pe_exports(args.dll)
+        logger.info(f"Extracting exports from {dll_path} (using pefile)...")
+        exports, success = read_pe_exports(dll_path, image)
         
         # Log result
         if exports:
             logger.info(f"Found {len(exports)} exports")
         else:
             if not allow_no_exports:
-                logger.warning(f"No exports found in {args.dll} (and file is classified as PE_DLL)")
+                logger.warning(f"No exports found in {dll_path} (and file is classified as PE_DLL)")
                 # We can try legacy dumpbin if pefile yields 0 but that probably means 0 exports.
             else:
                 logger.info("No exports found (expected for EXE/Internal DLL)")
 
-
-
     if not exports:
         logger.warning("No exports found")
         if not allow_no_exports:
@@ -905,13 +991,13 @@ def main():
     # Phase 2: Deduplicate and demangle, resolve forwarders
     exports = deduplicate_exports(exports)
 
-    if not args.no_demangle:
-        demangle_with_undname(exports, args.undname)
+    if not options.no_demangle:
+        demangle_exports(exports, options.undname)
     
     # Extract digital signature
     is_signed, publisher = False, None
     if dll_path:
-        is_signed, publisher = extract_signature(dll_path)
+        is_signed, publisher = extract_signature(dll_path, image)
     
     # Resolve forwarder chains
     forwarding_chain = resolve_forwarders(exports)
@@ -920,29 +1006,74 @@ def main():
     matches: dict = {}
     doc_hits: dict = {}
 
-    if args.headers:
-        matches = scan_headers(args.headers, exports)
+    if options.headers:
+        matches = scan_headers(options.headers, exports)
+
+    if options.docs:
+        doc_hits = scan_docs_for_exports(options.docs, exports, options.max_doc_hits,
+                                         options.index_dir)
+
+    # Import Analysis (detect capabilities: RPC, COM, networking, etc.)
+    logger.info("Analyzing import table for capabilities...")
+    import_analysis = analyze_imports(target, options.dumpbin, image=image)
+    summary = import_analysis['summary']
 
-    if args.docs:
-        doc_hits = scan_docs_for_exports(args.docs, exports, args.max_doc_hits)
+    # Printable strings, extracted once for the RPC endpoint and URL scans
+    strings = None
+    if dll_path and (summary.get('has_rpc') or summary.get('has_networking')):
+        strings = extract_strings(dll_path, image)
+
+    if summary.get('has_networking') and strings is not None:
+        import_analysis['capabilities']['networking']['urls'] = find_urls(strings)
+    
+    # RPC Analysis (if RPC capabilities detected)
+    rpc_analysis = None
+    rpc_invocables = []
+    if summary.get('has_rpc'):
+        logger.info("RPC capabilities detected - analyzing RPC interfaces...")
+        rpc_analysis = analyze_rpc(target, import_analysis['imports'], image=image, strings=strings)
+        rpc_invocables = rpc_to_invocables(rpc_analysis, target)
+    
+    # Convert exports to Invocables
+    invocables = exports_to_invocables(
+        exports,
+        target,
+        matches,
+        is_signed,
+        publisher
+    )
+    
+    # Merge RPC invocables if found
+    if rpc_invocables:
+        logger.info(f"Adding {len(rpc_invocables)} RPC invocables")
+        invocables.extend(rpc_invocables)
+
+    if invocables:
+        result.groups["exports"] = invocables
+
+    if not options.write_artifacts:
+        return 0
 
     # Phase 4: Write tiered outputs
+    out_dir = options.out_dir
     tier_entries = []
 
     # Tier 1: Exports + headers + docs
-    if args.headers and args.docs and matches:
+    if options.headers and options.docs and matches:
         tier1_csv = out_dir / f"{base_name}_tier1_api.csv"
         tier1_md = out_dir / f"{base_name}_tier1_api.md"
         write_csv(tier1_csv, exports, matches, doc_hits, is_signed, publisher)
-        write_markdown(tier1_md, dll_path or args.dll or Path(base_name), exports, matches, doc_hits)
+        write_markdown(tier1_md, target, exports, matches, doc_hits)
+        result.artifacts.extend([tier1_csv, tier1_md])
         tier_entries.append("Tier 1: Exports + headers + docs")
 
     # Tier 2: Exports + headers
-    if args.headers and matches:
+    if options.headers and matches:
         tier2_csv = out_dir / f"{base_name}_tier2_api.csv"
         tier2_md = out_dir / f"{base_name}_tier2_api.md"
         write_csv(tier2_csv, exports, matches, {}, is_signed, publisher)
-        write_markdown(tier2_md, dll_path or args.dll or Path(base_name), exports, matches, {})
+        write_markdown(tier2_md, target, exports, matches, {})
+        result.artifacts.extend([tier2_csv, tier2_md])
         tier_entries.append("Tier 2: Exports + headers")
 
     # Tier 3: Exports + demangle
@@ -950,54 +1081,29 @@ def main():
         tier3_csv = out_dir / f"{base_name}_tier3_api.csv"
         tier3_md = out_dir / f"{base_name}_tier3_api.md"
         write_csv(tier3_csv, exports, {}, {}, is_signed, publisher)
-        write_markdown(tier3_md, dll_path or args.dll or Path(base_name), exports, {}, {})
+        write_markdown(tier3_md, target, exports, {}, {})
+        result.artifacts.extend([tier3_csv, tier3_md])
         tier_entries.append("Tier 3: Exports + demangled names")
 
     # Tier 4: Exports only (always generated)
     tier4_csv = out_dir / f"{base_name}_tier4_api.csv"
     tier4_md = out_dir / f"{base_name}_tier4_api.md"
     write_csv(tier4_csv, exports, {}, {}, is_signed, publisher)
-    write_markdown(tier4_md, dll_path or args.dll or Path(base_name), exports, {}, {})
+    write_markdown(tier4_md, target, exports, {}, {})
+    result.artifacts.extend([tier4_csv, tier4_md])
     tier_entries.append("Tier 4: Exports only")
-    
-    # Import Analysis (detect capabilities: RPC, COM, networking, etc.)
-    logger.info("Analyzing import table for capabilities...")
-    import_analysis = analyze_imports(dll_path or args.dll or Path(base_name), args.dumpbin)
-    
-    # RPC Analysis (if RPC capabilities detected)
-    rpc_analysis = None
-    rpc_invocables = []
-    if import_analysis['summary'].get('has_rpc'):
-        logger.info("RPC capabilities detected - analyzing RPC interfaces...")
-        rpc_analysis = analyze_rpc(
-            dll_path or args.dll or Path(base_name),
-            import_analysis['imports']
-        )
-        rpc_invocables = rpc_to_invocables(rpc_analysis, dll_path or args.dll or Path(base_name))
-    
-    # Convert exports to Invocables and write MCP JSON
-    invocables = exports_to_invocables(
-        exports,
-        dll_path or args.dll or Path(base_name),
-        matches,
-        is_signed,
-        publisher
-    )
-    
-    # Merge RPC invocables if found
-    if rpc_invocables:
-        logger.info(f"Adding {len(rpc_invocables)} RPC invocables")
-        invocables.extend(rpc_invocables)
-    
+
+    # Write MCP JSON
     if invocables:
         mcp_json_path = out_dir / f"{base_name}_exports_mcp.json"
         write_invocables_json(
             mcp_json_path,
             invocables,
-            dll_path=dll_path or args.dll or Path(base_name),
+            dll_path=target,
             tier=4,
             schema_version="2.0.0"
         )
+        result.artifacts.append(mcp_json_path)
     else:
         logger.info(f"No invocables found (exports or RPC), skipping {base_name}_exports_mcp.json")
     
@@ -1025,6 +1131,10 @@ def main():
                     f.write("  ```\n")
                 if cap == 'networking' and 'protocols' in info:
                     f.write(f"- **Protocols**: {', '.join(info['protocols'])}\n")
+                if cap == 'networking' and info.get('urls'):
+                    f.write(f"- **URLs found**: {len(info['urls'])}\n")
+                    for url in info['urls'][:10]:
+                        f.write(f"  - `{url}`\n")
                 f.write("\n")
         else:
             f.write("No special capabilities detected (standard Win32 API usage)\n\n")
@@ -1053,6 +1163,14 @@ def main():
                     f.write(f"- `{pipe}`\n")
                 f.write("\n")
 
+            endpoints = rpc_analysis.get('endpoints', [])
+            if endpoints:
+                f.write(f"**Endpoints**: {len(endpoints)}\n\n")
+                for endpoint in endpoints[:10]:
+                    f.write(f"- `{endpoint}`\n")
+                f.write("\n")
+    result.artifacts.append(capabilities_md)
+
     # Tier 5: Metadata
     tier5_md = out_dir / f"{base_name}_tier5_metadata.md"
     with open(tier5_md, 'w', encoding='utf-8') as f:
@@ -1065,16 +1183,19 @@ def main():
         matched_count = sum(1 for e in exports if e.name in matches)
         f.write(f"Header matched: {matched_count}\n")
         f.write(f"\nDate generated: {__import__('datetime').datetime.now().isoformat()}\n")
+    result.artifacts.append(tier5_md)
     tier_entries.append("Tier 5: Metadata only")
 
     # Tier summary
     summary_md = out_dir / f"{base_name}_tiers.md"
     write_tier_summary(summary_md, tier_entries)
+    result.artifacts.append(summary_md)
 
     # Phase 5: Generate confidence summary
     confidence_summary = generate_confidence_summary(
         exports, matches, is_signed, forwarding_chain, base_name, out_dir
     )
+    result.artifacts.append(out_dir / f"{base_name}_confidence_summary.txt")
 
     logger.info(f"Analysis complete. Results in: {out_dir}")
     logger.info(f"Exports found: {len(exports)}")
@@ -1089,5 +1210,277 @@ def main():
     return 0
 
 
+def analyze_file(path: Path, options: Optional[AnalysisOptions] = None) -> AnalysisResult:
+    """Analyze a single target file in-process.
+
+    Classifies *path*, routes it through the matching analyzers and returns
+    every discovered Invocable grouped by output kind.  Nothing is written
+    to disk unless ``options.write_artifacts`` is set, in which case the
+    usual Markdown / CSV / ``*_mcp.json`` reports go to ``options.out_dir``.
+
+    Args:
+        path: Any supported target file (DLL, EXE, script, spec, ...)
+        options: Analysis settings; defaults to in-memory analysis
+
+    Returns:
+        AnalysisResult with invocables, artifacts written and an exit code
+    """
+    import dataclasses
+
+    options = options or AnalysisOptions()
+    if options.write_artifacts:
+        out_dir = options.out_dir or get_default_output_dir()
+        out_dir.mkdir(parents=True, exist_ok=True)
+        options = dataclasses.replace(options, out_dir=out_dir)
+
+    base_name = path.stem
+    if options.tag:
+        base_name = f"{base_name}_{options.tag}"
+
+    result = AnalysisResult(target=path)
+
+    # Map the file and parse its PE headers once; every PE stage shares it
+    image = PEImage.open(path) if path.is_file() else None
+    try:
+        result.exit_code = _route_file(path, base_name, options, result, image)
+    finally:
+        if image is not None:
+            image.close()
+    return result
+
+
+def _route_file(path: Path, base_name: str, options: AnalysisOptions,
+                result: AnalysisResult, image: Optional[PEImage]) -> int:
+    """Classify *path* and run the matching analyzers; returns the exit code."""
+    # Detect file type and route to appropriate analyzer
+    file_type = None
+    if path.exists():
+        file_type = classify_file(path, image=image)
+        result.file_type = file_type.value
+        logger.info(f"Detected file type: {file_type.value}")
+        
+        # Route based on file type
+        if file_type == FileType.DOTNET_ASSEMBLY:
+            logger.info("Analyzing .NET assembly...")
+            return analyze_dotnet_assembly(path, base_name, options, result, image=image)
+        elif file_type == FileType.COM_OBJECT:
+            logger.info("Analyzing COM object...")
+            # Run COM analysis but don't return - fall through to native analysis
+            # because many COM DLLs (shell32, oleaut32) also have standard exports
+            analyze_com_object(path, base_name, options, result, image=image)
+        elif file_type == FileType.PE_EXE:
+            logger.info("Analyzing PE executable (try CLI)...")
+            analyze_cli_tool(path, base_name, options, result)
+        elif file_type in _SCRIPT_DISPATCH:
+            # JIT / scripting / query file — route to language-specific analyzer
+            logger.info("Routing to scripting language analyzer: %s", file_type.value)
+            return analyze_scripting_language(path, base_name, file_type, options, result)
+
+        # For PE files (DLL or EXE) that weren't classified as COM_OBJECT,
+        # still check if they are registered as COM servers (InProc or LocalServer).
+        if file_type in [FileType.PE_DLL, FileType.PE_EXE]:
+             # analyze_com_object is safe to call, it checks registry
+             logger.info("Checking for associated COM objects (Registry)...")
+             analyze_com_object(path, base_name, options, result, image=image)
+
+        # Otherwise fall through to native DLL analysis
+
+    return analyze_native_exports(path, file_type, base_name, options, result, image=image)
+
+
+def main():
+    """Main entry point."""
+    logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+    parser = argparse.ArgumentParser(
+        description=(
+            "MCP Factory — Binary/Executable/Script Analyzer. "
+            "Accepts DLLs, EXEs, .NET assemblies, COM objects, SQL files, "
+            "Python, PowerShell, JavaScript, TypeScript, Batch, VBScript, "
+            "Shell scripts, and more."
+        )
+    )
+
+    # Required arguments (one of)
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument(
+        "--dll", "--target",
+        dest="dll",
+        type=Path,
+        metavar="TARGET",
+        help="Path to any target file to analyze (DLL, EXE, .py, .ps1, .sql, .js, .ts, etc.)",
+    )
+    input_group.add_argument(
+        "--exports-raw",
+        type=Path,
+        help="Path to existing dumpbin /exports output (skip dumpbin run)",
+    )
+    input_group.add_argument(
+        "--build-header-db",
+        type=Path,
+        metavar="DB",
+        help="Index every prototype under --headers into a SQLite database, then exit",
+    )
+
+    # Optional arguments
+    parser.add_argument(
+        "--headers",
+        type=Path,
+        help="Root directory to search for header files (.h, .hpp, etc.), "
+             "or a prototype database built with --build-header-db",
+    )
+    parser.add_argument(
+        "--docs", type=Path, help="Root directory to search for documentation files"
+    )
+    parser.add_argument(
+        "--com-registry",
+        type=Path,
+        metavar="REG_FILE",
+        help="Exported .reg file (HKCR\\CLSID) to resolve COM registrations from "
+             "instead of the live registry",
+    )
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=None,
+        help=f"Output directory (default: {get_default_output_dir()})",
+    )
+    parser.add_argument(
+        "--tag", type=str, default="", help="Tag to append to output filenames"
+    )
+    parser.add_argument(
+        "--dumpbin",
+        type=str,
+        default="dumpbin",
+        help="Path to dumpbin.exe or name on PATH",
+    )
+    parser.add_argument(
+        "--undname",
+        type=str,
+        default="undname",
+        help="Path to undname.exe or name on PATH (fallback for names the "
+             "built-in demangler cannot undecorate)",
+    )
+    parser.add_argument(
+        "--no-demangle",
+        action="store_true",
+        help="Skip C++ name demangling step",
+    )
+    parser.add_argument(
+        "--max-doc-hits",
+        type=int,
+        default=2,
+        help="Maximum documentation file hits per export",
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Worker processes for directory scans (0 = one per CPU core)",
+    )
+    parser.add_argument(
+        "--exclude-dir",
+        action="append",
+        metavar="NAME",
+        help="Directory scans: also skip directories with this name (repeatable; "
+             ".git, node_modules, WinSxS\\Backup, ... are always skipped)",
+    )
+    parser.add_argument(
+        "--max-file-size",
+        type=float,
+        metavar="MB",
+        help="Directory scans: skip files larger than this many megabytes",
+    )
+    parser.add_argument(
+        "--unique-blobs",
+        action="store_true",
+        help="Directory scans: emit the invocables of duplicate file copies once, "
+             "not once per copy",
+    )
+    parser.add_argument(
+        "--aggregate-only",
+        action="store_true",
+        help="Directory scans: skip per-file reports, write only the aggregate MCP JSON",
+    )
+    parser.add_argument(
+        "--python-packages",
+        action="store_true",
+        help="Directory scans: report only the public API of Python packages "
+             "(__all__, re-exports) and script / click entry points, instead of "
+             "every public function of every module",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Re-analyze every file instead of reusing results from <out>/{CACHE_FILENAME}",
+    )
+    parser.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Show detailed pipeline steps with spinner animation",
+    )
+
+    args = parser.parse_args()
+
+    # Configure verbose mode for Spinner
+    Spinner.enabled = args.verbose
+    
+    if args.verbose:
+        print("\n" + "=" * 60)
+        print("MCP FACTORY - ADVANCED BINARY ANALYZER")
+        print("=" * 60 + "\n")
+
+    if args.build_header_db:
+        if not args.headers or not args.headers.is_dir():
+            parser.error("--build-header-db requires --headers <include root directory>")
+        count = build_header_db(args.headers, args.build_header_db)
+        print(f"Indexed {count} prototypes into {args.build_header_db}")
+        return 0
+
+    if args.headers and is_header_db(args.headers):
+        try:
+            HeaderDB(args.headers).close()
+        except (ValueError, sqlite3.Error) as e:
+            parser.error(f"--headers: {e}")
+
+    if args.com_registry and not args.com_registry.is_file():
+        parser.error(f"--com-registry: {args.com_registry} is not a file")
+
+    # Resolve output directory
+    out_dir = args.out or get_default_output_dir()
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # ── §2.a: Accept installed directory (c:\Program Files\AppD\) ────────────
+    if args.dll and args.dll.is_dir():
+        return analyze_directory(args.dll, out_dir, args)
+    # ─────────────────────────────────────────────────────────────────────────
+
+    options = _options_from_args(args, out_dir, write_artifacts=True)
+
+    if args.exports_raw:
+        base_name = "analysis"
+        if args.tag:
+            base_name = f"{base_name}_{args.tag}"
+        return analyze_native_exports(None, None, base_name, options,
+                                      AnalysisResult(target=None),
+                                      exports_raw=args.exports_raw)
+
+    if args.no_cache or not args.dll.is_file():
+        return analyze_file(args.dll, options).exit_code
+
+    cache = ScanCache.for_output_dir(out_dir)
+    try:
+        content_hash = file_hash(args.dll)
+        result = cache.lookup(args.dll, content_hash, options)
+        if result is not None:
+            logger.info(f"Unchanged since last scan, reusing cached results from {cache.db_path}")
+            print(f"Invocables found: {len(result.invocables)} (cached)")
+            return result.exit_code
+        result = analyze_file(args.dll, options)
+        cache.store(content_hash, options, result)
+        return result.exit_code
+    finally:
+        cache.close()
+
+
 if __name__ == "__main__":
     sys.exit(main())
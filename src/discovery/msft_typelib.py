@@ -0,0 +1,396 @@
+"""
+msft_typelib.py - Reader for binary (MSFT format) COM type libraries.
+
+Parses the type library format written by MIDL / ICreateTypeLib2 straight
+from bytes, so interfaces, dispinterfaces and coclasses can be listed on
+any platform without ``LoadTypeLib`` (no pythoncom, no COM marshalling,
+no registration needed).
+
+Implements:
+- MSFT header and segment directory (Wine's typelib.h layout)
+- Type info table, name table, string table and GUID table lookups
+- Function records: member IDs, invoke kinds, parameters and help strings
+- Type descriptors (pointers, SAFEARRAY, C arrays, user-defined and
+  imported types) rendered as IDL type names
+- Standalone .tlb/.olb files and TYPELIB resources embedded in PE images
+
+The older SLTG format (16-bit era, some Office .olb files) is not read;
+load_type_libraries() skips it.
+"""
+
+import logging
+import struct
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+from pe_image import PEImage
+
+logger = logging.getLogger(__name__)
+
+MSFT_MAGIC = b"MSFT"
+SLTG_MAGIC = b"SLTG"
+
+_HEADER = struct.Struct("<4s20i")         # MSFT_Header
+_SEGMENT_DIR = struct.Struct("<60i")      # 15 x (offset, length, res08, res0c)
+_TYPEINFO = struct.Struct("<19ihh5i")     # MSFT_TypeInfoBase (0x64 bytes)
+_FUNC_RECORD = struct.Struct("<iiihhihh")  # MSFT_FuncRecord fixed part
+_PARAM_INFO = struct.Struct("<iii")       # MSFT_ParameterInfo
+_TYPEDESC = struct.Struct("<hhhh")        # type descriptor table entry
+
+HELPDLL_FLAG = 0x100
+IMPINFO_OFFSET_IS_GUID = 0x10000
+TYPEINFO_SIZE = 0x64
+
+# Segment directory slots
+SEG_TYPEINFO = 0
+SEG_IMPINFO = 1
+SEG_IMPFILES = 2
+SEG_REFTAB = 3
+SEG_GUID = 5
+SEG_NAME = 7
+SEG_STRING = 8
+SEG_TYPEDESC = 9
+SEG_ARRAYDESC = 10
+
+# TYPEKIND, in the names tlb_analyzer reports
+TYPE_KINDS = ("enum", "record", "module", "interface", "dispatch", "coclass",
+              "alias", "union")
+
+# INVOKEKIND
+INVOKE_FUNC = 1
+INVOKE_PROPERTYGET = 2
+INVOKE_PROPERTYPUT = 4
+INVOKE_PROPERTYPUTREF = 8
+
+# VARTYPE -> IDL type name
+VT_PTR = 26
+VT_SAFEARRAY = 27
+VT_CARRAY = 28
+VT_USERDEFINED = 29
+VT_TYPEMASK = 0xFFF
+
+_VT_NAMES = {
+    0: "void", 1: "NULL", 2: "short", 3: "long", 4: "float", 5: "double",
+    6: "CURRENCY", 7: "DATE", 8: "BSTR", 9: "IDispatch*", 10: "SCODE",
+    11: "VARIANT_BOOL", 12: "VARIANT", 13: "IUnknown*", 14: "DECIMAL",
+    16: "char", 17: "unsigned char", 18: "unsigned short", 19: "unsigned long",
+    20: "int64", 21: "uint64", 22: "int", 23: "unsigned int", 24: "void",
+    25: "HRESULT", 30: "LPSTR", 31: "LPWSTR", 36: "RECORD", 37: "INT_PTR",
+    38: "UINT_PTR", 64: "FILETIME", 65: "BLOB", 66: "IStream*", 67: "IStorage*",
+    68: "IStream*", 69: "IStorage*", 70: "BLOB", 71: "CF", 72: "GUID",
+}
+
+# Imported interfaces referenced by GUID that every automation library uses
+_WELL_KNOWN_GUIDS = {
+    "{00000000-0000-0000-C000-000000000046}": "IUnknown",
+    "{00020400-0000-0000-C000-000000000046}": "IDispatch",
+    "{00020404-0000-0000-C000-000000000046}": "IEnumVARIANT",
+    "{BEF6E002-A874-101A-8BBA-00AA00300CAB}": "IFont",
+    "{BEF6E003-A874-101A-8BBA-00AA00300CAB}": "IFontDisp",
+    "{7BF80980-BF32-101A-8BBB-00AA00300CAB}": "IPicture",
+    "{7BF80981-BF32-101A-8BBB-00AA00300CAB}": "IPictureDisp",
+}
+
+# Records MIDL imports from stdole2.tlb by type info index
+_STDOLE_TYPES = {
+    ("stdole2.tlb", 0): "GUID",
+    ("stdole2.tlb", 1): "DISPPARAMS",
+    ("stdole2.tlb", 2): "EXCEPINFO",
+}
+
+
+class TypeLibError(ValueError):
+    """Raised for truncated or malformed type library data."""
+
+
+@contextmanager
+def _malformed():
+    """Report reads past the end of the library as TypeLibError."""
+    try:
+        yield
+    except (struct.error, IndexError) as e:
+        raise TypeLibError(f"truncated type library: {e}") from e
+
+
+class TlbFunction(NamedTuple):
+    """One function of an interface or dispinterface."""
+    name: str
+    memid: int
+    invkind: int                        # INVOKE_* (1=func, 2=propget, 4=propput)
+    return_type: str
+    parameters: List[Tuple[str, str]]   # (IDL type, parameter name)
+    doc: Optional[str]
+
+
+class TlbType(NamedTuple):
+    """One type info: interface, dispinterface, coclass, enum, ..."""
+    name: str
+    kind: str                           # one of TYPE_KINDS
+    guid: Optional[str]                 # "{XXXXXXXX-...}" as pythoncom prints it
+    doc: Optional[str]
+    functions: List[TlbFunction]
+    implemented: List[str]              # base interface / coclass interfaces
+
+
+class TypeLibrary:
+    """One parsed MSFT type library.
+
+    Use ``TypeLibrary.parse(data)``; it raises TypeLibError if *data* is not
+    a well-formed MSFT library.
+    """
+
+    def __init__(self, data: bytes):
+        self._data = data
+        header = _HEADER.unpack_from(data, 0)
+        if header[0] != MSFT_MAGIC:
+            raise TypeLibError("not an MSFT type library")
+        (posguid, self.lcid, _, varflags, version, _, count, helpstring,
+         _, _, _, _, name_offset) = header[2:15]
+        self.version = f"{version & 0xFFFF}.{version >> 16}"
+
+        pos = _HEADER.size + (4 if varflags & HELPDLL_FLAG else 0) + count * 4
+        segments = _SEGMENT_DIR.unpack_from(data, pos)
+        self._segments = [(segments[i], segments[i + 1]) for i in range(0, 60, 4)]
+        for offset, length in self._segments:
+            if length > 0 and (offset < 0 or offset + length > len(data)):
+                raise TypeLibError("segment exceeds the type library")
+        if self._segments[SEG_TYPEINFO][1] < count * TYPEINFO_SIZE:
+            raise TypeLibError("type info table is truncated")
+
+        self._count = count
+        self.name = self.name_at(name_offset)
+        self.guid = self.guid_at(posguid)
+        self.doc = self.string_at(helpstring)
+        self._type_names: Optional[List[str]] = None
+
+    @classmethod
+    def parse(cls, data: bytes) -> "TypeLibrary":
+        with _malformed():
+            return cls(data)
+
+    # ── Table access ─────────────────────────────────────────────────────────
+
+    def _segment(self, index: int) -> int:
+        return self._segments[index][0]
+
+    def name_at(self, offset: int) -> Optional[str]:
+        """Entry at *offset* of the name table (MSFT_NameIntro + chars)."""
+        if offset < 0:
+            return None
+        pos = self._segment(SEG_NAME) + offset
+        length = struct.unpack_from("<i", self._data, pos + 8)[0] & 0xFF
+        return self._data[pos + 12:pos + 12 + length].decode("cp1252", errors="replace")
+
+    def string_at(self, offset: int) -> Optional[str]:
+        """Entry at *offset* of the string table (16-bit length + chars)."""
+        if offset < 0:
+            return None
+        pos = self._segment(SEG_STRING) + offset
+        length = struct.unpack_from("<H", self._data, pos)[0]
+        return self._data[pos + 2:pos + 2 + length].decode("cp1252", errors="replace") or None
+
+    def guid_at(self, offset: int) -> Optional[str]:
+        """Entry at *offset* of the GUID table, formatted ``{XXXXXXXX-...}``."""
+        if offset < 0:
+            return None
+        pos = self._segment(SEG_GUID) + offset
+        raw = self._data[pos:pos + 16]
+        if len(raw) < 16:
+            raise TypeLibError(f"GUID offset {offset} out of range")
+        return "{" + str(uuid.UUID(bytes_le=raw)).upper() + "}"
+
+    def _type_info(self, index: int) -> Tuple[int, ...]:
+        return _TYPEINFO.unpack_from(self._data, self._segment(SEG_TYPEINFO)
+                                     + index * TYPEINFO_SIZE)
+
+    # ── Type names ───────────────────────────────────────────────────────────
+
+    def type_name(self, href: int) -> str:
+        """Name of the type behind HREFTYPE *href* (local or imported)."""
+        if href < 0:
+            return "void"
+        if not href & 3:
+            if self._type_names is None:
+                self._type_names = [self.name_at(self._type_info(i)[13]) or f"type{i}"
+                                    for i in range(self._count)]
+            index = href // TYPEINFO_SIZE
+            if index >= self._count:
+                raise TypeLibError(f"type reference {href} out of range")
+            return self._type_names[index]
+        return self._imported_name(href & ~3)
+
+    def _imported_name(self, offset: int) -> str:
+        """Name of an imported type (MSFT_ImpInfo at *offset*).
+
+        Interfaces are imported by GUID; records by index into the imported
+        library, whose names are only known for stdole2.tlb.
+        """
+        flags, file_offset, target = struct.unpack_from(
+            "<iii", self._data, self._segment(SEG_IMPINFO) + offset)
+        if flags & IMPINFO_OFFSET_IS_GUID:
+            guid = self.guid_at(target)
+            return _WELL_KNOWN_GUIDS.get(guid, guid)
+        pos = self._segment(SEG_IMPFILES) + file_offset
+        length = struct.unpack_from("<H", self._data, pos + 12)[0] >> 2
+        library = self._data[pos + 14:pos + 14 + length].decode("cp1252", errors="replace")
+        return _STDOLE_TYPES.get((library.lower(), target), "USERDEFINED")
+
+    def type_desc(self, encoded: int, depth: int = 0) -> str:
+        """IDL name of an encoded type: inline VARTYPE or typedesc table offset."""
+        if encoded < 0:
+            return _VT_NAMES.get(encoded & VT_TYPEMASK, "VARIANT")
+        if depth > 16:
+            raise TypeLibError("type descriptor chain too deep")
+        vt, _, low, high = _TYPEDESC.unpack_from(
+            self._data, self._segment(SEG_TYPEDESC) + encoded)
+        vt &= VT_TYPEMASK
+        target = (high & 0xFFFF) << 16 | (low & 0xFFFF)
+        if vt in (VT_PTR, VT_SAFEARRAY):
+            inner = (_VT_NAMES.get(low & VT_TYPEMASK, "VARIANT") if high < 0
+                     else self.type_desc(low & 0xFFFF, depth + 1))
+            return f"{inner}*" if vt == VT_PTR else f"SAFEARRAY({inner})"
+        if vt == VT_USERDEFINED:
+            return self.type_name(target)
+        if vt == VT_CARRAY:
+            return self._array_desc(target, depth)
+        return _VT_NAMES.get(vt, "VARIANT")
+
+    def _array_desc(self, offset: int, depth: int) -> str:
+        pos = self._segment(SEG_ARRAYDESC) + offset
+        element, dims = struct.unpack_from("<ih", self._data, pos)
+        bounds = "".join(f"[{struct.unpack_from('<i', self._data, pos + 8 + i * 8)[0]}]"
+                         for i in range(dims))
+        return self.type_desc(element, depth + 1) + bounds
+
+    # ── Type infos ───────────────────────────────────────────────────────────
+
+    def types(self) -> List[TlbType]:
+        """Every type info in the library, in index order."""
+        with _malformed():
+            return [self._read_type(i) for i in range(self._count)]
+
+    def _read_type(self, index: int) -> TlbType:
+        info = self._type_info(index)
+        typekind, memoffset, elements = info[0], info[1], info[6]
+        posguid, name_offset, doc_offset = info[11], info[13], info[15]
+        impl_count, datatype1 = info[19], info[22]
+        kind = TYPE_KINDS[typekind & 0xF] if typekind & 0xF < len(TYPE_KINDS) else "unknown"
+
+        functions: List[TlbFunction] = []
+        if kind in ("interface", "dispatch", "module") and elements & 0xFFFF:
+            functions = self._read_functions(memoffset, elements & 0xFFFF, elements >> 16)
+
+        implemented: List[str] = []
+        if kind == "coclass":
+            ref = datatype1
+            for _ in range(impl_count):
+                if ref < 0:
+                    break
+                href, _, _, ref = struct.unpack_from(
+                    "<iiii", self._data, self._segment(SEG_REFTAB) + ref)
+                implemented.append(self.type_name(href))
+        elif kind in ("interface", "dispatch") and datatype1 >= 0:
+            implemented.append(self.type_name(datatype1))
+
+        return TlbType(
+            name=self.name_at(name_offset) or f"type{index}",
+            kind=kind,
+            guid=self.guid_at(posguid),
+            doc=self.string_at(doc_offset),
+            functions=functions,
+            implemented=implemented,
+        )
+
+    def _read_functions(self, offset: int, func_count: int,
+                        var_count: int) -> List[TlbFunction]:
+        """Function records at *offset*.
+
+        The member block is: total record length, the function then variable
+        records, then arrays of member IDs, name offsets and record offsets.
+        """
+        data = self._data
+        info_length = struct.unpack_from("<i", data, offset)[0]
+        ids = offset + 4 + info_length
+        names = ids + (func_count + var_count) * 4
+        record = offset + 4
+
+        functions: List[TlbFunction] = []
+        for i in range(func_count):
+            (info, return_type, _, _, _, kind_flags,
+             arg_count, _) = _FUNC_RECORD.unpack_from(data, record)
+            length = info & 0xFFFF
+            if length < _FUNC_RECORD.size:
+                raise TypeLibError(f"function record {i} too short")
+            invkind = kind_flags >> 3 & 0xF
+
+            # Optional fields sit between the fixed part and the arguments
+            optional = length - arg_count * _PARAM_INFO.size
+            if kind_flags & 0x1000:  # default values precede the arguments
+                optional -= arg_count * 4
+            doc = None
+            if optional > 0x1C:
+                doc = self.string_at(struct.unpack_from("<i", data, record + 0x1C)[0])
+
+            name_offset = struct.unpack_from("<i", data, names + i * 4)[0]
+            # propget/propput pairs often store the name only once
+            if name_offset == -1 and functions and functions[-1].invkind != INVOKE_FUNC:
+                name = functions[-1].name
+            else:
+                name = self.name_at(name_offset) or f"func{i}"
+
+            parameters = []
+            args = record + length - arg_count * _PARAM_INFO.size
+            for j in range(arg_count):
+                param_type, param_name, _ = _PARAM_INFO.unpack_from(data, args + j * _PARAM_INFO.size)
+                parameters.append((self.type_desc(param_type),
+                                   self.name_at(param_name) or f"arg{j + 1}"))
+
+            functions.append(TlbFunction(
+                name=name,
+                memid=struct.unpack_from("<i", data, ids + i * 4)[0],
+                invkind=invkind,
+                return_type=self.type_desc(return_type),
+                parameters=parameters,
+                doc=doc,
+            ))
+            record += length
+        return functions
+
+
+def load_type_libraries(path: Path, image: Optional[PEImage] = None) -> List[TypeLibrary]:
+    """MSFT type libraries of a standalone .tlb/.olb or a PE image's TYPELIB resources.
+
+    *image* is the already mapped PE for *path*, if any; otherwise a PE is
+    mapped here.  Malformed and SLTG-format libraries are skipped.
+    """
+    if image is None:
+        image = PEImage.open(path)
+        if image is not None:
+            with image:
+                return load_type_libraries(path, image)
+
+    blobs: List[bytes] = []
+    if image is not None:
+        blobs = [bytes(image.data[offset:offset + size])
+                 for offset, size in image.resources("TYPELIB")]
+    else:
+        try:
+            with open(path, "rb") as f:
+                head = f.read(4)
+                if head in (MSFT_MAGIC, SLTG_MAGIC):
+                    blobs = [head + f.read()]
+        except OSError as e:
+            logger.warning(f"Could not read type library {path.name}: {e}")
+
+    libraries = []
+    for blob in blobs:
+        if blob[:4] == SLTG_MAGIC:
+            logger.info(f"{path.name}: SLTG-format type library is not supported")
+            continue
+        try:
+            libraries.append(TypeLibrary.parse(blob))
+        except TypeLibError as e:
+            logger.warning(f"Malformed type library in {path.name}: {e}")
+    return libraries
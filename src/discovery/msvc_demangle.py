@@ -0,0 +1,612 @@
+"""
+msvc_demangle.py - Built-in MSVC C++ name demangler.
+
+Turns ``?``-decorated names into the declarations undname.exe prints, in
+process and on any platform, so demangling an export table no longer
+launches one undname process per symbol.
+
+Covers:
+- global and member functions (access, static, virtual, adjustor thunks)
+- constructors, destructors, operators and special names (vftable, RTTI, ...)
+- data symbols and static members
+- templates (type, integer and symbol arguments)
+- calling conventions, pointers/references, arrays, function and member pointers
+- name and parameter back-references
+
+``demangle()`` returns None for anything it does not understand; callers
+keep the decorated name.  Results are memoized for the whole process.
+"""
+
+import functools
+from typing import List, Optional, Tuple
+
+
+class _Error(ValueError):
+    """Malformed or unsupported decoration."""
+
+
+_SIMPLE_TYPES = {
+    'C': 'signed char', 'D': 'char', 'E': 'unsigned char',
+    'F': 'short', 'G': 'unsigned short', 'H': 'int', 'I': 'unsigned int',
+    'J': 'long', 'K': 'unsigned long', 'M': 'float', 'N': 'double',
+    'O': 'long double', 'X': 'void',
+}
+
+_EXTENDED_TYPES = {
+    'D': '__int8', 'E': 'unsigned __int8', 'F': '__int16', 'G': 'unsigned __int16',
+    'H': '__int32', 'I': 'unsigned __int32', 'J': '__int64', 'K': 'unsigned __int64',
+    'L': '__int128', 'M': 'unsigned __int128', 'N': 'bool', 'Q': 'char8_t',
+    'S': 'char16_t', 'U': 'char32_t', 'W': 'wchar_t',
+}
+
+_CALLING_CONVENTIONS = {
+    'A': '__cdecl', 'B': '__cdecl', 'C': '__pascal', 'D': '__pascal',
+    'E': '__thiscall', 'F': '__thiscall', 'G': '__stdcall', 'H': '__stdcall',
+    'I': '__fastcall', 'J': '__fastcall', 'M': '__clrcall', 'N': '__clrcall',
+    'O': '__eabi', 'Q': '__vectorcall', 'S': '__swift_1', 'U': '__swift_2',
+    'W': '__regcall',
+}
+
+_CV = {'A': '', 'B': 'const', 'C': 'volatile', 'D': 'const volatile'}
+
+# Function class letter -> (access, kind, has "this" qualifiers)
+_FUNCTION_CLASSES = {}
+for _letters, _access in (('ABCDEFGH', 'private: '), ('IJKLMNOP', 'protected: '),
+                          ('QRSTUVWX', 'public: ')):
+    for _i, _kind in enumerate(('', 'static ', 'virtual ', 'thunk')):
+        for _letter in _letters[_i * 2:_i * 2 + 2]:
+            _FUNCTION_CLASSES[_letter] = (_access, _kind, _kind != 'static ')
+_FUNCTION_CLASSES['Y'] = _FUNCTION_CLASSES['Z'] = ('', '', False)
+
+# Data storage class digit -> prefix
+_DATA_CLASSES = {
+    '0': 'private: static ', '1': 'protected: static ', '2': 'public: static ',
+    '3': '', '4': '',
+}
+
+_OPERATORS = {
+    '2': 'operator new', '3': 'operator delete', '4': 'operator=',
+    '5': 'operator>>', '6': 'operator<<', '7': 'operator!', '8': 'operator==',
+    '9': 'operator!=', 'A': 'operator[]', 'C': 'operator->', 'D': 'operator*',
+    'E': 'operator++', 'F': 'operator--', 'G': 'operator-', 'H': 'operator+',
+    'I': 'operator&', 'J': 'operator->*', 'K': 'operator/', 'L': 'operator%',
+    'M': 'operator<', 'N': 'operator<=', 'O': 'operator>', 'P': 'operator>=',
+    'Q': 'operator,', 'R': 'operator()', 'S': 'operator~', 'T': 'operator^',
+    'U': 'operator|', 'V': 'operator&&', 'W': 'operator||', 'X': 'operator*=',
+    'Y': 'operator+=', 'Z': 'operator-=',
+}
+
+_UNDERSCORE_OPERATORS = {
+    '0': 'operator/=', '1': 'operator%=', '2': 'operator>>=', '3': 'operator<<=',
+    '4': 'operator&=', '5': 'operator|=', '6': 'operator^=',
+    '7': "`vftable'", '8': "`vbtable'", '9': "`vcall'", 'A': "`typeof'",
+    'B': "`local static guard'", 'D': "`vbase destructor'",
+    'E': "`vector deleting destructor'", 'F': "`default constructor closure'",
+    'G': "`scalar deleting destructor'", 'H': "`vector constructor iterator'",
+    'I': "`vector destructor iterator'", 'J': "`vector vbase constructor iterator'",
+    'K': "`virtual displacement map'", 'L': "`eh vector constructor iterator'",
+    'M': "`eh vector destructor iterator'", 'N': "`eh vector vbase constructor iterator'",
+    'O': "`copy constructor closure'", 'S': "`local vftable'",
+    'T': "`local vftable constructor closure'", 'U': 'operator new[]',
+    'V': 'operator delete[]', 'X': "`placement delete closure'",
+    'Y': "`placement delete[] closure'",
+}
+
+_DOUBLE_UNDERSCORE_OPERATORS = {
+    'L': 'operator co_await', 'M': 'operator<=>',
+}
+
+# Placeholder until the target type (encoded as the return type) is known
+_CONVERSION = '\x00conversion'
+
+_RTTI_NAMES = {
+    '2': "`RTTI Base Class Array'", '3': "`RTTI Class Hierarchy Descriptor'",
+    '4': "`RTTI Complete Object Locator'",
+}
+
+
+# ── Types ────────────────────────────────────────────────────────────────────
+# Each type renders itself around a declarator ("*", "x", "Foo::*", ...) so
+# pointers to functions and arrays come out as C declarations.
+
+def _join(left: str, right: str) -> str:
+    return f"{left} {right}" if right else left
+
+
+class _Simple:
+    def __init__(self, name: str):
+        self.name = name
+
+    def render(self, decl: str = '') -> str:
+        return _join(self.name, decl)
+
+
+class _Qualified:
+    """A type with const/volatile applied (``char const``)."""
+
+    def __init__(self, base, cv: str):
+        self.base = base
+        self.cv = cv
+
+    def render(self, decl: str = '') -> str:
+        if not self.cv:
+            return self.base.render(decl)
+        return _join(f"{self.base.render()} {self.cv}", decl)
+
+
+class _Pointer:
+    def __init__(self, pointee, op: str, cv: str = '', modifiers: str = '',
+                 scope: str = ''):
+        self.pointee = pointee
+        self.op = op                # "*", "&" or "&&"
+        self.cv = cv                # qualifiers of the pointer itself
+        self.modifiers = modifiers  # " __ptr64" etc.
+        self.scope = scope          # class of a pointer to member
+
+    def render(self, decl: str = '') -> str:
+        inner = f"{self.scope}::{self.op}" if self.scope else self.op
+        if self.cv:
+            inner += f" {self.cv}"
+        inner += self.modifiers
+        return self.pointee.render(_join(inner, decl))
+
+
+class _Array:
+    def __init__(self, element, dimensions: List[int]):
+        self.element = element
+        self.dimensions = dimensions
+
+    def render(self, decl: str = '') -> str:
+        dims = ''.join(f"[{d}]" for d in self.dimensions)
+        if decl:
+            return f"{self.element.render()} ({decl}){dims}"
+        return f"{self.element.render()} {dims}"
+
+
+class _Function:
+    def __init__(self, ret, cc: str, params: str, quals: str = ''):
+        self.ret = ret
+        self.cc = cc
+        self.params = params
+        self.quals = quals
+
+    def render(self, decl: str = '') -> str:
+        if not decl:
+            return f"{self.ret.render()} {self.cc}({self.params}){self.quals}"
+        sep = '' if decl[0] in '*&' else ' '
+        return f"{self.ret.render()} ({self.cc}{sep}{decl})({self.params}){self.quals}"
+
+
+def _template(name: str, args: List[str]) -> str:
+    joined = ','.join(args)
+    return f"{name}<{joined} >" if joined.endswith('>') else f"{name}<{joined}>"
+
+
+# ── Parser ───────────────────────────────────────────────────────────────────
+
+class _Parser:
+    def __init__(self, text: str):
+        self.s = text
+        self.pos = 0
+        self.names: List[str] = []   # name back-references (0-9)
+        self.types: list = []        # parameter type back-references (0-9)
+
+    # -- cursor helpers --
+
+    def _peek(self, n: int = 1) -> str:
+        return self.s[self.pos:self.pos + n]
+
+    def _next(self) -> str:
+        if self.pos >= len(self.s):
+            raise _Error("unexpected end")
+        c = self.s[self.pos]
+        self.pos += 1
+        return c
+
+    def _consume(self, prefix: str) -> bool:
+        if self.s.startswith(prefix, self.pos):
+            self.pos += len(prefix)
+            return True
+        return False
+
+    def _expect(self, prefix: str) -> None:
+        if not self._consume(prefix):
+            raise _Error(f"expected {prefix!r} at {self.pos}")
+
+    def _number(self) -> int:
+        """<number> ::= [?] <digit> | [?] <hex A-P>+ @"""
+        negative = self._consume('?')
+        c = self._next()
+        if c.isdigit():
+            value = int(c) + 1
+        else:
+            value = 0
+            while c != '@':
+                if not 'A' <= c <= 'P':
+                    raise _Error("bad number")
+                value = value * 16 + ord(c) - ord('A')
+                c = self._next()
+        return -value if negative else value
+
+    # -- names --
+
+    def _memorize(self, name: str) -> None:
+        if name not in self.names and len(self.names) < 10:
+            self.names.append(name)
+
+    def _simple_name(self, memorize: bool = True) -> str:
+        end = self.s.find('@', self.pos)
+        if end <= self.pos:
+            raise _Error("bad identifier")
+        name = self.s[self.pos:end]
+        self.pos = end + 1
+        if memorize:
+            self._memorize(name)
+        return name
+
+    def _template_name(self) -> str:
+        """Template instantiation after ``?$``; has its own back-reference tables."""
+        saved = self.names, self.types
+        self.names, self.types = [], []
+        try:
+            if self._consume('?'):
+                name = self._operator_name()
+                if name in ('ctor', 'dtor'):
+                    raise _Error("template constructor")
+            else:
+                name = self._simple_name()
+            args = self._template_args()
+        finally:
+            self.names, self.types = saved
+        return _template(name, args)
+
+    def _template_args(self) -> List[str]:
+        args: List[str] = []
+        while not self._consume('@'):
+            if self._consume('$$V') or self._consume('$$Z') or self._consume('$S'):
+                continue  # empty pack / pack separator
+            if self._consume('$0'):
+                args.append(str(self._number()))
+            elif self._consume('$1') or self._consume('$E'):
+                args.append('&' + self._nested_symbol_name())
+            elif self._consume('$$C'):
+                cv = _CV.get(self._next())
+                if cv is None:
+                    raise _Error("bad cv")
+                args.append(_Qualified(self._type(), cv).render())
+            else:
+                args.append(self._type().render())
+        return args
+
+    def _nested_symbol_name(self) -> str:
+        """Qualified name of an embedded ``?name@...`` symbol (template argument)."""
+        if not self._consume('?'):
+            raise _Error("expected symbol")
+        return self._symbol()[0]
+
+    def _unqualified_type_name(self) -> str:
+        c = self._peek()
+        if c.isdigit():
+            self.pos += 1
+            return self._backref_name(int(c))
+        if self._consume('?$'):
+            name = self._template_name()
+            self._memorize(name)
+            return name
+        return self._simple_name()
+
+    def _backref_name(self, index: int) -> str:
+        if index >= len(self.names):
+            raise _Error("bad name back-reference")
+        return self.names[index]
+
+    def _scope(self) -> str:
+        c = self._peek()
+        if c.isdigit():
+            self.pos += 1
+            return self._backref_name(int(c))
+        if self._consume('?$'):
+            name = self._template_name()
+            self._memorize(name)
+            return name
+        if self._consume('?A'):
+            end = self.s.find('@', self.pos)
+            if end < 0:
+                raise _Error("bad anonymous namespace")
+            self.pos = end + 1
+            name = "`anonymous namespace'"
+            self._memorize(name)
+            return name
+        if c == '?':
+            # ?<number>?<symbol>: a name local to a function
+            self.pos += 1
+            number = self._number()
+            self._expect('?')
+            saved = self.names, self.types
+            self.names, self.types = [], []
+            try:
+                self._expect('?')
+                _, full = self._symbol()
+            finally:
+                self.names, self.types = saved
+            return f"`{full}'::`{number}'"
+        return self._simple_name()
+
+    def _scopes(self) -> List[str]:
+        """Enclosing scopes up to the terminating '@' (innermost first)."""
+        scopes = []
+        while not self._consume('@'):
+            scopes.append(self._scope())
+        return scopes
+
+    def _qualified_type_name(self) -> str:
+        first = self._unqualified_type_name()
+        return '::'.join(reversed([first] + self._scopes()))
+
+    def _operator_name(self) -> str:
+        """Operator/special name after ``??`` (``ctor``/``dtor`` placeholders)."""
+        c = self._next()
+        if c == '0':
+            return 'ctor'
+        if c == '1':
+            return 'dtor'
+        if c == 'B':
+            return _CONVERSION
+        if c in _OPERATORS:
+            return _OPERATORS[c]
+        if c != '_':
+            raise _Error("bad operator")
+        c = self._next()
+        if c in _UNDERSCORE_OPERATORS:
+            return _UNDERSCORE_OPERATORS[c]
+        if c == '_':
+            c = self._next()
+            if c in _DOUBLE_UNDERSCORE_OPERATORS:
+                return _DOUBLE_UNDERSCORE_OPERATORS[c]
+            if c in 'EF':
+                kind = 'dynamic initializer' if c == 'E' else 'dynamic atexit destructor'
+                target = self._qualified_type_name()
+                return f"`{kind} for '{target}''"
+            if c == 'K':
+                return f'operator "" {self._simple_name()}'
+        if c == 'R':
+            return self._rtti_name()
+        raise _Error("unsupported special name")
+
+    def _rtti_name(self) -> str:
+        c = self._next()
+        if c == '0':
+            return 'rtti0'
+        if c == '1':
+            nums = [self._number() for _ in range(4)]
+            return "`RTTI Base Class Descriptor at ({},{},{},{})'".format(*nums)
+        if c in _RTTI_NAMES:
+            return _RTTI_NAMES[c]
+        raise _Error("bad RTTI name")
+
+    # -- types --
+
+    def _modifiers(self) -> str:
+        """Pointer/this modifiers: E (__ptr64), I (__restrict), F (__unaligned)."""
+        out = ''
+        while True:
+            if self._consume('E'):
+                out += ' __ptr64'
+            elif self._consume('I'):
+                out += ' __restrict'
+            elif self._consume('F'):
+                out += ' __unaligned'
+            else:
+                return out
+
+    def _type(self):
+        c = self._next()
+        if c in _SIMPLE_TYPES:
+            return _Simple(_SIMPLE_TYPES[c])
+        if c == '_':
+            c = self._next()
+            if c not in _EXTENDED_TYPES:
+                raise _Error("bad extended type")
+            return _Simple(_EXTENDED_TYPES[c])
+        if c.isdigit():
+            index = int(c)
+            if index >= len(self.types):
+                raise _Error("bad type back-reference")
+            return self.types[index]
+        if c in 'TUV':
+            kind = {'T': 'union', 'U': 'struct', 'V': 'class'}[c]
+            return _Simple(f"{kind} {self._qualified_type_name()}")
+        if c == 'W':
+            self._next()  # underlying type, always int ('4') in practice
+            return _Simple(f"enum {self._qualified_type_name()}")
+        if c in 'PQRSAB':
+            op = '&' if c in 'AB' else '*'
+            cv = {'Q': 'const', 'R': 'volatile', 'S': 'const volatile', 'B': 'volatile'}.get(c, '')
+            return self._pointer(op, cv)
+        if c == 'Y':
+            dims = [self._number() for _ in range(self._number())]
+            return _Array(self._type(), dims)
+        if c == '?':
+            cv = _CV.get(self._next())
+            if cv is None:
+                raise _Error("bad cv")
+            return _Qualified(self._type(), cv)
+        if c == '$':
+            if self._consume('$Q'):
+                return self._pointer('&&', '')
+            if self._consume('$R'):
+                return self._pointer('&&', 'volatile')
+            if self._consume('$T'):
+                return _Simple('std::nullptr_t')
+            if self._consume('$A6'):
+                return self._function_type()
+            if self._consume('$B'):
+                return self._type()
+        raise _Error(f"unsupported type {c!r}")
+
+    def _pointer(self, op: str, cv: str) -> _Pointer:
+        if self._consume('6'):
+            return _Pointer(self._function_type(), op, cv)
+        if self._consume('8'):
+            scope = self._qualified_type_name()
+            quals = self._this_qualifiers()
+            return _Pointer(self._function_type(quals), op, cv, scope=scope)
+        modifiers = self._modifiers()
+        c = self._next()
+        if c in _CV:
+            return _Pointer(_Qualified(self._type(), _CV[c]), op, cv, modifiers)
+        if c in 'QRST':
+            pointee_cv = _CV['ABCD'['QRST'.index(c)]]
+            scope = self._qualified_type_name()
+            return _Pointer(_Qualified(self._type(), pointee_cv), op, cv, modifiers, scope)
+        raise _Error("bad pointer")
+
+    def _this_qualifiers(self) -> str:
+        modifiers = self._modifiers()
+        ref = ' &' if self._consume('G') else ' &&' if self._consume('H') else ''
+        cv = _CV.get(self._next())
+        if cv is None:
+            raise _Error("bad this qualifiers")
+        return cv + modifiers + ref
+
+    def _calling_convention(self) -> str:
+        cc = _CALLING_CONVENTIONS.get(self._next())
+        if cc is None:
+            raise _Error("bad calling convention")
+        return cc
+
+    def _return_type(self):
+        if self._consume('?'):
+            cv = _CV.get(self._next())
+            if cv is None:
+                raise _Error("bad cv")
+            return _Qualified(self._type(), cv)
+        return self._type()
+
+    def _params(self) -> str:
+        if self._consume('X'):
+            return 'void'
+        params = []
+        while True:
+            if self._consume('@'):
+                break
+            if self._consume('Z'):
+                params.append('...')
+                break
+            start = self.pos
+            t = self._type()
+            # Only multi-character encodings are worth a back-reference
+            if self.pos - start > 1 and len(self.types) < 10:
+                self.types.append(t)
+            params.append(t.render())
+        return ','.join(params)
+
+    def _throw_spec(self) -> str:
+        if self._consume('_E'):
+            return ' noexcept'
+        self._expect('Z')
+        return ''
+
+    def _function_type(self, quals: str = '') -> _Function:
+        cc = self._calling_convention()
+        ret = self._return_type()
+        params = self._params()
+        self._throw_spec()
+        return _Function(ret, cc, params, quals)
+
+    # -- symbols --
+
+    def _symbol(self) -> Tuple[str, str]:
+        """Parse after the leading '?'; returns (qualified name, full declaration)."""
+        special = None
+        if self._consume('?$'):
+            first = self._template_name()
+        elif self._consume('?'):
+            special = self._operator_name()
+            if special == 'rtti0':
+                t = self._type()
+                self._expect('@8')
+                return "`RTTI Type Descriptor'", f"{t.render()} `RTTI Type Descriptor'"
+            first = special
+        else:
+            first = self._simple_name()
+
+        scopes = self._scopes()
+        if special == 'ctor' or special == 'dtor':
+            if not scopes:
+                raise _Error("constructor outside a class")
+            first = scopes[0] if special == 'ctor' else '~' + scopes[0]
+        name = '::'.join(reversed([first] + scopes))
+
+        c = self._next()
+        if c in _DATA_CLASSES:
+            t = self._type()
+            self._modifiers()
+            cv = _CV.get(self._next())
+            if cv is None:
+                raise _Error("bad storage class")
+            return name, _DATA_CLASSES[c] + _Qualified(t, cv).render(name)
+        if c in '67':
+            self._modifiers()
+            cv = _CV.get(self._next())
+            if cv is None:
+                raise _Error("bad storage class")
+            decl = f"{cv} {name}" if cv else name
+            bases = []
+            while not self._consume('@'):
+                bases.append(self._qualified_type_name())
+            if bases:
+                decl += '{for ' + ''.join(f"`{b}'" for b in bases) + '}'
+            return name, decl
+        if c == '8':
+            return name, name
+        if c not in _FUNCTION_CLASSES:
+            raise _Error("unsupported symbol kind")
+
+        access, kind, has_this = _FUNCTION_CLASSES[c]
+        prefix = access
+        if kind == 'thunk':
+            adjustor = self._number()
+            prefix = f"[thunk]:{access}virtual "
+            display = f"{name}`adjustor{{{adjustor}}}' "
+        else:
+            prefix += kind
+            display = name
+        quals = self._this_qualifiers() if has_this else ''
+        cc = self._calling_convention()
+        ret = None if self._consume('@') else self._return_type()
+        params = self._params()
+        noexcept = self._throw_spec()
+
+        if special == _CONVERSION:
+            if ret is None:
+                raise _Error("conversion operator without type")
+            conversion = f"operator {ret.render()}"
+            name = name.replace(_CONVERSION, conversion)
+            display = display.replace(_CONVERSION, conversion)
+            ret = None
+
+        decl = f"{cc} {display}({params}){quals}{noexcept}"
+        return name, prefix + (ret.render(decl) if ret is not None else decl)
+
+
+@functools.lru_cache(maxsize=65536)
+def demangle(name: str) -> Optional[str]:
+    """Undecorate an MSVC C++ symbol the way undname.exe does.
+
+    Returns None if *name* is not ``?``-decorated or uses an encoding this
+    demangler does not support.
+    """
+    if not name.startswith('?'):
+        return None
+    if name.startswith('??_C@'):
+        return "`string'"
+    parser = _Parser(name)
+    parser.pos = 1
+    try:
+        _, full = parser._symbol()
+    except (_Error, IndexError, KeyError, RecursionError):
+        return None
+    if parser.pos != len(name):
+        return None
+    return full
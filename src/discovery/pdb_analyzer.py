@@ -1,15 +1,18 @@
 """
 pdb_analyzer.py — Invocable extractor for Windows PDB (Program Database) files.
 
-Uses the Windows DbgHelp API (dbghelp.dll) via ctypes to enumerate symbols
-from a PDB file.  The companion DLL/EXE is loaded as a module so DbgHelp can
+Reads the PDB directly with pdb_reader (MSF 7.00 container, DBI, publics,
+globals and TPI streams), on any platform and without the companion
+DLL/EXE.  Procedures with type records get their parameter names and
+types; public symbols without one are demangled.
+
+PDBs the reader cannot handle (e.g. the MSF 2.00 format of pre-VC 7
+toolchains) fall back on Windows to the DbgHelp API (dbghelp.dll) via
+ctypes.  The companion DLL/EXE is loaded as a module so DbgHelp can
 resolve the PDB; the image is never actually mapped into user memory.
 
-Each SymTagFunction / SymTagPublicSymbol entry becomes an Invocable with
-source_type='pdb_symbol'.  Where type information is available (SymTagData,
-parameter children) parameters/return types are extracted at 'high' confidence.
-
-Windows-only.  Returns an empty list on non-Windows platforms.
+Each function / public symbol becomes an Invocable with
+source_type='pdb_symbol'.
 """
 
 import ctypes
@@ -21,6 +24,8 @@ from ctypes import c_uint64, c_char, c_void_p, c_ulong, POINTER
 from pathlib import Path
 from typing import List, Optional
 
+from msvc_demangle import demangle
+from pdb_reader import PdbError, PdbFile, PdbFunction
 from schema import Invocable
 
 logger = logging.getLogger(__name__)
@@ -98,7 +103,8 @@ def _looks_compiler_internal(name: str) -> bool:
 def _demangle_name(name: bytes) -> str:
     """Use UnDecorateSymbolName to convert a mangled C++ name."""
     if sys.platform != "win32":
-        return name.decode("mbcs", errors="replace")
+        text = name.decode("latin-1")
+        return demangle(text) or text
     try:
         dbghelp = ctypes.WinDLL("dbghelp.dll")
         buf = ctypes.create_string_buffer(2048)
@@ -111,6 +117,22 @@ def _demangle_name(name: bytes) -> str:
     return name.decode("mbcs", errors="replace")
 
 
+def _c_to_json(t: str) -> str:
+    """Convert a C type to a JSON type."""
+    t = t.strip().lower()
+    if any(x in t for x in ["char*", "char *", "char const *", "wchar", "lpstr", "lpwstr", "bstr", "string"]):
+        return "string"
+    if any(x in t for x in ["int", "long", "short", "dword", "size_t", "word", "byte", "uint", "ulong"]):
+        return "integer"
+    if any(x in t for x in ["float", "double"]):
+        return "number"
+    if "bool" in t:
+        return "boolean"
+    if "void" in t and "*" not in t:
+        return "null"
+    return t or "any"
+
+
 def _parse_undecorated(undecorated: str):
     """Extract (return_type, func_name, params_str) from an undecorated C++ name.
 
@@ -131,21 +153,6 @@ def _parse_undecorated(undecorated: str):
     name = m.group("name").strip()
     params_raw = m.group("params").strip()
 
-    # Convert C types to JSON types
-    def _c_to_json(t: str) -> str:
-        t = t.strip().lower()
-        if any(x in t for x in ["char*", "char *", "wchar", "lpstr", "lpwstr", "bstr", "string"]):
-            return "string"
-        if any(x in t for x in ["int", "long", "short", "dword", "size_t", "word", "byte", "uint", "ulong"]):
-            return "integer"
-        if any(x in t for x in ["float", "double"]):
-            return "number"
-        if "bool" in t:
-            return "boolean"
-        if "void" in t and "*" not in t:
-            return "null"
-        return t or "any"
-
     # Parse params
     if not params_raw or params_raw.lower() == "void":
         params_str = ""
@@ -191,12 +198,21 @@ def _load_dbghelp():
 # Public API
 # ---------------------------------------------------------------------------
 
+def _find_companion(path: Path) -> Optional[Path]:
+    """The DLL/EXE/SYS next to the PDB with the same stem, if any."""
+    for ext in (".dll", ".exe", ".sys"):
+        candidate = path.with_suffix(ext)
+        if candidate.exists():
+            return candidate
+    return None
+
+
 def analyze_pdb(path: Path) -> List[Invocable]:
-    """Extract symbols from a Windows PDB file using DbgHelp.
+    """Extract function symbols from a Windows PDB file.
 
-    The function looks for a companion DLL/EXE in the same directory whose
-    stem matches the PDB.  DbgHelp loads the image and automatically resolves
-    the PDB via the symbol search path set to the PDB's directory.
+    The PDB is read directly; DbgHelp is only used on Windows for PDBs the
+    built-in reader rejects.  A companion DLL/EXE in the same directory
+    whose stem matches the PDB is recorded as the invocables' dll_path.
 
     Args:
         path: Path to the .pdb file.
@@ -204,22 +220,92 @@ def analyze_pdb(path: Path) -> List[Invocable]:
     Returns:
         List[Invocable] — one entry per discovered function symbol.
     """
-    if sys.platform != "win32":
-        logger.info("PDB analysis skipped: not running on Windows")
-        return []
+    companion = _find_companion(path)
+    try:
+        with PdbFile.open(path) as pdb:
+            functions = pdb.functions()
+    except PdbError as exc:
+        if sys.platform != "win32":
+            logger.warning("PDB analysis skipped for %s: %s", path.name, exc)
+            return []
+        logger.info("PDB reader failed for %s (%s); using DbgHelp", path.name, exc)
+        return _analyze_pdb_dbghelp(path, companion)
+
+    invocables: List[Invocable] = []
+    seen: set = set()
+    for function in functions:
+        if _looks_compiler_internal(function.mangled or function.name):
+            continue
+        if function.parameters is None:
+            # Public symbol only: the decorated name is all there is
+            ret_type, clean_name, params_str = _parse_undecorated(
+                demangle(function.name) or function.name)
+        else:
+            ret_type, clean_name, params_str = _typed_signature(function)
+
+        if not clean_name or clean_name in seen or _looks_compiler_internal(clean_name):
+            continue
+        seen.add(clean_name)
+        tag = _TAG_PUBLIC_SYMBOL if function.parameters is None else _TAG_FUNCTION
+        invocables.append(_make_invocable(path, companion, clean_name, ret_type,
+                                          params_str, function.is_public, tag))
+
+    logger.info("PDB: extracted %d symbols from %s", len(invocables), path.name)
+    return invocables
+
+
+def _typed_signature(function: PdbFunction):
+    """(return_type, func_name, params_str) from a procedure's type record."""
+    params_str = ", ".join(
+        f"{name or f'arg{i}'}: {_c_to_json(ptype)}"
+        for i, (ptype, name) in enumerate(function.parameters) if ptype != "...")
+    ret = function.return_type or ""
+    ret_json = _c_to_json(ret) if ret.lower() != "void" else None
+    return ret_json, function.name, params_str
+
+
+def _make_invocable(path: Path, companion: Optional[Path], clean_name: str,
+                    ret_type: Optional[str], params_str: Optional[str],
+                    is_public: bool, tag: int) -> Invocable:
+    """Invocable for one symbol; confidence grows with what is known about it."""
+    sig = f"{clean_name}({params_str or ''})"
+    if ret_type:
+        sig += f": {ret_type}"
+
+    has_params = bool(params_str)
+    has_ret    = bool(ret_type)
+
+    if has_params and has_ret and is_public:
+        confidence = "guaranteed"
+    elif is_public and (has_params or has_ret):
+        confidence = "high"
+    elif is_public:
+        confidence = "medium"
+    else:
+        confidence = "low"
+
+    return Invocable(
+        name=clean_name,
+        source_type="pdb_symbol",
+        signature=sig,
+        parameters=params_str or None,
+        return_type=ret_type,
+        doc_comment=f"Symbol from {path.name} (tag={tag})",
+        confidence=confidence,
+        dll_path=str(companion) if companion else None,
+    )
+
 
+def _analyze_pdb_dbghelp(path: Path, companion: Optional[Path]) -> List[Invocable]:
+    """Enumerate symbols through DbgHelp (Windows only).
+
+    DbgHelp loads the companion image and automatically resolves the PDB
+    via the symbol search path set to the PDB's directory.
+    """
     dbghelp, kernel32 = _load_dbghelp()
     if dbghelp is None:
         return []
 
-    # Locate companion binary (same directory, same stem)
-    companion: Optional[Path] = None
-    for ext in (".dll", ".exe", ".sys"):
-        candidate = path.with_suffix(ext)
-        if candidate.exists():
-            companion = candidate
-            break
-
     if companion is None:
         logger.warning("No companion DLL/EXE found for %s — cannot load module for PDB", path.name)
         return []
@@ -301,33 +387,8 @@ def analyze_pdb(path: Path) -> List[Invocable]:
         if _looks_compiler_internal(clean_name):
             continue
 
-        sig = f"{clean_name}({params_str or ''})"
-        if ret_type:
-            sig += f": {ret_type}"
-
-        has_params = bool(params_str)
-        has_ret    = bool(ret_type)
-        is_public  = (tag == _TAG_PUBLIC_SYMBOL)
-
-        if has_params and has_ret and is_public:
-            confidence = "guaranteed"
-        elif is_public and (has_params or has_ret):
-            confidence = "high"
-        elif is_public:
-            confidence = "medium"
-        else:
-            confidence = "low"
-
-        invocables.append(Invocable(
-            name=clean_name,
-            source_type="pdb_symbol",
-            signature=sig,
-            parameters=params_str or None,
-            return_type=ret_type,
-            doc_comment=f"Symbol from {path.name} (tag={tag})",
-            confidence=confidence,
-            dll_path=str(companion),
-        ))
+        invocables.append(_make_invocable(path, companion, clean_name, ret_type, params_str,
+                                          tag == _TAG_PUBLIC_SYMBOL, tag))
 
     logger.info("PDB: extracted %d symbols from %s", len(invocables), path.name)
     return invocables
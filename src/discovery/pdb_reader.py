@@ -0,0 +1,539 @@
+"""
+pdb_reader.py - Pure-Python reader for MSF 7.00 program databases (.pdb).
+
+Lists the functions of a PDB straight from the file, without DbgHelp or
+the companion DLL, so symbol-server PDBs can be analyzed on any platform.
+The file is memory-mapped and every stream is read block by block only
+when needed: a module stream is touched only at the procedures the global
+symbol table points into.
+
+Implements:
+- MSF superblock, stream directory and lazy block-list streams
+- DBI stream header and module info substream (module symbol streams)
+- Publics (S_PUB32) and globals (S_PROCREF / S_LPROCREF) hash records
+  resolved through the symbol record stream
+- Module procedures (S_GPROC32 / S_LPROC32 and their _ID forms) with the
+  parameter names of their S_LOCAL / S_REGREL32 / S_BPREL32 children
+- TPI (and IPI) type records rendered as undname-style C++ type names:
+  simple types, pointers/references, const/volatile, classes, unions,
+  enums, arrays and function pointers
+
+The older MSF 2.00 container (pre-VC 7 PDBs) is not read.
+"""
+
+import mmap
+import struct
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+MSF7_MAGIC = b"Microsoft C/C++ MSF 7.00\r\n\x1aDS\x00\x00\x00"
+MSF2_MAGIC = b"Microsoft C/C++ program database 2.00\r\n\x1aJG"
+
+# Fixed stream numbers
+STREAM_TPI = 2
+STREAM_DBI = 3
+STREAM_IPI = 4
+NIL_STREAM = 0xFFFF
+
+_DBI_HEADER = struct.Struct("<iIIHHHHHHiiiiiIiiHHI")
+_MODULE_INFO_SIZE = 64
+_PUBLICS_HEADER_SIZE = 28
+_GSI_HEADER = struct.Struct("<IIII")
+_TPI_HEADER = struct.Struct("<IIIII")
+_PROC = struct.Struct("<IIIIIIIIHB")  # S_*PROC32 body up to the name
+
+# Symbol record kinds (cvinfo.h)
+S_END = 0x0006
+S_THUNK32 = 0x1102
+S_BLOCK32 = 0x1103
+S_WITH32 = 0x1104
+S_REGISTER = 0x1106
+S_BPREL32 = 0x110B
+S_PUB32 = 0x110E
+S_LPROC32 = 0x110F
+S_GPROC32 = 0x1110
+S_REGREL32 = 0x1111
+S_PROCREF = 0x1125
+S_LPROCREF = 0x1127
+S_SEPCODE = 0x1132
+S_LOCAL = 0x113E
+S_LPROC32_ID = 0x1146
+S_GPROC32_ID = 0x1147
+S_INLINESITE = 0x114D
+S_INLINESITE_END = 0x114E
+S_PROC_ID_END = 0x114F
+S_INLINESITE2 = 0x115D
+
+_PROC_KINDS = {S_LPROC32, S_GPROC32, S_LPROC32_ID, S_GPROC32_ID}
+_SCOPE_OPEN = _PROC_KINDS | {S_THUNK32, S_BLOCK32, S_WITH32, S_SEPCODE,
+                             S_INLINESITE, S_INLINESITE2}
+_SCOPE_CLOSE = {S_END, S_INLINESITE_END, S_PROC_ID_END}
+
+PUBLIC_FUNCTION = 0x2   # CVPSF_FUNCTION
+LOCAL_IS_PARAM = 0x1    # S_LOCAL flags: fIsParam
+
+# Type record kinds
+LF_MODIFIER = 0x1001
+LF_POINTER = 0x1002
+LF_PROCEDURE = 0x1008
+LF_MFUNCTION = 0x1009
+LF_ARGLIST = 0x1201
+LF_ARRAY = 0x1503
+LF_CLASS = 0x1504
+LF_STRUCTURE = 0x1505
+LF_UNION = 0x1506
+LF_ENUM = 0x1507
+LF_INTERFACE = 0x1519
+LF_FUNC_ID = 0x1601
+LF_MFUNC_ID = 0x1602
+
+# Numeric leaf sizes (LF_CHAR .. LF_UQUADWORD)
+_NUMERIC_SIZES = {0x8000: 1, 0x8001: 2, 0x8002: 2, 0x8003: 4, 0x8004: 4,
+                  0x8005: 4, 0x8006: 8, 0x8009: 8, 0x800A: 8}
+
+# Simple type kinds (low byte of a type index < 0x1000)
+_SIMPLE_TYPES = {
+    0x00: "<no type>", 0x03: "void", 0x08: "HRESULT",
+    0x10: "signed char", 0x11: "short", 0x12: "long", 0x13: "__int64", 0x14: "__int128",
+    0x20: "unsigned char", 0x21: "unsigned short", 0x22: "unsigned long",
+    0x23: "unsigned __int64", 0x24: "unsigned __int128",
+    0x30: "bool", 0x31: "bool", 0x32: "bool", 0x33: "bool", 0x34: "bool",
+    0x40: "float", 0x41: "double", 0x42: "long double", 0x43: "__float128",
+    0x68: "signed char", 0x69: "unsigned char", 0x70: "char", 0x71: "wchar_t",
+    0x72: "short", 0x73: "unsigned short", 0x74: "int", 0x75: "unsigned int",
+    0x76: "__int64", 0x77: "unsigned __int64", 0x78: "__int128", 0x79: "unsigned __int128",
+    0x7A: "char16_t", 0x7B: "char32_t", 0x7C: "char8_t",
+}
+
+# CV_call_e -> keyword
+_CALLING_CONVENTIONS = {0x00: "__cdecl", 0x04: "__fastcall", 0x07: "__stdcall",
+                        0x0B: "__thiscall", 0x16: "__clrcall", 0x18: "__vectorcall"}
+
+_MAX_TYPE_DEPTH = 32
+
+
+class PdbError(ValueError):
+    """Raised for files that are not readable MSF 7.00 program databases."""
+
+
+@contextmanager
+def _malformed():
+    """Report reads past the end of a stream or record as PdbError."""
+    try:
+        yield
+    except (struct.error, IndexError) as e:
+        raise PdbError(f"truncated PDB: {e}") from e
+
+
+class PdbFunction(NamedTuple):
+    """One function of a program database."""
+    name: str                       # undecorated name ("Foo::bar") or public symbol
+    mangled: Optional[str]          # decorated public symbol name at the same address
+    return_type: Optional[str]      # None when the PDB has no type for it
+    parameters: Optional[List[Tuple[str, str]]]  # (type, name); None without type info
+    calling_convention: Optional[str]
+    is_public: bool                 # has a public (S_PUB32) symbol
+    section: int
+    offset: int
+
+    def declaration(self) -> Optional[str]:
+        """undname-style declaration with parameter names, if types are known."""
+        if self.parameters is None:
+            return None
+        params = ", ".join(f"{t} {n}" if n else t for t, n in self.parameters) or "void"
+        convention = f"{self.calling_convention} " if self.calling_convention else ""
+        return f"{self.return_type} {convention}{self.name}({params})"
+
+
+class MsfStream:
+    """One MSF stream; bytes are read from its blocks only on demand."""
+
+    def __init__(self, data, block_size: int, blocks: List[int], size: int):
+        self._data = data
+        self._block_size = block_size
+        self._blocks = blocks
+        self.size = size
+
+    def read(self, offset: int, size: int) -> bytes:
+        """*size* bytes at *offset* (fewer at the end of the stream)."""
+        size = max(0, min(size, self.size - offset))
+        chunks = []
+        while size > 0:
+            block, within = divmod(offset, self._block_size)
+            length = min(self._block_size - within, size)
+            start = self._blocks[block] * self._block_size + within
+            chunks.append(self._data[start:start + length])
+            offset += length
+            size -= length
+        return b"".join(chunks)
+
+    def data(self) -> bytes:
+        """The whole stream."""
+        return self.read(0, self.size)
+
+
+class PdbFile:
+    """Memory-mapped MSF 7.00 program database.
+
+    Use ``PdbFile.open(path)``; it raises PdbError for anything else.  Close
+    it (or use it as a context manager) when done.
+    """
+
+    def __init__(self, path: Path, data: mmap.mmap):
+        self.path = path
+        self._data = data
+        self._streams = self._read_directory()
+        self._types: Dict[int, Optional["_TypeStream"]] = {}
+        self._module_streams: Optional[List[int]] = None
+
+    @classmethod
+    def open(cls, path: Path) -> "PdbFile":
+        try:
+            with open(path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:  # ValueError: empty file
+            raise PdbError(f"cannot map {path.name}: {e}") from e
+        try:
+            if data[:len(MSF2_MAGIC)] == MSF2_MAGIC:
+                raise PdbError("MSF 2.00 program databases are not supported")
+            if data[:len(MSF7_MAGIC)] != MSF7_MAGIC:
+                raise PdbError("not an MSF 7.00 program database")
+            with _malformed():
+                return cls(path, data)
+        except PdbError:
+            data.close()
+            raise
+
+    def close(self) -> None:
+        self._data.close()
+
+    def __enter__(self) -> "PdbFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ── MSF container ────────────────────────────────────────────────────────
+
+    def _read_directory(self) -> List[Optional[MsfStream]]:
+        data = self._data
+        block_size, _, block_count, directory_size, _, map_block = struct.unpack_from(
+            "<IIIIII", data, len(MSF7_MAGIC))
+        if block_size not in (512, 1024, 2048, 4096, 8192, 16384, 32768):
+            raise PdbError(f"bad MSF block size {block_size}")
+        if block_count * block_size > len(data):
+            raise PdbError("MSF file is truncated")
+
+        directory_blocks = -(-directory_size // block_size)
+        blocks = list(struct.unpack_from(f"<{directory_blocks}I", data, map_block * block_size))
+        directory = MsfStream(data, block_size, blocks, directory_size).data()
+
+        count = struct.unpack_from("<I", directory, 0)[0]
+        sizes = struct.unpack_from(f"<{count}I", directory, 4)
+        pos = 4 + 4 * count
+        streams: List[Optional[MsfStream]] = []
+        for size in sizes:
+            if size == 0xFFFFFFFF:
+                streams.append(None)
+                continue
+            used = -(-size // block_size)
+            stream_blocks = list(struct.unpack_from(f"<{used}I", directory, pos))
+            if any(b >= block_count for b in stream_blocks):
+                raise PdbError("stream block out of range")
+            streams.append(MsfStream(data, block_size, stream_blocks, size))
+            pos += 4 * used
+        return streams
+
+    def stream(self, index: int) -> Optional[MsfStream]:
+        """Stream *index*, or None if it is absent."""
+        if index == NIL_STREAM or index >= len(self._streams):
+            return None
+        return self._streams[index]
+
+    # ── Functions ────────────────────────────────────────────────────────────
+
+    def functions(self) -> List[PdbFunction]:
+        """Every procedure and public function, ordered by address.
+
+        Procedures (private symbols) carry their type signature; public
+        symbols without a procedure (stripped PDBs) only their decorated name.
+        """
+        with _malformed():
+            return self._functions()
+
+    def _functions(self) -> List[PdbFunction]:
+        dbi = self.stream(STREAM_DBI)
+        if dbi is None:
+            raise PdbError("no DBI stream")
+        header = _DBI_HEADER.unpack_from(dbi.read(0, _DBI_HEADER.size))
+        globals_index, publics_index, records_index = header[3], header[5], header[7]
+        records = self.stream(records_index)
+        if records is None:
+            return []
+        symbols = records.data()
+
+        publics: Dict[Tuple[int, int], str] = {}
+        for offset in self._hash_records(publics_index, _PUBLICS_HEADER_SIZE):
+            length, kind = struct.unpack_from("<HH", symbols, offset)
+            if kind == S_PUB32:
+                flags, address, section = struct.unpack_from("<IIH", symbols, offset + 4)
+                if flags & PUBLIC_FUNCTION:
+                    publics.setdefault((section, address), _name(symbols, offset + 14))
+
+        functions: Dict[Tuple[int, int], PdbFunction] = {}
+        for offset in self._hash_records(globals_index, 0):
+            length, kind = struct.unpack_from("<HH", symbols, offset)
+            if kind in (S_PROCREF, S_LPROCREF):
+                _, module_offset, module = struct.unpack_from("<IIH", symbols, offset + 4)
+                function = self._procedure(module - 1, module_offset, publics)
+                if function is not None:
+                    functions.setdefault((function.section, function.offset), function)
+
+        for (section, address), mangled in publics.items():
+            if (section, address) not in functions:
+                functions[(section, address)] = PdbFunction(
+                    name=mangled, mangled=mangled, return_type=None, parameters=None,
+                    calling_convention=None, is_public=True, section=section, offset=address)
+        return [functions[key] for key in sorted(functions)]
+
+    def _hash_records(self, stream_index: int, skip: int) -> List[int]:
+        """Symbol record offsets listed in a GSI hash (globals / publics stream)."""
+        stream = self.stream(stream_index)
+        if stream is None or stream.size < skip + _GSI_HEADER.size:
+            return []
+        signature, _, records_size, _ = _GSI_HEADER.unpack(stream.read(skip, _GSI_HEADER.size))
+        if signature != 0xFFFFFFFF:
+            raise PdbError("unsupported symbol hash format")
+        raw = stream.read(skip + _GSI_HEADER.size, records_size)
+        # Each record: (offset + 1 into the symbol record stream, reference count)
+        return sorted(struct.unpack_from("<I", raw, i)[0] - 1 for i in range(0, len(raw) - 7, 8))
+
+    def _module_stream(self, module: int) -> Optional[MsfStream]:
+        if self._module_streams is None:
+            dbi = self.stream(STREAM_DBI)
+            header = _DBI_HEADER.unpack_from(dbi.read(0, _DBI_HEADER.size))
+            info = dbi.read(_DBI_HEADER.size, header[9])
+            self._module_streams = []
+            pos = 0
+            while pos + _MODULE_INFO_SIZE <= len(info):
+                self._module_streams.append(struct.unpack_from("<H", info, pos + 34)[0])
+                end = info.find(b"\x00", pos + _MODULE_INFO_SIZE)   # module name
+                end = info.find(b"\x00", end + 1)                   # object file name
+                if end < 0:
+                    break
+                pos = (end + 1 + 3) & ~3
+        if not 0 <= module < len(self._module_streams):
+            return None
+        return self.stream(self._module_streams[module])
+
+    def _procedure(self, module: int, offset: int,
+                   publics: Dict[Tuple[int, int], str]) -> Optional[PdbFunction]:
+        """The S_*PROC32 record at *offset* of a module's symbol stream."""
+        stream = self._module_stream(module)
+        if stream is None:
+            return None
+        length, kind = struct.unpack("<HH", stream.read(offset, 4))
+        if kind not in _PROC_KINDS:
+            return None
+        record = stream.read(offset, length + 2)
+        (_, end, _, _, _, _, type_index, address, section, _) = _PROC.unpack_from(record, 4)
+        name = _name(record, 4 + _PROC.size)
+
+        if kind in (S_LPROC32_ID, S_GPROC32_ID):
+            type_index = self.types(STREAM_IPI).function_type(type_index)
+        signature = self.types(STREAM_TPI).procedure(type_index)
+
+        return_type = parameters = convention = None
+        if signature is not None:
+            return_type, convention, arg_types = signature
+            # Children up to the matching S_END hold the parameter names
+            names = _parameter_names(stream.read(offset + length + 2, end - offset - length - 2),
+                                     len(arg_types))
+            parameters = [(arg_type, names[i] if i < len(names) and arg_type != "..." else "")
+                          for i, arg_type in enumerate(arg_types)]
+        return PdbFunction(
+            name=name,
+            mangled=publics.get((section, address)),
+            return_type=return_type,
+            parameters=parameters,
+            calling_convention=convention,
+            is_public=(section, address) in publics,
+            section=section,
+            offset=address,
+        )
+
+    def types(self, stream_index: int) -> "_TypeStream":
+        """Type records of the TPI or IPI stream, indexed on first use."""
+        if stream_index not in self._types:
+            self._types[stream_index] = _TypeStream(self.stream(stream_index))
+        return self._types[stream_index]
+
+
+def _name(data: bytes, pos: int) -> str:
+    end = data.find(b"\x00", pos)
+    return data[pos:end if end >= 0 else len(data)].decode("utf-8", errors="replace")
+
+
+def _parameter_names(children: bytes, count: int) -> List[str]:
+    """Parameter names among the direct children of a procedure.
+
+    Optimized code marks parameters (S_LOCAL fIsParam); unoptimized frames
+    list them first as S_REGREL32 / S_BPREL32 / S_REGISTER records.
+    """
+    params: List[str] = []
+    frame: List[str] = []
+    depth, pos = 0, 0
+    while pos + 4 <= len(children):
+        length, kind = struct.unpack_from("<HH", children, pos)
+        if kind in _SCOPE_CLOSE:
+            depth -= 1
+        elif kind in _SCOPE_OPEN:
+            depth += 1
+        elif depth == 0:
+            if kind == S_LOCAL:
+                _, flags = struct.unpack_from("<IH", children, pos + 4)
+                if flags & LOCAL_IS_PARAM:
+                    params.append(_name(children, pos + 10))
+            elif kind == S_REGREL32:
+                frame.append(_name(children, pos + 14))
+            elif kind == S_BPREL32:
+                frame.append(_name(children, pos + 12))
+            elif kind == S_REGISTER:
+                frame.append(_name(children, pos + 10))
+        if depth < 0 or length < 2:
+            break
+        pos += length + 2
+    names = params or frame
+    # Member functions list the implicit `this` first
+    if names and names[0] == "this":
+        names = names[1:]
+    return names[:count]
+
+
+class _TypeStream:
+    """TPI / IPI records; record offsets are indexed on first lookup."""
+
+    def __init__(self, stream: Optional[MsfStream]):
+        self._data = b""
+        self._first = self._end = 0x1000
+        self._offsets: Optional[List[int]] = None
+        self._names: Dict[int, str] = {}
+        self._spelling: Set[int] = set()  # types whose name() is in progress
+        if stream is not None and stream.size >= _TPI_HEADER.size:
+            _, header_size, self._first, self._end, record_bytes = _TPI_HEADER.unpack(
+                stream.read(0, _TPI_HEADER.size))
+            self._data = stream.read(header_size, record_bytes)
+
+    def record(self, index: int) -> Optional[Tuple[int, bytes]]:
+        """(leaf kind, record body) of type *index*, or None."""
+        if not self._first <= index < self._end:
+            return None
+        if self._offsets is None:
+            self._offsets = []
+            pos, data = 0, self._data
+            while pos + 4 <= len(data):
+                self._offsets.append(pos)
+                pos += struct.unpack_from("<H", data, pos)[0] + 2
+        position = index - self._first
+        if position >= len(self._offsets):
+            return None
+        pos = self._offsets[position]
+        length, kind = struct.unpack_from("<HH", self._data, pos)
+        return kind, self._data[pos + 4:pos + 2 + length]
+
+    def function_type(self, item: int) -> int:
+        """Type index behind an LF_FUNC_ID / LF_MFUNC_ID item (IPI)."""
+        record = self.record(item)
+        if record and record[0] in (LF_FUNC_ID, LF_MFUNC_ID):
+            return struct.unpack_from("<I", record[1], 4)[0]
+        return 0
+
+    def procedure(self, index: int,
+                  depth: int = 0) -> Optional[Tuple[str, Optional[str], List[str]]]:
+        """(return type, calling convention, argument types) of a function type.
+
+        *depth* is the nesting level of the type being spelled, so that
+        self-referential signatures stop at _MAX_TYPE_DEPTH like other types.
+        """
+        record = self.record(index)
+        if record is None:
+            return None
+        kind, body = record
+        if kind == LF_PROCEDURE:
+            return_type, convention, _, _, arg_list = struct.unpack_from("<IBBHI", body)
+        elif kind == LF_MFUNCTION:
+            return_type, _, _, convention, _, _, arg_list = struct.unpack_from("<IIIBBHI", body)
+        else:
+            return None
+        return (self.name(return_type, depth), _CALLING_CONVENTIONS.get(convention),
+                self._arguments(arg_list, depth))
+
+    def _arguments(self, index: int, depth: int = 0) -> List[str]:
+        record = self.record(index)
+        if record is None or record[0] != LF_ARGLIST:
+            return []
+        count = struct.unpack_from("<I", record[1])[0]
+        types = struct.unpack_from(f"<{count}I", record[1], 4)
+        if types == (0,):  # unprototyped C function: f()
+            return []
+        # A varargs list ends in a "no type" entry
+        return [self.name(t, depth) if t else "..." for t in types]
+
+    def name(self, index: int, depth: int = 0) -> str:
+        """undname-style spelling of type *index*."""
+        if index < 0x1000:
+            base = _SIMPLE_TYPES.get(index & 0xFF, f"<simple 0x{index & 0xFF:02X}>")
+            return f"{base} *" if index >> 8 & 0x7 else base
+        if index in self._names:
+            return self._names[index]
+        record = self.record(index)
+        # A type reached again while it is being spelled refers to itself
+        if record is None or depth > _MAX_TYPE_DEPTH or index in self._spelling:
+            return f"<type 0x{index:X}>"
+        self._spelling.add(index)
+        try:
+            spelled = self._spell(index, *record, depth + 1)
+        finally:
+            self._spelling.discard(index)
+        self._names[index] = spelled
+        return spelled
+
+    def _spell(self, index: int, kind: int, body: bytes, depth: int) -> str:
+        if kind == LF_MODIFIER:
+            target, modifiers = struct.unpack_from("<IH", body)
+            return self.name(target, depth) + _qualifiers(modifiers & 1, modifiers & 2)
+        if kind == LF_POINTER:
+            target, attributes = struct.unpack_from("<II", body)
+            mode = attributes >> 5 & 0x7
+            pointee = self.record(target)
+            if pointee and pointee[0] in (LF_PROCEDURE, LF_MFUNCTION):
+                signature = self.procedure(target, depth)
+                return_type, convention, args = signature
+                return f"{return_type} ({convention or ''}*)({', '.join(args) or 'void'})"
+            symbol = {1: "&", 4: "&&"}.get(mode, "*")
+            return (f"{self.name(target, depth)} {symbol}"
+                    + _qualifiers(attributes & 0x400, attributes & 0x200))
+        if kind in (LF_CLASS, LF_STRUCTURE, LF_INTERFACE):
+            return _name(body, 16 + _numeric_size(body, 16))
+        if kind == LF_UNION:
+            return _name(body, 8 + _numeric_size(body, 8))
+        if kind == LF_ENUM:
+            return _name(body, 12)
+        if kind == LF_ARRAY:
+            element = struct.unpack_from("<I", body)[0]
+            return f"{self.name(element, depth)}[]"
+        if kind in (LF_PROCEDURE, LF_MFUNCTION):
+            return_type, convention, args = self.procedure(index, depth)
+            return f"{return_type} ({', '.join(args) or 'void'})"
+        return f"<type 0x{index:X}>"
+
+
+def _qualifiers(const, volatile) -> str:
+    return (" const" if const else "") + (" volatile" if volatile else "")
+
+
+def _numeric_size(body: bytes, pos: int) -> int:
+    """Byte length of the numeric leaf at *pos* (value < 0x8000 is inline)."""
+    leaf = struct.unpack_from("<H", body, pos)[0]
+    return 2 if leaf < 0x8000 else 2 + _NUMERIC_SIZES.get(leaf, 0)
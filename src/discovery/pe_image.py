@@ -0,0 +1,226 @@
+"""
+pe_image.py - Shared, memory-mapped PE image.
+
+A PEImage is opened once per target and handed to every PE analysis stage
+(classification, exports, imports, RPC, architecture) so a binary is mapped
+and its headers parsed a single time instead of once per stage.
+
+Implements:
+- DOS / COFF / optional header and section table parsing (struct over mmap)
+- Data directory lookup and RVA -> file offset translation
+- Resource directory lookup by named type (TYPELIB, ...)
+- One lazily built pefile.PE (export + import directories) shared by all callers
+"""
+
+import logging
+import mmap
+import struct
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pefile
+
+logger = logging.getLogger(__name__)
+
+# Data directory indices (IMAGE_DIRECTORY_ENTRY_*)
+DIR_EXPORT = 0
+DIR_IMPORT = 1
+DIR_RESOURCE = 2
+DIR_SECURITY = 4
+DIR_CLR = 14
+
+IMAGE_FILE_DLL = 0x2000
+
+_MACHINES = {
+    0x014C: "x86",
+    0x8664: "x64",
+    0x01C0: "ARM",
+    0xAA64: "ARM64",
+}
+
+
+class PEImage:
+    """Read-only memory map of a PE file with its headers parsed once.
+
+    Use ``PEImage.open()``; it returns None for anything that is not a PE
+    image.  Close the image (or use it as a context manager) when done.
+    """
+
+    def __init__(self, path: Path, data: mmap.mmap):
+        self.path = path
+        self.data = data
+        self._pefile: Optional[pefile.PE] = None
+        self._pefile_failed = False
+
+        self.pe_offset = struct.unpack_from('<I', data, 0x3C)[0]
+        (self.machine, self.num_sections, _, _, _,
+         self.opt_header_size, self.characteristics) = struct.unpack_from(
+            '<HHIIIHH', data, self.pe_offset + 4)
+
+        opt = self.pe_offset + 24
+        self.opt_magic = struct.unpack_from('<H', data, opt)[0]
+        self.is_64bit = self.opt_magic == 0x20B  # 0x20B = PE32+, 0x10B = PE32
+
+        # NumberOfRvaAndSizes sits at +108 (PE32+) / +92 (PE32) in the optional header
+        rva_count_offset = opt + (108 if self.is_64bit else 92)
+        self.data_directories: List[Tuple[int, int]] = []
+        if rva_count_offset + 4 <= len(data):
+            count = min(struct.unpack_from('<I', data, rva_count_offset)[0], 16)
+            for i in range(count):
+                entry = rva_count_offset + 4 + i * 8
+                if entry + 8 > len(data):
+                    break
+                self.data_directories.append(struct.unpack_from('<II', data, entry))
+
+        # Section table: (name, virtual_address, virtual_size, raw_offset, raw_size)
+        self.sections: List[Tuple[str, int, int, int, int]] = []
+        table = opt + self.opt_header_size
+        for i in range(self.num_sections):
+            entry = table + i * 40
+            if entry + 40 > len(data):
+                break
+            name, vsize, va, raw_size, raw_ptr = struct.unpack_from('<8sIIII', data, entry)
+            self.sections.append((name.rstrip(b'\x00').decode('ascii', errors='replace'),
+                                  va, vsize, raw_ptr, raw_size))
+
+    @classmethod
+    def open(cls, path: Path) -> Optional["PEImage"]:
+        """Map *path* and parse its headers; None if it is not a PE image."""
+        try:
+            with open(path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # ValueError: empty file
+            return None
+
+        image = cls.from_bytes(path, data)
+        if image is None:
+            data.close()
+        return image
+
+    @classmethod
+    def from_bytes(cls, path: Path, data) -> Optional["PEImage"]:
+        """Parse headers from data already in memory; None if it is not a PE image.
+
+        *data* may be just the start of the file (e.g. a classification
+        read): header facts are complete, and RVAs past its end translate
+        to None.
+        """
+        try:
+            if data[:2] == b'MZ' and len(data) >= 0x40:
+                pe_offset = struct.unpack_from('<I', data, 0x3C)[0]
+                if data[pe_offset:pe_offset + 4] == b'PE\x00\x00':
+                    return cls(path, data)
+        except struct.error:
+            pass
+        return None
+
+    def close(self) -> None:
+        # pefile.PE.close() only releases maps it opened itself (and forces a
+        # full gc.collect()), so just drop the reference to our shared view.
+        self._pefile = None
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __enter__(self) -> "PEImage":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ── Header facts ─────────────────────────────────────────────────────────
+
+    @property
+    def is_dll(self) -> bool:
+        return bool(self.characteristics & IMAGE_FILE_DLL)
+
+    @property
+    def architecture(self) -> Optional[str]:
+        return _MACHINES.get(self.machine)
+
+    def data_directory(self, index: int) -> Tuple[int, int]:
+        """(rva, size) of data directory *index*, or (0, 0) if absent."""
+        if index < len(self.data_directories):
+            return self.data_directories[index]
+        return 0, 0
+
+    @property
+    def has_clr(self) -> bool:
+        """True if the CLR Runtime Header (directory 14) is present (.NET)."""
+        rva, size = self.data_directory(DIR_CLR)
+        return rva > 0 and size > 0
+
+    def rva_to_offset(self, rva: int) -> Optional[int]:
+        """Translate an RVA to a file offset, or None if it is not file-backed."""
+        for _, va, vsize, raw_ptr, raw_size in self.sections:
+            if va <= rva < va + max(vsize, raw_size):
+                if rva - va >= raw_size:
+                    return None     # uninitialized tail: zero-filled, not in the file
+                offset = raw_ptr + (rva - va)
+                return offset if offset < len(self.data) else None
+        # Headers are mapped 1:1 below the first section
+        if rva < len(self.data) and (not self.sections or rva < self.sections[0][1]):
+            return rva
+        return None
+
+    def resources(self, type_name: str) -> List[Tuple[int, int]]:
+        """(file offset, size) of every resource of named type *type_name*.
+
+        Walks the type -> name/id -> language levels of the resource
+        directory; a malformed directory yields what was found before it.
+        """
+        rva, size = self.data_directory(DIR_RESOURCE)
+        root = self.rva_to_offset(rva) if rva and size else None
+        if root is None:
+            return []
+        found = []
+        try:
+            for name, type_dir, is_dir in self._resource_entries(root, root):
+                if not is_dir or name is None or name.upper() != type_name.upper():
+                    continue
+                for _, name_dir, is_dir in self._resource_entries(root, type_dir):
+                    if not is_dir:
+                        continue
+                    for _, leaf, is_dir in self._resource_entries(root, name_dir):
+                        if is_dir:
+                            continue
+                        data_rva, data_size = struct.unpack_from('<II', self.data, leaf)
+                        offset = self.rva_to_offset(data_rva)
+                        if offset is not None and offset + data_size <= len(self.data):
+                            found.append((offset, data_size))
+        except (struct.error, IndexError):
+            pass
+        return found
+
+    def _resource_entries(self, root: int, directory: int):
+        """(name or None for an id, file offset, is subdirectory) per entry."""
+        named, ids = struct.unpack_from('<HH', self.data, directory + 12)
+        for i in range(named + ids):
+            name_field, target = struct.unpack_from('<II', self.data, directory + 16 + i * 8)
+            name = None
+            if name_field & 0x80000000:
+                pos = root + (name_field & 0x7FFFFFFF)
+                length = struct.unpack_from('<H', self.data, pos)[0]
+                name = self.data[pos + 2:pos + 2 + length * 2].decode('utf-16-le', errors='replace')
+            yield name, root + (target & 0x7FFFFFFF), bool(target & 0x80000000)
+
+    # ── Shared pefile parse ──────────────────────────────────────────────────
+
+    @property
+    def pe(self) -> Optional[pefile.PE]:
+        """pefile view of the mapped data with export + import directories parsed.
+
+        Built on first use and shared by every caller; None if pefile rejects
+        the image.
+        """
+        if self._pefile is None and not self._pefile_failed:
+            try:
+                pe = pefile.PE(data=self.data, fast_load=True)
+                pe.parse_data_directories(directories=[
+                    pefile.DIRECTORY_ENTRY['IMAGE_DIRECTORY_ENTRY_EXPORT'],
+                    pefile.DIRECTORY_ENTRY['IMAGE_DIRECTORY_ENTRY_IMPORT'],
+                ])
+                self._pefile = pe
+            except Exception as e:
+                logger.warning(f"pefile could not parse {self.path.name}: {e}")
+                self._pefile_failed = True
+        return self._pefile
@@ -1,7 +1,9 @@
 """
 pe_parse.py - PE file parsing and export extraction.
 
-Extracts export table from PE files using pefile library.
+Reads the export and import tables straight from the memory-mapped image
+with struct.unpack_from (no per-structure Python objects), falling back to
+the pefile library only for images the fast path rejects as malformed.
 Replaces reliance on dumpbin.exe with a pure Python approach.
 """
 
@@ -11,113 +13,310 @@ import logging
 import subprocess
 import glob
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
-import pefile
+import ordlookup  # ships with pefile
 
+from pe_image import DIR_EXPORT, DIR_IMPORT, PEImage
 from schema import ExportedFunc
 
 logger = logging.getLogger(__name__)
 
-def read_pe_exports(dll_path: Path) -> Tuple[List[ExportedFunc], bool]:
-    """Read PE export table directly from DLL without dumpbin using `pefile`.
+# Same limits pefile applies (MAX_SYMBOL_NAME_LENGTH / MAX_IMPORT_SYMBOLS)
+_MAX_NAME_LENGTH = 0x200
+_MAX_IMPORT_SYMBOLS = 0x2000
 
-    Returns (exports_list, success_bool).
-    """
-    try:
-        import pefile
-    except Exception:
-        return [], False
+# Characters pefile accepts in export (relaxed) and import symbol names
+_NAME_CHARS = frozenset(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+_EXPORT_NAME_CHARS = _NAME_CHARS | frozenset(b"!\"#$%&'()*+,-./:<>?[\\]^_`{|}~@")
+_IMPORT_NAME_CHARS = _NAME_CHARS | frozenset(b"._?@$()<>")
+# DLL names are checked as DOS file names (pefile's is_valid_dos_filename),
+# which allows api-ms-win-*.dll and relative paths
+_DLL_NAME_CHARS = _NAME_CHARS | frozenset(b"!#$%&'()-@^_`{}~+,.;=[]:\\/")
 
-    try:
-        pe = pefile.PE(str(dll_path), fast_load=True)
-        try:
-            pe.parse_data_directories(directories=[pefile.DIRECTORY_ENTRY['IMAGE_DIRECTORY_ENTRY_EXPORT']])
-        except Exception:
-            pass
 
-        if not hasattr(pe, 'DIRECTORY_ENTRY_EXPORT') or not pe.DIRECTORY_ENTRY_EXPORT:
-            try:
-                pe.close()
-            except Exception:
-                pass
-            return [], False
+class MalformedPE(ValueError):
+    """The fast reader met a structure it will not guess about."""
 
-        exports: List[ExportedFunc] = []
-        for sym in pe.DIRECTORY_ENTRY_EXPORT.symbols:
-            name = None
-            if getattr(sym, 'name', None):
-                try:
-                    name = sym.name.decode('utf-8', errors='replace')
-                except Exception:
-                    name = str(sym.name)
 
-            ordinal = getattr(sym, 'ordinal', None)
-            if not name:
-                name = f"#{ordinal}" if ordinal is not None else "<unknown>"
+def _offset(image: PEImage, rva: int) -> int:
+    offset = image.rva_to_offset(rva)
+    if offset is None:
+        raise MalformedPE(f"RVA 0x{rva:x} is not backed by file data")
+    return offset
 
-            rva = None
-            if hasattr(sym, 'address') and sym.address is not None:
-                try:
-                    rva = hex(sym.address)
-                except Exception:
-                    rva = str(sym.address)
 
-            hint = str(ordinal) if ordinal is not None else None
+def _c_string(image: PEImage, view: memoryview, rva: int, allowed: frozenset) -> bytes:
+    """NUL-terminated name at *rva*, validated against *allowed* characters."""
+    start = _offset(image, rva)
+    end = image.data.find(b'\x00', start, start + _MAX_NAME_LENGTH)
+    if end < 0:
+        raise MalformedPE(f"unterminated name at RVA 0x{rva:x}")
+    name = bytes(view[start:end])
+    if not name or not allowed.issuperset(name):
+        raise MalformedPE(f"invalid name at RVA 0x{rva:x}")
+    return name
 
-            forwarded = None
-            if getattr(sym, 'forwarder', None):
-                try:
-                    forwarded = sym.forwarder.decode('utf-8', errors='replace')
-                except Exception:
-                    forwarded = str(sym.forwarder)
 
+def _read_exports_native(image: PEImage) -> List[ExportedFunc]:
+    """Walk IMAGE_EXPORT_DIRECTORY over the mapped image.
+
+    Emits named exports in name-table order, then ordinal-only exports, the
+    same order and content as pefile's DIRECTORY_ENTRY_EXPORT.symbols.
+    """
+    dir_rva, dir_size = image.data_directory(DIR_EXPORT)
+    if not dir_rva:
+        return []
+
+    with memoryview(image.data) as view:
+        (_, _, _, _, _, base, n_functions, n_names,
+         functions_rva, names_rva, ordinals_rva) = struct.unpack_from(
+            '<IIHHIIIIIII', view, _offset(image, dir_rva))
+        if n_functions > 0x10000 or n_names > n_functions:
+            raise MalformedPE("implausible export counts")
+
+        functions = struct.unpack_from(f'<{n_functions}I', view, _offset(image, functions_rva)) \
+            if n_functions else ()
+        names = struct.unpack_from(f'<{n_names}I', view, _offset(image, names_rva)) \
+            if n_names else ()
+        name_ordinals = struct.unpack_from(f'<{n_names}H', view, _offset(image, ordinals_rva)) \
+            if n_names else ()
+
+        def _forwarder(address: int) -> Optional[str]:
+            if dir_rva <= address < dir_rva + dir_size:
+                return _c_string(image, view, address, _EXPORT_NAME_CHARS).decode('utf-8', errors='replace')
+            return None
+
+        exports: List[ExportedFunc] = []
+        named = set()
+        for name_rva, index in zip(names, name_ordinals):
+            if index >= n_functions:
+                raise MalformedPE("name ordinal outside the function table")
+            address = functions[index]
+            if not address:
+                continue
+            name = _c_string(image, view, name_rva, _EXPORT_NAME_CHARS)
+            ordinal = base + index
+            named.add(index)
+            exports.append(ExportedFunc(
+                name=name.decode('utf-8', errors='replace'),
+                ordinal=ordinal,
+                hint=str(ordinal),
+                rva=hex(address),
+                forwarded_to=_forwarder(address),
+            ))
+
+        for index, address in enumerate(functions):
+            if not address or index in named:
+                continue
+            ordinal = base + index
             exports.append(ExportedFunc(
-                name=name,
+                name=f"#{ordinal}",
                 ordinal=ordinal,
-                hint=hint,
-                rva=rva,
-                forwarded_to=forwarded
+                hint=str(ordinal),
+                rva=hex(address),
+                forwarded_to=_forwarder(address),
             ))
 
+    return exports
+
+
+def _read_exports_pefile(image: PEImage) -> List[ExportedFunc]:
+    """Fallback export reader built on the image's shared pefile parse."""
+    pe = image.pe
+    if pe is None or not getattr(pe, 'DIRECTORY_ENTRY_EXPORT', None):
+        return []
+
+    exports: List[ExportedFunc] = []
+    for sym in pe.DIRECTORY_ENTRY_EXPORT.symbols:
+        name = None
+        if getattr(sym, 'name', None):
+            try:
+                name = sym.name.decode('utf-8', errors='replace')
+            except Exception:
+                name = str(sym.name)
+
+        ordinal = getattr(sym, 'ordinal', None)
+        if not name:
+            name = f"#{ordinal}" if ordinal is not None else "<unknown>"
+
+        rva = None
+        if hasattr(sym, 'address') and sym.address is not None:
+            try:
+                rva = hex(sym.address)
+            except Exception:
+                rva = str(sym.address)
+
+        hint = str(ordinal) if ordinal is not None else None
+
+        forwarded = None
+        if getattr(sym, 'forwarder', None):
+            try:
+                forwarded = sym.forwarder.decode('utf-8', errors='replace')
+            except Exception:
+                forwarded = str(sym.forwarder)
+
+        exports.append(ExportedFunc(
+            name=name,
+            ordinal=ordinal,
+            hint=hint,
+            rva=rva,
+            forwarded_to=forwarded
+        ))
+    return exports
+
+
+def read_pe_exports(dll_path: Path, image: Optional[PEImage] = None) -> Tuple[List[ExportedFunc], bool]:
+    """Read PE export table directly from DLL without dumpbin.
+
+    Uses the struct-based fast path; `pefile` is only consulted when the
+    export directory is malformed.
+
+    Args:
+        dll_path: Path to PE file
+        image: Already-opened PEImage of *dll_path* (opened here if omitted)
+
+    Returns (exports_list, success_bool).
+    """
+    if image is None:
+        image = PEImage.open(dll_path)
+        if image is None:
+            return [], False
+        with image:
+            return read_pe_exports(dll_path, image)
+
+    try:
+        exports = _read_exports_native(image)
+    except (MalformedPE, struct.error) as e:
+        logger.info(f"Export table of {dll_path.name} needs pefile fallback: {e}")
         try:
-            pe.close()
+            exports = _read_exports_pefile(image)
         except Exception:
-            pass
+            return [], False
 
-        return exports, len(exports) > 0
+    return exports, len(exports) > 0
 
-    except Exception:
-        return [], False
 
+def _read_imports_native(image: PEImage) -> Dict[str, List[str]]:
+    """Walk IMAGE_IMPORT_DESCRIPTORs and their thunk arrays over the mapped image."""
+    dir_rva, _ = image.data_directory(DIR_IMPORT)
+    if not dir_rva:
+        return {}
+
+    if image.is_64bit:
+        thunk_fmt, thunk_size, ordinal_flag = '<Q', 8, 1 << 63
+    else:
+        thunk_fmt, thunk_size, ordinal_flag = '<I', 4, 1 << 31
+
+    imports: Dict[str, List[str]] = {}
+    total = 0
+    with memoryview(image.data) as view:
+        desc = _offset(image, dir_rva)
+        while True:
+            original_thunk, _, _, name_rva, first_thunk = struct.unpack_from('<IIIII', view, desc)
+            if not (original_thunk or name_rva or first_thunk):
+                break
+            desc += 20
+
+            raw_name = _c_string(image, view, name_rva, _DLL_NAME_CHARS).lower()
+            dll_name = raw_name.decode('ascii')
+            funcs: List[str] = []
+            thunk = _offset(image, original_thunk or first_thunk)
+            while True:
+                value = struct.unpack_from(thunk_fmt, view, thunk)[0]
+                if not value:
+                    break
+                thunk += thunk_size
+                total += 1
+                if total > _MAX_IMPORT_SYMBOLS:
+                    raise MalformedPE("too many import symbols")
+                if value & ordinal_flag:
+                    # Named like pefile does for ws2_32 / wsock32 / oleaut32
+                    ordinal = value & 0xFFFF
+                    name = ordlookup.ordLookup(raw_name, ordinal, make_name=False)
+                    funcs.append(name.decode('ascii') if name else f"#{ordinal}")
+                else:
+                    # IMAGE_IMPORT_BY_NAME: WORD hint, then the name
+                    name = _c_string(image, view, (value & 0x7FFFFFFF) + 2, _IMPORT_NAME_CHARS)
+                    funcs.append(name.decode('ascii'))
+            imports[dll_name] = funcs
+
+    return imports
+
+
+def _read_imports_pefile(image: PEImage) -> Dict[str, List[str]]:
+    """Fallback import reader built on the image's shared pefile parse."""
+    imports = {}
+    pe = image.pe
+
+    if hasattr(pe, 'DIRECTORY_ENTRY_IMPORT'):
+        for entry in pe.DIRECTORY_ENTRY_IMPORT:
+            if entry.dll:
+                try:
+                    dll_name = entry.dll.decode('utf-8').lower()
+                except UnicodeDecodeError:
+                    dll_name = str(entry.dll)
+
+                func_list = []
+                for imp in entry.imports:
+                    if imp.name:
+                        try:
+                            func_list.append(imp.name.decode('utf-8'))
+                        except UnicodeDecodeError:
+                            func_list.append(str(imp.name))
+                    else:
+                        # Ordinal import
+                        func_list.append(f"#{imp.ordinal}")
+                imports[dll_name] = func_list
+    return imports
+
+
+def read_pe_imports(dll_path: Path, image: Optional[PEImage] = None) -> Tuple[Dict[str, List[str]], bool]:
+    """Read the import table: imported DLL name -> list of functions.
+
+    Ordinal-only imports are reported as ``#<ordinal>``, or by name for
+    DLLs whose ordinals pefile's ordlookup table knows.  Uses the
+    struct-based fast path, falling back to `pefile` for malformed tables.
+
+    Args:
+        dll_path: Path to PE file
+        image: Already-opened PEImage of *dll_path* (opened here if omitted)
+
+    Returns:
+        (imports_dict, success_bool)
+    """
+    if image is None:
+        image = PEImage.open(dll_path)
+        if image is None:
+            logger.error(f"Error reading imports from {dll_path}: not a PE image")
+            return {}, False
+        with image:
+            return read_pe_imports(dll_path, image)
 
-def get_pe_imports(dll_path: Path) -> Tuple[List[str], bool]:
-    """Extract list of imported DLLs using pefile.
+    try:
+        return _read_imports_native(image), True
+    except (MalformedPE, struct.error, UnicodeDecodeError) as e:
+        logger.info(f"Import table of {dll_path.name} needs pefile fallback: {e}")
+
+    try:
+        return _read_imports_pefile(image), image.pe is not None
+    except Exception as e:
+        logger.error(f"Error reading imports from {dll_path}: {e}")
+        return {}, False
+
+
+def get_pe_imports(dll_path: Path, image: Optional[PEImage] = None) -> Tuple[List[str], bool]:
+    """Extract list of imported DLLs.
     
     Args:
         dll_path: Path to PE file
+        image: Already-opened PEImage of *dll_path* (opened here if omitted)
         
     Returns:
         (list of lowercase DLL names, success_bool)
     """
-    try:
-        pe = pefile.PE(str(dll_path))
-        imports = []
-        
-        if hasattr(pe, 'DIRECTORY_ENTRY_IMPORT'):
-            for entry in pe.DIRECTORY_ENTRY_IMPORT:
-                if entry.dll:
-                    try:
-                        dll_name = entry.dll.decode('utf-8').lower()
-                        imports.append(dll_name)
-                    except UnicodeDecodeError:
-                        pass
-                        
-        return imports, True
-        
-    except Exception as e:
-        logger.error(f"Error reading imports from {dll_path}: {e}")
-        return [], False
+    imports, success = read_pe_imports(dll_path, image)
+    return list(imports), success
 
 # -------------------------------------------------------------------------
 # LEGACY DUMPBIN FUNCTIONS (DEPRECATED)
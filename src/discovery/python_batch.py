@@ -0,0 +1,73 @@
+"""
+python_batch.py - Batch analysis of Python source trees.
+
+Analyzes many .py modules at once for directory scans of large Python
+applications.  Modules are parsed in a process pool, handed out in chunks
+so that per-task overhead stays small next to a module's ast.parse(), and
+each worker runs the same analyzer as a single-file scan
+(script_analyzer.analyze_script).
+
+Caching is left to the caller: analyze_directory() looks each module up
+in its ScanCache (keyed per file, see scan_cache.py) before batching the
+rest, so a re-scan of a large tree only parses the modules that changed.
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, TypeVar
+
+from classify import FileType
+from schema import AnalysisResult, Invocable
+from script_analyzer import analyze_script
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Output kind of a Python module's invocables, as written by analyze_file()
+PYTHON_KIND = FileType.PYTHON_SCRIPT.value.lower()
+
+# Chunks handed to each worker over a batch; more than one so that workers
+# finishing early can pick up work from slow ones
+_CHUNKS_PER_WORKER = 4
+
+
+def analyze_python_files(paths: Sequence[Path], workers: int = 1) -> Dict[Path, AnalysisResult]:
+    """Analyze the Python modules *paths*; returns a result per path.
+
+    Results are those of ``analyze_file(path)`` without artifacts.  With
+    *workers* > 1, modules are parsed in that many processes.
+    """
+    results = {path: python_result(path, invocables)
+               for path, invocables in zip(paths, map_modules(analyze_script, paths, workers))}
+    logger.info("Python batch: %d module(s) parsed", len(paths))
+    return results
+
+
+def map_modules(func: Callable[[Path], T], paths: Sequence[Path], workers: int = 1) -> List[T]:
+    """``func(path)`` for each of *paths*, in order.
+
+    With *workers* > 1 the calls run in that many processes, handed out in
+    chunks; *func* must then be a module-level function.
+    """
+    workers = min(workers, len(paths))
+    if workers <= 1:
+        return [func(path) for path in paths]
+    chunk = max(1, len(paths) // (workers * _CHUNKS_PER_WORKER))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_quiet_worker) as pool:
+        return list(pool.map(func, paths, chunksize=chunk))
+
+
+def python_result(path: Path, invocables: List[Invocable]) -> AnalysisResult:
+    """The AnalysisResult analyze_file() gives for a module with *invocables*."""
+    return AnalysisResult(
+        target=path,
+        file_type=FileType.PYTHON_SCRIPT.value,
+        groups={PYTHON_KIND: invocables} if invocables else {},
+    )
+
+
+def _quiet_worker() -> None:
+    """Keep warnings visible but drop per-module INFO chatter in workers."""
+    logging.disable(logging.INFO)
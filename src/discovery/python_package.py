@@ -0,0 +1,445 @@
+"""
+python_package.py - Public API of Python package trees (package-aware mode).
+
+Plain Python analysis reports every public def of every module, which for
+an installed package is mostly internals.  This module reads the .py files
+of a directory once into an import graph and reports only what a user of
+the packages can reach:
+
+  - the names a package (its __init__.py) or top-level module exports:
+    its __all__ when that is a static list, otherwise its public defs and,
+    for a package, the names it imports from modules of the tree
+    (``from .core import open_db``)
+  - each name followed through re-export chains and star imports to the
+    function it names (under the exported name) or to the class it names
+    (its public methods)
+  - the public submodules of a package that exports nothing itself
+  - entry points: modules run as scripts (``if __name__ == "__main__":``,
+    a package's __main__.py) with the options of their argparse parser,
+    and click commands with the options of their decorators
+
+Imports of modules outside the scanned tree are not followed.
+"""
+
+import ast
+import dataclasses
+import logging
+from pathlib import Path
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from python_batch import map_modules
+from schema import Invocable
+from script_analyzer import one_liner, python_invocable, python_public_methods, python_statements
+
+logger = logging.getLogger(__name__)
+
+
+class PyImport(NamedTuple):
+    """One ``from <module> import <name> as <bound>`` of a module."""
+    level: int                  # leading dots
+    module: Optional[str]       # None for "from . import x"
+    name: str                   # '*' for a star import
+    bound: str                  # name bound in the importing module
+
+
+class ModuleInfo(NamedTuple):
+    """What package resolution needs to know about one module."""
+    defs: Dict[str, List[Invocable]]   # top-level function / class -> its invocable(s)
+    classes: FrozenSet[str]
+    imports: List[PyImport]
+    all_names: Optional[List[str]]     # None when there is no static __all__
+    all_refs: List[str]                # __all__ += <name>.__all__
+    main_guard: bool
+    doc: Optional[str]                 # argparse description or module docstring
+    cli_params: List[str]              # argparse options / arguments
+    commands: List[Invocable]          # click commands
+
+
+def analyze_python_package(paths: Sequence[Path], workers: int = 1) -> Dict[Path, List[Invocable]]:
+    """The public API and entry points of the Python modules *paths*.
+
+    *paths* should be every .py file of a tree: a directory is a package
+    when its __init__.py is among them.  Modules are read in *workers*
+    processes.  Returns the invocables each module defines (an empty list
+    for modules that contribute nothing).
+    """
+    paths = list(paths)
+    infos = dict(zip(paths, map_modules(python_module_info, paths, workers)))
+    graph = _ImportGraph({path: info for path, info in infos.items() if info is not None})
+
+    results: Dict[Path, List[Invocable]] = {path: [] for path in paths}
+    emitted: Set[Tuple[Path, str]] = set()
+    for root in graph.roots():
+        for name, (path, def_name) in graph.surface(root):
+            if (path, def_name) in emitted:
+                continue
+            emitted.add((path, def_name))
+            results[path].extend(graph.invocables(path, def_name, name))
+
+    for path in graph.modules:
+        results[path].extend(graph.entry_points(path))
+
+    logger.info("Python package API: %d invocables from %d module(s)",
+                sum(len(invocables) for invocables in results.values()), len(paths))
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Per-module facts (run in pool workers)
+# ---------------------------------------------------------------------------
+
+def python_module_info(path: Path) -> Optional[ModuleInfo]:
+    """Parse *path*; None if it cannot be read or parsed."""
+    try:
+        tree = ast.parse(path.read_text(encoding='utf-8', errors='replace'), filename=str(path))
+    except (OSError, SyntaxError, ValueError) as exc:
+        logger.warning("Python package: skipping %s: %s", path.name, exc)
+        return None
+
+    defs: Dict[str, List[Invocable]] = {}
+    classes: Set[str] = set()
+    imports: List[PyImport] = []
+    uses_click = False
+    commands: List[Invocable] = []
+    for node in python_statements(tree.body):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            defs[node.name] = [python_invocable(node, path)]
+            command = _click_command(node, path)
+            if command is not None:
+                commands.append(command)
+        elif isinstance(node, ast.ClassDef):
+            defs[node.name] = [python_invocable(method, path)
+                               for method in python_public_methods(node)]
+            classes.add(node.name)
+        elif isinstance(node, ast.ImportFrom):
+            uses_click = uses_click or (node.module or '').split('.')[0] == 'click'
+            imports.extend(PyImport(node.level, node.module, alias.name, alias.asname or alias.name)
+                           for alias in node.names)
+        elif isinstance(node, ast.Import):
+            uses_click = uses_click or any(alias.name.split('.')[0] == 'click' for alias in node.names)
+
+    all_names, all_refs = _static_all(tree.body)
+    main_guard = any(_is_main_guard(node) for node in tree.body)
+    doc = one_liner(ast.get_docstring(tree) or '')
+    cli_params: List[str] = []
+    if main_guard or path.name == '__main__.py':
+        description, cli_params = _argparse_options(tree)
+        doc = description or doc
+
+    return ModuleInfo(defs, frozenset(classes), imports, all_names, all_refs, main_guard, doc,
+                      cli_params, commands if uses_click else [])
+
+
+def _static_all(body: List[ast.stmt]) -> Tuple[Optional[List[str]], List[str]]:
+    """The names in a module's __all__ and the modules whose __all__ it
+    adds; (None, []) if there is no __all__ or it is not a static list."""
+    names: Optional[List[str]] = None
+    refs: List[str] = []
+
+    def add(value: ast.expr) -> bool:
+        if isinstance(value, (ast.List, ast.Tuple)):
+            items = [elt.value for elt in value.elts
+                     if isinstance(elt, ast.Constant) and isinstance(elt.value, str)]
+            names.extend(items)
+            return len(items) == len(value.elts)
+        if isinstance(value, ast.BinOp) and isinstance(value.op, ast.Add):
+            return add(value.left) and add(value.right)
+        if (isinstance(value, ast.Attribute) and value.attr == '__all__'
+                and isinstance(value.value, ast.Name)):
+            refs.append(value.value.id)
+            return True
+        return False
+
+    for node in python_statements(body):
+        if isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            if not any(isinstance(t, ast.Name) and t.id == '__all__' for t in targets):
+                continue
+            names, refs = [], []
+            if node.value is None or not add(node.value):
+                return None, []
+        elif (isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name)
+              and node.target.id == '__all__'):
+            if names is None or not add(node.value):
+                return None, []
+        elif (isinstance(node, ast.Expr) and isinstance(node.value, ast.Call)
+              and isinstance(node.value.func, ast.Attribute)
+              and isinstance(node.value.func.value, ast.Name)
+              and node.value.func.value.id == '__all__'):
+            call = node.value
+            if names is None or len(call.args) != 1:
+                return None, []
+            if call.func.attr == 'append':
+                arg = call.args[0]
+                if not (isinstance(arg, ast.Constant) and isinstance(arg.value, str)):
+                    return None, []
+                names.append(arg.value)
+            elif call.func.attr != 'extend' or not add(call.args[0]):
+                return None, []
+    return names, refs
+
+
+def _is_main_guard(node: ast.stmt) -> bool:
+    """Whether *node* is ``if __name__ == "__main__":``."""
+    if not isinstance(node, ast.If) or not isinstance(node.test, ast.Compare):
+        return False
+    test = node.test
+    if len(test.ops) != 1 or not isinstance(test.ops[0], ast.Eq):
+        return False
+    sides = [test.left, test.comparators[0]]
+    return (any(isinstance(s, ast.Name) and s.id == '__name__' for s in sides)
+            and any(isinstance(s, ast.Constant) and s.value == '__main__' for s in sides))
+
+
+def _argparse_options(tree: ast.Module) -> Tuple[Optional[str], List[str]]:
+    """The ArgumentParser description and add_argument() options of a script."""
+    description: Optional[str] = None
+    options: List[str] = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        func_name = func.attr if isinstance(func, ast.Attribute) else getattr(func, 'id', '')
+        if func_name == 'ArgumentParser' and description is None:
+            for kw in node.keywords:
+                if kw.arg == 'description' and isinstance(kw.value, ast.Constant):
+                    description = one_liner(str(kw.value.value))
+        elif func_name == 'add_argument':
+            option = _option_name(node)
+            if option and option not in options:
+                options.append(option)
+    return description, options
+
+
+def _click_command(node: ast.FunctionDef, path: Path) -> Optional[Invocable]:
+    """The click command declared by the decorators of *node*, if any."""
+    name: Optional[str] = None
+    params: List[str] = []
+    for decorator in node.decorator_list:
+        call = decorator if isinstance(decorator, ast.Call) else None
+        func = call.func if call is not None else decorator
+        attr = func.attr if isinstance(func, ast.Attribute) else getattr(func, 'id', '')
+        if attr in ('command', 'group'):
+            name = node.name.replace('_', '-')
+            if call is not None and call.args and isinstance(call.args[0], ast.Constant):
+                name = str(call.args[0].value)
+        elif attr in ('option', 'argument') and call is not None:
+            option = _option_name(call)
+            if option:
+                params.append(option)
+    if name is None:
+        return None
+    return Invocable(
+        name=name,
+        source_type='python_cli',
+        signature=f"{name} [OPTIONS]" + ''.join(f" {p.upper()}" for p in params if not p.startswith('-')),
+        parameters=', '.join(params),
+        doc_comment=one_liner(ast.get_docstring(node) or ''),
+        confidence='high',
+        dll_path=str(path),
+    )
+
+
+def _option_name(call: ast.Call) -> Optional[str]:
+    """The longest flag (or the positional name) among a call's string arguments."""
+    flags = [arg.value for arg in call.args
+             if isinstance(arg, ast.Constant) and isinstance(arg.value, str)]
+    return max(flags, key=len) if flags else None
+
+
+# ---------------------------------------------------------------------------
+# Import graph (main process)
+# ---------------------------------------------------------------------------
+
+# A name resolved to the module defining it and the def it names there
+_Target = Tuple[Path, str]
+
+
+class _ImportGraph:
+    """Modules of the scanned tree, keyed by path, with import resolution."""
+
+    def __init__(self, modules: Dict[Path, ModuleInfo]):
+        self.modules = modules
+        self.names = {path: self._dotted_name(path) for path in modules}
+        self.by_name: Dict[str, Path] = {}
+        for path in sorted(modules):
+            self.by_name.setdefault(self.names[path], path)
+        self._exports: Dict[Path, List[str]] = {}
+        self._surfaces: Dict[Path, List[Tuple[str, _Target]]] = {}
+
+    def _in_package(self, directory: Path) -> bool:
+        return directory / '__init__.py' in self.modules
+
+    def _dotted_name(self, path: Path) -> str:
+        parts = [] if path.name == '__init__.py' else [path.stem]
+        directory = path.parent
+        while self._in_package(directory):
+            parts.insert(0, directory.name)
+            directory = directory.parent
+        return '.'.join(parts)
+
+    def _module(self, base: Path) -> Optional[Path]:
+        """The module at *base* (``base.py`` or ``base/__init__.py``) if scanned."""
+        for path in (base.with_name(base.name + '.py'), base / '__init__.py'):
+            if path in self.modules:
+                return path
+        return None
+
+    def roots(self) -> List[Path]:
+        """Top-level packages and public modules outside any package."""
+        roots = []
+        for path in sorted(self.modules):
+            if path.name == '__init__.py':
+                if not self._in_package(path.parent.parent):
+                    roots.append(path)
+            elif not self._in_package(path.parent) and not path.stem.startswith('_'):
+                roots.append(path)
+        return roots
+
+    def _public_submodules(self, directory: Path) -> List[Path]:
+        """Modules and packages directly in package *directory* not named '_...'."""
+        children = []
+        for path in sorted(self.modules):
+            if path.parent == directory and path.name != '__init__.py':
+                if not path.stem.startswith('_'):
+                    children.append(path)
+            elif (path.parent.parent == directory and path.name == '__init__.py'
+                  and not path.parent.name.startswith('_')):
+                children.append(path)
+        return children
+
+    def _submodule(self, package: Path, name: str) -> Optional[Path]:
+        if package.name != '__init__.py':
+            return None
+        return self._module(package.parent / name)
+
+    def _import_source(self, importer: Path, imp: PyImport) -> Optional[Path]:
+        """The scanned module an import takes names from."""
+        if imp.level:
+            base = importer.parent
+            for _ in range(imp.level - 1):
+                base = base.parent
+            if not imp.module:
+                return self._module(base) if base / '__init__.py' in self.modules else None
+            return self._module(base.joinpath(*imp.module.split('.')))
+        return self.by_name.get(imp.module or '')
+
+    def exports(self, path: Path) -> List[str]:
+        """Names module *path* exports (see the module docstring)."""
+        if path in self._exports:
+            return self._exports[path]
+        self._exports[path] = []    # import cycles export nothing more
+        info = self.modules[path]
+        if info.all_names is not None:
+            names = list(info.all_names)
+            for ref in info.all_refs:
+                source = self._named_module(path, ref, set())
+                if source is not None:
+                    names.extend(self.exports(source))
+        else:
+            names = [name for name in info.defs if not name.startswith('_')]
+            if path.name == '__init__.py':
+                for imp in info.imports:
+                    source = self._import_source(path, imp)
+                    if source is None:
+                        continue
+                    if imp.name == '*':
+                        names.extend(self.exports(source))
+                    elif not imp.bound.startswith('_'):
+                        names.append(imp.bound)
+        names = list(dict.fromkeys(names))
+        self._exports[path] = names
+        return names
+
+    def resolve(self, path: Path, name: str) -> List[Tuple[str, _Target]]:
+        """(name, def) pairs *name* stands for in module *path*: the function
+        or class it names, or the surface of the module it names."""
+        target = self._definition(path, name, set())
+        if target is not None:
+            return [(name, target)]
+        module = self._named_module(path, name, set())
+        return self.surface(module) if module is not None else []
+
+    def _definition(self, path: Path, name: str, seen: Set[_Target]) -> Optional[_Target]:
+        """The def *name* is bound to in *path*, through imports from the tree."""
+        if (path, name) in seen:
+            return None
+        seen.add((path, name))
+        info = self.modules[path]
+        if name in info.defs:
+            return path, name
+        for imp in reversed(info.imports):
+            if imp.bound == name and imp.name != '*':
+                source = self._import_source(path, imp)
+                return None if source is None else self._definition(source, imp.name, seen)
+        for imp in info.imports:
+            if imp.name == '*':
+                source = self._import_source(path, imp)
+                if source is not None and name in self.exports(source):
+                    target = self._definition(source, name, seen)
+                    if target is not None:
+                        return target
+        return None
+
+    def _named_module(self, path: Path, name: str, seen: Set[_Target]) -> Optional[Path]:
+        """The module *name* is bound to in *path* (``from . import sub``, or a
+        submodule of the package *path*)."""
+        if (path, name) in seen:
+            return None
+        seen.add((path, name))
+        for imp in reversed(self.modules[path].imports):
+            if imp.bound == name and imp.name != '*':
+                source = self._import_source(path, imp)
+                if source is None:
+                    return None
+                # An attribute of the package first, else its submodule
+                return self._named_module(source, imp.name, seen) or self._submodule(source, imp.name)
+        return self._submodule(path, name)
+
+    def surface(self, path: Path) -> List[Tuple[str, _Target]]:
+        """(exported name, def) pairs of module *path*; a package exporting
+        nothing stands for the surfaces of its public submodules."""
+        if path in self._surfaces:
+            return self._surfaces[path]
+        self._surfaces[path] = []
+        pairs = [pair for name in self.exports(path) for pair in self.resolve(path, name)]
+        if not pairs and path.name == '__init__.py':
+            for child in self._public_submodules(path.parent):
+                pairs.extend(self.surface(child))
+        self._surfaces[path] = pairs
+        return pairs
+
+    def invocables(self, path: Path, def_name: str, exported_as: str) -> List[Invocable]:
+        """Invocables of def *def_name* of *path*; a function re-exported under
+        another name is reported under that name."""
+        invocables = self.modules[path].defs[def_name]
+        if def_name in self.modules[path].classes or exported_as == def_name:
+            return list(invocables)
+        inv = invocables[0]
+        return [dataclasses.replace(
+            inv, name=exported_as,
+            signature=inv.signature.replace(f"def {def_name}(", f"def {exported_as}(", 1))]
+
+    def entry_points(self, path: Path) -> List[Invocable]:
+        """The script entry point and click commands of module *path*."""
+        info = self.modules[path]
+        invocables: List[Invocable] = []
+        is_main = path.name == '__main__.py'
+        # A script whose options all come from click is described by its commands
+        if (info.main_guard or is_main) and (info.cli_params or not info.commands):
+            name = self.names[path]
+            if is_main:
+                name = name.rpartition('.')[0] or path.parent.name
+            in_package = self._in_package(path.parent)
+            command = f"python -m {name}" if in_package else f"python {path.name}"
+            invocables.append(Invocable(
+                name=name,
+                source_type='python_cli',
+                signature=command + (" [options]" if info.cli_params else ""),
+                parameters=', '.join(info.cli_params) or None,
+                doc_comment=info.doc or 'Python script entry point',
+                confidence='high' if info.cli_params else 'medium',
+                dll_path=str(path),
+            ))
+        invocables.extend(info.commands)
+        return invocables
@@ -4,17 +4,20 @@ rpc_analyzer.py - RPC (Remote Procedure Call) endpoint detection and analysis.
 Detects RPC interfaces in native DLLs by:
 1. Analyzing imports (RpcServer*, RpcBinding*, etc.)
 2. Searching for MIDL-generated stub/proxy code patterns
-3. Extracting interface UUIDs from binary
+3. Locating MIDL RPC_SERVER/CLIENT_INTERFACE structures (UUID + version)
 4. Detecting named pipes and RPC endpoints
 """
 
 import logging
 import re
 import struct
+import uuid
 from pathlib import Path
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 
+from binary_strings import BinaryString, extract_strings
+from pe_image import PEImage
 from schema import Invocable
 
 logger = logging.getLogger(__name__)
@@ -38,66 +41,100 @@ class RpcInterface:
             self.procedures = []
 
 
-def extract_uuids_from_binary(dll_path: Path) -> List[str]:
-    """Extract UUID patterns from binary data.
-    
-    RPC interface UUIDs are stored in specific format:
-    GUID: {XXXXXXXX-XXXX-XXXX-XXXX-XXXXXXXXXXXX}
-    Binary: 16 bytes in little-endian format
+def _binary_data(dll_path: Path, image: Optional[PEImage]):
+    """Bytes of the target: the shared image's memory map, or a fresh read."""
+    if image is not None:
+        return image.data
+    with open(dll_path, 'rb') as f:
+        return f.read()
+
+
+# RPC protocol sequences -> endpoint type
+PROTSEQ_NAMES = {
+    'ncacn_np': 'Named Pipes',
+    'ncacn_ip_tcp': 'TCP/IP',
+    'ncacn_http': 'HTTP',
+    'ncalrpc': 'Local RPC',
+    'ncadg_ip_udp': 'UDP',
+    'ncacn_hvsocket': 'Hyper-V Socket',
+}
+
+_PIPE_RE = re.compile(r'\\\\\.\\pipe\\[\w\-_]+')
+# Protocol sequence, optionally followed by a string binding "[:host][endpoint]"
+_ENDPOINT_RE = re.compile(r'\b(?:%s)\b(?::[\w.\-]*\[[^\]\s]*\])?' % '|'.join(PROTSEQ_NAMES))
+
+# Transfer syntaxes as laid out in RPC_SYNTAX_IDENTIFIER (GUID + RPC_VERSION)
+_NDR_SYNTAX = uuid.UUID('8a885d04-1ceb-11c9-9fe8-08002b104860').bytes_le + struct.pack('<HH', 2, 0)
+_NDR64_SYNTAX = uuid.UUID('71710533-beba-4937-8319-b5dbef9ccc36').bytes_le + struct.pack('<HH', 1, 0)
+
+# sizeof(RPC_SERVER_INTERFACE) == sizeof(RPC_CLIENT_INTERFACE) -> pointer size
+_INTERFACE_LENGTHS = {0x44: 4, 0x60: 8}
+
+# Offsets inside the structure: Length, InterfaceId, TransferSyntax, and the
+# DispatchTable pointer, which is pointer-aligned (4 bytes of padding on x64)
+_IID_OFFSET = 4
+_SYNTAX_OFFSET = 24
+_DISPATCH_OFFSETS = {4: 44, 8: 48}
+
+
+def find_rpc_interfaces(dll_path: Path, image: Optional[PEImage] = None) -> List[RpcInterface]:
+    """Locate MIDL RPC_SERVER_INTERFACE / RPC_CLIENT_INTERFACE structures.
+
+    Every MIDL stub embeds one of these; the transfer syntax (NDR or NDR64)
+    is searched with ``find()`` and each hit is confirmed by the structure's
+    ``Length`` field 24 bytes earlier.  A non-null DispatchTable marks a
+    server stub, a null one a client stub.
+
+    Returns:
+        One RpcInterface per (UUID, version), in file order
     """
-    uuids = []
-    
     try:
-        with open(dll_path, 'rb') as f:
-            data = f.read()
-        
-        # Search for UUID patterns in binary
-        # UUIDs typically appear near MIDL stub code
-        # Pattern: Look for 16-byte aligned GUID structures
-        
-        offset = 0
-        while offset < len(data) - 16:
-            try:
-                # Try to parse as GUID (little-endian)
-                guid_bytes = data[offset:offset+16]
-                
-                # Basic validation: first field should look reasonable
-                # (not all zeros, not all FFs)
-                if guid_bytes != b'\x00' * 16 and guid_bytes != b'\xff' * 16:
-                    # Parse GUID components
-                    data1 = struct.unpack('<I', guid_bytes[0:4])[0]
-                    data2 = struct.unpack('<H', guid_bytes[4:6])[0]
-                    data3 = struct.unpack('<H', guid_bytes[6:8])[0]
-                    data4 = guid_bytes[8:16]
-                    
-                    # Format as UUID string
-                    uuid_str = f"{{{data1:08X}-{data2:04X}-{data3:04X}-"
-                    uuid_str += f"{data4[0]:02X}{data4[1]:02X}-"
-                    uuid_str += ''.join(f"{b:02X}" for b in data4[2:])
-                    uuid_str += "}"
-                    
-                    # Check if it looks like a valid RPC interface UUID
-                    # (heuristic: version field should be small)
-                    if data2 < 100 and data3 < 100:
-                        if uuid_str not in uuids:
-                            uuids.append(uuid_str)
-                
-            except Exception:
-                pass
-            
-            offset += 4  # Search every 4 bytes (alignment)
-            
-            # Limit to prevent excessive processing
-            if len(uuids) > 50:
-                break
-        
-        logger.info(f"Found {len(uuids)} potential UUIDs in {dll_path.name}")
-        return uuids
-        
-    except Exception as e:
-        logger.warning(f"Error extracting UUIDs: {e}")
+        data = _binary_data(dll_path, image)
+    except OSError as e:
+        logger.warning(f"Error scanning RPC interfaces: {e}")
         return []
 
+    found: Dict[tuple, tuple] = {}
+    for syntax in (_NDR_SYNTAX, _NDR64_SYNTAX):
+        pos = data.find(syntax)
+        while pos != -1:
+            start = pos - _SYNTAX_OFFSET
+            if start >= 0:
+                length = struct.unpack_from('<I', data, start)[0]
+                ptr_size = _INTERFACE_LENGTHS.get(length)
+                if ptr_size and start + length <= len(data):
+                    iid = bytes(data[start + _IID_OFFSET:start + _IID_OFFSET + 16])
+                    major, minor = struct.unpack_from('<HH', data, start + _IID_OFFSET + 16)
+                    dispatch = struct.unpack_from('<Q' if ptr_size == 8 else '<I',
+                                                  data, start + _DISPATCH_OFFSETS[ptr_size])[0]
+                    if iid != bytes(16):
+                        key = (iid, major, minor)
+                        first, is_server, is_client = found.get(key, (start, False, False))
+                        found[key] = (min(first, start), is_server or bool(dispatch),
+                                      is_client or not dispatch)
+            pos = data.find(syntax, pos + 1)
+
+    interfaces = []
+    for (iid, major, minor), (_, is_server, is_client) in sorted(found.items(), key=lambda kv: kv[1][0]):
+        interfaces.append(RpcInterface(
+            uuid="{" + str(uuid.UUID(bytes_le=iid)).upper() + "}",
+            version=f"{major}.{minor}",
+            is_server=is_server,
+            is_client=is_client,
+        ))
+
+    logger.info(f"Found {len(interfaces)} RPC interface structures in {dll_path.name}")
+    return interfaces
+
+
+def extract_uuids_from_binary(dll_path: Path, image: Optional[PEImage] = None) -> List[str]:
+    """Extract RPC interface UUIDs from binary data.
+    
+    UUIDs are formatted as {XXXXXXXX-XXXX-XXXX-XXXX-XXXXXXXXXXXX}; see
+    find_rpc_interfaces() for how they are located.
+    """
+    return [iface.uuid for iface in find_rpc_interfaces(dll_path, image)]
+
 
 def detect_rpc_from_imports(imports: Dict[str, List[str]]) -> Dict:
     """Detect RPC usage from import table.
@@ -134,47 +171,40 @@ def detect_rpc_from_imports(imports: Dict[str, List[str]]) -> Dict:
     rpc_info['is_client'] = len(client_funcs) > 0
     rpc_info['functions'] = all_functions
     
-    # Detect endpoint types
-    endpoint_keywords = {
-        'ncacn_np': 'Named Pipes',
-        'ncacn_ip_tcp': 'TCP/IP',
-        'ncacn_http': 'HTTP',
-        'ncalrpc': 'Local RPC'
-    }
-    
-    # These would be detected from string analysis
-    # For now, infer from function usage
+    # Endpoint types proper come from string analysis (search_rpc_endpoints);
+    # here only infer them from function usage
     if any('Protseq' in f for f in all_functions):
         rpc_info['endpoint_types'].append('Protocol sequence detected')
     
     return rpc_info
 
 
-def search_named_pipes(dll_path: Path) -> List[str]:
-    """Search for named pipe references in binary.
+def _strings(dll_path: Path, image: Optional[PEImage],
+             strings: Optional[List[BinaryString]]) -> List[BinaryString]:
+    return strings if strings is not None else extract_strings(dll_path, image)
+
+
+def search_named_pipes(dll_path: Path, image: Optional[PEImage] = None,
+                       strings: Optional[List[BinaryString]] = None) -> List[str]:
+    r"""Search for named pipe references in binary.
     
     Named pipes used for RPC typically follow pattern:
     \\.\pipe\<name>
+
+    Args:
+        dll_path: Path to DLL
+        image: Already-opened PEImage of *dll_path* (read here if omitted)
+        strings: Pre-extracted binary strings (extracted here if omitted)
     """
-    pipes = []
-    
     try:
-        with open(dll_path, 'rb') as f:
-            data = f.read()
-        
-        # Convert to string (try UTF-16 and ASCII)
-        try:
-            text_utf16 = data.decode('utf-16le', errors='ignore')
-            text_ascii = data.decode('ascii', errors='ignore')
-            combined = text_utf16 + ' ' + text_ascii
-        except:
-            combined = str(data)
-        
-        # Search for named pipe patterns
-        pipe_pattern = r'\\\\\.\\pipe\\[\w\-_]+'
-        matches = re.findall(pipe_pattern, combined)
-        
-        pipes = list(set(matches))[:20]  # Limit to 20 unique pipes
+        pipes: List[str] = []
+        for s in _strings(dll_path, image, strings):
+            if '\\pipe\\' not in s.text:
+                continue
+            for pipe in _PIPE_RE.findall(s.text):
+                if pipe not in pipes:
+                    pipes.append(pipe)
+        pipes = pipes[:20]  # Limit to 20 unique pipes
         
         if pipes:
             logger.info(f"Found {len(pipes)} named pipe references")
@@ -186,12 +216,45 @@ def search_named_pipes(dll_path: Path) -> List[str]:
         return []
 
 
-def analyze_rpc(dll_path: Path, imports: Dict[str, List[str]] = None) -> Dict:
+def search_rpc_endpoints(dll_path: Path, image: Optional[PEImage] = None,
+                         strings: Optional[List[BinaryString]] = None) -> List[str]:
+    """Search for RPC protocol sequences and string bindings.
+
+    Finds ``ncalrpc`` / ``ncacn_*`` / ``ncadg_*`` references, including the
+    endpoint when written as a string binding (``ncalrpc:[LRPC-Foo]``).
+
+    Args:
+        dll_path: Path to DLL
+        image: Already-opened PEImage of *dll_path* (read here if omitted)
+        strings: Pre-extracted binary strings (extracted here if omitted)
+    """
+    endpoints: List[str] = []
+    try:
+        for s in _strings(dll_path, image, strings):
+            if 'nca' not in s.text:
+                continue
+            for endpoint in _ENDPOINT_RE.findall(s.text):
+                if endpoint not in endpoints:
+                    endpoints.append(endpoint)
+    except Exception as e:
+        logger.warning(f"Error searching RPC endpoints: {e}")
+        return []
+
+    if endpoints:
+        logger.info(f"Found {len(endpoints)} RPC endpoint references")
+    return endpoints[:20]
+
+
+def analyze_rpc(dll_path: Path, imports: Dict[str, List[str]] = None,
+                image: Optional[PEImage] = None,
+                strings: Optional[List[BinaryString]] = None) -> Dict:
     """Comprehensive RPC analysis.
     
     Args:
         dll_path: Path to DLL
         imports: Optional pre-parsed imports
+        image: Already-opened PEImage of *dll_path* (read here if omitted)
+        strings: Pre-extracted binary strings (extracted here if omitted)
         
     Returns:
         Dict with RPC analysis results
@@ -202,6 +265,7 @@ def analyze_rpc(dll_path: Path, imports: Dict[str, List[str]] = None) -> Dict:
         'has_rpc': False,
         'interfaces': [],
         'named_pipes': [],
+        'endpoints': [],
         'summary': {}
     }
     
@@ -215,23 +279,24 @@ def analyze_rpc(dll_path: Path, imports: Dict[str, List[str]] = None) -> Dict:
         logger.info("No RPC usage detected in imports")
         return analysis
     
-    # 2. Extract UUIDs (potential RPC interface IDs)
-    uuids = extract_uuids_from_binary(dll_path)
+    # 2. Locate MIDL interface structures
+    interfaces = find_rpc_interfaces(dll_path, image)
     
-    # 3. Search for named pipes
-    pipes = search_named_pipes(dll_path)
+    # 3. Search strings (extracted once) for named pipes and RPC endpoints
+    strings = _strings(dll_path, image, strings)
+    pipes = search_named_pipes(dll_path, strings=strings)
+    endpoints = search_rpc_endpoints(dll_path, strings=strings)
     analysis['named_pipes'] = pipes
+    analysis['endpoints'] = endpoints
+    for endpoint in endpoints:
+        label = PROTSEQ_NAMES[endpoint.split(':', 1)[0]]
+        if label not in analysis['summary']['endpoint_types']:
+            analysis['summary']['endpoint_types'].append(label)
     
-    # 4. Create RpcInterface objects for discovered interfaces
-    for uuid in uuids[:10]:  # Limit to first 10
-        interface = RpcInterface(
-            uuid=uuid,
-            version="1.0",  # Default version
-            name=f"RPC Interface {uuid}",
-            is_server=analysis['summary'].get('is_server', False),
-            is_client=analysis['summary'].get('is_client', False),
-            endpoints=pipes if pipes else ['Unknown']
-        )
+    # 4. Attach endpoints to every discovered interface
+    for interface in interfaces:
+        interface.name = f"RPC Interface {interface.uuid}"
+        interface.endpoints = (pipes + endpoints) or ['Unknown']
         analysis['interfaces'].append(interface)
     
     logger.info(f"RPC analysis complete: {len(analysis['interfaces'])} interfaces found")
@@ -257,14 +322,13 @@ def rpc_to_invocables(rpc_analysis: Dict, dll_path: Path) -> List[Invocable]:
     interfaces = rpc_analysis.get('interfaces', [])
     
     for interface in interfaces:
-        # RPC interfaces with server functions detected = HIGH confidence
-        # RPC interfaces from binary UUID scan only = MEDIUM confidence
+        # Interfaces confirmed by a MIDL server/client stub structure = HIGH confidence
         confidence = 'high' if interface.is_server or interface.is_client else 'medium'
         reasons = ['RPC interface UUID detected']
         if interface.is_server:
-            reasons.append('RPC server functions imported')
+            reasons.append('MIDL server interface structure (dispatch table present)')
         if interface.is_client:
-            reasons.append('RPC client functions imported')
+            reasons.append('MIDL client interface structure')
         
         invocable = Invocable(
             name=interface.name or f"RPC_{interface.uuid}",
@@ -336,4 +400,12 @@ def format_rpc_summary(rpc_analysis: Dict) -> str:
         if len(pipes) > 5:
             lines.append(f"    ... and {len(pipes) - 5} more")
     
+    endpoints = rpc_analysis.get('endpoints', [])
+    if endpoints:
+        lines.append(f"\n  Endpoints: {len(endpoints)}")
+        for endpoint in endpoints[:5]:
+            lines.append(f"    - {endpoint}")
+        if len(endpoints) > 5:
+            lines.append(f"    ... and {len(endpoints) - 5} more")
+    
     return '\n'.join(lines)
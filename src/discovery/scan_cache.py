@@ -0,0 +1,245 @@
+"""
+scan_cache.py - Persistent incremental scan cache.
+
+Stores the invocables found for each analyzed file in a SQLite database
+(``.mcp_scan_cache.sqlite`` under the output directory) so re-scans of a
+patched install tree only re-analyze files whose content changed.
+
+Entries are keyed by:
+- SHA-256 of the file content (plus the size/mtime of a .NET assembly's
+  sibling XML documentation file)
+- the resolved target path (results name it, and analysis can depend on
+  the file name)
+- analyzer version (fingerprint of the src/discovery sources)
+- the options that change results (--headers, --docs, --no-demangle, ...),
+  with the --headers / --docs trees fingerprinted by the size and mtime of
+  every file in them
+
+Content hashes are remembered by path, size and mtime, so re-scans only
+read files that were touched since the last scan.
+
+COM registry lookups depend on machine state rather than file content;
+use --no-cache after (un)registering COM servers.
+"""
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from dotnet_xmldoc import xml_doc_path
+from schema import AnalysisOptions, AnalysisResult, Invocable
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = ".mcp_scan_cache.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    content_hash     TEXT NOT NULL,
+    target           TEXT NOT NULL,
+    analyzer_version TEXT NOT NULL,
+    options_key      TEXT NOT NULL,
+    file_type        TEXT,
+    exit_code        INTEGER NOT NULL,
+    groups_json      TEXT NOT NULL,
+    artifacts_json   TEXT NOT NULL,
+    PRIMARY KEY (content_hash, target, analyzer_version, options_key)
+);
+CREATE TABLE IF NOT EXISTS file_hashes (
+    path         TEXT PRIMARY KEY,
+    size         INTEGER NOT NULL,
+    mtime_ns     INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+"""
+
+# A file modified this soon after it was hashed may keep its mtime
+# (coarse filesystem timestamps); such hashes are not remembered
+_RACY_MTIME_NS = 2_000_000_000
+
+_analyzer_version: Optional[str] = None
+
+
+def analyzer_version() -> str:
+    """Fingerprint of the analyzer sources; any code change invalidates the cache."""
+    global _analyzer_version
+    if _analyzer_version is None:
+        digest = hashlib.sha256()
+        for src in sorted(Path(__file__).parent.glob("*.py")):
+            digest.update(src.name.encode())
+            digest.update(src.read_bytes())
+        _analyzer_version = digest.hexdigest()[:16]
+    return _analyzer_version
+
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of *path*'s content (read in 1 MiB chunks) and its companion files."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    # Analysis also reads <Assembly>.xml beside .NET assemblies
+    xml_doc = xml_doc_path(path)
+    if xml_doc is not None:
+        st = xml_doc.stat()
+        digest.update(f"xmldoc {st.st_size} {st.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def path_fingerprint(path: Optional[Path]) -> Optional[str]:
+    """State of an input file or tree: a file's mtime, or a digest of the
+    relative path, size and mtime of every file under a directory."""
+    if path is None or not path.exists():
+        return None
+    if path.is_file():
+        return str(path.stat().st_mtime_ns)
+    digest = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames.sort()
+        for name in sorted(filenames):
+            full = os.path.join(dirpath, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            digest.update(f"{os.path.relpath(full, path)}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+def options_key(options: AnalysisOptions,
+                fingerprint: Callable[[Optional[Path]], Optional[str]] = path_fingerprint) -> str:
+    """Serialize the options that affect analysis results.
+
+    Header / doc trees, a prototype database and a .reg file can change in
+    place, so their state (see path_fingerprint) is part of the key.
+    """
+    return json.dumps({
+        "headers":      str(options.headers.resolve()) if options.headers else None,
+        "headers_state": fingerprint(options.headers),
+        "docs":         str(options.docs.resolve()) if options.docs else None,
+        "docs_state":   fingerprint(options.docs),
+        "com_registry": str(options.com_registry.resolve()) if options.com_registry else None,
+        "com_registry_state": fingerprint(options.com_registry),
+        "no_demangle":  options.no_demangle,
+        "max_doc_hits": options.max_doc_hits,
+        "tag":          options.tag,
+        "out_dir":      str(options.out_dir.resolve()) if options.out_dir else None,
+        "write_artifacts": options.write_artifacts,
+    }, sort_keys=True)
+
+
+class ScanCache:
+    """SQLite-backed map of (content hash, target, analyzer version, options) -> result."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path))
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(results)")]
+        if columns and "target" not in columns:
+            # Written before results were keyed by target: start over
+            self._conn.execute("DROP TABLE results")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        # Input trees are fingerprinted once per scan, not once per file
+        self._fingerprints: Dict[Optional[Path], Optional[str]] = {}
+
+    def _fingerprint(self, path: Optional[Path]) -> Optional[str]:
+        if path not in self._fingerprints:
+            self._fingerprints[path] = path_fingerprint(path)
+        return self._fingerprints[path]
+
+    def _options_key(self, options: AnalysisOptions) -> str:
+        return options_key(options, self._fingerprint)
+
+    @classmethod
+    def for_output_dir(cls, out_dir: Path) -> "ScanCache":
+        return cls(out_dir / CACHE_FILENAME)
+
+    def lookup(self, path: Path, content_hash: str,
+               options: AnalysisOptions) -> Optional[AnalysisResult]:
+        """Return the cached result for *path*, or None on a miss.
+
+        Only a result recorded for *path* itself is returned, never one of a
+        byte-identical copy elsewhere.  When artifacts were requested, the
+        entry only counts as a hit if every report it recorded is still on
+        disk.
+        """
+        row = self._conn.execute(
+            "SELECT file_type, exit_code, groups_json, artifacts_json FROM results "
+            "WHERE content_hash = ? AND target = ? AND analyzer_version = ? AND options_key = ?",
+            (content_hash, _target_key(path), analyzer_version(), self._options_key(options)),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        file_type, exit_code, groups_json, artifacts_json = row
+        artifacts = [Path(p) for p in json.loads(artifacts_json)]
+        if options.write_artifacts and not all(p.exists() for p in artifacts):
+            self.misses += 1
+            return None
+
+        groups = {
+            kind: [Invocable(**fields) for fields in invocables]
+            for kind, invocables in json.loads(groups_json).items()
+        }
+        self.hits += 1
+        return AnalysisResult(target=path, file_type=file_type, groups=groups,
+                              artifacts=artifacts, exit_code=exit_code)
+
+    def store(self, content_hash: str, options: AnalysisOptions,
+              result: AnalysisResult) -> None:
+        """Record *result* (for the file ``result.target``) under the given
+        content hash and options."""
+        groups = {
+            kind: [dataclasses.asdict(inv) for inv in invocables]
+            for kind, invocables in result.groups.items()
+        }
+        self._conn.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (content_hash, _target_key(result.target), analyzer_version(),
+             self._options_key(options), result.file_type,
+             result.exit_code, json.dumps(groups),
+             json.dumps([str(p) for p in result.artifacts])),
+        )
+        self._conn.commit()
+
+    def known_hash(self, path: Path) -> Optional[str]:
+        """The content hash remembered for *path*, if its size and mtime are
+        those it had when hashed; None when the file has to be read."""
+        st = path.stat()
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, content_hash FROM file_hashes WHERE path = ?",
+            (str(path.resolve()),),
+        ).fetchone()
+        if row is None or row[0] != st.st_size or row[1] != st.st_mtime_ns:
+            return None
+        return row[2]
+
+    def remember_hash(self, path: Path, content_hash: str) -> None:
+        """Record *content_hash* for *path* at its current size and mtime."""
+        st = path.stat()
+        # file_hash() also covers companion files, which stat() does not
+        if xml_doc_path(path) is not None or time.time_ns() - st.st_mtime_ns < _RACY_MTIME_NS:
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)",
+            (str(path.resolve()), st.st_size, st.st_mtime_ns, content_hash),
+        )
+
+    def close(self) -> None:
+        self._conn.commit()
+        self._conn.close()
+
+
+def _target_key(path: Optional[Path]) -> str:
+    return str(path.resolve()) if path is not None else ""
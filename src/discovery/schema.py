@@ -6,7 +6,7 @@ provides writers for CSV, JSON, and Markdown output formats.
 """
 
 import csv
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -514,6 +514,46 @@ class MatchInfo:
     prototype: str
 
 
+@dataclass
+class AnalysisOptions:
+    """Per-file analysis settings (mirrors the main.py CLI flags).
+
+    Artifacts (Markdown, CSV tiers, ``*_mcp.json``) are only written to
+    *out_dir* when *write_artifacts* is set; otherwise analysis is purely
+    in-memory.  Reusable indexes (the ``--docs`` identifier index) are kept
+    in *index_dir*, or rebuilt in memory each time when it is None.
+    COM registrations come from the live registry unless *com_registry*
+    names an exported .reg file.
+    """
+    headers: Optional[Path] = None
+    docs: Optional[Path] = None
+    dumpbin: str = "dumpbin"
+    undname: str = "undname"
+    no_demangle: bool = False
+    max_doc_hits: int = 2
+    tag: str = ""
+    out_dir: Optional[Path] = None
+    write_artifacts: bool = False
+    index_dir: Optional[Path] = None
+    com_registry: Optional[Path] = None
+
+
+@dataclass
+class AnalysisResult:
+    """Outcome of analyzing a single target file."""
+    target: Optional[Path]
+    file_type: Optional[str] = None  # FileType value, e.g. "PE_DLL"
+    # Output kind (the *_mcp.json suffix, e.g. "exports", "com_objects") -> invocables
+    groups: Dict[str, List[Invocable]] = field(default_factory=dict)
+    artifacts: List[Path] = field(default_factory=list)
+    exit_code: int = 0
+
+    @property
+    def invocables(self) -> List[Invocable]:
+        """All invocables across every output group, in pipeline order."""
+        return [inv for group in self.groups.values() for inv in group]
+
+
 def exports_to_invocables(
     exports: List[ExportedFunc],
     dll_path: Path,
@@ -788,27 +828,20 @@ def write_tier_summary(path: Path, entries: List[str]) -> None:
         f.write("See individual tier files for detailed analysis.\n")
 
 
-def write_invocables_json(
-    path: Path,
+def build_invocables_payload(
     invocables: List[Invocable],
     dll_path: Optional[Path] = None,
     tier: int = 2,
-    schema_version: str = "2.0.0"
-) -> None:
-    """Write Invocable objects to MCP-compatible JSON.
-    
+) -> dict:
+    """Build the MCP-compatible ``{metadata, invocables, summary}`` dict.
+
     Args:
-        path: Output JSON file path
         invocables: List of Invocable objects
         dll_path: Source DLL/assembly path
         tier: Analysis tier level
-        schema_version: JSON schema version
     """
-    import json
     import os
-    
-    path.parent.mkdir(parents=True, exist_ok=True)
-    
+
     # Build metadata (do not emit schema_version at top-level)
     metadata = {
         "tier": tier,
@@ -828,7 +861,7 @@ def write_invocables_json(
     invocable_dicts = [inv.to_dict() for inv in invocables]
     
     # Build final structure (omit top-level schema_version to match demo outputs)
-    output = {
+    return {
         "metadata": metadata,
         "invocables": invocable_dicts,
         "summary": {
@@ -837,6 +870,29 @@ def write_invocables_json(
             "by_confidence": _count_by_confidence(invocables)
         }
     }
+
+
+def write_invocables_json(
+    path: Path,
+    invocables: List[Invocable],
+    dll_path: Optional[Path] = None,
+    tier: int = 2,
+    schema_version: str = "2.0.0"
+) -> None:
+    """Write Invocable objects to MCP-compatible JSON.
+    
+    Args:
+        path: Output JSON file path
+        invocables: List of Invocable objects
+        dll_path: Source DLL/assembly path
+        tier: Analysis tier level
+        schema_version: JSON schema version
+    """
+    import json
+    
+    path.parent.mkdir(parents=True, exist_ok=True)
+    
+    output = build_invocables_payload(invocables, dll_path=dll_path, tier=tier)
     
     with open(path, 'w', encoding='utf-8') as f:
         json.dump(output, f, indent=2, ensure_ascii=False)
@@ -22,7 +22,7 @@ import logging
 import re
 import textwrap
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from schema import Invocable
 
@@ -79,38 +79,76 @@ def _analyze_python(path: Path) -> List[Invocable]:
         logger.warning("Python syntax error in %s: %s", path.name, exc)
         return []
 
-    invocables: List[Invocable] = []
+    invocables = [python_invocable(node, path) for node in _python_public_defs(tree.body)]
 
-    for node in ast.walk(tree):
-        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            continue
-        # Skip private helpers
-        if node.name.startswith('_'):
-            continue
+    logger.info("Python: %d public functions found in %s", len(invocables), path.name)
+    return invocables
 
-        doc = ast.get_docstring(node) or ''
-        params = _python_params(node)
-        ret = _python_return_type(node)
 
-        sig = f"def {node.name}({params})"
-        if ret:
-            sig += f" -> {ret}"
+def python_invocable(node: ast.FunctionDef, path: Path) -> Invocable:
+    """The Invocable for the function or method *node* of module *path*."""
+    doc = ast.get_docstring(node) or ''
+    params = _python_params(node)
+    ret = _python_return_type(node)
 
-        confidence = 'guaranteed' if doc and ret else ('high' if doc or ret else 'medium')
+    sig = f"def {node.name}({params})"
+    if ret:
+        sig += f" -> {ret}"
 
-        invocables.append(Invocable(
-            name=node.name,
-            source_type='python_function',
-            signature=sig,
-            parameters=params,
-            return_type=ret,
-            doc_comment=_one_liner(doc),
-            confidence=confidence,
-            dll_path=str(path),
-        ))
+    confidence = 'guaranteed' if doc and ret else ('high' if doc or ret else 'medium')
 
-    logger.info("Python: %d public functions found in %s", len(invocables), path.name)
-    return invocables
+    return Invocable(
+        name=node.name,
+        source_type='python_function',
+        signature=sig,
+        parameters=params,
+        return_type=ret,
+        doc_comment=one_liner(doc),
+        confidence=confidence,
+        dll_path=str(path),
+    )
+
+
+def _python_public_defs(body: List[ast.stmt]) -> Iterator[ast.FunctionDef]:
+    """Public module-level functions and public methods of public module-level
+    classes, in source order.
+
+    Function bodies and nested classes are never entered: what is defined
+    there is not reachable from outside the module.
+    """
+    for node in python_statements(body):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if not node.name.startswith('_'):
+                yield node
+        elif isinstance(node, ast.ClassDef) and not node.name.startswith('_'):
+            yield from python_public_methods(node)
+
+
+def python_public_methods(node: ast.ClassDef) -> Iterator[ast.FunctionDef]:
+    """Methods of class *node* whose names do not start with '_'."""
+    for member in python_statements(node.body):
+        if (isinstance(member, (ast.FunctionDef, ast.AsyncFunctionDef))
+                and not member.name.startswith('_')):
+            yield member
+
+
+def python_statements(body: List[ast.stmt]) -> Iterator[ast.stmt]:
+    """Statements of *body*, including those of if / try / with blocks in it
+    (conditional definitions such as platform-specific fallbacks)."""
+    for node in body:
+        if isinstance(node, ast.If):
+            yield from python_statements(node.body)
+            yield from python_statements(node.orelse)
+        elif isinstance(node, ast.Try):
+            yield from python_statements(node.body)
+            for handler in node.handlers:
+                yield from python_statements(handler.body)
+            yield from python_statements(node.orelse)
+            yield from python_statements(node.finalbody)
+        elif isinstance(node, (ast.With, ast.AsyncWith)):
+            yield from python_statements(node.body)
+        else:
+            yield node
 
 
 def _python_params(node: ast.FunctionDef) -> str:
@@ -547,7 +585,7 @@ def _analyze_php(path: Path) -> List[Invocable]:
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _one_liner(text: str) -> Optional[str]:
+def one_liner(text: str) -> Optional[str]:
     """Return first non-empty line of a docstring, stripped."""
     if not text:
         return None
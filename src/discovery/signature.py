@@ -1,28 +1,341 @@
 """
 signature.py - Digital signature extraction from PE files.
 
-Extracts Authenticode signature information from Security Directory[4].
+Extracts Authenticode signature information from Security Directory[4]
+in-process: the WIN_CERTIFICATE table holds a PKCS#7 SignedData blob whose
+SignerInfo names (by issuer and serial number) the X.509 certificate of the
+signer; its subject gives the publisher.  Parsed signers are cached per
+SHA-256 of the certificate table, so the signature of a file (or of
+identically signed copies) is decoded once per process.
+
+The signature is located and decoded, not verified: like the
+SignerCertificate of Get-AuthenticodeSignature, the publisher is reported
+whether or not the file hash or the certificate chain check out.
+PowerShell (Get-AuthenticodeSignature, Windows only) is still used for
+certificate tables the parser rejects, and for files without an embedded
+signature: most of System32 is catalog-signed, and only the catalog
+lookup names its signer ("Microsoft Windows").  Elsewhere such files are
+reported unsigned.  Catalog results are cached per SHA-256 of the file, and
+a directory scan looks up all its catalog-only binaries in one PowerShell
+call up front (prefetch_catalog_signers) instead of one call per file.
 """
 
+import hashlib
+import shutil
+import struct
 import subprocess
+import sys
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from pe_image import DIR_SECURITY, PEImage
+
+WIN_CERT_TYPE_PKCS_SIGNED_DATA = 0x0002
+
+_OID_SIGNED_DATA = "1.2.840.113549.1.7.2"
+
+# X.500 attribute type -> the label Windows shows in a subject string
+_NAME_ATTRIBUTES = {
+    "2.5.4.3": "CN", "2.5.4.4": "SN", "2.5.4.5": "SERIALNUMBER", "2.5.4.6": "C",
+    "2.5.4.7": "L", "2.5.4.8": "S", "2.5.4.9": "STREET", "2.5.4.10": "O",
+    "2.5.4.11": "OU", "2.5.4.12": "T", "2.5.4.17": "PostalCode", "2.5.4.42": "G",
+    "1.2.840.113549.1.9.1": "E", "0.9.2342.19200300.100.1.25": "DC",
+}
+
+# DER string types -> codec
+_STRING_CODECS = {0x0C: "utf-8", 0x13: "ascii", 0x14: "latin-1", 0x16: "ascii",
+                  0x1C: "utf-32-be", 0x1E: "utf-16-be"}
+
+_SEQUENCE, _SET, _CONTEXT_0 = 0x30, 0x31, 0xA0
+
+
+class SignatureError(ValueError):
+    """Raised for certificate tables that are not well-formed Authenticode."""
+
 
+class AuthenticodeSigner(NamedTuple):
+    """Signer certificate of an Authenticode signature."""
+    subject: str                # "CN=..., O=..., C=US" (most specific first, as Windows shows it)
+    issuer: str
+    publisher: Optional[str]    # subject CN (or its first attribute)
 
-def get_signature_info(file_path: Path) -> Tuple[bool, Optional[str]]:
+
+_SIGNERS: Dict[str, Optional[AuthenticodeSigner]] = {}
+
+# SHA-256 of a file without an embedded signature -> its catalog signature
+_CATALOG: Dict[str, Tuple[bool, Optional[str]]] = {}
+
+# Get-AuthenticodeSignature for each path on stdin; one subject line per path
+_CATALOG_SCRIPT = (
+    "[Console]::OutputEncoding = [Text.Encoding]::UTF8; "
+    "$input | ForEach-Object { "
+    "[string](Get-AuthenticodeSignature -LiteralPath $_).SignerCertificate.Subject }"
+)
+
+
+def get_signature_info(file_path: Path,
+                       image: Optional[PEImage] = None,
+                       content_hash: Optional[str] = None) -> Tuple[bool, Optional[str]]:
     """Extract digital signature info from PE file.
-    
-    Uses PowerShell Get-AuthenticodeSignature to verify Authenticode.
-    
+
     Args:
         file_path: Path to PE file
-        
+        image: Already mapped PEImage of *file_path* (opened here if omitted)
+        content_hash: SHA-256 of *file_path*'s content, if already known
+
     Returns:
         Tuple of (is_signed: bool, publisher: str or None)
     """
     if not file_path.exists():
         return False, None
-    
+
+    try:
+        signer = read_signer(file_path, image)
+    except SignatureError:
+        return _get_signature_info_powershell(file_path)
+
+    if signer is not None and signer.publisher:
+        return True, signer.publisher
+    if signer is None and sys.platform == "win32":
+        # No embedded signature: the file may still be signed by a catalog
+        key = content_hash or _content_hash(file_path, image)
+        return catalog_signers({file_path: key})[key]
+    return False, None
+
+
+def prefetch_catalog_signers(
+        paths: Dict[Path, Optional[str]]) -> Dict[str, Tuple[bool, Optional[str]]]:
+    """Catalog signatures of those of *paths* that carry no embedded signature.
+
+    *paths* maps each PE file to its SHA-256, or None if not yet known.
+    Windows only (an empty dict elsewhere).  The results, keyed by SHA-256,
+    can be handed to other processes with seed_catalog_signers().
+    """
+    if sys.platform != "win32":
+        return {}
+    wanted: Dict[Path, str] = {}
+    for path, key in paths.items():
+        image = PEImage.open(path)
+        if image is None:
+            continue
+        with image:
+            try:
+                if read_signer(path, image) is not None:
+                    continue
+            except SignatureError:
+                continue
+            wanted[path] = key or _content_hash(path, image)
+    return catalog_signers(wanted)
+
+
+def seed_catalog_signers(results: Dict[str, Tuple[bool, Optional[str]]]) -> None:
+    """Add catalog signatures looked up elsewhere (prefetch_catalog_signers)."""
+    _CATALOG.update(results)
+
+
+def catalog_signers(paths: Dict[Path, str]) -> Dict[str, Tuple[bool, Optional[str]]]:
+    """(is_signed, publisher) per SHA-256 for the files *paths* (path -> SHA-256).
+
+    Files not looked up before are passed to one Get-AuthenticodeSignature
+    call, which also consults the system's security catalogs.
+    """
+    missing = {key: path for path, key in paths.items() if key not in _CATALOG}
+    if missing:
+        subjects = _catalog_subjects(list(missing.values()))
+        for key, subject in zip(missing, subjects):
+            publisher = _extract_publisher_from_subject(subject)
+            _CATALOG[key] = (True, publisher) if publisher else (False, None)
+    return {key: _CATALOG[key] for key in paths.values()}
+
+
+def _content_hash(file_path: Path, image: Optional[PEImage]) -> str:
+    if image is not None:
+        return hashlib.sha256(image.data).hexdigest()
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_signer(file_path: Path, image: Optional[PEImage] = None) -> Optional[AuthenticodeSigner]:
+    """Signer of the Authenticode signature of a PE file, or None if unsigned.
+
+    Raises SignatureError if the certificate table cannot be decoded.
+    """
+    if image is None:
+        image = PEImage.open(file_path)
+        if image is None:
+            return None
+        with image:
+            return read_signer(file_path, image)
+
+    # The security directory holds a file offset, not an RVA
+    offset, size = image.data_directory(DIR_SECURITY)
+    if not offset or not size:
+        return None
+    if offset + size > len(image.data):
+        raise SignatureError("certificate table extends past the end of the file")
+    table = image.data[offset:offset + size]
+
+    key = hashlib.sha256(table).hexdigest()
+    if key not in _SIGNERS:
+        _SIGNERS[key] = _signer_from_certificate_table(table)
+    return _SIGNERS[key]
+
+
+def _signer_from_certificate_table(table: bytes) -> Optional[AuthenticodeSigner]:
+    """Signer of the first PKCS#7 entry of a WIN_CERTIFICATE table."""
+    pos = 0
+    while pos + 8 <= len(table):
+        length, _, cert_type = struct.unpack_from("<IHH", table, pos)
+        if length < 8:
+            raise SignatureError(f"bad WIN_CERTIFICATE length {length}")
+        if cert_type == WIN_CERT_TYPE_PKCS_SIGNED_DATA:
+            try:
+                return _signer_from_pkcs7(table[pos + 8:pos + length])
+            except (IndexError, ValueError) as e:
+                raise SignatureError(f"malformed PKCS#7 signature: {e}") from e
+        pos += (length + 7) & ~7  # entries are 8-byte aligned
+    return None
+
+
+# ── PKCS#7 / X.509 (DER) ─────────────────────────────────────────────────────
+
+def _signer_from_pkcs7(der: bytes) -> AuthenticodeSigner:
+    _, start, end = _element(der, 0)                     # ContentInfo
+    content_type, content = _children(der, start, end)[:2]
+    if _oid(der[content_type[1]:content_type[2]]) != _OID_SIGNED_DATA:
+        raise SignatureError("not PKCS#7 SignedData")
+    _, start, end = _element(der, content[1])            # [0] EXPLICIT SignedData
+    fields = _children(der, start, end)
+
+    certificates: List[Tuple[bytes, bytes, Tuple[int, int, int], Tuple[int, int, int]]] = []
+    for tag, cert_start, cert_end in fields:
+        if tag == _CONTEXT_0:                            # [0] IMPLICIT certificates
+            for cert_tag, s, e in _children(der, cert_start, cert_end):
+                if cert_tag != _SEQUENCE:                # not an X.509 certificate
+                    continue
+                _, tbs_start, tbs_end = _children(der, s, e)[0]
+                tbs = _children(der, tbs_start, tbs_end)
+                if tbs[0][0] == _CONTEXT_0:              # explicit version
+                    tbs = tbs[1:]
+                serial, issuer, subject = tbs[0], tbs[2], tbs[4]
+                certificates.append((der[serial[1]:serial[2]], der[issuer[1]:issuer[2]],
+                                     issuer, subject))
+    if not certificates:
+        raise SignatureError("signature carries no certificates")
+
+    # SignerInfo identifies its certificate by issuer and serial number
+    chosen = certificates[0]
+    signer_infos = fields[-1]
+    if signer_infos[0] == _SET:
+        infos = _children(der, signer_infos[1], signer_infos[2])
+        if infos:
+            sid = _children(der, infos[0][1], infos[0][2])[1]
+            if sid[0] == _SEQUENCE:
+                issuer, serial = _children(der, sid[1], sid[2])[:2]
+                wanted = (der[serial[1]:serial[2]], der[issuer[1]:issuer[2]])
+                chosen = next((c for c in certificates if c[:2] == wanted), chosen)
+
+    _, _, issuer, subject = chosen
+    subject_attributes = _name(der, subject[1], subject[2])
+    common_name = next((v for k, v in subject_attributes if k == "CN"), None)
+    return AuthenticodeSigner(
+        subject=_format_name(subject_attributes),
+        issuer=_format_name(_name(der, issuer[1], issuer[2])),
+        publisher=common_name or (subject_attributes[-1][1] if subject_attributes else None),
+    )
+
+
+def _element(der: bytes, pos: int) -> Tuple[int, int, int]:
+    """(tag, content start, content end) of the DER element at *pos*."""
+    tag, length = der[pos], der[pos + 1]
+    pos += 2
+    if length & 0x80:
+        count = length & 0x7F
+        if not 0 < count <= 4:
+            raise SignatureError("unsupported DER length encoding")
+        length = int.from_bytes(der[pos:pos + count], "big")
+        pos += count
+    if pos + length > len(der):
+        raise SignatureError("truncated DER element")
+    return tag, pos, pos + length
+
+
+def _children(der: bytes, start: int, end: int) -> List[Tuple[int, int, int]]:
+    """The DER elements between *start* and *end* (content of a SEQUENCE / SET)."""
+    items = []
+    while start < end:
+        item = _element(der, start)
+        items.append(item)
+        start = item[2]
+    return items
+
+
+def _oid(raw: bytes) -> str:
+    first = min(raw[0] // 40, 2)
+    arcs, value = [first, raw[0] - 40 * first], 0
+    for byte in raw[1:]:
+        value = value << 7 | byte & 0x7F
+        if not byte & 0x80:
+            arcs.append(value)
+            value = 0
+    return ".".join(map(str, arcs))
+
+
+def _name(der: bytes, start: int, end: int) -> List[Tuple[str, str]]:
+    """(label, value) attributes of an X.500 Name in encoded order."""
+    attributes = []
+    for _, set_start, set_end in _children(der, start, end):
+        for _, s, e in _children(der, set_start, set_end):
+            (_, oid_start, oid_end), (tag, value_start, value_end) = _children(der, s, e)[:2]
+            oid = _oid(der[oid_start:oid_end])
+            value = der[value_start:value_end].decode(_STRING_CODECS.get(tag, "latin-1"),
+                                                      errors="replace")
+            attributes.append((_NAME_ATTRIBUTES.get(oid, f"OID.{oid}"), value))
+    return attributes
+
+
+def _format_name(attributes: List[Tuple[str, str]]) -> str:
+    """Subject string as Windows renders it: most specific attribute first."""
+    def quote(value: str) -> str:
+        if any(c in value for c in ',+=";<>#') or value != value.strip():
+            return '"' + value.replace('"', '""') + '"'
+        return value
+    return ", ".join(f"{key}={quote(value)}" for key, value in reversed(attributes))
+
+
+# ── PowerShell fallback ──────────────────────────────────────────────────────
+
+def _catalog_subjects(paths: List[Path]) -> List[str]:
+    """Signer subject of each of *paths* ("" if unsigned or unknown)."""
+    subjects = [""] * len(paths)
+    if shutil.which('powershell') is None:
+        return subjects
+    try:
+        result = subprocess.run(
+            ['powershell', '-NoProfile', '-Command', _CATALOG_SCRIPT],
+            input="\n".join(str(path) for path in paths) + "\n",
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            timeout=5 + len(paths) // 5
+        )
+    except (subprocess.TimeoutExpired, OSError):
+        return subjects
+    lines = result.stdout.splitlines()
+    if result.returncode == 0 and len(lines) == len(paths):
+        subjects = [line.strip() for line in lines]
+    return subjects
+
+
+def _get_signature_info_powershell(file_path: Path) -> Tuple[bool, Optional[str]]:
+    """Ask Get-AuthenticodeSignature (Windows PowerShell only)."""
+    if shutil.which('powershell') is None:
+        return False, None
+
     try:
         # Use PowerShell Get-AuthenticodeSignature cmdlet
         ps_cmd = f'(Get-AuthenticodeSignature "{file_path}").SignerCertificate.Subject'
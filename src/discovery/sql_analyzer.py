@@ -15,9 +15,11 @@ syntax well enough for broad invocable discovery without a full parser.
 import logging
 import re
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
+from comment_index import SQL_COMMENTS, Comment, CommentIndex
 from schema import Invocable
+from sql_lexer import DOC_WINDOW, MAX_STATEMENT_CHARS, iter_statements
 
 logger = logging.getLogger(__name__)
 
@@ -26,10 +28,13 @@ logger = logging.getLogger(__name__)
 # Regex patterns
 # ---------------------------------------------------------------------------
 
-# CREATE [OR REPLACE] [DEFINER=…] PROCEDURE|FUNCTION|VIEW|TABLE|TRIGGER name
+# CREATE [OR REPLACE] [DEFINER=…] PROCEDURE|FUNCTION|VIEW|TABLE|TRIGGER [schema.]name
+# (names may be quoted: [dbo].[name], "public"."name", `name`)
 _DDL_RE = re.compile(
     r'CREATE\s+(?:OR\s+REPLACE\s+)?(?:DEFINER\s*=\s*\S+\s+)?'
-    r'(?P<kind>PROCEDURE|FUNCTION|VIEW|TABLE|TRIGGER)\s+(?:`?(?P<name>\w+)`?)',
+    r'(?P<kind>PROCEDURE|FUNCTION|VIEW|TABLE|TRIGGER)\s+'
+    r'(?:(?:\[[^\]\n]+\]|"[^"\n]+"|`[^`\n]+`|\w+)\s*\.\s*)*'
+    r'(?:\[(?P<bracketed>[^\]\n]+)\]|"(?P<quoted>[^"\n]+)"|`?(?P<name>\w+)`?)',
     re.IGNORECASE,
 )
 
@@ -50,10 +55,6 @@ _PARAM_ENTRY_RE = re.compile(
     re.IGNORECASE,
 )
 
-# Comment patterns
-_LINE_COMMENT_RE = re.compile(r'--\s*(.+)')          # -- comment
-_BLOCK_COMMENT_RE = re.compile(r'/\*(.+?)\*/', re.DOTALL)
-
 # RETURNS clause for functions
 _RETURNS_RE = re.compile(r'\bRETURNS\s+(TABLE|[\w\(\)]+)', re.IGNORECASE)
 
@@ -65,6 +66,9 @@ _RETURNS_RE = re.compile(r'\bRETURNS\s+(TABLE|[\w\(\)]+)', re.IGNORECASE)
 def analyze_sql(path: Path) -> List[Invocable]:
     """Extract database objects from a .sql file.
 
+    The file is read as a stream of statements (see sql_lexer), so memory
+    use stays bounded however large the script is.
+
     Args:
         path: Path to the .sql source file.
 
@@ -72,23 +76,50 @@ def analyze_sql(path: Path) -> List[Invocable]:
         List[Invocable] – one entry per discovered object.
     """
     try:
-        source = path.read_text(encoding='utf-8', errors='replace')
+        invocables = list(iter_sql_objects(path))
     except OSError as exc:
         logger.error("Cannot read %s: %s", path, exc)
         return []
 
-    invocables: List[Invocable] = []
-    # Normalise line endings
-    source = source.replace('\r\n', '\n').replace('\r', '\n')
+    logger.info("SQL: %d objects found in %s", len(invocables), path.name)
+    return invocables
+
+
+def iter_sql_objects(path: Path) -> Iterator[Invocable]:
+    """Database objects of a .sql file, one at a time, as the file is read.
 
-    for m in _DDL_RE.finditer(source):
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    # Text mode normalises \r\n and \r line endings
+    with open(path, encoding='utf-8', errors='replace') as stream:
+        for statement in iter_statements(stream):
+            if statement.truncated:
+                logger.debug("SQL: statement over %d characters cut short in %s",
+                             MAX_STATEMENT_CHARS, path.name)
+            yield from _statement_objects(statement.text, path)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _statement_objects(source: str, path: Path) -> Iterator[Invocable]:
+    """Database objects declared in one statement (and its leading comments)."""
+    matches = list(_DDL_RE.finditer(source))
+    if not matches:
+        return
+    comments = CommentIndex(source, SQL_COMMENTS)
+
+    for m in matches:
+        if comments.contains(m.start()):
+            continue                             # commented-out DDL
         kind = m.group('kind').upper()           # PROCEDURE | FUNCTION | VIEW | TABLE | TRIGGER
-        name = m.group('name')
+        name = m.group('name') or m.group('bracketed') or m.group('quoted')
         obj_start = m.start()
 
         # --- documentation: look for block or line comments before the DDL ---
-        preamble = source[max(0, obj_start - 400):obj_start]
-        doc = _extract_doc_comment(preamble)
+        doc = _extract_doc_comment(comments.within(max(0, obj_start - DOC_WINDOW), obj_start))
 
         # --- parameters (PROCEDURE / FUNCTION only) ---
         params_str = ''
@@ -161,7 +192,7 @@ def analyze_sql(path: Path) -> List[Invocable]:
         else:  # TRIGGER
             sig = f"-- TRIGGER: {name}"
 
-        invocables.append(Invocable(
+        yield Invocable(
             name=name,
             source_type='sql_' + kind.lower(),
             signature=sig,
@@ -170,15 +201,8 @@ def analyze_sql(path: Path) -> List[Invocable]:
             doc_comment=doc,
             confidence=confidence,
             dll_path=str(path),
-        ))
-
-    logger.info("SQL: %d objects found in %s", len(invocables), path.name)
-    return invocables
-
+        )
 
-# ---------------------------------------------------------------------------
-# Helpers
-# ---------------------------------------------------------------------------
 
 def _extract_balanced_parens(text: str) -> Optional[str]:
     """Return the content of the FIRST balanced paren pair in text, or None."""
@@ -242,28 +266,22 @@ def _parse_sql_params(raw: str) -> str:
     return ', '.join(cleaned)
 
 
-def _extract_doc_comment(preamble: str) -> Optional[str]:
-    """Extract the most recent comment block or line comment from preamble text."""
-    # Block comment: /* … */
-    blocks = _BLOCK_COMMENT_RE.findall(preamble)
+def _extract_doc_comment(preamble: List[Comment]) -> Optional[str]:
+    """Extract the most recent comment block or line comments from the comments before a DDL."""
+    # Block comment: /* … */ (leading * per line already stripped, Javadoc style)
+    blocks = [c for c in preamble if c.block]
     if blocks:
-        # Take the last block comment, strip leading * per line (Javadoc style)
-        block = blocks[-1]
-        lines = [re.sub(r'^\s*\*\s?', '', l).strip() for l in block.splitlines()]
-        text = ' '.join(l for l in lines if l)
+        text = ' '.join(l.strip() for l in blocks[-1].text.splitlines() if l.strip())
         if text and not _is_separator_comment(text):
             return text[:300]
 
     # Line comments: -- …
-    line_comments = _LINE_COMMENT_RE.findall(preamble)
-    if line_comments:
-        # Filter out visual separator lines (box-drawing chars, dashes-only, etc.)
-        meaningful = [c.strip() for c in line_comments if not _is_separator_comment(c)]
-        if meaningful:
-            # Take last 3 consecutive meaningful line comments
-            text = ' '.join(meaningful[-3:])
-            if text:
-                return text[:300]
+    # Filter out visual separator lines (box-drawing chars, dashes-only, etc.)
+    meaningful = [c.text for c in preamble
+                  if not c.block and c.text and not _is_separator_comment(c.text)]
+    if meaningful:
+        # Take last 3 consecutive meaningful line comments
+        return ' '.join(meaningful[-3:])[:300]
 
     return None
 
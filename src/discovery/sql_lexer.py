@@ -0,0 +1,297 @@
+"""
+sql_lexer.py - Streaming statement splitter for SQL scripts.
+
+Reads a script in fixed-size chunks and cuts it into statements, holding no
+more than one chunk and one (capped) statement in memory, so multi-gigabyte
+pg_dump / SSMS exports can be analyzed.  Lexical state is carried across
+chunk boundaries:
+
+  -- line comments and /* block comments */ (nested, as in PostgreSQL and T-SQL)
+  'strings' ('' escapes; E'...' strings also \\ escapes)
+  "quoted" and [bracketed] identifiers
+  $tag$ dollar-quoted bodies $tag$
+  ( nested parentheses )
+
+A statement ends at ';' outside all of the above, at a GO batch separator
+line (T-SQL), or at the delimiter set by a MySQL DELIMITER line.  The data
+of a pg_dump COPY ... FROM stdin statement, up to its '\\.' line, is skipped.
+
+Each SqlStatement starts with the comments and blank space in front of the
+statement, which is where its doc comment lives; only the last DOC_WINDOW
+characters of those are kept, and at most MAX_STATEMENT_CHARS of the
+statement itself -- plenty for an object's header (name, parameter list,
+RETURNS clause), not necessarily its whole body.
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+CHUNK_SIZE = 1 << 20
+MAX_STATEMENT_CHARS = 64 * 1024
+# Doc comments are looked for this far in front of a statement
+DOC_WINDOW = 400
+# Tokens are only acted on this far from the end of an unfinished chunk, so
+# none is cut short ('--', '*/', '$tag$', a GO line, ...)
+_LOOKAHEAD = 256
+
+# Lexical states
+_CODE, _LINE_COMMENT, _BLOCK_COMMENT, _QUOTED, _E_STRING, _DOLLAR, _COPY_DATA = range(7)
+
+_BLOCK_RE = re.compile(r"/\*|\*/")
+_CLOSE_RE = {q: re.compile(re.escape(q * 2) + "|" + re.escape(q)) for q in "'\"]"}
+_E_STRING_RE = re.compile(r"\\.|''|'", re.DOTALL)
+_DIRECTIVE_RE = re.compile(r"[ \t]*(GO|DELIMITER)\b", re.IGNORECASE)
+_GO_TAIL_RE = re.compile(r"[ \t]*(?:\d+[ \t]*)?(?:--[^\n]*)?(?=\n|\Z)")
+_DELIMITER_TAIL_RE = re.compile(r"[ \t]+(\S+)[ \t]*(?=\n|\Z)")
+_COPY_STDIN_RE = re.compile(r"COPY\b[^;]*\bFROM\s+stdin\b", re.IGNORECASE)
+_COPY_END_RE = re.compile(r"^\\\.[ \t]*$", re.MULTILINE)
+
+
+class SqlStatement(NamedTuple):
+    """One statement of a script, as cut by iter_statements()."""
+    text: str           # leading comments / blank space, then the statement (no terminator)
+    truncated: bool     # the statement was longer than MAX_STATEMENT_CHARS
+
+
+def iter_statements(stream: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[SqlStatement]:
+    """Statements of the script read from *stream*, in order, as they are read."""
+    splitter = _Splitter()
+    while True:
+        chunk = stream.read(chunk_size)
+        yield from splitter.feed(chunk)
+        if not chunk:
+            return
+
+
+@lru_cache(maxsize=None)
+def _token_re(delimiter: str, leading: bool) -> re.Pattern:
+    """Where the lexical state can change in code; with *leading*, also any code at all."""
+    stops = [re.escape(delimiter), r"--|/\*|['\"\[]|\n[ \t]*(?:GO|DELIMITER)\b"]
+    if delimiter == ";":
+        stops.append(r"\$(?:[A-Za-z_]\w*)?\$")  # no dollar quoting in MySQL scripts
+    if leading:
+        stops.append(r"\S")
+    return re.compile("|".join(stops), re.IGNORECASE)
+
+
+class _Splitter:
+    """State of iter_statements() between chunks."""
+
+    def __init__(self):
+        self.buf = ""
+        self.before = "\n"          # the (up to) two characters in front of buf[0]
+        self.line_blank = True      # only blanks on buf[0]'s line before it
+        self.mark = 0               # buf[:mark] is already in the statement
+        self.state = _CODE
+        self.closing = ""           # what ends the open quoted text
+        self.comment_depth = 0
+        self.delimiter = ";"
+        self.out: List[SqlStatement] = []
+        self._reset()
+
+    def _reset(self) -> None:
+        self.lead = ""              # comments and blank space before the statement
+        self.lead_comments: List[Tuple[int, int]] = []
+        self.comment_start: Optional[int] = None  # open comment, in lead
+        self.dropping = False       # open comment is too long to be a doc comment
+        self.code = False           # the statement itself has started
+        self.body: List[str] = []
+        self.body_len = 0
+        self.truncated = False
+        self.depth = 0
+
+    def feed(self, chunk: str) -> Iterator[SqlStatement]:
+        """Statements completed by *chunk* ('' at the end of the script)."""
+        eof = not chunk
+        buf = self.buf = self.buf + chunk
+        end = len(buf) if eof else max(0, len(buf) - _LOOKAHEAD)
+        pos = 0
+        while pos < end:
+            state = self.state
+            if state == _CODE:
+                pos = self._code(pos, end)
+            elif state == _LINE_COMMENT:
+                nl = buf.find("\n", pos)
+                if nl == -1:
+                    pos = len(buf)
+                else:
+                    self._comment_end(nl)
+                    pos = nl
+            elif state == _BLOCK_COMMENT:
+                m = _BLOCK_RE.search(buf, pos)
+                if m is None or m.start() >= end:
+                    pos = end
+                elif m.group() == "/*":
+                    self.comment_depth += 1
+                    pos = m.end()
+                else:
+                    self.comment_depth -= 1
+                    pos = m.end()
+                    if not self.comment_depth:
+                        self._comment_end(pos)
+            elif state == _QUOTED or state == _E_STRING:
+                regex = _E_STRING_RE if state == _E_STRING else _CLOSE_RE[self.closing]
+                m = regex.search(buf, pos)
+                if m is None or m.start() >= end:
+                    pos = end
+                else:
+                    pos = m.end()
+                    if len(m.group()) == 1:
+                        self.state = _CODE
+            elif state == _DOLLAR:
+                i = buf.find(self.closing, pos)
+                if i == -1 or i >= end:
+                    pos = end
+                else:
+                    pos = i + len(self.closing)
+                    self.state = _CODE
+            else:                                   # _COPY_DATA
+                m = _COPY_END_RE.search(buf, pos)
+                if m is None or m.start() >= end:
+                    pos = end
+                else:
+                    pos = m.end()
+                    self.state = _CODE
+                self.mark = pos
+
+        self._take(pos)
+        if self.state == _CODE and not self.code:
+            self._trim_lead()
+        if eof:
+            self._end(len(buf), len(buf))
+        self.before = (self.before + buf[max(0, pos - 2):pos])[-2:]
+        nl = buf.rfind("\n", 0, pos)
+        self.line_blank = not buf[nl + 1:pos].strip(" \t") and (nl >= 0 or self.line_blank)
+        self.buf = buf[pos:]
+        self.mark = 0
+        yield from self.out
+        self.out.clear()
+
+    def _code(self, pos: int, end: int) -> int:
+        """Act on the next token in code; returns where to go on."""
+        buf = self.buf
+        if pos == 0 and self.line_blank:
+            resume = self._directive(0)         # a GO / DELIMITER line cut by the last chunk
+            if resume is not None:
+                return resume
+        m = _token_re(self.delimiter, not self.code).search(buf, pos)
+        if m is None or m.start() >= end:
+            self._count_parens(pos, end)
+            return end
+        start, token = m.start(), m.group()
+        self._count_parens(pos, start)
+
+        if token == self.delimiter:
+            if self.depth == 0 or self.delimiter != ";":
+                self._end(start, m.end())
+            return m.end()
+        if token[0] == "\n":
+            resume = self._directive(start + 1, start)
+            return start + 1 if resume is None else resume
+        if token == "--" or token == "/*":
+            if not self.code:
+                self._take(start)
+                self.comment_start = len(self.lead)
+            self.state = _LINE_COMMENT if token == "--" else _BLOCK_COMMENT
+            self.comment_depth = 1
+            return m.end()
+        if not self.code:
+            self._take(start)
+            self.code = True
+            return start                        # look at it again as code
+
+        first = token[0]
+        if first == "'":
+            prefix = self._preceding(start)
+            e_string = prefix[-1:] in ("E", "e") and not (prefix[:-1].isalnum() or prefix[:-1] == "_")
+            self.state = _E_STRING if e_string else _QUOTED
+            self.closing = "'"
+        elif first == '"' or first == "[":
+            self.state = _QUOTED
+            self.closing = '"' if first == '"' else "]"
+        elif first == "$":
+            self.state = _DOLLAR
+            self.closing = token
+        return m.end()
+
+    def _directive(self, line_start: int, upto: Optional[int] = None) -> Optional[int]:
+        """Act on a GO / DELIMITER line at *line_start*, ending the statement at
+        *upto*; returns the end of the line (None if it is not such a line)."""
+        m = _DIRECTIVE_RE.match(self.buf, line_start)
+        if m is None:
+            return None
+        go = len(m.group(1)) == 2
+        tail = (_GO_TAIL_RE if go else _DELIMITER_TAIL_RE).match(self.buf, m.end())
+        if tail is None:
+            return None
+        self._end(line_start if upto is None else upto, tail.end())
+        if not go:
+            self.delimiter = tail.group(1)
+        return tail.end()
+
+    def _count_parens(self, pos: int, end: int) -> None:
+        if self.code:
+            opened = self.buf.count("(", pos, end)
+            closed = self.buf.count(")", pos, end)
+            if opened or closed:
+                self.depth = max(0, self.depth + opened - closed)
+
+    def _preceding(self, pos: int) -> str:
+        """The two characters in front of buf[pos]."""
+        return self.buf[pos - 2:pos] if pos >= 2 else (self.before + self.buf[:pos])[-2:]
+
+    def _take(self, upto: int) -> None:
+        """Add buf[mark:upto] to the statement (or to its lead)."""
+        if upto > self.mark:
+            if self.code:
+                room = MAX_STATEMENT_CHARS - self.body_len
+                if upto - self.mark > room:
+                    self.truncated = True
+                if room > 0:
+                    text = self.buf[self.mark:min(upto, self.mark + room)]
+                    self.body.append(text)
+                    self.body_len += len(text)
+            elif not self.dropping:
+                self.lead += self.buf[self.mark:upto]
+                if self.comment_start is not None and len(self.lead) - self.comment_start > DOC_WINDOW:
+                    # Cannot lie within DOC_WINDOW of the statement: forget it
+                    self.lead = self.lead[:self.comment_start]
+                    self.dropping = True
+        self.mark = upto
+
+    def _comment_end(self, upto: int) -> None:
+        self.state = _CODE
+        if self.code:
+            return
+        self._take(upto)
+        if not self.dropping:
+            self.lead_comments.append((self.comment_start, len(self.lead)))
+        self.comment_start = None
+        self.dropping = False
+        self._trim_lead()
+
+    def _trim_lead(self) -> None:
+        """Keep the last DOC_WINDOW characters of lead, without cutting a comment."""
+        if len(self.lead) <= 2 * DOC_WINDOW:
+            return
+        cut = len(self.lead) - DOC_WINDOW
+        for start, end in self.lead_comments:
+            if start < cut < end:
+                cut = end
+                break
+        self.lead = self.lead[cut:]
+        self.lead_comments = [(s - cut, e - cut) for s, e in self.lead_comments if s >= cut]
+
+    def _end(self, upto: int, resume: int) -> None:
+        """End the statement at *upto*; the next one starts at *resume*."""
+        self._take(upto)
+        self.mark = resume
+        if not self.code:
+            self.depth = 0
+            return
+        body = "".join(self.body)
+        self.out.append(SqlStatement(self.lead + body, self.truncated))
+        self._reset()
+        if _COPY_STDIN_RE.match(body):
+            self.state = _COPY_DATA
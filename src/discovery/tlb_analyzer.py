@@ -1,13 +1,18 @@
 """
 tlb_analyzer.py - Extract COM interface definitions from Type Libraries.
 
-Uses pywin32 (pythoncom) to parse embedded Type Libraries (.tlb) 
-within DLLs/EXEs to extract Interface and Method definitions.
+Reads standalone .tlb/.olb files and TYPELIB resources embedded in
+DLLs/EXEs with the built-in MSFT reader (msft_typelib), on any platform.
+pywin32 (pythoncom) is only used for libraries the reader cannot parse,
+such as the old SLTG format.
 """
 import logging
 from pathlib import Path
 from typing import List, Dict, Optional, Any
 
+from msft_typelib import TypeLibError, TypeLibrary, load_type_libraries
+from pe_image import PEImage
+
 try:
     import pythoncom
 except ImportError:
@@ -15,16 +20,69 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
-def scan_type_library(dll_path: Path) -> List[Dict[str, Any]]:
+def scan_type_library(dll_path: Path, image: Optional[PEImage] = None) -> List[Dict[str, Any]]:
     """
-    Load and parse the Type Library embedded in the given file.
+    Load and parse the Type Library in the given file (standalone or embedded).
     Returns a list of parsed interfaces/coclasses with their methods.
+
+    *image* is the already mapped PE for *dll_path*, if any.
     """
-    results = []
-    
+    libraries = load_type_libraries(dll_path, image=image)
+    if libraries:
+        results = []
+        for library in libraries:
+            try:
+                results.extend(_library_entries(library))
+            except TypeLibError as e:
+                logger.warning(f"Malformed type library {library.name} in {dll_path.name}: {e}")
+        logger.info(f"Type Library found: {len(results)} interfaces/coclasses")
+        return results
+
     if pythoncom is None:
-        logger.warning("pythoncom (pywin32) not installed, skipping Type Library scan")
+        logger.debug("pythoncom (pywin32) not installed, skipping Type Library fallback")
         return []
+    return _scan_type_library_pythoncom(dll_path)
+
+
+def _library_entries(library: TypeLibrary) -> List[Dict[str, Any]]:
+    """Interfaces/dispinterfaces with methods and coclasses of one library."""
+    results = []
+    for type_info in library.types():
+        if type_info.kind in ('interface', 'dispatch'):
+            methods = [{
+                'name': func.name,
+                'parameters': [name for _, name in func.parameters],
+                'parameter_types': [param_type for param_type, _ in func.parameters],
+                'return_type': func.return_type,
+                'description': func.doc,
+                'memid': func.memid,
+                'invkind': func.invkind,
+            } for func in type_info.functions]
+            if methods:
+                results.append({
+                    'name': type_info.name,
+                    'guid': type_info.guid,
+                    'kind': type_info.kind,
+                    'description': type_info.doc,
+                    'methods': methods,
+                    'confidence': 'guaranteed'  # TLB info is authoritative
+                })
+        elif type_info.kind == 'coclass':
+            results.append({
+                'name': type_info.name,
+                'guid': type_info.guid,
+                'kind': 'coclass',
+                'description': type_info.doc,
+                'interfaces': type_info.implemented,
+                'methods': [],
+                'confidence': 'guaranteed'
+            })
+    return results
+
+
+def _scan_type_library_pythoncom(dll_path: Path) -> List[Dict[str, Any]]:
+    """scan_type_library() through LoadTypeLib (Windows only)."""
+    results = []
 
     try:
         # Load the Type Library
@@ -111,7 +169,8 @@ def scan_type_library(dll_path: Path) -> List[Dict[str, Any]]:
          
     return results
 
-def format_tlb_signature(method_name: str, params: List[str]) -> str:
+def format_tlb_signature(method_name: str, params: List[str],
+                         return_type: str = "HRESULT") -> str:
     """Format a display string for a TLB method."""
     param_str = ", ".join(params)
-    return f"HRESULT {method_name}({param_str})"
+    return f"{return_type} {method_name}({param_str})"
@@ -20,7 +20,6 @@ import argparse
 import json
 import os
 import re
-import subprocess
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
@@ -110,38 +109,53 @@ def _kind_label(path: Path) -> str:
 
 
 def run_discovery(target: Path, description: Optional[str]) -> dict:
-    """Run src/discovery/main.py on *target*, collect ALL output JSONs,
-    notify the user about hybrid files, and return a single merged data dict."""
+    """Run discovery on *target* in-process, notify the user about hybrid
+    files, and return a single merged data dict.
+
+    Single files are analysed via ``analyze_file()`` and their invocable
+    groups are merged straight from memory; reports are still written to
+    ARTIFACTS_DIR for reference.  Directory targets go through
+    ``analyze_directory()`` and load the aggregate ``<dir>_scan_mcp.json``.
+    """
+    import logging
+    from argparse import Namespace
+
+    sys.path.insert(0, str(MAIN_PY.parent))
+    from main import analyze_directory, analyze_file
+    from schema import AnalysisOptions, build_invocables_payload
+
+    logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
     console.print(f"\n[bold cyan]Running discovery on:[/] {target}\n")
-    cmd = [sys.executable, str(MAIN_PY), "--target", str(target), "--out", str(ARTIFACTS_DIR)]
-    result = subprocess.run(cmd, cwd=str(PROJECT_ROOT))
-    if result.returncode != 0:
+    ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
+
+    if target.is_dir():
+        if analyze_directory(target, ARTIFACTS_DIR, Namespace()) != 0:
+            console.print("[red]Discovery failed — check output above.[/]")
+            sys.exit(1)
+        agg_path = ARTIFACTS_DIR / f"{target.name}_scan_mcp.json"
+        if not agg_path.exists():
+            console.print("[red]Could not find any discovery output JSON.[/]")
+            sys.exit(1)
+        return _load_and_merge([agg_path])
+
+    result = analyze_file(target, AnalysisOptions(out_dir=ARTIFACTS_DIR, write_artifacts=True))
+    if result.exit_code != 0:
         console.print("[red]Discovery failed — check output above.[/]")
         sys.exit(1)
 
-    # Collect ALL *_mcp.json files written for this target stem.
-    # For a directory target the aggregate is <dir>_scan_mcp.json; for a
-    # single file it is <stem>_*_mcp.json — both are found by the glob below.
-    candidates = sorted(
-        ARTIFACTS_DIR.glob(f"{target.stem}*_mcp.json"),
-        key=lambda p: p.stat().st_mtime,
-        reverse=True,
-    )
-    if not candidates:
-        console.print("[red]Could not find any discovery output JSON.[/]")
+    kinds = [kind for kind, group in result.groups.items() if group]
+    datasets = [build_invocables_payload(result.groups[kind], dll_path=target) for kind in kinds]
+    if not datasets:
+        console.print("[red]No invocables found in any of the discovery outputs.[/]")
         sys.exit(1)
-
-    return _load_and_merge(candidates)
+    labels = [_KIND_LABELS.get(kind, kind.replace("_", " ")) for kind in kinds]
+    return _merge_datasets(datasets, labels)
 
 
 def _load_and_merge(paths: list[Path]) -> dict:
-    """Load one or more discovery JSONs and merge their invocables.
-
-    If multiple files are found (hybrid binary), the user is notified clearly
-    and all invocables are combined into a single list so the selection UI
-    works on the full picture at once.
-    """
+    """Load one or more discovery JSONs and merge their invocables."""
     datasets: list[dict] = []
+    labels: list[str] = []
     for p in paths:
         with open(p, "r", encoding="utf-8") as f:
             data = json.load(f)
@@ -150,19 +164,25 @@ def _load_and_merge(paths: list[Path]) -> dict:
                 raise ValueError(f"{p.name}: missing key {key!r}")
         if isinstance(data["invocables"], list) and data["invocables"]:
             datasets.append(data)
+            labels.append(_kind_label(p))
 
     if not datasets:
         raise ValueError("No invocables found in any of the discovery outputs.")
 
+    return _merge_datasets(datasets, labels)
+
+
+def _merge_datasets(datasets: list[dict], labels: list[str]) -> dict:
+    """Merge discovery datasets into one.
+
+    If multiple datasets are given (hybrid binary), the user is notified
+    clearly and all invocables are combined into a single list so the
+    selection UI works on the full picture at once.
+    """
     if len(datasets) == 1:
         return datasets[0]
 
     # ── Hybrid detected ──────────────────────────────────────────────────────
-    labels = [_kind_label(Path(d.get("metadata", {}).get("target_path", "") or paths[i].name))
-              for i, d in enumerate(datasets)]
-    # fallback: use filenames if metadata target_path is unhelpful
-    labels = [_kind_label(paths[i]) for i in range(len(datasets))]
-
     total = sum(len(d["invocables"]) for d in datasets)
     label_str = "  +  ".join(
         f"[bold]{len(d['invocables'])}[/] {labels[i]}"
@@ -0,0 +1,63 @@
+"""
+test_analyze_file.py - In-process analysis API tests.
+
+Checks that analyze_file() returns invocables without touching disk unless
+artifacts are requested, and that --aggregate-only directory scans match
+full scans.
+"""
+
+import json
+import sys
+from argparse import Namespace
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+from main import analyze_directory, analyze_file
+from schema import AnalysisOptions
+
+
+class TestAnalyzeFile:
+    """Test suite for analyze_file()."""
+
+    SCRIPTS_DIR = Path(__file__).parent / "fixtures" / "scripts"
+
+    def test_in_memory_by_default(self, tmp_path, monkeypatch):
+        """Verify the default options return invocables and write nothing."""
+        monkeypatch.chdir(tmp_path)
+        result = analyze_file(self.SCRIPTS_DIR / "sample.py")
+
+        assert result.exit_code == 0
+        assert result.file_type == "PYTHON_SCRIPT"
+        assert result.invocables
+        assert result.artifacts == []
+        assert list(tmp_path.iterdir()) == []
+
+    def test_artifacts_match_result(self, tmp_path):
+        """Verify the written *_mcp.json holds the returned invocables."""
+        result = analyze_file(
+            self.SCRIPTS_DIR / "sample.py",
+            AnalysisOptions(out_dir=tmp_path, write_artifacts=True),
+        )
+        mcp_json = next(p for p in result.artifacts if p.name.endswith("_mcp.json"))
+        with open(mcp_json, encoding="utf-8") as fh:
+            data = json.load(fh)
+
+        assert data["invocables"] == [inv.to_dict() for inv in result.invocables]
+
+    def test_aggregate_only_scan(self, tmp_path):
+        """Verify --aggregate-only skips per-file reports, same aggregate."""
+        full, agg = tmp_path / "full", tmp_path / "agg"
+        full.mkdir()
+        agg.mkdir()
+        assert analyze_directory(self.SCRIPTS_DIR, full, Namespace()) == 0
+        assert analyze_directory(self.SCRIPTS_DIR, agg, Namespace(aggregate_only=True)) == 0
+
+        with open(full / "scripts_scan_mcp.json", encoding="utf-8") as fh:
+            expected = json.load(fh)["invocables"]
+        with open(agg / "scripts_scan_mcp.json", encoding="utf-8") as fh:
+            actual = json.load(fh)["invocables"]
+
+        assert actual == expected
+        assert not any(p.is_dir() for p in agg.iterdir())
@@ -0,0 +1,69 @@
+"""
+test_classify.py - Signature-table classification tests.
+
+Checks that classify_file() decides from the extension and a single
+bounded read of the file's first bytes: text markers for XML, top-level
+keys for JSON, and PE optional-header facts and import names for binaries.
+"""
+
+import builtins
+import json
+import struct
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+from classify import HEADER_READ_SIZE, FileType, classify_file
+from pe_image import DIR_IMPORT
+from test_pe_image import SECTION_RVA, build_pe
+
+
+def ole32_client(path: Path, import_offset: int = 0x100) -> Path:
+    """DLL importing OLE32.dll, with its import descriptor at *import_offset* of the section."""
+    section = bytearray(import_offset + 0x100)
+    rva = SECTION_RVA + import_offset
+    struct.pack_into("<IIIII", section, import_offset, rva + 0x40, 0, 0, rva + 0x80, rva + 0x40)
+    section[import_offset + 0x80:import_offset + 0x8A] = b"OLE32.dll\x00"
+    return build_pe(path, section=bytes(section), directories={DIR_IMPORT: (rva, 40)})
+
+
+class TestClassify:
+    """Test suite for classify_file()."""
+
+    def test_text_markers_and_json_keys(self, tmp_path):
+        """Verify descriptors are told apart by content, not just extension."""
+        cases = {
+            "beans.xml": ('<bean class="JndiObjectFactoryBean"/>', FileType.JNDI_CONFIG),
+            "svc.xml": ('<definitions xmlns="http://schemas.xmlsoap.org/wsdl/">', FileType.WSDL_FILE),
+            "pom.xml": ("<project><definitions/></project>", FileType.UNKNOWN),
+            "api.json": (json.dumps({"openapi": "3.0.0", "paths": {}}), FileType.OPENAPI_SPEC),
+            "rpc.json": (json.dumps({"methods": [{"name": "add"}]}), FileType.JSONRPC_SPEC),
+            "data.json": (json.dumps([1, 2, 3]), FileType.UNKNOWN),
+            "config.yml": ("key: value", FileType.OPENAPI_SPEC),
+        }
+        for name, (content, expected) in cases.items():
+            (tmp_path / name).write_text(content)
+            assert classify_file(tmp_path / name) == expected, name
+
+    def test_single_bounded_read(self, tmp_path, monkeypatch):
+        """Verify one open per sniffed file, none for extension-only types."""
+        dll = ole32_client(tmp_path / "client.dll")
+        script = tmp_path / "tool.py"
+        script.write_text("def main(): pass\n")
+
+        opened = []
+        real_open = builtins.open
+        monkeypatch.setattr(builtins, "open", lambda f, *a, **k: opened.append(f) or real_open(f, *a, **k))
+
+        assert classify_file(dll) == FileType.COM_OBJECT
+        assert classify_file(script) == FileType.PYTHON_SCRIPT
+        assert opened == [dll]
+
+    def test_import_table_past_header(self, tmp_path):
+        """Verify COM detection maps the whole file when imports lie past the header read."""
+        far = ole32_client(tmp_path / "far.dll", import_offset=HEADER_READ_SIZE + 0x100)
+        assert classify_file(far) == FileType.COM_OBJECT
+        assert classify_file(build_pe(tmp_path / "plain.dll")) == FileType.PE_DLL
+        assert classify_file(build_pe(tmp_path / "tool.exe", is_dll=False)) == FileType.PE_EXE
@@ -0,0 +1,206 @@
+"""
+test_clr_metadata.py - ECMA-335 metadata reader and XML doc tests.
+
+Assembles a tiny managed image (CLR header, #~ tables, #Strings and #Blob
+heaps) in memory and checks that the public methods and assembly identity
+match what reflection reports, and that a sibling Calc.xml documents them,
+for the equivalent C#:
+
+    namespace Ns {
+        public class Calc {
+            public static int Add(int a, int b);
+            public void Log(string[] lines, ref byte state);
+            private void Secret();
+            public int Value { get; }
+        }
+        class Hidden { public void Run(); }
+        public class Base<T> { public T Get(int index); }
+        public class Items : Base<string> { }
+    }
+"""
+
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+from clr_metadata import ClrMetadata, MetadataError
+from dotnet_analyzer import get_dotnet_metadata, get_dotnet_methods
+from dotnet_xmldoc import load_xml_docs
+from pe_image import DIR_CLR, PEImage
+from test_pe_image import SECTION_RVA, build_pe
+
+CLR_HEADER_SIZE = 72
+
+CALC_XML = """<?xml version="1.0"?>
+<doc>
+    <assembly><name>Calc</name></assembly>
+    <members>
+        <member name="T:Ns.Calc"><summary>Calculator.</summary></member>
+        <member name="M:Ns.Calc.Add(System.Int32,System.Int32)">
+            <summary>Adds <paramref name="a"/> and
+                <paramref name="b"/>, see <see cref="M:Ns.Calc.Log(System.String[],System.Byte@)"/>.</summary>
+            <param name="a">First value.</param>
+            <param name="b">Second value.</param>
+            <returns>The sum.</returns>
+        </member>
+        <member name="M:Ns.Base`1.Get(System.Int32)">
+            <summary>Item at <paramref name="index"/>.</summary>
+        </member>
+    </members>
+</doc>
+"""
+
+
+class _Heap:
+    """#Strings or #Blob heap under construction (index 0 is the empty entry)."""
+
+    def __init__(self, blob: bool):
+        self.data = bytearray(b"\x00")
+        self.blob = blob
+
+    def add(self, value) -> int:
+        offset = len(self.data)
+        if self.blob:
+            self.data += bytes([len(value)]) + value
+        else:
+            self.data += value.encode() + b"\x00"
+        return offset
+
+
+def build_metadata(truncate: bool = False) -> bytes:
+    """CLR header + metadata root for the assembly in the module docstring."""
+    strings, blobs = _Heap(False), _Heap(True)
+    s, b = strings.add, blobs.add
+
+    tables = {
+        0x00: [("<HHHHH", 0, s("Calc.dll"), 0, 0, 0)],                       # Module
+        0x01: [("<HHH", 0, s("Object"), s("System"))],                      # TypeRef
+        0x02: [                                                             # TypeDef
+            ("<IHHHHH", 0, s("<Module>"), 0, 0, 1, 1),
+            ("<IHHHHH", 0x100001, s("Calc"), s("Ns"), 1 << 2 | 1, 1, 1),
+            ("<IHHHHH", 0x100000, s("Hidden"), s("Ns"), 1 << 2 | 1, 1, 5),
+            ("<IHHHHH", 0x100001, s("Base`1"), s("Ns"), 1 << 2 | 1, 1, 6),
+            ("<IHHHHH", 0x100001, s("Items"), s("Ns"), 1 << 2 | 2, 1, 7),
+        ],
+        0x06: [                                                             # MethodDef
+            ("<IHHHHH", 0, 0, 0x96, s("Add"), b(b"\x00\x02\x08\x08\x08"), 1),
+            ("<IHHHHH", 0, 0, 0x86, s("Log"), b(b"\x20\x02\x01\x1d\x0e\x10\x05"), 3),
+            ("<IHHHHH", 0, 0, 0x81, s("Secret"), b(b"\x20\x00\x01"), 5),
+            ("<IHHHHH", 0, 0, 0x886, s("get_Value"), b(b"\x20\x00\x08"), 5),
+            ("<IHHHHH", 0, 0, 0x86, s("Run"), b(b"\x20\x00\x01"), 5),
+            ("<IHHHHH", 0, 0, 0x86, s("Get"), b(b"\x20\x01\x13\x00\x08"), 5),
+        ],
+        0x08: [("<HHH", 0, seq, s(name)) for seq, name in                   # Param
+               ((1, "a"), (2, "b"), (1, "lines"), (2, "state"), (1, "index"))],
+        0x1B: [("<H", b(b"\x15\x12" + bytes([4 << 2]) + b"\x01\x0e"))],      # TypeSpec Base<string>
+        0x20: [("<IHHHHIHHH", 0x8004, 1, 2, 3, 4, 0, 0, s("Calc"), 0)],     # Assembly
+        0x2A: [("<HHHH", 0, 0, 4 << 1, s("T"))],                            # GenericParam
+    }
+
+    valid = sum(1 << t for t in tables)
+    stream = struct.pack("<IBBBBQQ", 0, 2, 0, 0, 1, valid, 0)
+    stream += b"".join(struct.pack("<I", len(rows)) for _, rows in sorted(tables.items()))
+    for _, rows in sorted(tables.items()):
+        stream += b"".join(struct.pack(fmt, *values) for fmt, *values in rows)
+    if truncate:
+        stream = stream[:len(stream) // 2]
+
+    def padded(data) -> bytes:
+        return bytes(data) + b"\x00" * (-len(data) % 4)
+
+    streams = [(b"#~", padded(stream)), (b"#Strings", padded(strings.data)),
+               (b"#Blob", padded(blobs.data))]
+    version = padded(b"v4.0.30319\x00")
+    header_size = 16 + len(version) + 4 + sum(8 + len(padded(name + b"\x00")) for name, _ in streams)
+
+    root = struct.pack("<IHHII", 0x424A5342, 1, 1, 0, len(version)) + version
+    root += struct.pack("<HH", 0, len(streams))
+    offset = header_size
+    for name, data in streams:
+        root += struct.pack("<II", offset, len(data)) + padded(name + b"\x00")
+        offset += len(data)
+    root += b"".join(data for _, data in streams)
+
+    cor20 = struct.pack("<IHHII", CLR_HEADER_SIZE, 2, 5,
+                        SECTION_RVA + CLR_HEADER_SIZE, len(root))
+    return cor20.ljust(CLR_HEADER_SIZE, b"\x00") + root
+
+
+def build_assembly(path: Path, truncate: bool = False) -> Path:
+    return build_pe(path, is_64bit=False, machine=0x014C,
+                    section=build_metadata(truncate),
+                    directories={DIR_CLR: (SECTION_RVA, CLR_HEADER_SIZE)})
+
+
+class TestClrMetadata:
+    """Test suite for the in-process .NET metadata reader."""
+
+    def test_public_methods(self, tmp_path):
+        """Verify public methods, reflection type names and inherited generics."""
+        with PEImage.open(build_assembly(tmp_path / "Calc.dll")) as image:
+            methods = ClrMetadata.open(image).public_methods()
+
+        rendered = [(m.type_name, m.name, m.return_type, m.parameters, m.is_static)
+                    for m in methods]
+        assert rendered == [
+            ("Ns.Calc", "Add", "Int32", [("Int32", "a"), ("Int32", "b")], True),
+            ("Ns.Calc", "Log", "Void", [("String[]", "lines"), ("Byte&", "state")], False),
+            ("Ns.Base`1", "Get", "T", [("Int32", "index")], False),
+            ("Ns.Items", "Get", "String", [("Int32", "index")], False),
+        ]
+        # Inherited methods keep the ID of their generic declaration
+        assert [m.doc_id for m in methods] == [
+            "M:Ns.Calc.Add(System.Int32,System.Int32)",
+            "M:Ns.Calc.Log(System.String[],System.Byte@)",
+            "M:Ns.Base`1.Get(System.Int32)",
+            "M:Ns.Base`1.Get(System.Int32)",
+        ]
+
+    def test_dotnet_invocables_without_powershell(self, tmp_path):
+        """Verify get_dotnet_methods() and get_dotnet_metadata() read the image directly."""
+        dll = build_assembly(tmp_path / "Calc.dll")
+
+        invocables = get_dotnet_methods(dll)
+        add = invocables[0]
+        assert add.name == "Ns.Calc.Add"
+        assert add.signature == "Int32 Add(Int32 a, Int32 b)"
+        assert add.source_type == "dotnet"
+        assert add.doc_comment == "Static method from Ns"
+
+        assert get_dotnet_metadata(dll) == {
+            "AssemblyName": "Calc", "Version": "1.2.3.4",
+            "Culture": "neutral", "PublicKeyToken": "null"}
+
+    def test_xml_documentation(self, tmp_path):
+        """Verify a sibling <Assembly>.xml supplies summaries, params and returns."""
+        dll = build_assembly(tmp_path / "Calc.dll")
+        xml = tmp_path / "Calc.xml"
+        xml.write_text(CALC_XML)
+
+        docs = load_xml_docs(xml, {"M:Ns.Calc.Add(System.Int32,System.Int32)"})
+        assert list(docs) == ["M:Ns.Calc.Add(System.Int32,System.Int32)"]
+        add = docs["M:Ns.Calc.Add(System.Int32,System.Int32)"]
+        assert add.summary == "Adds a and b, see Log."
+        assert add.params == (("a", "First value."), ("b", "Second value."))
+        assert add.returns == "The sum."
+
+        by_name = {inv.name: inv for inv in get_dotnet_methods(dll)}
+        assert by_name["Ns.Calc.Add"].doc_comment == (
+            "Adds a and b, see Log. Parameters: a: First value; b: Second value. Returns: The sum.")
+        assert "XML documentation" in by_name["Ns.Calc.Add"].confidence_reasons
+        assert by_name["Ns.Items.Get"].doc_comment == "Item at index."
+        assert by_name["Ns.Calc.Log"].doc_comment == "Instance method from Ns"
+
+    def test_malformed_metadata(self, tmp_path):
+        """Verify truncated tables raise MetadataError and native images yield None."""
+        with PEImage.open(build_assembly(tmp_path / "bad.dll", truncate=True)) as image:
+            with pytest.raises(MetadataError):
+                ClrMetadata.open(image).public_methods()
+
+        with PEImage.open(build_pe(tmp_path / "native.dll")) as image:
+            assert ClrMetadata.open(image) is None
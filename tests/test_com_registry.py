@@ -0,0 +1,117 @@
+"""
+test_com_registry.py - COM registration index tests.
+
+Loads regedit exports (no Windows registry needed) and checks that
+servers are indexed by file name with their CLSID, ProgID, server type
+and friendly name, that scan_com_registry() reuses one index, and that
+directory scans hand their index to worker processes.
+"""
+
+import json
+import sys
+from argparse import Namespace
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+import main
+from com_registry import ComRegistration, ComRegistryIndex, registry_index, server_filename
+from com_scan import scan_com_registry
+from test_pe_image import build_pe
+
+# "%SystemRoot%\system32\shell32.dll" as REG_EXPAND_SZ, split over two lines
+SHELL32_EXPAND = ("hex(2):25,00,53,00,79,00,73,00,74,00,65,00,6d,00,52,00,6f,00,6f,00,74,00,25,\\\n"
+                  "  00,5c,00,73,00,79,00,73,00,74,00,65,00,6d,00,33,00,32,00,5c,00,73,00,68,00,\\\n"
+                  "  65,00,6c,00,6c,00,33,00,32,00,2e,00,64,00,6c,00,6c,00,00,00")
+
+REG_EXPORT = f"""Windows Registry Editor Version 5.00
+
+[HKEY_CLASSES_ROOT\\CLSID\\{{13709620-C279-11CE-A49E-444553540000}}]
+@="Shell Automation Service"
+
+[HKEY_CLASSES_ROOT\\CLSID\\{{13709620-C279-11CE-A49E-444553540000}}\\InProcServer32]
+@={SHELL32_EXPAND}
+"ThreadingModel"="Apartment"
+
+[HKEY_CLASSES_ROOT\\CLSID\\{{13709620-C279-11CE-A49E-444553540000}}\\ProgID]
+@="Shell.Application.1"
+
+; Out-of-process server with quotes and switches
+[HKEY_LOCAL_MACHINE\\SOFTWARE\\Classes\\WOW6432Node\\CLSID\\{{00024500-0000-0000-C000-000000000046}}]
+@="Microsoft Excel Application"
+
+[HKEY_LOCAL_MACHINE\\SOFTWARE\\Classes\\WOW6432Node\\CLSID\\{{00024500-0000-0000-C000-000000000046}}\\LocalServer32]
+@="\\"C:\\\\Program Files\\\\Microsoft Office\\\\EXCEL.EXE\\" /automation"
+
+[HKEY_CLASSES_ROOT\\CLSID\\{{00000000-1111-2222-3333-444444444444}}]
+@="Registered without a server"
+
+[-HKEY_CLASSES_ROOT\\CLSID\\{{99999999-0000-0000-0000-000000000000}}\\InprocServer32]
+"""
+
+
+class TestComRegistry:
+    """Test suite for the COM registration index."""
+
+    def test_reg_export(self, tmp_path):
+        """Verify a UTF-16 regedit export is indexed by server file name."""
+        reg = tmp_path / "clsid.reg"
+        reg.write_bytes(b"\xff\xfe" + REG_EXPORT.encode("utf-16-le"))
+
+        index = ComRegistryIndex.from_reg_file(reg)
+        assert index.count == 2
+
+        shell, = index.lookup("SHELL32.dll")
+        assert shell.to_dict() == {
+            'clsid': "{13709620-C279-11CE-A49E-444553540000}",
+            'name': "Shell Automation Service",
+            'progid': "Shell.Application.1",
+            'server_path': "%SystemRoot%\\system32\\shell32.dll",
+            'inproc': True,
+            'server_type': "InprocServer32",
+        }
+
+        excel, = index.lookup("excel.exe")
+        assert (excel.server_type, excel.progid, excel.name) == (
+            "LocalServer32", None, "Microsoft Excel Application")
+        assert index.lookup("kernel32.dll") == []
+
+    def test_server_filename(self):
+        """Verify quotes, switches and Windows paths are stripped on any OS."""
+        assert server_filename('"C:\\Program Files\\App\\app.exe" /automation') == "app.exe"
+        assert server_filename("C:\\WINDOWS\\System32\\OLE32.DLL") == "ole32.dll"
+        assert server_filename("mscoree.dll -Embedding") == "mscoree.dll"
+
+    def test_scan_com_registry_reuses_index(self, tmp_path):
+        """Verify scan_com_registry() reads a .reg file once per process."""
+        reg = tmp_path / "clsid.reg"
+        reg.write_text(REG_EXPORT.replace("Windows Registry Editor Version 5.00", "REGEDIT4"))
+
+        assert registry_index(reg) is registry_index(reg)
+        objects = scan_com_registry("shell32.dll", reg)
+        assert [(o['clsid'], o['progid']) for o in objects] == [
+            ("{13709620-C279-11CE-A49E-444553540000}", "Shell.Application.1")]
+        assert scan_com_registry("missing.dll", tmp_path / "missing.reg") == []
+
+    def test_directory_scan_seeds_workers(self, tmp_path, monkeypatch):
+        """Verify --jobs workers use the index built by the scan, not their own."""
+        reg = tmp_path / "clsid.reg"
+        reg.write_text(REG_EXPORT)
+        seeded = ComRegistryIndex([ComRegistration(
+            "{11111111-2222-3333-4444-555555555555}", "Seeded", "Seeded.Application",
+            "C:\\Windows\\shell32.dll", "InprocServer32")])
+        monkeypatch.setattr(main, "registry_index", lambda reg_file=None: seeded)
+
+        root = tmp_path / "bin"
+        root.mkdir()
+        build_pe(root / "shell32.dll")
+        build_pe(root / "excel.exe", is_dll=False)
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+        args = Namespace(com_registry=reg, jobs=2, aggregate_only=True, no_cache=True)
+        assert main.analyze_directory(root, out_dir, args) == 0
+
+        with open(out_dir / "bin_scan_mcp.json", encoding="utf-8") as fh:
+            names = {inv["name"] for inv in json.load(fh)["invocables"]}
+        assert "Seeded.Application" in names and "Shell.Application.1" not in names
@@ -0,0 +1,77 @@
+"""
+test_comment_index.py - Shared comment index tests.
+
+Checks the bisect lookups of CommentIndex (containment, ranges, the run of
+comments directly above an offset) and the doc comments the header, IDL
+and SQL analyzers now read from it.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+from comment_index import SQL_COMMENTS, CommentIndex
+from headers_scan import doc_comment_above, find_prototype_in_header
+from idl_analyzer import analyze_idl
+from sql_analyzer import analyze_sql
+
+C_SOURCE = """\
+int x; /// trailing
+/** Block doc,
+ * second line. */
+/// First line.
+/// Second line.
+
+int f(void);
+"""
+
+
+class TestCommentIndex:
+    """Test suite for CommentIndex and the analyzers using it."""
+
+    def test_lookups(self):
+        """Verify containment, range lookup, runs and blanking keep offsets."""
+        comments = CommentIndex(C_SOURCE)
+        assert len(comments) == 4
+        assert comments.contains(C_SOURCE.index("trailing"))
+        assert not comments.contains(C_SOURCE.index("int f"))
+        assert [c.marker for c in comments.within(0, C_SOURCE.index("/**"))] == ["///"]
+        assert comments[1].text == "Block doc,\nsecond line." and comments[1].own_line
+        assert not comments[0].own_line
+
+        run = comments.run_before(C_SOURCE.index("int f"))
+        assert [c.text for c in run] == ["Block doc,\nsecond line.", "First line.", "Second line."]
+        assert comments.run_before(C_SOURCE.index("int f"), max_blank_lines=0) == []
+
+        blank = comments.blank()
+        assert len(blank) == len(C_SOURCE) and blank.count("\n") == C_SOURCE.count("\n")
+        assert "doc" not in blank and blank.index("int f") == C_SOURCE.index("int f")
+
+    def test_header_doc_comments(self, tmp_path):
+        """Verify Doxygen runs and blocks attach, plain comments do not."""
+        comments = CommentIndex(C_SOURCE)
+        assert doc_comment_above(comments, C_SOURCE.index("int f")) == "First line.\nSecond line."
+
+        header = tmp_path / "api.h"
+        header.write_text("/*! Opens it. */\n\nint Open(int flags);\n"
+                          "/* Not a doc comment. */\nint Close(int h);\n")
+        assert find_prototype_in_header(header, "Open").doc_comment == "Opens it."
+        assert find_prototype_in_header(header, "Close").doc_comment == ""
+
+    def test_idl_and_sql_docs(self, tmp_path):
+        """Verify IDL // runs and SQL preamble comments come from the index."""
+        idl = tmp_path / "bank.idl"
+        idl.write_text("module Bank {\n  interface Account {\n"
+                       "    // Current balance\n    // in cents.\n\n    long balance();\n"
+                       "    /* internal */\n    void reset();\n  };\n};\n")
+        docs = {i.name: i.doc_comment for i in analyze_idl(idl)}
+        assert docs == {"balance": "Current balance in cents.", "reset": None}
+
+        sql = tmp_path / "schema.sql"
+        sql.write_text("-- ----------------\n-- Lists users.\nCREATE VIEW v_users AS SELECT 1;\n"
+                       "/**\n * Adds a user.\n */\nCREATE PROCEDURE add_user @name VARCHAR(50) AS SELECT 1;\n")
+        docs = {i.name: i.doc_comment for i in analyze_sql(sql)}
+        assert docs == {"v_users": "Lists users.", "add_user": "Adds a user."}
+        assert [c.marker for c in CommentIndex(sql.read_text(), SQL_COMMENTS)] == ["--", "--", "/**"]
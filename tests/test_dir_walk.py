@@ -0,0 +1,74 @@
+"""
+test_dir_walk.py - Directory walker and batched classification tests.
+
+Builds a small install tree with pruned directories (.git, node_modules,
+WinSxS backups) and checks walk_files() / classify_tree() against the
+rglob-based enumeration they replace.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+import dir_walk
+from classify import FileType, classify_file
+from dir_walk import classify_tree, walk_files
+
+EXTENSIONS = {".py", ".js", ".json", ".dll"}
+
+
+def build_tree(root: Path) -> Path:
+    files = {
+        "app/main.py": "def main(): pass\n",
+        "app/main.py.bak": "",
+        "app/b/util.js": "function util() {}\n",
+        "app/a.py": "",
+        "app/data.json": "[1, 2]",
+        "app/node_modules/dep/index.js": "module.exports = 1\n",
+        "app/.git/hooks/post.py": "",
+        "Windows/WinSxS/amd64_x/helper.py": "",
+        "Windows/WinSxS/Backup/old.py": "",
+        "Windows/Temp/scratch.py": "",
+        "big.py": "x = 1\n" * 1000,
+    }
+    for rel, content in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return root
+
+
+class TestDirWalk:
+    """Test suite for the scandir-based walker."""
+
+    def test_sorted_like_rglob(self, tmp_path):
+        """Verify order and filtering match sorted(rglob) minus pruned directories."""
+        root = build_tree(tmp_path)
+        walked = list(walk_files(root, EXTENSIONS, excluded=()))
+
+        expected = [p for p in sorted(root.rglob("*")) if p.is_file() and p.suffix in EXTENSIONS
+                    and "Backup" not in p.parts]
+        assert walked == expected
+
+    def test_pruning_and_size_limit(self, tmp_path):
+        """Verify default and extra excluded directories and the size cap."""
+        root = build_tree(tmp_path)
+        walked = [p.relative_to(root).as_posix()
+                  for p in walk_files(root, EXTENSIONS, max_size=1000,
+                                      excluded=dir_walk.EXCLUDED_DIRS | {"temp"})]
+        assert walked == ["Windows/WinSxS/amd64_x/helper.py", "app/a.py", "app/b/util.js",
+                          "app/data.json", "app/main.py"]
+
+    def test_classify_tree_batches(self, tmp_path, monkeypatch):
+        """Verify threaded batches give the serial result and drop UNKNOWN files."""
+        root = build_tree(tmp_path)
+        monkeypatch.setattr(dir_walk, "CLASSIFY_BATCH_SIZE", 2)
+
+        serial = classify_tree(root, EXTENSIONS)
+        assert classify_tree(root, EXTENSIONS, workers=4) == serial
+        assert (root / "app/data.json", FileType.UNKNOWN) not in serial
+        assert serial == [(p, classify_file(p)) for p in walk_files(root, EXTENSIONS)
+                          if classify_file(p) != FileType.UNKNOWN]
+        assert [t for _, t in serial].count(FileType.JAVASCRIPT) == 1
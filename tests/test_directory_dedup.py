@@ -0,0 +1,79 @@
+"""
+test_directory_dedup.py - Content-hash deduplication in directory scans.
+
+Scans a tree holding several copies of the same script and checks that
+each distinct file is analyzed once, every copy is listed in source_files,
+and --unique-blobs emits the shared invocables only once.
+"""
+
+import json
+import shutil
+import sys
+from argparse import Namespace
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+from main import analyze_directory
+
+SAMPLE = Path(__file__).parent / "fixtures" / "scripts" / "sample.py"
+
+
+def build_tree(root: Path) -> Path:
+    for folder in ("en-US", "de-DE", "fr-FR"):
+        (root / folder).mkdir(parents=True)
+        shutil.copy(SAMPLE, root / folder / "sample.py")
+    (root / "renamed.py").write_bytes(SAMPLE.read_bytes())
+    return root
+
+
+def scan(root: Path, out_dir: Path, **options) -> dict:
+    assert analyze_directory(root, out_dir, Namespace(**options)) == 0
+    with open(out_dir / f"{root.name}_scan_mcp.json", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+class TestDirectoryDedup:
+    """Test suite for content-hash deduplication."""
+
+    def test_copies_analyzed_once(self, tmp_path, capsys):
+        """Verify one analysis per blob, with every copy recorded."""
+        root = build_tree(tmp_path / "product")
+        data = scan(root, tmp_path / "out", no_cache=True)
+        output = capsys.readouterr().out
+
+        files = {s["relative_path"].replace("\\", "/"): s for s in data["metadata"]["source_files"]}
+        assert files["en-US/sample.py"]["duplicate_of"] == "de-DE/sample.py"
+        assert files["fr-FR/sample.py"]["duplicate_of"] == "de-DE/sample.py"
+        assert "duplicate_of" not in files["de-DE/sample.py"]
+        assert "duplicate_of" not in files["renamed.py"]  # name-dependent analysis
+        assert len({s["sha256"] for s in files.values()}) == 1
+        assert data["metadata"]["file_count"] == 4
+        assert data["metadata"]["unique_file_count"] == 2
+        assert "Files analysed:      2 (+2 duplicate copies)" in output
+
+    def test_copies_bound_to_their_own_path(self, tmp_path):
+        """Verify copies repeat the invocables, pointing at their own path."""
+        root = build_tree(tmp_path / "product")
+        data = scan(root, tmp_path / "out", jobs=2)
+
+        counts = {s["relative_path"].replace("\\", "/"): s["count"]
+                  for s in data["metadata"]["source_files"]}
+        assert counts["en-US/sample.py"] == counts["de-DE/sample.py"] > 0
+        assert sum(counts.values()) == data["summary"]["total_invocables"]
+        dumped = json.dumps(data["invocables"])
+        for folder in ("en-US", "de-DE", "fr-FR"):
+            assert json.dumps(str(root / folder / "sample.py"))[1:-1] in dumped
+
+    def test_unique_blobs(self, tmp_path):
+        """Verify --unique-blobs emits each blob's invocables once."""
+        root = build_tree(tmp_path / "product")
+        every = scan(root, tmp_path / "every")
+        unique = scan(root, tmp_path / "unique", unique_blobs=True)
+
+        counts = {s["relative_path"].replace("\\", "/"): s["count"]
+                  for s in unique["metadata"]["source_files"]}
+        assert counts["en-US/sample.py"] == counts["fr-FR/sample.py"] == 0
+        assert unique["summary"]["total_invocables"] * 2 == every["summary"]["total_invocables"]
+        assert sum(counts.values()) == unique["summary"]["total_invocables"]
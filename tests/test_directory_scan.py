@@ -0,0 +1,94 @@
+"""
+test_directory_scan.py - Directory scan (§2.a installed instance) tests.
+
+Runs analyze_directory() over the script fixtures serially and with a
+process pool and checks that both produce the same aggregate output.
+"""
+
+import json
+import sys
+from argparse import Namespace
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+from main import analyze_directory, analyze_file
+from scan_cache import ScanCache, file_hash
+from schema import AnalysisOptions
+
+
+class TestDirectoryScan:
+    """Test suite for directory scans."""
+
+    SCRIPTS_DIR = Path(__file__).parent / "fixtures" / "scripts"
+
+    def _scan(self, out_dir: Path, jobs: int) -> dict:
+        rc = analyze_directory(self.SCRIPTS_DIR, out_dir, Namespace(jobs=jobs))
+        assert rc == 0
+        with open(out_dir / "scripts_scan_mcp.json", encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def test_parallel_matches_serial(self, tmp_path):
+        """Verify --jobs produces the same aggregate, in the same order."""
+        serial = self._scan(tmp_path / "serial", jobs=1)
+        parallel = self._scan(tmp_path / "parallel", jobs=3)
+
+        assert serial["invocables"] == parallel["invocables"]
+        assert serial["metadata"]["source_files"] == parallel["metadata"]["source_files"]
+        assert serial["summary"] == parallel["summary"]
+
+    def test_shared_stems_not_double_counted(self, tmp_path):
+        """Verify files sharing a stem are harvested independently."""
+        data = self._scan(tmp_path, jobs=1)
+        counts = {s["file"]: s["count"] for s in data["metadata"]["source_files"]}
+
+        assert counts["sample.py"] > 0
+        assert sum(counts.values()) == data["summary"]["total_invocables"]
+        assert (tmp_path / "sample.py").is_dir() and (tmp_path / "sample.js").is_dir()
+
+    def test_rescan_reuses_cache(self, tmp_path, capsys):
+        """Verify unchanged files come from the cache and edited ones do not."""
+        import shutil
+
+        src = tmp_path / "scripts"
+        shutil.copytree(self.SCRIPTS_DIR, src)
+        out = tmp_path / "out"
+
+        assert analyze_directory(src, out, Namespace()) == 0
+        first = json.loads((out / "scripts_scan_mcp.json").read_text(encoding="utf-8"))
+        capsys.readouterr()
+
+        with open(src / "sample.py", "a", encoding="utf-8") as fh:
+            fh.write("\n\ndef added_after_patch(x):\n    return x\n")
+        assert analyze_directory(src, out, Namespace()) == 0
+        second = json.loads((out / "scripts_scan_mcp.json").read_text(encoding="utf-8"))
+        output = capsys.readouterr().out
+
+        n_files = len(first["metadata"]["source_files"])
+        assert f"Cache hits:          {n_files - 1}/{n_files}" in output
+        assert second["summary"]["total_invocables"] == first["summary"]["total_invocables"] + 1
+        assert any(inv["name"] == "added_after_patch" for inv in second["invocables"])
+
+    def test_cache_keyed_by_target_and_inputs(self, tmp_path):
+        """Verify copies elsewhere and edited --headers trees are cache misses."""
+        one, two = tmp_path / "a" / "one.py", tmp_path / "b" / "two.py"
+        for path in (one, two):
+            path.parent.mkdir()
+            path.write_bytes((self.SCRIPTS_DIR / "sample.py").read_bytes())
+        headers = tmp_path / "include"
+        headers.mkdir()
+        (headers / "api.h").write_text("int f(void);\n")
+        options = AnalysisOptions(headers=headers)
+
+        cache = ScanCache.for_output_dir(tmp_path / "out")
+        cache.store(file_hash(one), options, analyze_file(one, options))
+        assert cache.lookup(one, file_hash(one), options) is not None
+        assert cache.lookup(two, file_hash(two), options) is None
+
+        (headers / "api.h").write_text("int f(int flags);\n")
+        cache.close()
+        cache = ScanCache.for_output_dir(tmp_path / "out")
+        assert cache.lookup(one, file_hash(one), options) is None
+        cache.close()
+
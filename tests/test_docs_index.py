@@ -0,0 +1,58 @@
+"""
+test_docs_index.py - Documentation identifier index tests.
+
+Builds a small docs tree and checks ranking, identifier boundaries and
+that the on-disk index is reused until the tree changes.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+from docs_index import DocsIndex, index_path
+from headers_scan import scan_docs_for_exports
+from schema import ExportedFunc
+
+
+class TestDocsIndex:
+    """Test suite for the docs identifier index."""
+
+    def _tree(self, root: Path) -> Path:
+        (root / "api").mkdir(parents=True)
+        (root / "api" / "CreateFileW.md").write_text("# CreateFileW\nOpens a file.")
+        (root / "guide.txt").write_text("Call CreateFileW, then CreateFileW again; see CreateFile.")
+        (root / "overview.html").write_text("<p>CreateFileW and CloseHandle</p>")
+        (root / "notes.bin").write_text("CreateFileW")  # not a doc extension
+        return root
+
+    def test_ranked_lookup(self, tmp_path):
+        """Verify name-matching files rank first, then by occurrences."""
+        docs = self._tree(tmp_path / "docs")
+        exports = [ExportedFunc(name=n) for n in ("CreateFileW", "CreateFile", "ReadFile")]
+
+        hits = scan_docs_for_exports(docs, exports, max_hits=3)
+
+        assert hits["CreateFileW"] == [str(Path("api/CreateFileW.md")), "guide.txt", "overview.html"]
+        assert hits["CreateFile"] == ["guide.txt"]  # whole identifiers only
+        assert "ReadFile" not in hits
+
+    def test_index_reused_until_tree_changes(self, tmp_path):
+        """Verify the cached index is reused and rebuilt after a doc is added."""
+        docs = self._tree(tmp_path / "docs")
+        index_dir = tmp_path / "out"
+
+        with DocsIndex.open(docs, index_dir) as index:
+            assert index.lookup_many(["CloseHandle"], 2) == {"CloseHandle": ["overview.html"]}
+        db = index_path(index_dir, docs)
+        built = db.stat().st_mtime_ns
+
+        with DocsIndex.open(docs, index_dir):
+            pass
+        assert db.stat().st_mtime_ns == built
+
+        (docs / "api" / "CloseHandle.md").write_text("CloseHandle closes it.")
+        with DocsIndex.open(docs, index_dir) as index:
+            assert index.lookup_many(["CloseHandle"], 2) == {
+                "CloseHandle": [str(Path("api/CloseHandle.md")), "overview.html"]}
@@ -0,0 +1,85 @@
+"""
+test_headers_scan.py - Header prototype index tests.
+
+Writes small header trees and checks that the one-pass HeaderIndex and a
+prebuilt prototype database find the same prototypes as the per-export
+find_prototype_in_header() search.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+from header_db import build_header_db, is_header_db
+from headers_scan import find_prototype_in_header, iter_header_files, scan_headers
+from schema import ExportedFunc
+
+API_H = """\
+#pragma once
+#define ZSTD_VERSION(x) (x)
+
+/**
+ * Compress src into dst.
+ */
+ZSTDLIB_API size_t
+ZSTD_compress(void* dst, size_t dstCapacity,
+              const void* src, size_t srcSize, int level);
+
+// ZSTD_decompress(void* dst);  commented out
+ZSTDLIB_API size_t ZSTD_decompress(void* dst, size_t cap, const void* src, size_t size); /* inline doc */
+
+/// Version number
+unsigned ZSTD_versionNumber(void);
+"""
+
+# Macro table with no terminating ";" or "{" (common in generated headers)
+TABLE_H = "".join(f"TRAITS_BEG(iau, {n}) params(ZSTD_compress(), x({n})) TRAITS_END()\n"
+                  for n in range(200))
+
+
+class TestHeaderIndex:
+    """Test suite for the header prototype index."""
+
+    def test_matches_per_export_search(self, tmp_path):
+        """Verify scan_headers agrees with a per-export, per-header search."""
+        (tmp_path / "a_table.h").write_text(TABLE_H)
+        (tmp_path / "zstd.h").write_text(API_H)
+        names = ["ZSTD_compress", "ZSTD_decompress", "ZSTD_versionNumber",
+                 "ZSTD_VERSION", "ZSTD_missing", "?mangled@@YAXXZ"]
+
+        matches = scan_headers(tmp_path, [ExportedFunc(name=n) for n in names])
+
+        for name in names:
+            expected = None
+            for hdr in iter_header_files(tmp_path):
+                expected = find_prototype_in_header(hdr, name)
+                if expected:
+                    break
+            assert matches.get(name) == expected
+
+        assert set(matches) == {"ZSTD_compress", "ZSTD_decompress", "ZSTD_versionNumber"}
+        compress = matches["ZSTD_compress"]
+        assert compress.return_type == "size_t"
+        assert compress.doc_comment == "Compress src into dst."
+        assert compress.line == 7
+        assert matches["ZSTD_decompress"].doc_comment == "inline doc"
+        assert matches["ZSTD_versionNumber"].doc_comment == "Version number"
+
+    def test_prebuilt_db_matches_directory(self, tmp_path):
+        """Verify --headers given a built database returns the directory matches."""
+        include = tmp_path / "include"
+        include.mkdir()
+        (include / "a_table.h").write_text(TABLE_H)
+        (include / "zstd.h").write_text(API_H)
+        exports = [ExportedFunc(name=n) for n in
+                   ("ZSTD_versionNumber", "ZSTD_compress", "ZSTD_missing")]
+
+        db = tmp_path / "sdk.sqlite"
+        assert build_header_db(include, db) >= 3
+        assert is_header_db(db) and not is_header_db(include)
+
+        from_db = scan_headers(db, exports)
+        assert from_db == scan_headers(include, exports)
+        assert list(from_db) == ["ZSTD_versionNumber", "ZSTD_compress"]
@@ -0,0 +1,86 @@
+"""
+test_js_lexer.py - Single-pass JavaScript/TypeScript declaration scanner tests.
+
+Checks that scan_js() reports functions, arrows, methods and CommonJS
+exports with their JSDoc in one sweep, ignores anything inside comments,
+strings, template and regular-expression literals, and only attaches a
+JSDoc block that directly precedes its declaration.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+from js_analyzer import analyze_js
+from js_lexer import scan_js
+
+TS_SOURCE = """\
+/** Add two numbers. */
+export async function add<T extends Array<Map<string, number>>>(a: number, b = f(1, g(2))): Promise<number> {
+    return a + b;
+}
+
+export const scale = (v: number, k: number): number => v * k;
+const double = x => x * 2;
+module.exports.legacy = add;
+
+export class Store {
+    /** Read one key. */
+    @cached()
+    public async get<K>(key: K): Promise<string> {
+        if (key) { return lookup(key); }
+    }
+    get size() { return 0; }
+}
+"""
+
+
+class TestJsLexer:
+    """Test suite for scan_js()."""
+
+    def test_declarations(self, tmp_path):
+        """Verify each declaration kind with parameters, return type and JSDoc."""
+        events = {e.name: e for e in scan_js(TS_SOURCE)}
+        assert [e.kind for e in scan_js(TS_SOURCE)] == ["function", "arrow", "arrow", "export", "method"]
+
+        add = events["add"]
+        assert add.params == "a: number, b = f(1, g(2))"
+        assert (add.return_type, add.exported, add.jsdoc) == ("Promise<number>", True, " Add two numbers. ")
+        assert events["scale"].return_type == "number" and events["scale"].exported
+        assert events["double"].params == "x"
+        assert (events["get"].params, events["get"].jsdoc) == ("key: K", " Read one key. ")
+
+        (tmp_path / "store.ts").write_text(TS_SOURCE)
+        (tmp_path / "store.js").write_text(TS_SOURCE)
+        assert "get" in {i.name for i in analyze_js(tmp_path / "store.ts")}
+        assert "get" not in {i.name for i in analyze_js(tmp_path / "store.js")}
+
+    def test_literals_and_comments(self):
+        """Verify code inside comments and literals produces no events."""
+        source = (
+            "// function commented(a) {}\n"
+            "/* const alsoCommented = () => 1; */\n"
+            "const s = 'function quoted(a) {} \\' }';\n"
+            "const t = `${ { a: `function nested(b) {}` }.a } function templated() {}`;\n"
+            "const r = /function re(a) {}|[/*]/g, q = a / b / c;\n"
+            "function real(a) { return `}` + '{'; }\n"
+            "class K { method() {} }\n"
+        )
+        assert [(e.kind, e.name) for e in scan_js(source)] == [("function", "real"), ("method", "method")]
+
+    def test_jsdoc_attachment(self):
+        """Verify JSDoc attaches across blank lines and assignments, not across code."""
+        source = (
+            "/** Stale doc. */\n"
+            "const config = load();\n"
+            "function undocumented() {}\n"
+            "\n"
+            "/** Prototype doc. */;\n"
+            "Widget.prototype.render = function render(el) {};\n"
+            "/** Far doc. */\n\n\n\n\n"
+            "function tooFar() {}\n"
+        )
+        docs = {e.name: e.jsdoc for e in scan_js(source)}
+        assert docs == {"undocumented": None, "render": " Prototype doc. ", "tooFar": None}
@@ -0,0 +1,199 @@
+"""
+test_msft_typelib.py - Built-in MSFT type library reader tests.
+
+Assembles a small type library in memory (header, segment directory, type
+info, name, string, GUID, type descriptor and import tables plus function
+records) for the equivalent IDL:
+
+    [uuid(...), helpstring("Calculator library")]
+    library CalcLib {
+        importlib("stdole2.tlb");
+        [uuid(...), helpstring("Calculator interface")]
+        interface ICalc : IDispatch {
+            [helpstring("Adds two numbers")]
+            HRESULT Add([in] long a, [in] long b, [out, retval] long* result);
+            [propget] HRESULT Name([out, retval] BSTR* value);
+            [propput] HRESULT Name([in] BSTR value);
+        };
+        [uuid(...)] coclass Calc { [default] interface ICalc; };
+    }
+
+and checks it both as a standalone .tlb and as a TYPELIB resource of a PE.
+"""
+
+import struct
+import sys
+import uuid
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+from com_scan import com_objects_to_invocables
+from msft_typelib import load_type_libraries
+from pe_image import DIR_RESOURCE, PEImage
+from test_pe_image import SECTION_RVA, build_pe
+from tlb_analyzer import scan_type_library
+
+LIB_GUID = "{5A3E1D1D-947A-44AC-9B03-5C37D5F5FFFC}"
+ICALC_GUID = "{58955C76-60A9-4EEB-8B8A-8F92E90D0FE7}"
+CALC_GUID = "{1FCA61D1-A1A6-464C-B3A8-E9508B4AC8F7}"
+IDISPATCH_GUID = "{00020400-0000-0000-C000-000000000046}"
+
+VT_I4, VT_BSTR, VT_HRESULT, VT_PTR = 3, 8, 25, 26
+
+
+def inline(vt: int) -> int:
+    """A base VARTYPE encoded in place of a type descriptor offset."""
+    return struct.unpack("<i", struct.pack("<I", 0x80000000 | vt << 16 | vt))[0]
+
+
+class _Table:
+    """Name, string or GUID table under construction; add() returns the offset."""
+
+    def __init__(self, kind: str):
+        self.data = bytearray()
+        self.kind = kind
+
+    def add(self, value: str) -> int:
+        offset = len(self.data)
+        if self.kind == "guid":
+            self.data += uuid.UUID(value).bytes_le + struct.pack("<ii", -1, -1)
+            return offset
+        raw = value.encode()
+        if self.kind == "name":
+            entry = struct.pack("<iii", -1, -1, len(raw)) + raw
+        else:
+            entry = struct.pack("<H", len(raw)) + raw
+        self.data += entry + b"W" * (-len(entry) % 4)
+        return offset
+
+
+def function_block(names: _Table, strings: _Table, functions) -> bytes:
+    """Member block: record length, records, member IDs, names, record offsets."""
+    records, offsets = b"", []
+    for _, _, invkind, return_type, params, doc in functions:
+        args = b"".join(struct.pack("<iii", t, names.add(n) if n else -1, 1)
+                        for t, n in params)
+        length = 24 + 8 + len(args)
+        offsets.append(len(records))
+        records += struct.pack("<iiihhihh", length, return_type, 0, 28, 0,
+                               invkind << 3 | 1, len(params), 0)
+        records += struct.pack("<ii", 0, strings.add(doc) if doc else -1) + args
+    memids = b"".join(struct.pack("<i", memid) for _, memid, *_ in functions)
+    name_offsets = b"".join(struct.pack("<i", names.add(name) if name else -1)
+                            for name, *_ in functions)
+    return (struct.pack("<i", len(records)) + records + memids + name_offsets
+            + b"".join(struct.pack("<i", o) for o in offsets))
+
+
+def build_typelib(truncate: bool = False) -> bytes:
+    """MSFT type library for the IDL in the module docstring."""
+    names, strings, guids = _Table("name"), _Table("string"), _Table("guid")
+    long_ptr, bstr_ptr = 0, 8  # type descriptor offsets
+    typedescs = struct.pack("<hhhhhhhh", VT_PTR, 0, VT_I4, -1, VT_PTR, 0, VT_BSTR, -1)
+
+    lib = (guids.add(LIB_GUID), names.add("CalcLib"), strings.add("Calculator library"))
+    imports = struct.pack("<iii", 0x03010000, 0, guids.add(IDISPATCH_GUID))
+    import_files = struct.pack("<iiiH", 0, 0, 0, len("stdole2.tlb") << 2) + b"stdole2.tlbW"
+    reftab = struct.pack("<iiii", 0, 1, -1, -1)  # coclass Calc -> type info 0
+    icalc = (guids.add(ICALC_GUID), names.add("ICalc"), strings.add("Calculator interface"))
+    calc = (guids.add(CALC_GUID), names.add("Calc"), -1)
+    members = function_block(names, strings, [
+        ("Add", 0x60020000, 1, inline(VT_HRESULT),
+         [(inline(VT_I4), "a"), (inline(VT_I4), "b"), (long_ptr, "result")], "Adds two numbers"),
+        ("Name", 0x60020001, 2, inline(VT_HRESULT), [(bstr_ptr, "value")], None),
+        (None, 0x60020001, 4, inline(VT_HRESULT), [(inline(VT_BSTR), "value")], None),
+    ])
+
+    # Segment slot -> table; type infos are packed once the member block offset is known
+    tables = {1: imports, 2: import_files, 3: reftab, 5: guids.data,
+              7: names.data, 8: strings.data, 9: typedescs}
+    header_size = 0x54 + 2 * 4 + 15 * 16
+    memoffset = header_size + 2 * 0x64 + sum(len(t) for t in tables.values())
+
+    def type_info(kind, ids, functions, datatype1, offset):
+        guid, name, doc = ids
+        return struct.pack("<19ihh5i", kind, offset, 0, 0, 0, 0, functions, 0, 0, 0, 0,
+                           guid, 0, name, 0, doc, 0, 0, -1, 1, 0, 0, datatype1, 0, 0, 0)
+
+    tables[0] = (type_info(3, icalc, 3, 1, memoffset)       # ICalc : IDispatch (import 0)
+                 + type_info(5, calc, 0, 0, -1))            # coclass, reftab offset 0
+    directory, body = [], b""
+    for index in range(15):
+        if index in tables:
+            directory.append(struct.pack("<iiii", header_size + len(body), len(tables[index]), -1, 0x0F))
+            body += tables[index]
+        else:
+            directory.append(struct.pack("<iiii", -1, 0, -1, 0x0F))
+
+    header = struct.pack("<4s20i", b"MSFT", 0x00010002, lib[0], 0x409, 0, 0x41, 1, 0, 2,
+                         lib[2], 0, 0, 0, 0, lib[1], -1, -1, 0x20, 0x80, -1, 1)
+    data = header + struct.pack("<ii", 0, 0x64) + b"".join(directory) + body + members
+    return data[:len(data) // 2] if truncate else data
+
+
+def build_resource_section(typelib: bytes) -> bytes:
+    """.rsrc data with a single TYPELIB / 1 / 1033 resource."""
+    name = "TYPELIB".encode("utf-16-le")
+    section = struct.pack("<IIHHHH", 0, 0, 0, 0, 1, 0) + struct.pack("<II", 0x80000000 | 88, 0x80000000 | 24)
+    section += struct.pack("<IIHHHH", 0, 0, 0, 0, 0, 1) + struct.pack("<II", 1, 0x80000000 | 48)
+    section += struct.pack("<IIHHHH", 0, 0, 0, 0, 0, 1) + struct.pack("<II", 1033, 72)
+    section += struct.pack("<IIII", SECTION_RVA + 104, len(typelib), 0, 0)
+    section += struct.pack("<H", len(name) // 2) + name
+    return section + typelib
+
+
+class TestMsftTypeLib:
+    """Test suite for the built-in type library reader."""
+
+    def test_standalone_library(self, tmp_path):
+        """Verify interfaces, functions, parameter types and coclasses of a .tlb."""
+        tlb = tmp_path / "Calc.tlb"
+        tlb.write_bytes(build_typelib())
+
+        library, = load_type_libraries(tlb)
+        assert (library.name, library.guid, library.doc) == ("CalcLib", LIB_GUID, "Calculator library")
+
+        icalc, calc = library.types()
+        assert (icalc.kind, icalc.guid, icalc.doc, icalc.implemented) == (
+            "interface", ICALC_GUID, "Calculator interface", ["IDispatch"])
+        assert [(f.name, f.invkind, f.return_type, f.parameters, f.doc) for f in icalc.functions] == [
+            ("Add", 1, "HRESULT", [("long", "a"), ("long", "b"), ("long*", "result")], "Adds two numbers"),
+            ("Name", 2, "HRESULT", [("BSTR*", "value")], None),
+            ("Name", 4, "HRESULT", [("BSTR", "value")], None),
+        ]
+        assert (calc.kind, calc.guid, calc.implemented) == ("coclass", CALC_GUID, ["ICalc"])
+
+        entries = scan_type_library(tlb)
+        assert [(e["name"], e["kind"]) for e in entries] == [("ICalc", "interface"), ("Calc", "coclass")]
+        assert entries[0]["methods"][0]["parameter_types"] == ["long", "long", "long*"]
+
+    def test_embedded_typelib_resource(self, tmp_path):
+        """Verify a TYPELIB resource of a DLL becomes typed COM invocables."""
+        section = build_resource_section(build_typelib())
+        dll = build_pe(tmp_path / "calc.dll", section=section,
+                       directories={DIR_RESOURCE: (SECTION_RVA, len(section))})
+
+        with PEImage.open(dll) as image:
+            assert len(image.resources("typelib")) == 1
+            invocables = com_objects_to_invocables([], dll, image=image)
+
+        add = invocables[0]
+        assert add.name == "ICalc::Add"
+        assert add.signature == "HRESULT Add(long a, long b, long* result)"
+        assert add.doc_comment == "Adds two numbers"
+        assert add.clsid == ICALC_GUID
+        assert invocables[1].doc_comment == "Calculator interface"
+        assert [inv.name for inv in invocables] == ["ICalc::Add", "ICalc::Name", "ICalc::Name"]
+
+    def test_malformed_library(self, tmp_path):
+        """Verify truncated libraries and plain files yield nothing."""
+        truncated = tmp_path / "bad.tlb"
+        truncated.write_bytes(build_typelib(truncate=True))
+        assert load_type_libraries(truncated) == []
+
+        with PEImage.open(build_pe(tmp_path / "native.dll")) as image:
+            assert image.resources("TYPELIB") == []
+            assert load_type_libraries(image.path, image) == []
+        assert scan_type_library(tmp_path / "bad.tlb") == []
@@ -0,0 +1,61 @@
+"""
+test_msvc_demangle.py - Built-in MSVC demangler tests.
+
+Checks undname-style output for the decorations C++ DLLs export most
+(members, operators, templates, back-references) and that
+demangle_exports() fills ExportedFunc.demangled without undname.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+from exports import demangle_exports
+from msvc_demangle import demangle
+from schema import ExportedFunc
+
+CASES = [
+    ("?Fv_i@@YAHXZ", "int __cdecl Fv_i(void)"),
+    ("??0Foo@@QAE@XZ", "public: __thiscall Foo::Foo(void)"),
+    ("??1Foo@@UAE@XZ", "public: virtual __thiscall Foo::~Foo(void)"),
+    ("?bar@Foo@@QEAAXH@Z", "public: void __cdecl Foo::bar(int) __ptr64"),
+    ("?get@Foo@@QBEHXZ", "public: int __thiscall Foo::get(void)const"),
+    ("?x@Foo@@2HB", "public: static int const Foo::x"),
+    ("??_7Foo@@6B@", "const Foo::`vftable'"),
+    ("??4Foo@@QAEAAV0@ABV0@@Z",
+     "public: class Foo & __thiscall Foo::operator=(class Foo const &)"),
+    ("??BFoo@@QBEHXZ", "public: __thiscall Foo::operator int(void)const"),
+    ("?f@@YAXV?$basic_string@DU?$char_traits@D@std@@V?$allocator@D@2@@std@@@Z",
+     "void __cdecl f(class std::basic_string<char,struct std::char_traits<char>,"
+     "class std::allocator<char> >)"),
+    ("??$max@H@std@@YAABHABH0@Z",
+     "int const & __cdecl std::max<int>(int const &,int const &)"),
+    ("?f@@YAXP6AXH@Z@Z", "void __cdecl f(void (__cdecl*)(int))"),
+    ("?f@@YAXP8Foo@@AEXH@Z@Z", "void __cdecl f(void (__thiscall Foo::*)(int))"),
+    ("?printf@@YAHPBDZZ", "int __cdecl printf(char const *,...)"),
+    ("?x@?1??f@@YAXXZ@4HA", "int `void __cdecl f(void)'::`2'::x"),
+]
+
+
+class TestMsvcDemangle:
+    """Test suite for the built-in MSVC demangler."""
+
+    def test_undname_output(self):
+        """Verify decorations demangle to the undname declaration."""
+        for mangled, expected in CASES:
+            assert demangle(mangled) == expected, mangled
+
+    def test_rejects_unknown(self):
+        """Verify undecorated and malformed names return None."""
+        assert demangle("CreateFileW") is None
+        assert demangle("?foo@@YAHH@Ztrailing") is None
+        assert demangle("?foo@@") is None
+
+    def test_demangle_exports_without_undname(self):
+        """Verify exports are demangled in-process when undname is unavailable."""
+        exports = [ExportedFunc(name="?Fv_i@@YAHXZ"), ExportedFunc(name="CreateFileW"),
+                   ExportedFunc(name="?broken@@")]
+        assert demangle_exports(exports, "undname-not-installed")
+        assert [e.demangled for e in exports] == ["int __cdecl Fv_i(void)", None, None]
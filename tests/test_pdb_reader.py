@@ -0,0 +1,160 @@
+"""
+test_pdb_reader.py - Built-in PDB reader tests.
+
+Assembles a small MSF 7.00 program database in memory (superblock, stream
+directory, TPI, DBI, globals, publics, symbol record and module streams)
+for the equivalent of:
+
+    int __cdecl parse_config(char const *path, int flags);  // with a nested block
+    int __cdecl helper(int);                                 // public symbol only
+
+and checks the reader and analyze_pdb() on it, on any platform.
+"""
+
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+from pdb_analyzer import analyze_pdb
+from pdb_reader import MSF2_MAGIC, MSF7_MAGIC, MsfStream, PdbError, PdbFile
+
+BLOCK_SIZE = 512
+T_CHAR, T_INT4 = 0x70, 0x74
+
+
+def record(kind: int, body: bytes) -> bytes:
+    """Symbol or type record: length, kind, body padded to 4 bytes."""
+    body += b"\x00" * (-(len(body) + 4) % 4)
+    return struct.pack("<HH", len(body) + 2, kind) + body
+
+
+def type_stream(recursive: bool = False) -> bytes:
+    """TPI: char const, pointer to it, (char const *, int) and the procedure.
+
+    *recursive* points the pointer at the procedure instead, so that the
+    procedure returns and takes a pointer to itself.
+    """
+    pointee = 0x1003 if recursive else 0x1000
+    return_type = 0x1001 if recursive else T_INT4
+    records = (record(0x1001, struct.pack("<IH", T_CHAR, 1))              # 0x1000 char const
+               + record(0x1002, struct.pack("<II", pointee, 8 << 13 | 0x0C))  # 0x1001 ... *
+               + record(0x1201, struct.pack("<III", 2, 0x1001, T_INT4))   # 0x1002 arg list
+               + record(0x1008, struct.pack("<IBBHI", return_type, 0, 0, 2, 0x1002)))  # 0x1003
+    header = struct.pack("<IIIII", 20040203, 56, 0x1000, 0x1004, len(records))
+    return header + b"\x00" * (56 - len(header)) + records
+
+
+def module_stream() -> bytes:
+    """S_GPROC32 parse_config with two S_REGREL32 parameters and a nested block."""
+    def regrel(name: str) -> bytes:
+        return record(0x1111, struct.pack("<IIH", 8, T_INT4, 335) + name.encode() + b"\x00")
+
+    children = (regrel("path") + regrel("flags")
+                + record(0x1103, struct.pack("<IIIIH", 0, 0, 0, 0, 1) + b"\x00")  # S_BLOCK32
+                + regrel("local") + record(0x0006, b""))
+    proc_size = len(record(0x1110, bytes(35) + b"parse_config\x00"))
+    end = 4 + proc_size + len(children)
+    proc = record(0x1110, struct.pack("<IIIIIIIIHB", 0, end, 0, 0x20, 0, 0, 0x1003, 0x10, 1, 0)
+                  + b"parse_config\x00")
+    return struct.pack("<I", 4) + proc + children + record(0x0006, b"")
+
+
+def hash_records(offsets) -> bytes:
+    """GSI hash: header plus (symbol offset + 1, reference count) records."""
+    records = b"".join(struct.pack("<II", offset + 1, 1) for offset in offsets)
+    return struct.pack("<IIII", 0xFFFFFFFF, 0xF12F091A, len(records), 0) + records
+
+
+def build_pdb(path: Path, recursive_types: bool = False) -> Path:
+    """Write the program database described in the module docstring."""
+    procref = record(0x1125, struct.pack("<IIH", 0, 4, 1) + b"parse_config\x00")
+    publics = [record(0x110E, struct.pack("<IIH", 2, address, 1) + name)
+               for address, name in ((0x10, b"parse_config\x00"), (0x40, b"?helper@@YAHH@Z\x00"),
+                                     (0x80, b"__security_check_cookie\x00"))]
+    symbols = procref + b"".join(publics)
+    public_offsets = [len(procref), len(procref) + len(publics[0]),
+                      len(procref) + len(publics[0]) + len(publics[1])]
+
+    module_info = bytearray(64)
+    struct.pack_into("<H", module_info, 34, 8)
+    module_info += b"config.obj\x00config.obj\x00"
+    module_info += b"\x00" * (-len(module_info) % 4)
+    dbi = struct.pack("<iIIHHHHHHiiiiiIiiHHI", -1, 19990903, 1, 5, 0, 6, 0, 7, 0,
+                      len(module_info), 0, 0, 0, 0, 0, 0, 0, 0, 0x8664, 0) + module_info
+
+    streams = [b"", b"", type_stream(recursive_types), dbi, None, hash_records([0]),
+               bytes(28) + hash_records(public_offsets), symbols, module_stream()]
+
+    # Blocks: 0 superblock, 1-2 free page maps, then stream data, directory, block map
+    blocks, stream_blocks = [], []
+    next_block = 3
+    for stream in streams:
+        data = stream or b""
+        count = -(-len(data) // BLOCK_SIZE)
+        stream_blocks.append(list(range(next_block, next_block + count)))
+        blocks += [data[i * BLOCK_SIZE:(i + 1) * BLOCK_SIZE].ljust(BLOCK_SIZE, b"\x00")
+                   for i in range(count)]
+        next_block += count
+    directory = struct.pack("<I", len(streams))
+    directory += b"".join(struct.pack("<I", 0xFFFFFFFF if s is None else len(s)) for s in streams)
+    directory += b"".join(struct.pack("<I", b) for block_list in stream_blocks for b in block_list)
+    directory_block, map_block = next_block, next_block + 1
+
+    superblock = MSF7_MAGIC + struct.pack("<IIIIII", BLOCK_SIZE, 1, map_block + 1,
+                                          len(directory), 0, map_block)
+    data = (superblock.ljust(BLOCK_SIZE, b"\x00") + bytes(2 * BLOCK_SIZE) + b"".join(blocks)
+            + directory.ljust(BLOCK_SIZE, b"\x00")
+            + struct.pack("<I", directory_block).ljust(BLOCK_SIZE, b"\x00"))
+    path.write_bytes(data)
+    return path
+
+
+class TestPdbReader:
+    """Test suite for the built-in PDB reader."""
+
+    def test_functions(self, tmp_path):
+        """Verify procedures get typed parameters and publics are merged by address."""
+        with PdbFile.open(build_pdb(tmp_path / "config.pdb")) as pdb:
+            parse, helper, cookie = pdb.functions()
+
+        assert parse.declaration() == "int __cdecl parse_config(char const * path, int flags)"
+        assert (parse.mangled, parse.is_public, parse.section, parse.offset) == (
+            "parse_config", True, 1, 0x10)
+        assert (helper.name, helper.parameters, helper.offset) == ("?helper@@YAHH@Z", None, 0x40)
+        assert cookie.name == "__security_check_cookie"
+
+    def test_analyze_pdb(self, tmp_path):
+        """Verify analyze_pdb() works without DbgHelp and records the companion DLL."""
+        pdb = build_pdb(tmp_path / "config.pdb")
+        invocables = analyze_pdb(pdb)
+        assert [(i.signature, i.confidence, i.dll_path) for i in invocables] == [
+            ("parse_config(path: string, flags: integer): integer", "guaranteed", None),
+            ("helper(arg0: integer): integer", "guaranteed", None),
+        ]
+
+        (tmp_path / "config.dll").write_bytes(b"MZ")
+        assert analyze_pdb(pdb)[0].dll_path == str(tmp_path / "config.dll")
+
+    def test_malformed_pdb(self, tmp_path):
+        """Verify unsupported and truncated files are rejected, self-referential
+        types are cut off, and streams span blocks."""
+        for name, data in (("old.pdb", MSF2_MAGIC + bytes(64)), ("text.pdb", b"not a pdb"),
+                           ("cut.pdb", build_pdb(tmp_path / "full.pdb").read_bytes()[:1536])):
+            (tmp_path / name).write_bytes(data)
+            with pytest.raises(PdbError):
+                PdbFile.open(tmp_path / name)
+            if sys.platform != "win32":
+                assert analyze_pdb(tmp_path / name) == []
+
+        with PdbFile.open(build_pdb(tmp_path / "loop.pdb", recursive_types=True)) as pdb:
+            declaration = pdb.functions()[0].declaration()
+        assert declaration.endswith(
+            "parse_config(<type 0x1001> (__cdecl*)(<type 0x1001>, int) path, int flags)")
+
+        stream = MsfStream(b"AAAABBBBCCCC", 4, [2, 0], 6)
+        assert (stream.read(2, 10), stream.data()) == (b"CCAA", b"CCCCAA")
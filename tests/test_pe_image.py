@@ -0,0 +1,174 @@
+"""
+test_pe_image.py - Shared PE image tests.
+
+Builds minimal PE files in memory (no Windows binaries needed) and checks
+that PEImage header parsing and the stages sharing it agree.
+"""
+
+import struct
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+from classify import FileType, classify_file, get_architecture
+from pe_image import PEImage
+from pe_parse import (_read_exports_pefile, _read_imports_native, _read_imports_pefile,
+                      read_pe_exports, read_pe_imports)
+
+SECTION_RVA = 0x1000
+SECTION_RAW = 0x200
+
+
+def build_pe(path: Path, *, is_dll: bool = True, is_64bit: bool = True,
+             machine: int = 0x8664, section: bytes = b"",
+             directories: dict = None, virtual_size: int = None) -> Path:
+    """Write a minimal PE image with one section mapped at SECTION_RVA.
+
+    *directories* maps data directory index -> (rva, size).  The section's
+    virtual size defaults to its raw size.
+    """
+    directories = directories or {}
+    opt_size = 240 if is_64bit else 224
+    pe_offset = 0x40
+
+    dos = bytearray(pe_offset)
+    dos[0:2] = b"MZ"
+    struct.pack_into("<I", dos, 0x3C, pe_offset)
+
+    characteristics = 0x0002 | (0x2000 if is_dll else 0)
+    coff = b"PE\x00\x00" + struct.pack("<HHIIIHH", machine, 1, 0, 0, 0, opt_size, characteristics)
+
+    opt = bytearray(opt_size)
+    struct.pack_into("<H", opt, 0, 0x20B if is_64bit else 0x10B)
+    rva_count = 108 if is_64bit else 92
+    struct.pack_into("<I", opt, rva_count, 16)
+    for index, (rva, size) in directories.items():
+        struct.pack_into("<II", opt, rva_count + 4 + index * 8, rva, size)
+
+    raw_size = max(len(section), 1)
+    sect = struct.pack("<8sIIII", b".text", virtual_size or raw_size, SECTION_RVA, raw_size, SECTION_RAW)
+    sect += b"\x00" * 16
+
+    image = bytearray(dos + coff + opt + sect)
+    image += b"\x00" * (SECTION_RAW - len(image))
+    image += section or b"\x00"
+    path.write_bytes(bytes(image))
+    return path
+
+
+class TestPEImage:
+    """Test suite for PEImage header parsing."""
+
+    def test_headers(self, tmp_path):
+        """Verify machine, DLL flag and section mapping are read once."""
+        path = build_pe(tmp_path / "lib.dll", section=b"\xcc" * 64)
+        with PEImage.open(path) as image:
+            assert image.is_dll
+            assert image.is_64bit
+            assert image.architecture == "x64"
+            assert image.rva_to_offset(SECTION_RVA + 0x10) == SECTION_RAW + 0x10
+            assert not image.has_clr
+
+        # RVAs in the zero-filled tail past the raw data have no file offset
+        path = build_pe(tmp_path / "bss.dll", section=b"\xcc" * 64, virtual_size=0x1000)
+        path.write_bytes(path.read_bytes() + b"\xee" * 0x100)   # bytes after the section
+        with PEImage.open(path) as image:
+            assert image.rva_to_offset(SECTION_RVA + 63) == SECTION_RAW + 63
+            assert image.rva_to_offset(SECTION_RVA + 64) is None
+
+    def test_not_pe(self, tmp_path):
+        """Verify non-PE and empty files are rejected without raising."""
+        (tmp_path / "a.txt").write_text("hello")
+        (tmp_path / "empty.dll").write_bytes(b"")
+        assert PEImage.open(tmp_path / "a.txt") is None
+        assert PEImage.open(tmp_path / "empty.dll") is None
+
+    def test_classification_shares_image(self, tmp_path):
+        """Verify classify_file/get_architecture agree with and without an image."""
+        exe = build_pe(tmp_path / "tool.exe", is_dll=False, is_64bit=False, machine=0x014C)
+        net = build_pe(tmp_path / "managed.dll", directories={14: (SECTION_RVA, 0x48)})
+
+        for path, expected, arch in ((exe, FileType.PE_EXE, "x86"),
+                                     (net, FileType.DOTNET_ASSEMBLY, "x64")):
+            with PEImage.open(path) as image:
+                assert classify_file(path, image=image) == expected
+                assert get_architecture(path, image=image) == arch
+            assert classify_file(path) == expected
+            assert get_architecture(path) == arch
+
+
+def build_export_import_section(dll_name: bytes = b"KERNEL32.dll") -> tuple:
+    """Section bytes with an export and an import table, plus its directories.
+
+    Exports (Base 5): Alpha (named), #7 (ordinal only), Fwd -> NTDLL.RtlFoo.
+    Imports: <dll_name>!CreateFileW and <dll_name>!#7, and WS2_32.dll
+    ordinals 52 and 115 (which pefile's ordlookup names).
+    """
+    sec = bytearray(0x200)
+    rva = lambda off: SECTION_RVA + off  # noqa: E731
+
+    # IMAGE_EXPORT_DIRECTORY: Base=5, 4 functions, 2 names
+    struct.pack_into("<IIHHIIIIIII", sec, 0x00, 0, 0, 0, 0, 0, 5, 4, 2,
+                     rva(0x40), rva(0x60), rva(0x70))
+    struct.pack_into("<4I", sec, 0x40, 0x1500, 0, 0x1510, rva(0x8A))
+    struct.pack_into("<2I", sec, 0x60, rva(0x80), rva(0x86))
+    struct.pack_into("<2H", sec, 0x70, 0, 3)
+    sec[0x80:0x8A] = b"Alpha\x00Fwd\x00"
+    sec[0x8A:0x97] = b"NTDLL.RtlFoo\x00"  # forwarder string, inside the export directory
+
+    # Two IMAGE_IMPORT_DESCRIPTORs + terminator, PE32+ thunks
+    struct.pack_into("<IIIII", sec, 0x100, rva(0x140), 0, 0, rva(0x1A0), rva(0x140))
+    struct.pack_into("<IIIII", sec, 0x114, rva(0x1C0), 0, 0, rva(0x1E0), rva(0x1C0))
+    struct.pack_into("<3Q", sec, 0x1C0, (1 << 63) | 52, (1 << 63) | 115, 0)
+    sec[0x1E0:0x1EB] = b"WS2_32.dll\x00"
+    struct.pack_into("<3Q", sec, 0x140, rva(0x190), (1 << 63) | 7, 0)
+    sec[0x1A0:0x1A1 + len(dll_name)] = dll_name + b"\x00"
+    struct.pack_into("<H", sec, 0x190, 0)
+    sec[0x192:0x19E] = b"CreateFileW\x00"
+
+    directories = {0: (rva(0), 0x97), 1: (rva(0x100), 60)}
+    return bytes(sec), directories
+
+
+class TestPEReaders:
+    """Test suite for the struct-based export/import readers."""
+
+    def test_native_matches_pefile(self, tmp_path):
+        """Verify the fast path returns exactly what pefile reports."""
+        section, directories = build_export_import_section()
+        path = build_pe(tmp_path / "lib.dll", section=section, directories=directories)
+
+        with PEImage.open(path) as image:
+            exports, ok = read_pe_exports(path, image)
+            imports, imports_ok = read_pe_imports(path, image)
+            assert ok and imports_ok
+            assert exports == _read_exports_pefile(image)
+            assert imports == _read_imports_pefile(image)
+
+        assert [(e.name, e.ordinal, e.forwarded_to) for e in exports] == [
+            ("Alpha", 5, None), ("Fwd", 8, "NTDLL.RtlFoo"), ("#7", 7, None)]
+        assert imports == {"kernel32.dll": ["CreateFileW", "#7"],
+                           "ws2_32.dll": ["gethostbyname", "WSAStartup"]}
+
+    def test_api_set_import(self, tmp_path):
+        """Verify hyphenated api-ms-win-* DLL names stay on the fast path."""
+        section, directories = build_export_import_section(b"api-ms-win-core-file-l1-1-0.dll")
+        path = build_pe(tmp_path / "lib.dll", section=section, directories=directories)
+
+        with PEImage.open(path) as image:
+            imports = _read_imports_native(image)
+            assert imports == _read_imports_pefile(image)
+        assert imports["api-ms-win-core-file-l1-1-0.dll"] == ["CreateFileW", "#7"]
+
+    def test_malformed_falls_back_to_pefile(self, tmp_path):
+        """Verify a names table outside the image is handed to pefile."""
+        section, directories = build_export_import_section()
+        section = bytearray(section)
+        struct.pack_into("<I", section, 0x60, 0x7FFF0000)  # first name RVA: unmapped
+        path = build_pe(tmp_path / "bad.dll", section=bytes(section), directories=directories)
+
+        with PEImage.open(path) as image:
+            exports, _ = read_pe_exports(path, image)
+            assert exports == _read_exports_pefile(image)
@@ -0,0 +1,114 @@
+"""
+test_python_batch.py - Batch Python module analysis tests.
+
+Checks that the Python analyzer only reports module-level functions and
+public class methods, that analyze_python_files() gives the same results
+serially and in a process pool, and that aggregate-only directory scans
+use it, re-parsing only changed modules on a re-scan.
+"""
+
+import json
+import os
+import sys
+from argparse import Namespace
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+from main import analyze_directory, analyze_file
+from python_batch import analyze_python_files
+from scan_cache import ScanCache
+
+MODULE = '''\
+import sys
+
+def top(a: int) -> int:
+    """Top-level."""
+    def nested():
+        pass
+    return a
+
+if sys.platform == "win32":
+    def conditional():
+        pass
+else:
+    def conditional():
+        pass
+
+class Api:
+    def method(self, x):
+        def inner():
+            pass
+
+    def _private(self):
+        pass
+
+    class Nested:
+        def hidden(self):
+            pass
+
+class _Impl:
+    def run(self):
+        pass
+'''
+
+
+def write_tree(root: Path, count: int = 6) -> list:
+    root.mkdir()
+    paths = []
+    for i in range(count):
+        path = root / f"mod{i}.py"
+        path.write_text(MODULE + f"\ndef only_in_{i}():\n    pass\n", encoding="utf-8")
+        # Old enough for the cache to trust its size and mtime
+        os.utime(path, (1_600_000_000, 1_600_000_000))
+        paths.append(path)
+    return paths
+
+
+class TestPythonBatch:
+    """Test suite for the batch Python analyzer."""
+
+    def test_public_definitions_only(self, tmp_path):
+        """Verify nested functions and private classes are not reported."""
+        path = tmp_path / "mod.py"
+        path.write_text(MODULE, encoding="utf-8")
+        names = [inv.name for inv in analyze_file(path).invocables]
+        assert names == ["top", "conditional", "conditional", "method"]
+
+    def test_pool_and_cache(self, tmp_path, capsys):
+        """Verify pooled results match, and re-scans only re-parse changed modules."""
+        paths = write_tree(tmp_path / "pkg")
+        serial = analyze_python_files(paths)
+        pooled = analyze_python_files(paths, workers=2)
+        assert {p: r.invocables for p, r in serial.items()} == {p: r.invocables for p, r in pooled.items()}
+        assert serial[paths[0]].invocables == analyze_file(paths[0]).invocables
+
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+        args = Namespace(aggregate_only=True, jobs=2)
+        assert analyze_directory(tmp_path / "pkg", out_dir, args) == 0
+        paths[1].write_text("def changed():\n    pass\n", encoding="utf-8")
+        capsys.readouterr()
+        assert analyze_directory(tmp_path / "pkg", out_dir, args) == 0
+        assert f"Cache hits:          {len(paths) - 1}/{len(paths)}" in capsys.readouterr().out
+
+        cache = ScanCache.for_output_dir(out_dir)
+        assert cache.known_hash(paths[0]) is not None and cache.known_hash(paths[1]) is None
+        cache.close()
+
+    def test_aggregate_only_scan(self, tmp_path):
+        """Verify aggregate-only scans of Python trees match per-file scans."""
+        root = tmp_path / "app"
+        write_tree(root)
+        for name, options in (("full", {}), ("batch", {"aggregate_only": True, "jobs": 2})):
+            out_dir = tmp_path / name
+            out_dir.mkdir()
+            assert analyze_directory(root, out_dir, Namespace(no_cache=True, **options)) == 0
+            with open(out_dir / "app_scan_mcp.json", encoding="utf-8") as fh:
+                data = json.load(fh)
+            data["metadata"].pop("generated_at")
+            if name == "full":
+                full = data
+        assert data == full
+        assert full["summary"]["total_invocables"] == 6 * 5
@@ -0,0 +1,128 @@
+"""
+test_python_package.py - Package-aware Python API resolution tests.
+
+Builds a small package tree and checks that analyze_python_package()
+reports only names reachable through __all__ and re-exports (under their
+exported names), that script, argparse and click entry points are found,
+and that --python-packages directory scans emit just that surface.
+"""
+
+import json
+import sys
+from argparse import Namespace
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+from main import analyze_directory
+from python_package import analyze_python_package
+
+TREE = {
+    "app/__init__.py": (
+        '"""App."""\n'
+        "from .core import open_db, Client as PublicClient\n"
+        "from .core.util import helper as do_help\n"
+        "from . import extra\n"
+        "__all__ = ['open_db', 'PublicClient', 'do_help'] + ['extra']\n"
+    ),
+    "app/core/__init__.py": "from .db import *\nfrom .client import Client\n",
+    "app/core/db.py": (
+        "__all__ = ['open_db']\n"
+        "def open_db(path: str) -> int:\n    '''Open it.'''\n"
+        "def internal(): pass\n"
+    ),
+    "app/core/client.py": (
+        "class Client:\n    def get(self, key): pass\n    def _raw(self): pass\n"
+        "def not_exported(): pass\n"
+    ),
+    "app/core/util.py": "def helper(x): pass\ndef other(): pass\n",
+    "app/extra.py": "def extra_fn(): pass\n",
+    "app/_impl/__init__.py": "def hidden(): pass\n",
+    "app/plugins/__init__.py": "",
+    "app/plugins/csv.py": "def read_csv(path): pass\n",
+    "lib/__init__.py": "",
+    "lib/fmt.py": "def format_row(row): pass\n",
+    "lib/_compat.py": "def shim(): pass\n",
+    "app/__main__.py": (
+        "import argparse\n"
+        "parser = argparse.ArgumentParser(description='Run the app.')\n"
+        "parser.add_argument('-v', '--verbose', action='store_true')\n"
+        "parser.add_argument('target')\n"
+    ),
+    "tools/greet.py": (
+        "import click\n"
+        "@click.command()\n@click.option('--count', '-c')\n@click.argument('name')\n"
+        "def say_hello(count, name):\n    '''Greets.'''\n"
+        "if __name__ == '__main__':\n    say_hello()\n"
+    ),
+    "tools/report.py": "def build(): pass\nif __name__ == '__main__':\n    build()\n",
+}
+
+
+def write_tree(root: Path) -> list:
+    paths = []
+    for rel, text in TREE.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        paths.append(path)
+    return sorted(paths)
+
+
+def names(results: dict, root: Path) -> dict:
+    return {path.relative_to(root).as_posix(): [inv.name for inv in invocables]
+            for path, invocables in results.items() if invocables}
+
+
+class TestPythonPackage:
+    """Test suite for analyze_python_package() and --python-packages."""
+
+    def test_public_api(self, tmp_path):
+        """Verify __all__, re-export chains, aliases and empty packages."""
+        paths = write_tree(tmp_path)
+        found = names(analyze_python_package(paths), tmp_path)
+        assert found["app/core/db.py"] == ["open_db"]
+        assert found["app/core/client.py"] == ["get"]
+        assert found["app/core/util.py"] == ["do_help"]
+        assert found["app/extra.py"] == ["extra_fn"]
+        assert found["lib/fmt.py"] == ["format_row"]   # lib/__init__.py exports nothing
+        for hidden in ("app/_impl/__init__.py", "app/plugins/csv.py", "lib/_compat.py"):
+            assert hidden not in found
+
+        results = analyze_python_package(paths, workers=2)
+        assert names(results, tmp_path) == found
+        alias = results[tmp_path / "app/core/util.py"][0]
+        assert alias.signature == "def do_help(x)" and alias.dll_path == str(tmp_path / "app/core/util.py")
+
+    def test_entry_points(self, tmp_path):
+        """Verify argparse, click and bare script entry points."""
+        results = analyze_python_package(write_tree(tmp_path))
+        main = results[tmp_path / "app/__main__.py"][0]
+        assert (main.name, main.signature) == ("app", "python -m app [options]")
+        assert main.parameters == "--verbose, target" and main.doc_comment == "Run the app."
+
+        greet = {inv.source_type: inv for inv in results[tmp_path / "tools/greet.py"]}
+        assert greet["python_cli"].name == "say-hello"
+        assert greet["python_cli"].parameters == "--count, name"
+        assert greet["python_function"].name == "say_hello"
+
+        report = [(inv.name, inv.source_type) for inv in results[tmp_path / "tools/report.py"]]
+        assert report == [("build", "python_function"), ("report", "python_cli")]
+
+    def test_directory_scan(self, tmp_path):
+        """Verify --python-packages scans emit only the package surface."""
+        root = tmp_path / "src"
+        write_tree(root)
+        counts = {}
+        for flag in (False, True):
+            out_dir = tmp_path / f"out_{flag}"
+            out_dir.mkdir()
+            args = Namespace(python_packages=flag, aggregate_only=True, no_cache=True)
+            assert analyze_directory(root, out_dir, args) == 0
+            with open(out_dir / "src_scan_mcp.json", encoding="utf-8") as fh:
+                data = json.load(fh)
+            counts[flag] = {inv["name"] for inv in data["invocables"]}
+        assert {"internal", "other", "not_exported", "hidden"} <= counts[False]
+        assert not {"internal", "other", "not_exported", "hidden", "helper"} & counts[True]
+        assert {"open_db", "get", "do_help", "extra_fn", "app", "say-hello"} <= counts[True]
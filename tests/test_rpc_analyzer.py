@@ -0,0 +1,73 @@
+"""
+test_rpc_analyzer.py - RPC interface and endpoint detection tests.
+
+Embeds MIDL RPC_SERVER_INTERFACE / RPC_CLIENT_INTERFACE layouts and endpoint
+strings in a blob and checks that the scanners report exactly those.
+"""
+
+import struct
+import sys
+import uuid
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+from binary_strings import extract_strings
+from import_analyzer import find_urls
+from rpc_analyzer import (_NDR64_SYNTAX, _NDR_SYNTAX, find_rpc_interfaces,
+                          search_named_pipes, search_rpc_endpoints)
+
+
+def rpc_interface(iid: str, major: int, minor: int, dispatch: int,
+                  ptr_size: int = 8, syntax: bytes = _NDR_SYNTAX) -> bytes:
+    """Serialize an RPC_SERVER/CLIENT_INTERFACE with the given fields."""
+    length = 0x60 if ptr_size == 8 else 0x44
+    head = struct.pack("<I", length) + uuid.UUID(iid).bytes_le + struct.pack("<HH", major, minor)
+    # DispatchTable is pointer-aligned: offset 48 on x64, after 4 bytes of padding
+    head += syntax + (struct.pack("<4xQ", dispatch) if ptr_size == 8 else struct.pack("<I", dispatch))
+    return head + b"\x00" * (length - len(head))
+
+
+class TestFindRpcInterfaces:
+    """Test suite for find_rpc_interfaces()."""
+
+    def test_server_and_client_structures(self, tmp_path):
+        """Verify every structure is found with its version and role."""
+        blob = (b"\x90" * 1001
+                + rpc_interface("12345778-1234-abcd-ef00-0123456789ab", 1, 0, 0x180001000)
+                + b"\x00" * 37
+                + rpc_interface("338cd001-2244-31f1-aaaa-900038001003", 2, 1, 0, ptr_size=4)
+                + _NDR_SYNTAX * 3  # bare transfer syntax without a Length anchor
+                + rpc_interface("12345778-1234-abcd-ef00-0123456789ab", 1, 0, 0,
+                                syntax=_NDR64_SYNTAX)
+                # x64 server whose dispatch table pointer has a zero low half
+                + rpc_interface("0b0a6584-9e0f-11cf-a3cf-00805f68cb1b", 1, 1, 0x200000000))
+        path = tmp_path / "stub.dll"
+        path.write_bytes(blob)
+
+        found = [(i.uuid, i.version, i.is_server, i.is_client) for i in find_rpc_interfaces(path)]
+        assert found == [
+            ("{12345778-1234-ABCD-EF00-0123456789AB}", "1.0", True, True),
+            ("{338CD001-2244-31F1-AAAA-900038001003}", "2.1", False, True),
+            ("{0B0A6584-9E0F-11CF-A3CF-00805F68CB1B}", "1.1", True, False),
+        ]
+
+
+class TestBinaryStrings:
+    """Test suite for the shared string extraction stage."""
+
+    def test_pipes_endpoints_and_urls_share_one_extraction(self, tmp_path):
+        """Verify ASCII and UTF-16 strings feed every detector with offsets."""
+        blob = (b"\x01\x02" + r"\\.\pipe\spoolss".encode("utf-16le")
+                + b"\x00\xff" + b"ncalrpc:[LRPC-a1b2]\x00"
+                + "https://api.example.com/v1".encode("utf-16le") + b"\x00\x00"
+                + b"ncacn_ip_tcp\x00ab\x00")
+        path = tmp_path / "svc.dll"
+        path.write_bytes(blob)
+
+        strings = extract_strings(path)
+        assert [(s.offset, s.encoding) for s in strings][:2] == [(2, "utf-16le"), (36, "ascii")]
+        assert search_named_pipes(path, strings=strings) == [r"\\.\pipe\spoolss"]
+        assert search_rpc_endpoints(path, strings=strings) == ["ncalrpc:[LRPC-a1b2]", "ncacn_ip_tcp"]
+        assert find_urls(strings) == ["https://api.example.com/v1"]
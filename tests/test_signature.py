@@ -0,0 +1,149 @@
+"""
+test_signature.py - Authenticode signer extraction tests.
+
+Encodes a PKCS#7 SignedData signature by hand (CA and leaf certificates,
+one SignerInfo naming the leaf by issuer and serial number), places it in
+the certificate table of a minimal PE and checks the signer is decoded
+in-process, without PowerShell.
+"""
+
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+import signature
+from classify import extract_signature
+from pe_image import DIR_SECURITY, PEImage
+from signature import (SignatureError, get_signature_info, prefetch_catalog_signers, read_signer,
+                       seed_catalog_signers)
+from test_pe_image import SECTION_RAW, build_pe
+
+ROOT = [("2.5.4.6", "US"), ("2.5.4.10", "Contoso, Ltd."), ("2.5.4.3", "Contoso Code Signing CA")]
+LEAF = [("2.5.4.6", "CH"), ("2.5.4.7", "Zürich"), ("2.5.4.10", "Contoso, Ltd."),
+        ("2.5.4.3", "Contoso Zürich Tools")]
+
+
+def der(tag: int, *parts: bytes) -> bytes:
+    content = b"".join(parts)
+    if len(content) < 0x80:
+        return bytes([tag, len(content)]) + content
+    size = len(content).to_bytes((len(content).bit_length() + 7) // 8, "big")
+    return bytes([tag, 0x80 | len(size)]) + size + content
+
+
+def oid(dotted: str) -> bytes:
+    arcs = [int(a) for a in dotted.split(".")]
+    body = bytes([arcs[0] * 40 + arcs[1]])
+    for arc in arcs[2:]:
+        chunk = [arc & 0x7F]
+        while arc > 0x7F:
+            arc >>= 7
+            chunk.insert(0, 0x80 | arc & 0x7F)
+        body += bytes(chunk)
+    return der(0x06, body)
+
+
+def name(attributes) -> bytes:
+    return der(0x30, *(der(0x31, der(0x30, oid(o), der(0x0C, v.encode()))) for o, v in attributes))
+
+
+def certificate(serial: int, issuer, subject) -> bytes:
+    algorithm = der(0x30, oid("1.2.840.113549.1.1.11"))
+    validity = der(0x30, der(0x17, b"260101000000Z"), der(0x17, b"280101000000Z"))
+    key = der(0x30, der(0x30, oid("1.2.840.113549.1.1.1")), der(0x03, b"\x00\x01"))
+    tbs = der(0x30, der(0xA0, der(0x02, b"\x02")), der(0x02, bytes([serial])), algorithm,
+              name(issuer), validity, name(subject), key)
+    return der(0x30, tbs, algorithm, der(0x03, b"\x00\x01"))
+
+
+def certificate_table(pkcs7: bytes = None) -> bytes:
+    """WIN_CERTIFICATE table holding the leaf-signed SignedData (or *pkcs7*)."""
+    if pkcs7 is None:
+        digest = der(0x30, oid("2.16.840.1.101.3.4.2.1"))
+        signer_info = der(0x30, der(0x02, b"\x01"), der(0x30, name(ROOT), der(0x02, b"\x42")),
+                          digest, der(0x30, oid("1.2.840.113549.1.1.1")), der(0x04, b"sig"))
+        signed_data = der(0x30, der(0x02, b"\x01"), der(0x31, digest),
+                          der(0x30, oid("1.3.6.1.4.1.311.2.1.4")),
+                          der(0xA0, certificate(0x07, ROOT, ROOT), certificate(0x42, ROOT, LEAF)),
+                          der(0x31, signer_info))
+        pkcs7 = der(0x30, oid("1.2.840.113549.1.7.2"), der(0xA0, signed_data))
+    entry = struct.pack("<IHH", 8 + len(pkcs7), 0x0200, 0x0002) + pkcs7
+    return entry + b"\x00" * (-len(entry) % 8)
+
+
+def signed_pe(path: Path, table: bytes = None) -> Path:
+    table = table or certificate_table()
+    return build_pe(path, section=table, directories={DIR_SECURITY: (SECTION_RAW, len(table))})
+
+
+class TestSignature:
+    """Test suite for in-process Authenticode parsing."""
+
+    def test_signer_subject(self, tmp_path):
+        """Verify the SignerInfo's certificate (not the first one) gives the publisher."""
+        dll = signed_pe(tmp_path / "tools.dll")
+
+        signer = read_signer(dll)
+        assert signer.subject == 'CN=Contoso Zürich Tools, O="Contoso, Ltd.", L=Zürich, C=CH'
+        assert signer.issuer == 'CN=Contoso Code Signing CA, O="Contoso, Ltd.", C=US'
+        assert get_signature_info(dll) == (True, "Contoso Zürich Tools")
+        with PEImage.open(dll) as image:
+            assert extract_signature(dll, image) == (True, "Contoso Zürich Tools")
+
+    def test_cached_per_certificate_table(self, tmp_path):
+        """Verify identically signed files share one decoded signer."""
+        first = signed_pe(tmp_path / "a.dll")
+        second = signed_pe(tmp_path / "b.exe")
+        signature._SIGNERS.clear()
+
+        assert read_signer(first) is read_signer(second)
+        assert len(signature._SIGNERS) == 1
+
+    def test_unsigned_and_malformed(self, tmp_path):
+        """Verify unsigned files, non-PE files and broken signatures are not signed."""
+        assert get_signature_info(build_pe(tmp_path / "plain.dll")) == (False, None)
+        (tmp_path / "notes.txt").write_text("not a binary")
+        assert get_signature_info(tmp_path / "notes.txt") == (False, None)
+
+        broken = signed_pe(tmp_path / "broken.dll", certificate_table(b"\x30\x82\xff\xff\x06"))
+        with pytest.raises(SignatureError):
+            read_signer(broken)
+        if sys.platform != "win32":
+            assert get_signature_info(broken) == (False, None)
+
+    def test_catalog_fallback(self, tmp_path, monkeypatch):
+        """Verify files without an embedded signature ask the catalog on Windows,
+        once per content and in one batch for a prefetch."""
+        batches = []
+        def catalog(paths):
+            batches.append(sorted(path.name for path in paths))
+            return ["CN=Microsoft Windows, O=Microsoft Corporation" if path.stem.endswith("32")
+                    else "" for path in paths]
+        monkeypatch.setattr(signature, "_catalog_subjects", catalog)
+        monkeypatch.setattr(signature, "_CATALOG", {})
+        monkeypatch.setattr(signature.sys, "platform", "win32")
+
+        kernel32 = build_pe(tmp_path / "kernel32.dll")
+        copy = build_pe(tmp_path / "copy.dll")                  # same content as kernel32.dll
+        vendor = build_pe(tmp_path / "vendor.dll", virtual_size=0x400)
+        signed = signed_pe(tmp_path / "tools.dll")
+        assert get_signature_info(kernel32) == (True, "Microsoft Windows")
+        assert get_signature_info(copy) == (True, "Microsoft Windows")
+        assert get_signature_info(signed) == (True, "Contoso Zürich Tools")
+        assert batches == [["kernel32.dll"]]
+
+        found = prefetch_catalog_signers({vendor: None, signed: None, copy: None})
+        assert batches == [["kernel32.dll"], ["vendor.dll"]] and len(found) == 2
+        monkeypatch.setattr(signature, "_CATALOG", {})
+        seed_catalog_signers(found)
+        assert get_signature_info(vendor) == (False, None)
+        assert len(batches) == 2
+
+        monkeypatch.setattr(signature.sys, "platform", "linux")
+        assert get_signature_info(kernel32) == (False, None)
+        assert prefetch_catalog_signers({kernel32: None}) == {}
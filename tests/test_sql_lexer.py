@@ -0,0 +1,80 @@
+"""
+test_sql_lexer.py - Streaming SQL statement splitter tests.
+
+Checks that iter_statements() cuts scripts at ';', GO and DELIMITER
+boundaries only outside comments, literals, dollar-quoted bodies and
+parentheses, independently of the chunk size, with bounded statement and
+leading-comment text, and that analyze_sql() reads objects from it.
+"""
+
+import io
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "discovery"))
+
+import sql_lexer
+from sql_analyzer import analyze_sql
+from sql_lexer import iter_statements
+
+SCRIPT = """\
+-- Adds one.
+CREATE FUNCTION public.add_one(a integer) RETURNS integer AS $body$
+BEGIN RETURN a + 1; END; $$ not the end
+$body$ LANGUAGE plpgsql;
+COMMENT ON FUNCTION add_one(integer) IS 'it''s; done -- really';
+SELECT E'a\\'; b', (1; 2);
+COPY t (a, b) FROM stdin;
+1\tx; CREATE TABLE nope (a int) 'unbalanced
+\\.
+/* CREATE VIEW commented AS SELECT 1; */
+CREATE PROCEDURE [dbo].[usp_Get]
+    @id INT = 0
+AS
+    SELECT [a;b] FROM t
+go
+DELIMITER //
+CREATE PROCEDURE p() BEGIN SELECT 1; END //
+DELIMITER ;
+SELECT 2"""
+
+
+def split(text, chunk_size=sql_lexer.CHUNK_SIZE):
+    return [s.text.strip() for s in iter_statements(io.StringIO(text), chunk_size)]
+
+
+class TestSqlLexer:
+    """Test suite for iter_statements() and the streaming analyze_sql()."""
+
+    def test_statement_boundaries(self):
+        """Verify statements end only outside literals, comments and parentheses."""
+        statements = split(SCRIPT)
+        assert [s.splitlines()[-1][:20] for s in statements] == [
+            "$body$ LANGUAGE plpg", "COMMENT ON FUNCTION ", "SELECT E'a\\'; b', (1",
+            "COPY t (a, b) FROM s", "    SELECT [a;b] FRO", "CREATE PROCEDURE p()", "SELECT 2",
+        ]
+        assert statements[0].startswith("-- Adds one.")
+        assert all(split(SCRIPT, size) == statements for size in (1, 2, 5, 64, 300))
+
+    def test_bounded_text(self, monkeypatch):
+        """Verify long statements are cut short and leading text keeps only the doc window."""
+        monkeypatch.setattr(sql_lexer, "MAX_STATEMENT_CHARS", 50)
+        long_comment = "/* " + "x" * 1000 + " */\n"
+        script = ("-- old\n" * 200 + long_comment + "-- Doc.\nINSERT INTO t VALUES ('"
+                  + "y" * 5000 + "');\nSELECT 1;")
+        first, second = iter_statements(io.StringIO(script), chunk_size=100)
+        assert first.truncated and not second.truncated
+        assert first.text.lstrip().startswith("-- old")
+        assert first.text.endswith("-- Doc.\nINSERT INTO t VALUES ('" + "y" * 27)
+        assert "xxx" not in first.text and len(first.text) <= 2 * sql_lexer.DOC_WINDOW + 50
+
+    def test_analyze_streamed_script(self, tmp_path):
+        """Verify objects, names and docs from a script read in small chunks."""
+        path = tmp_path / "dump.sql"
+        path.write_text(SCRIPT)
+        found = {i.name: i for i in analyze_sql(path)}
+        assert sorted(found) == ["add_one", "p", "usp_Get"]
+        assert found["add_one"].doc_comment == "Adds one."
+        assert found["add_one"].return_type == "integer"
+        assert found["usp_Get"].parameters == "@id INT = 0"